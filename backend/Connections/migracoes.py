@@ -0,0 +1,315 @@
+"""
+Migrações do esquema do banco de dados.
+
+As migrações são arquivos ``NNNN_nome.sql`` em ``data/migracoes``, aplicados
+em ordem numérica. Cada uma roda na sua própria transação e é registrada na
+tabela schema_version; migrações já registradas são ignoradas, de modo que
+aplicar novamente é seguro. Um advisory lock evita que duas instâncias da
+API apliquem a mesma migração ao mesmo tempo.
+
+Uso pela linha de comando (a partir de backend/):
+
+    python -m Connections.migracoes              # aplica as pendentes
+    python -m Connections.migracoes status       # lista aplicadas/pendentes
+    python -m Connections.migracoes verificar-indices --linhas 200000
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, NamedTuple
+
+from Connections.postgre import postgreConnection
+
+DIRETORIO_MIGRACOES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "migracoes"
+)
+
+# Chave do advisory lock usado durante a aplicação das migrações
+CHAVE_LOCK_MIGRACOES = 7_311_992_001
+
+_PADRAO_ARQUIVO = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+
+class Migracao(NamedTuple):
+    versao: int
+    nome: str
+    caminho: str
+
+
+def listar_migracoes(diretorio: str = DIRETORIO_MIGRACOES) -> List[Migracao]:
+    """
+    Lista os arquivos de migração em ordem de versão.
+
+    Raises:
+        ValueError: Se duas migrações tiverem a mesma versão.
+    """
+    migracoes = []
+    for arquivo in os.listdir(diretorio):
+        correspondencia = _PADRAO_ARQUIVO.match(arquivo)
+        if correspondencia:
+            migracoes.append(
+                Migracao(
+                    versao=int(correspondencia.group(1)),
+                    nome=correspondencia.group(2),
+                    caminho=os.path.join(diretorio, arquivo),
+                )
+            )
+
+    migracoes.sort(key=lambda m: m.versao)
+    for anterior, atual in zip(migracoes, migracoes[1:]):
+        if anterior.versao == atual.versao:
+            raise ValueError(f"Versão de migração duplicada: {atual.versao}")
+
+    return migracoes
+
+
+def _criar_tabela_versoes(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            versao INTEGER PRIMARY KEY,
+            nome VARCHAR(200) NOT NULL,
+            aplicada_em TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+        """)
+
+
+def versoes_aplicadas(db: postgreConnection = None) -> Dict[int, str]:
+    """
+    Retorna as migrações registradas em schema_version (versão -> nome).
+    """
+    db = db or postgreConnection()
+    with db.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            _criar_tabela_versoes(cursor)
+            cursor.execute("SELECT versao, nome FROM schema_version ORDER BY versao")
+            versoes = dict(cursor.fetchall())
+            conn.commit()
+            return versoes
+        finally:
+            cursor.close()
+
+
+def aplicar_migracoes(
+    db: postgreConnection = None, diretorio: str = DIRETORIO_MIGRACOES
+) -> List[Migracao]:
+    """
+    Aplica, em ordem, as migrações ainda não registradas.
+
+    Returns:
+        Migrações aplicadas nesta chamada.
+    """
+    db = db or postgreConnection()
+    aplicadas = []
+
+    with db.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            _criar_tabela_versoes(cursor)
+            conn.commit()
+
+            for migracao in listar_migracoes(diretorio):
+                # O lock é liberado no fim da transação de cada migração
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s)", (CHAVE_LOCK_MIGRACOES,)
+                )
+                cursor.execute(
+                    "SELECT 1 FROM schema_version WHERE versao = %s",
+                    (migracao.versao,),
+                )
+                if cursor.fetchone():
+                    conn.rollback()
+                    continue
+
+                with open(migracao.caminho, encoding="utf-8") as arquivo:
+                    sql = arquivo.read()
+
+                try:
+                    cursor.execute(sql)
+                    cursor.execute(
+                        "INSERT INTO schema_version (versao, nome) VALUES (%s, %s)",
+                        (migracao.versao, migracao.nome),
+                    )
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    raise Exception(
+                        f"Erro ao aplicar a migração {migracao.versao:04d}_"
+                        f"{migracao.nome}: {str(e)}"
+                    )
+
+                aplicadas.append(migracao)
+        finally:
+            cursor.close()
+
+    return aplicadas
+
+
+# Consultas das listagens que devem usar índices, com o índice esperado
+CONSULTAS_INDEXADAS = {
+    "listar_simulacoes_projeto": (
+        """
+        SELECT s.id, s.nome_produto, s.data_simulacao
+        FROM simulacoes s
+        JOIN projeto p ON p.id_grupo = s.id_projeto
+        WHERE s.id_projeto = %(id_projeto)s AND p.id_usuario = %(id_usuario)s
+        ORDER BY s.data_simulacao DESC
+        """,
+        "idx_simulacoes_projeto_data",
+    ),
+    "listar_projetos_usuario": (
+        """
+        SELECT id_grupo, nome_grupo, data_criacao
+        FROM projeto
+        WHERE id_usuario = %(id_usuario)s
+        ORDER BY data_criacao DESC
+        """,
+        "idx_projeto_usuario_data",
+    ),
+}
+
+
+def _nos_plano(no: Dict[str, Any]):
+    yield no
+    for filho in no.get("Plans", []):
+        yield from _nos_plano(filho)
+
+
+def verificar_indices(
+    linhas: int = 200_000, db: postgreConnection = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Verifica com EXPLAIN se as listagens usam os índices esperados.
+
+    Um conjunto sintético de usuários, projetos e ``linhas`` simulações é
+    inserido, as estatísticas são atualizadas com ANALYZE e os planos são
+    analisados; ao final a transação é desfeita, sem deixar dados no banco.
+
+    Returns:
+        Para cada consulta: índice esperado, índices usados, tabelas lidas
+        com Seq Scan e se o plano foi aprovado.
+    """
+    db = db or postgreConnection()
+    projetos_por_usuario = 10
+    usuarios = max(1, min(1000, linhas // 100))
+    simulacoes_por_projeto = max(1, linhas // (usuarios * projetos_por_usuario))
+
+    with db.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                INSERT INTO usuarios (nome, email, senha)
+                SELECT 'Sintético ' || g, 'sintetico-' || g || '@exemplo.invalid', '-'
+                FROM generate_series(1, %s) AS g
+                RETURNING id_usuario
+                """,
+                (usuarios,),
+            )
+            ids_usuarios = [linha[0] for linha in cursor.fetchall()]
+
+            cursor.execute(
+                """
+                INSERT INTO projeto (id_usuario, nome_grupo, data_criacao)
+                SELECT u, 'Projeto ' || g, NOW() - g * INTERVAL '1 day'
+                FROM unnest(%s::int[]) AS u, generate_series(1, %s) AS g
+                """,
+                (ids_usuarios, projetos_por_usuario),
+            )
+            cursor.execute(
+                """
+                INSERT INTO simulacoes (
+                    id_projeto, nome_produto, demanda_anual, custo_pedido,
+                    custo_manutencao, lote_otimo_calculado, custo_total_otimo,
+                    data_simulacao
+                )
+                SELECT p.id_grupo, 'Produto ' || g, 1000, 50, 2, 223.61, 447.21,
+                       NOW() - g * INTERVAL '1 minute'
+                FROM projeto p, generate_series(1, %s) AS g
+                WHERE p.id_usuario = ANY(%s)
+                """,
+                (simulacoes_por_projeto, ids_usuarios),
+            )
+            cursor.execute("ANALYZE usuarios")
+            cursor.execute("ANALYZE projeto")
+            cursor.execute("ANALYZE simulacoes")
+
+            cursor.execute(
+                "SELECT id_grupo, id_usuario FROM projeto WHERE id_usuario = %s "
+                "LIMIT 1",
+                (ids_usuarios[-1],),
+            )
+            id_projeto, id_usuario = cursor.fetchone()
+
+            resultado = {}
+            for nome, (sql, indice) in CONSULTAS_INDEXADAS.items():
+                cursor.execute(
+                    "EXPLAIN (FORMAT JSON) " + sql,
+                    {"id_projeto": id_projeto, "id_usuario": id_usuario},
+                )
+                plano = cursor.fetchone()[0]
+                if isinstance(plano, str):
+                    plano = json.loads(plano)
+                nos = list(_nos_plano(plano[0]["Plan"]))
+
+                indices_usados = sorted(
+                    {n["Index Name"] for n in nos if "Index Name" in n}
+                )
+                seq_scans = sorted(
+                    {n["Relation Name"] for n in nos if n["Node Type"] == "Seq Scan"}
+                )
+                resultado[nome] = {
+                    "indice_esperado": indice,
+                    "indices_usados": indices_usados,
+                    "seq_scans": seq_scans,
+                    "aprovado": indice in indices_usados and not seq_scans,
+                }
+
+            return resultado
+        finally:
+            conn.rollback()
+            cursor.close()
+
+
+def main(argumentos: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Migrações do banco de dados")
+    comandos = parser.add_subparsers(dest="comando")
+    comandos.add_parser("aplicar", help="Aplica as migrações pendentes (padrão)")
+    comandos.add_parser("status", help="Lista migrações aplicadas e pendentes")
+    verificar = comandos.add_parser(
+        "verificar-indices",
+        help="Confere com EXPLAIN se as listagens usam índices (dados sintéticos)",
+    )
+    verificar.add_argument("--linhas", type=int, default=200_000)
+    args = parser.parse_args(argumentos)
+
+    if args.comando == "status":
+        aplicadas = versoes_aplicadas()
+        for migracao in listar_migracoes():
+            situacao = "aplicada" if migracao.versao in aplicadas else "pendente"
+            print(f"{migracao.versao:04d}_{migracao.nome}: {situacao}")
+        return 0
+
+    if args.comando == "verificar-indices":
+        resultado = verificar_indices(args.linhas)
+        for nome, dados in resultado.items():
+            situacao = "OK" if dados["aprovado"] else "FALHOU"
+            print(
+                f"{situacao} {nome}: índices={dados['indices_usados']} "
+                f"seq_scans={dados['seq_scans']}"
+            )
+        return 0 if all(d["aprovado"] for d in resultado.values()) else 1
+
+    aplicadas = aplicar_migracoes()
+    for migracao in aplicadas:
+        print(f"Aplicada {migracao.versao:04d}_{migracao.nome}")
+    if not aplicadas:
+        print("Nenhuma migração pendente")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,304 @@
 import os
+import time
+import threading
 import psycopg2
-from typing import Optional
+import psycopg2.extensions
+import psycopg2.pool
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Funções chamadas com o SQL de cada comando enviado ao banco
+_observadores_consultas: List[Callable[[str], None]] = []
+
+
+def registrar_observador_consultas(observador: Callable[[str], None]):
+    """
+    Registra uma função chamada a cada comando executado pelos cursores
+    das conexões do pool (usado para medir consultas por requisição).
+    """
+    if observador not in _observadores_consultas:
+        _observadores_consultas.append(observador)
+
+
+def remover_observador_consultas(observador: Callable[[str], None]):
+    """
+    Remove um observador registrado com registrar_observador_consultas.
+    """
+    if observador in _observadores_consultas:
+        _observadores_consultas.remove(observador)
+
+
+def _notificar_consulta(sql):
+    for observador in _observadores_consultas:
+        observador(sql)
+
+
+class _CursorInstrumentado:
+    """
+    Mixin que notifica os observadores a cada comando enviado ao banco.
+    """
+
+    def execute(self, query, vars=None):
+        _notificar_consulta(query)
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        _notificar_consulta(query)
+        return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        _notificar_consulta(sql)
+        return super().copy_expert(sql, file, size)
+
+
+_cursores_instrumentados: Dict[type, type] = {}
+
+
+def _cursor_instrumentado(cursor_factory: type) -> type:
+    """
+    Retorna (criando na primeira vez) a subclasse instrumentada de um
+    tipo de cursor.
+    """
+    classe = _cursores_instrumentados.get(cursor_factory)
+    if classe is None:
+        classe = type(
+            f"{cursor_factory.__name__}Instrumentado",
+            (_CursorInstrumentado, cursor_factory),
+            {},
+        )
+        _cursores_instrumentados[cursor_factory] = classe
+    return classe
+
+
+class _ConexaoInstrumentada(psycopg2.extensions.connection):
+    """
+    Conexão cujos cursores notificam os observadores de consultas.
+    """
+
+    def cursor(self, *args, **kwargs):
+        fabrica = kwargs.get("cursor_factory") or self.cursor_factory
+        kwargs["cursor_factory"] = _cursor_instrumentado(
+            fabrica or psycopg2.extensions.cursor
+        )
+        return super().cursor(*args, **kwargs)
+
+
+class _PoolConexoes:
+    """
+    Pool de conexões thread-safe compartilhado pelos serviços.
+
+    Mantém até ``maximo`` conexões abertas, espera com timeout quando todas
+    estão em uso, verifica (pre-ping) conexões que ficaram ociosas,
+    recicla conexões antigas e desfaz transações pendentes na devolução.
+    """
+
+    def __init__(
+        self,
+        minimo: int,
+        maximo: int,
+        timeout: float,
+        reciclar_apos: float,
+        ping_apos: float,
+        **parametros,
+    ):
+        self.maximo = maximo
+        self.timeout = timeout
+        self.reciclar_apos = reciclar_apos
+        self.ping_apos = ping_apos
+        self._parametros = parametros
+        self._cond = threading.Condition()
+        # Conexões livres com o momento da última devolução
+        self._livres: Deque[Tuple[psycopg2.extensions.connection, float]] = deque()
+        # id da conexão -> momento de criação
+        self._criadas_em: Dict[int, float] = {}
+        self._abertas = 0
+        self._fechado = False
+
+        for _ in range(minimo):
+            self._abertas += 1
+            self._livres.append((self._conectar(), time.monotonic()))
+
+    def obter(self) -> psycopg2.extensions.connection:
+        """
+        Retira uma conexão válida do pool, aguardando até o timeout.
+
+        Raises:
+            psycopg2.pool.PoolError: Se nenhuma conexão ficar livre a tempo.
+        """
+        prazo = time.monotonic() + self.timeout
+
+        while True:
+            with self._cond:
+                if self._fechado:
+                    raise psycopg2.pool.PoolError("O pool de conexões está fechado")
+
+                while not self._livres and self._abertas >= self.maximo:
+                    restante = prazo - time.monotonic()
+                    if restante <= 0:
+                        raise psycopg2.pool.PoolError(
+                            "Tempo esgotado aguardando uma conexão livre no pool"
+                        )
+                    self._cond.wait(restante)
+
+                if self._livres:
+                    # LIFO: reaproveita a conexão usada mais recentemente
+                    conn, devolvida_em = self._livres.pop()
+                else:
+                    conn, devolvida_em = None, None
+                    self._abertas += 1
+
+            if conn is None:
+                try:
+                    return self._conectar()
+                except Exception:
+                    with self._cond:
+                        self._abertas -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._conexao_valida(conn, devolvida_em):
+                return conn
+
+            self._descartar(conn)
+
+    def devolver(self, conn: psycopg2.extensions.connection):
+        """
+        Devolve a conexão ao pool, desfazendo transações pendentes.
+        Conexões quebradas ou antigas são fechadas em vez de reaproveitadas.
+        """
+        if conn.closed or self._expirada(conn):
+            self._descartar(conn)
+            return
+
+        try:
+            if (
+                conn.info.transaction_status
+                != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            ):
+                conn.rollback()
+        except psycopg2.Error:
+            self._descartar(conn)
+            return
+
+        with self._cond:
+            if self._fechado:
+                self._abertas -= 1
+                self._criadas_em.pop(id(conn), None)
+                conn.close()
+                return
+            self._livres.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def fechar(self):
+        """
+        Fecha as conexões livres e impede novas retiradas. Conexões em uso
+        são fechadas quando forem devolvidas.
+        """
+        with self._cond:
+            self._fechado = True
+            while self._livres:
+                conn, _ = self._livres.pop()
+                self._abertas -= 1
+                self._criadas_em.pop(id(conn), None)
+                conn.close()
+            self._cond.notify_all()
+
+    def _conectar(self) -> psycopg2.extensions.connection:
+        """
+        Abre uma nova conexão com o banco de dados.
+        """
+        conn = psycopg2.connect(
+            connection_factory=_ConexaoInstrumentada, **self._parametros
+        )
+        with self._cond:
+            self._criadas_em[id(conn)] = time.monotonic()
+        return conn
+
+    def _expirada(self, conn: psycopg2.extensions.connection) -> bool:
+        """
+        Indica se a conexão já passou do tempo de reciclagem.
+        """
+        if not self.reciclar_apos:
+            return False
+        criada_em = self._criadas_em.get(id(conn), time.monotonic())
+        return time.monotonic() - criada_em > self.reciclar_apos
+
+    def _conexao_valida(
+        self, conn: psycopg2.extensions.connection, devolvida_em: float
+    ) -> bool:
+        """
+        Verifica se a conexão pode ser entregue: não fechada, dentro do
+        tempo de reciclagem e, se ficou ociosa por muito tempo, respondendo
+        a um SELECT 1.
+        """
+        if conn.closed or self._expirada(conn):
+            return False
+
+        if time.monotonic() - devolvida_em >= self.ping_apos:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+
+        return True
+
+    def _descartar(self, conn: psycopg2.extensions.connection):
+        """
+        Fecha a conexão e libera a sua vaga no pool.
+        """
+        try:
+            conn.close()
+        finally:
+            with self._cond:
+                self._abertas -= 1
+                self._criadas_em.pop(id(conn), None)
+                self._cond.notify()
+
 
 class postgreConnection:
     """
     Classe responsável por gerenciar a conexão com o banco de dados PostgreSQL.
     As credenciais são obtidas das variáveis de ambiente.
+
+    As conexões vêm de um pool compartilhado por todas as instâncias com as
+    mesmas credenciais. Cada operação deve retirar a sua conexão com
+    ``conexao()`` e devolvê-la ao final.
     """
 
+    _pools: Dict[tuple, _PoolConexoes] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self):
         """
         Inicializa a classe com as credenciais do banco de dados
-        obtidas das variáveis de ambiente.
+        e a configuração do pool obtidas das variáveis de ambiente.
         """
         self.host = os.getenv('DB_HOST', 'localhost')
         self.port = os.getenv('DB_PORT', '5432')
         self.database = os.getenv('DB_NAME')
         self.user = os.getenv('DB_USER')
         self.password = os.getenv('DB_PASSWORD')
-        self._connection: Optional[psycopg2.extensions.connection] = None
 
-    def get_connection(self) -> psycopg2.extensions.connection:
+        self.pool_min = int(os.getenv('DB_POOL_MIN', '1'))
+        self.pool_max = int(os.getenv('DB_POOL_MAX', '10'))
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+        self.pool_reciclar = float(os.getenv('DB_POOL_RECYCLE', '1800'))
+        self.pool_ping = float(os.getenv('DB_POOL_PING_APOS', '10'))
+
+    def _chave_pool(self) -> tuple:
+        return (self.host, self.port, self.database, self.user, self.password)
+
+    def _obter_pool(self) -> _PoolConexoes:
         """
-        Retorna um objeto de conexão com o banco de dados PostgreSQL.
-        
-        Returns:
-            psycopg2.extensions.connection: Objeto de conexão ativo com o banco de dados.
-            
+        Retorna o pool compartilhado destas credenciais, criando-o na
+        primeira utilização.
+
         Raises:
             ValueError: Se as credenciais obrigatórias não estiverem configuradas.
             psycopg2.Error: Se houver erro ao conectar com o banco de dados.
@@ -42,27 +310,62 @@ class postgreConnection:
                 "Defina DB_NAME, DB_USER e DB_PASSWORD nas variáveis de ambiente."
             )
 
-        # Se já existe uma conexão ativa, retorna ela
-        if self._connection and not self._connection.closed:
-            return self._connection
+        chave = self._chave_pool()
+        pool = self._pools.get(chave)
+        if pool:
+            return pool
+
+        with self._pools_lock:
+            pool = self._pools.get(chave)
+            if pool:
+                return pool
 
-        # Cria uma nova conexão
+            try:
+                pool = _PoolConexoes(
+                    minimo=self.pool_min,
+                    maximo=self.pool_max,
+                    timeout=self.pool_timeout,
+                    reciclar_apos=self.pool_reciclar,
+                    ping_apos=self.pool_ping,
+                    host=self.host,
+                    port=self.port,
+                    database=self.database,
+                    user=self.user,
+                    password=self.password,
+                )
+            except psycopg2.Error as e:
+                raise psycopg2.Error(f"Erro ao conectar ao banco de dados: {str(e)}")
+
+            self._pools[chave] = pool
+            return pool
+
+    @contextmanager
+    def conexao(self) -> Iterator[psycopg2.extensions.connection]:
+        """
+        Retira uma conexão do pool pelo tempo de uma operação.
+
+        Ao sair do bloco a conexão é devolvida ao pool; transações não
+        confirmadas são desfeitas.
+
+        Yields:
+            psycopg2.extensions.connection: Conexão ativa com o banco de dados.
+
+        Raises:
+            ValueError: Se as credenciais obrigatórias não estiverem configuradas.
+            psycopg2.pool.PoolError: Se nenhuma conexão ficar livre a tempo.
+        """
+        pool = self._obter_pool()
+        conn = pool.obter()
         try:
-            self._connection = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
-            return self._connection
-        except psycopg2.Error as e:
-            raise psycopg2.Error(f"Erro ao conectar ao banco de dados: {str(e)}")
+            yield conn
+        finally:
+            pool.devolver(conn)
 
     def close(self):
         """
-        Fecha a conexão com o banco de dados, se estiver aberta.
+        Fecha todas as conexões do pool compartilhado destas credenciais.
         """
-        if self._connection and not self._connection.closed:
-            self._connection.close()
-            self._connection = None
+        with self._pools_lock:
+            pool = self._pools.pop(self._chave_pool(), None)
+        if pool:
+            pool.fechar()
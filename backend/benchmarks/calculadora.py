@@ -0,0 +1,97 @@
+"""
+Benchmark dos cálculos de CalculadoraLoteEconomico.
+
+Mede a construção da calculadora (modos numérico e simbólico), o lote
+ótimo, o custo total, os dados do gráfico com vários números de pontos e o
+relatório detalhado. O banco não participa.
+
+Uso (a partir de backend/):
+
+    python -m benchmarks.calculadora --pontos 100 1000 10000 100000
+"""
+
+import argparse
+from typing import Dict, Iterable, List, Optional
+
+from benchmarks.medicao import medir
+from utils.lote_economico import (
+    ESCALA_ADAPTATIVA,
+    ESCALA_LINEAR,
+    MODO_SIMBOLICO,
+    CalculadoraLoteEconomico,
+)
+
+PONTOS_PADRAO = [100, 1000, 10000, 100000]
+
+# Produto usado em todas as medidas
+PARAMETROS = {
+    "demanda_anual": 12000,
+    "custo_pedido": 85.5,
+    "custo_manutencao": 3.2,
+    "lote_atual": 1500,
+}
+
+
+def executar(
+    pontos: List[int],
+    amostras: int = 15,
+    tempo_minimo: float = 0.05,
+    nomes: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Mede os benchmarks da calculadora (apenas os de ``nomes``, se
+    informado).
+    """
+    calculadora = CalculadoraLoteEconomico(**PARAMETROS)
+    lote_otimo = calculadora.calcular_lote_otimo(False)["lote_otimo"]
+
+    casos = {
+        "calculadora.construcao": lambda: CalculadoraLoteEconomico(**PARAMETROS),
+        "calculadora.construcao_simbolica": lambda: CalculadoraLoteEconomico(
+            **PARAMETROS, modo=MODO_SIMBOLICO
+        ),
+        "calculadora.calcular_lote_otimo": lambda: calculadora.calcular_lote_otimo(),
+        "calculadora.calcular_lote_otimo_sem_expressoes": (
+            lambda: calculadora.calcular_lote_otimo(False)
+        ),
+        "calculadora.calcular_custo_total": (
+            lambda: calculadora.calcular_custo_total(lote_otimo)
+        ),
+    }
+    for quantidade in pontos:
+        casos[f"calculadora.gerar_dados_grafico[linear,{quantidade}]"] = (
+            lambda quantidade=quantidade: calculadora.gerar_dados_grafico(
+                pontos=quantidade, escala=ESCALA_LINEAR
+            )
+        )
+        casos[f"calculadora.gerar_dados_grafico[adaptativa,{quantidade}]"] = (
+            lambda quantidade=quantidade: calculadora.gerar_dados_grafico(
+                pontos=quantidade, escala=ESCALA_ADAPTATIVA
+            )
+        )
+    casos["calculadora.gerar_relatorio_detalhado"] = (
+        lambda: calculadora.gerar_relatorio_detalhado()
+    )
+
+    return {
+        nome: medir(funcao, amostras=amostras, tempo_minimo=tempo_minimo)
+        for nome, funcao in casos.items()
+        if nomes is None or nome in nomes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tempo por chamada dos cálculos de CalculadoraLoteEconomico"
+    )
+    parser.add_argument("--pontos", type=int, nargs="+", default=PONTOS_PADRAO)
+    parser.add_argument("--amostras", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'benchmark':60s} {'mediana':>11s} {'p95':>11s}")
+    for nome, medidas in executar(args.pontos, args.amostras).items():
+        print(f"{nome:60s} {medidas['mediana_ms']:9.4f}ms {medidas['p95_ms']:9.4f}ms")
+
+
+if __name__ == "__main__":
+    main()
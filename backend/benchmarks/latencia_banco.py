@@ -0,0 +1,226 @@
+"""
+Benchmark da latência das rotas que consultam o banco com muitos clientes
+simultâneos.
+
+Sobe a API com o uvicorn em uma thread (com o lifespan, como em produção)
+e um processo separado abre ``--clientes`` conexões HTTP simultâneas que
+chamam, em rodízio, a leitura de uma simulação, a primeira página da
+listagem do projeto e o resumo do projeto. Compara dois cenários:
+
+- antes: os serviços rodam direto no event loop (como antes de as rotas
+  usarem run_in_threadpool), de modo que cada consulta bloqueia todas as
+  requisições em andamento;
+- depois: as rotas como estão, com as consultas no pool de threads do
+  AnyIO (API_MAX_THREADS) e as conexões do pool do banco (DB_POOL_MAX).
+
+Usa o banco configurado nas variáveis de ambiente (DB_HOST, DB_NAME, ...),
+com as migrações aplicadas. Cria um usuário e um projeto próprios, com
+``--simulacoes`` simulações, e os remove ao final.
+
+Uso (a partir de backend/):
+
+    python -m benchmarks.latencia_banco --clientes 200 --requisicoes 20
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+import httpx
+import numpy as np
+import uvicorn
+
+from benchmarks.latencia_saude import porta_livre
+from benchmarks.simulacao_crud import _criar_usuario, _remover_usuario, _simulacao
+from Connections.postgre import postgreConnection
+from main import app
+from models.projeto import ProjetoCriar
+from routes import auth, job, projeto, simulacao
+from services.projeto import ProjetoService
+from services.simulacao import SimulacaoService
+from utils.auth import token_manager
+
+# Módulos de rotas que chamam os serviços com run_in_threadpool
+MODULOS_ROTAS = (auth, job, projeto, simulacao)
+
+
+async def _no_event_loop(funcao, *args, **kwargs):
+    """
+    Substituto de run_in_threadpool do cenário "antes": executa a função
+    bloqueante na própria thread do event loop.
+    """
+    return funcao(*args, **kwargs)
+
+
+@contextmanager
+def servicos_no_event_loop():
+    """
+    Faz as rotas chamarem os serviços no event loop enquanto ativo.
+    """
+    originais = [modulo.run_in_threadpool for modulo in MODULOS_ROTAS]
+    for modulo in MODULOS_ROTAS:
+        modulo.run_in_threadpool = _no_event_loop
+    try:
+        yield
+    finally:
+        for modulo, original in zip(MODULOS_ROTAS, originais):
+            modulo.run_in_threadpool = original
+
+
+async def _clientes(
+    porta: int, token: str, rotas: List[str], clientes: int, requisicoes: int
+) -> List[float]:
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{porta}",
+        headers={"Authorization": f"Bearer {token}"},
+        limits=limites,
+        timeout=120,
+    ) as cliente:
+        latencias: List[float] = []
+
+        async def sessao(indice: int):
+            for numero in range(requisicoes):
+                rota = rotas[(indice + numero) % len(rotas)]
+                inicio = time.perf_counter()
+                resposta = await cliente.get(rota)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                assert resposta.status_code == 200, (rota, resposta.status_code)
+
+        await asyncio.gather(*(sessao(indice) for indice in range(clientes)))
+        return latencias
+
+
+def medir_latencias(
+    porta: int,
+    token: str,
+    rotas: List[str],
+    clientes: int,
+    requisicoes: int,
+    fila: multiprocessing.Queue,
+):
+    """
+    Processo cliente: ``clientes`` sessões simultâneas com ``requisicoes``
+    chamadas cada; devolve as latências em milissegundos e a duração.
+    """
+    inicio = time.perf_counter()
+    latencias = asyncio.run(_clientes(porta, token, rotas, clientes, requisicoes))
+    fila.put((latencias, time.perf_counter() - inicio))
+
+
+def medir_cenario(
+    porta: int, token: str, rotas: List[str], clientes: int, requisicoes: int
+) -> Dict[str, float]:
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    cliente = contexto.Process(
+        target=medir_latencias,
+        args=(porta, token, rotas, clientes, requisicoes, fila),
+    )
+    cliente.start()
+    latencias, duracao = fila.get()
+    cliente.join()
+
+    latencias = np.array(latencias)
+    return {
+        "p50_ms": float(np.percentile(latencias, 50)),
+        "p95_ms": float(np.percentile(latencias, 95)),
+        "p99_ms": float(np.percentile(latencias, 99)),
+        "max_ms": float(latencias.max()),
+        "requisicoes_por_s": latencias.size / duracao,
+    }
+
+
+def _preparar_dados(simulacoes: int) -> Tuple[int, int, List[int]]:
+    db = postgreConnection()
+    id_usuario = _criar_usuario(db)
+    try:
+        id_projeto = (
+            ProjetoService()
+            .criar_projeto(ProjetoCriar(nome_grupo="Benchmark latência"), id_usuario)
+            .id_grupo
+        )
+        criadas = SimulacaoService().criar_simulacoes_lote(
+            [_simulacao(indice) for indice in range(simulacoes)],
+            id_projeto,
+            id_usuario,
+        )
+    except Exception:
+        _remover_usuario(db, id_usuario)
+        raise
+    return id_usuario, id_projeto, [item.id for item in criadas.simulacoes]
+
+
+def executar(
+    clientes: int, requisicoes: int, simulacoes: int
+) -> Dict[str, Dict[str, float]]:
+    id_usuario, id_projeto, ids = _preparar_dados(simulacoes)
+    token = token_manager.criar_token(id_usuario)
+    rotas = [
+        f"/projetos/{id_projeto}/simulacoes/{id_simulacao}" for id_simulacao in ids
+    ]
+    rotas = [
+        rota
+        for trio in zip(
+            rotas,
+            [f"/projetos/{id_projeto}/simulacoes/?limite=50"] * len(rotas),
+            [f"/projetos/{id_projeto}/resumo"] * len(rotas),
+        )
+        for rota in trio
+    ]
+
+    porta = porta_livre()
+    servidor = uvicorn.Server(uvicorn.Config(app, port=porta, log_level="warning"))
+    thread_servidor = threading.Thread(target=servidor.run, daemon=True)
+    thread_servidor.start()
+    try:
+        while not servidor.started:
+            if not thread_servidor.is_alive():
+                raise RuntimeError("O servidor da API não iniciou")
+            time.sleep(0.05)
+
+        resultados = {}
+        with servicos_no_event_loop():
+            resultados["antes (serviços no event loop)"] = medir_cenario(
+                porta, token, rotas, clientes, requisicoes
+            )
+        resultados["depois (run_in_threadpool)"] = medir_cenario(
+            porta, token, rotas, clientes, requisicoes
+        )
+        return resultados
+    finally:
+        servidor.should_exit = True
+        thread_servidor.join()
+        ProjetoService().deletar_projeto(id_projeto, id_usuario)
+        _remover_usuario(postgreConnection(), id_usuario)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latência das rotas com banco sob muitos clientes simultâneos"
+    )
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--requisicoes", type=int, default=20)
+    parser.add_argument("--simulacoes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"clientes: {args.clientes}, requisições por cliente: {args.requisicoes}")
+    print(
+        f"{'cenário':34s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'máx':>9s}"
+        f" {'req/s':>9s}"
+    )
+    resultados = executar(args.clientes, args.requisicoes, args.simulacoes)
+    for nome, medidas in resultados.items():
+        print(
+            f"{nome:34s} {medidas['p50_ms']:7.2f}ms {medidas['p95_ms']:7.2f}ms"
+            f" {medidas['p99_ms']:7.2f}ms {medidas['max_ms']:7.2f}ms"
+            f" {medidas['requisicoes_por_s']:9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
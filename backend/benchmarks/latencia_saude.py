@@ -0,0 +1,201 @@
+"""
+Benchmark da latência do endpoint raiz (saúde) com cálculos pesados em
+andamento.
+
+Sobe a API com o uvicorn em uma thread e, enquanto threads do próprio
+processo (como as do pool de threads do AnyIO atendendo requisições)
+calculam curvas adaptativas e mapas de sensibilidade grandes, um processo
+separado mede a latência de ``GET /``. Compara três cenários: sem carga,
+cálculos na própria thread e cálculos enviados ao pool de processos. O
+banco não participa.
+
+Uso (a partir de backend/):
+
+    python -m benchmarks.latencia_saude --threads 4 --requisicoes 200
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+import uvicorn
+
+from main import app
+from utils.lote_economico import (
+    ESCALA_ADAPTATIVA,
+    MAX_PONTOS_GRAFICO,
+    CalculadoraLoteEconomico,
+)
+from utils.pool_calculo import PoolCalculo
+from utils.sensibilidade import MAX_PONTOS_SENSIBILIDADE, AnaliseSensibilidade
+
+
+def medir_latencias(
+    porta: int, requisicoes: int, intervalo: float, fila: multiprocessing.Queue
+):
+    """
+    Processo cliente: faz ``requisicoes`` chamadas a GET / e devolve as
+    latências em milissegundos.
+    """
+    conexao = http.client.HTTPConnection("127.0.0.1", porta)
+    latencias = []
+    for _ in range(requisicoes):
+        inicio = time.perf_counter()
+        conexao.request("GET", "/")
+        resposta = conexao.getresponse()
+        resposta.read()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        assert resposta.status == 200
+        time.sleep(intervalo)
+    conexao.close()
+    fila.put(latencias)
+
+
+def calcular_carga(pool: PoolCalculo, parar: threading.Event, contador: List[int]):
+    """
+    Repete os cálculos pesados de um gráfico e de uma análise de
+    sensibilidade até o sinal de parada.
+    """
+    calculadora = CalculadoraLoteEconomico(1000, 50, 2, 300)
+    while not parar.is_set():
+        pool.executar(
+            calculadora.calcular_curva,
+            None,
+            None,
+            MAX_PONTOS_GRAFICO,
+            ESCALA_ADAPTATIVA,
+            None,
+            None,
+            custo=MAX_PONTOS_GRAFICO * 8,
+        )
+        pool.executar(
+            AnaliseSensibilidade(calculadora).gerar_analise,
+            -0.3,
+            0.3,
+            21,
+            "demanda_anual",
+            "custo_manutencao",
+            MAX_PONTOS_SENSIBILIDADE,
+            "custo_total_otimo",
+            custo=MAX_PONTOS_SENSIBILIDADE**2,
+        )
+        contador[0] += 1
+
+
+def medir_cenario(
+    porta: int,
+    pool: PoolCalculo,
+    threads: int,
+    requisicoes: int,
+    intervalo: float,
+) -> Dict[str, float]:
+    """
+    Mede a latência de GET / com ``threads`` threads de cálculo (0 = sem
+    carga) usando o pool informado.
+    """
+    parar = threading.Event()
+    contador = [0]
+    carga = [
+        threading.Thread(target=calcular_carga, args=(pool, parar, contador))
+        for _ in range(threads)
+    ]
+    for thread in carga:
+        thread.start()
+
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    cliente = contexto.Process(
+        target=medir_latencias, args=(porta, requisicoes, intervalo, fila)
+    )
+    inicio = time.perf_counter()
+    cliente.start()
+    latencias = np.array(fila.get())
+    cliente.join()
+    duracao = time.perf_counter() - inicio
+
+    parar.set()
+    for thread in carga:
+        thread.join()
+
+    return {
+        "p50_ms": float(np.percentile(latencias, 50)),
+        "p95_ms": float(np.percentile(latencias, 95)),
+        "p99_ms": float(np.percentile(latencias, 99)),
+        "max_ms": float(latencias.max()),
+        "calculos_por_s": contador[0] / duracao,
+    }
+
+
+def porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def executar(
+    threads: int, requisicoes: int, intervalo: float, processos: int
+) -> Dict[str, Dict[str, float]]:
+    porta = porta_livre()
+    # Sem lifespan: o benchmark cria os próprios pools
+    servidor = uvicorn.Server(
+        uvicorn.Config(app, port=porta, lifespan="off", log_level="warning")
+    )
+    thread_servidor = threading.Thread(target=servidor.run, daemon=True)
+    thread_servidor.start()
+    while not servidor.started:
+        time.sleep(0.05)
+
+    resultados = {}
+    inline = PoolCalculo(max_processos=0)
+    resultados["sem carga"] = medir_cenario(porta, inline, 0, requisicoes, intervalo)
+    resultados["cálculos na thread"] = medir_cenario(
+        porta, inline, threads, requisicoes, intervalo
+    )
+
+    pool = PoolCalculo(max_processos=processos)
+    pool.iniciar()
+    resultados[f"pool de processos ({processos})"] = medir_cenario(
+        porta, pool, threads, requisicoes, intervalo
+    )
+    pool.encerrar()
+
+    servidor.should_exit = True
+    thread_servidor.join()
+    return resultados
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(
+        description="Latência de GET / com cálculos pesados em andamento"
+    )
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--requisicoes", type=int, default=200)
+    parser.add_argument("--intervalo", type=float, default=0.01)
+    parser.add_argument("--processos", type=int, default=cpus)
+    args = parser.parse_args()
+
+    print(f"CPUs: {cpus}, threads de cálculo: {args.threads}")
+    print(
+        f"{'cenário':30s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'máx':>9s}"
+        f" {'cálculos/s':>11s}"
+    )
+    resultados = executar(
+        args.threads, args.requisicoes, args.intervalo, args.processos
+    )
+    for nome, medidas in resultados.items():
+        print(
+            f"{nome:30s} {medidas['p50_ms']:7.2f}ms {medidas['p95_ms']:7.2f}ms"
+            f" {medidas['p99_ms']:7.2f}ms {medidas['max_ms']:7.2f}ms"
+            f" {medidas['calculos_por_s']:11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
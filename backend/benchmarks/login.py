@@ -0,0 +1,84 @@
+"""
+Benchmark de logins por segundo em um worker.
+
+Mede a verificação de senha (a parte de CPU do login) com vários clientes
+simultâneos, para cada limite de concorrência do executor de hash. O banco
+não participa: o custo das consultas é o mesmo em qualquer configuração.
+
+Uso (a partir de backend/):
+
+    python -m benchmarks.login --clientes 16 --logins 200
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from utils.senha import HasherSenha
+
+
+def medir_logins_por_segundo(
+    hasher: HasherSenha, hash_armazenado: str, clientes: int, logins: int
+) -> float:
+    """
+    Executa ``logins`` verificações a partir de ``clientes`` threads (como
+    as threads do servidor atendendo requisições) e retorna a vazão.
+    """
+    with ThreadPoolExecutor(max_workers=clientes) as requisicoes:
+        inicio = time.perf_counter()
+        resultados = list(
+            requisicoes.map(
+                lambda _: hasher.verificar("senha-de-teste", hash_armazenado),
+                range(logins),
+            )
+        )
+        duracao = time.perf_counter() - inicio
+
+    assert all(valida for valida, _ in resultados)
+    return logins / duracao
+
+
+def executar(clientes: int, logins: int, concorrencias: List[int]) -> Dict[str, float]:
+    resultados = {}
+
+    legado = HasherSenha(max_concorrencia=1)
+    hash_legado = hashlib.sha256(b"senha-de-teste").hexdigest()
+    resultados["sha256 (legado)"] = medir_logins_por_segundo(
+        legado, hash_legado, clientes, logins
+    )
+    legado.encerrar()
+
+    for concorrencia in concorrencias:
+        hasher = HasherSenha(max_concorrencia=concorrencia)
+        hash_scrypt = hasher.gerar_hash("senha-de-teste")
+        resultados[f"scrypt n={hasher.n} concorrencia={concorrencia}"] = (
+            medir_logins_por_segundo(hasher, hash_scrypt, clientes, logins)
+        )
+        hasher.encerrar()
+
+    return resultados
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Logins por segundo por worker")
+    parser.add_argument("--clientes", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument(
+        "--concorrencias",
+        type=int,
+        nargs="+",
+        default=sorted({1, max(1, cpus // 2), cpus}),
+    )
+    args = parser.parse_args()
+
+    print(f"CPUs: {cpus}, clientes simultâneos: {args.clientes}")
+    for nome, vazao in executar(args.clientes, args.logins, args.concorrencias).items():
+        print(f"{nome:45s} {vazao:10.1f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Medição de tempos e comparação com a linha de base dos benchmarks.
+
+Cada benchmark é medido em várias amostras; em cada amostra a função é
+chamada um número fixo de vezes (calibrado para que a amostra dure pelo
+menos ``tempo_minimo``), e o resultado é o tempo por chamada. A medida
+comparada com a linha de base é a menor amostra: o ruído da máquina (outros
+processos, frequência da CPU) só aumenta os tempos, e o mínimo varia bem
+menos entre execuções do que a mediana.
+"""
+
+import json
+import os
+import platform
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+# Linha de base versionada junto com os benchmarks
+CAMINHO_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+
+def medir(
+    funcao: Callable[[], Any],
+    amostras: int = 15,
+    tempo_minimo: float = 0.05,
+    chamadas: Optional[int] = None,
+    preparar: Optional[Callable[[], Any]] = None,
+) -> Dict[str, float]:
+    """
+    Mede o tempo por chamada de ``funcao``.
+
+    Args:
+        funcao: Função sem argumentos a medir.
+        amostras: Número de amostras.
+        tempo_minimo: Duração mínima de cada amostra, em segundos, usada
+            para calibrar o número de chamadas por amostra.
+        chamadas: Chamadas por amostra (sem calibração quando informado).
+        preparar: Função chamada antes de cada chamada, fora da medição
+            (por exemplo para descartar um cache).
+
+    Returns:
+        Mediana, percentil 95 e mínimo do tempo por chamada em
+        milissegundos, com o número de amostras e de chamadas por amostra.
+    """
+
+    def amostra(vezes: int) -> float:
+        if preparar is None:
+            inicio = time.perf_counter()
+            for _ in range(vezes):
+                funcao()
+            return time.perf_counter() - inicio
+
+        total = 0.0
+        for _ in range(vezes):
+            preparar()
+            inicio = time.perf_counter()
+            funcao()
+            total += time.perf_counter() - inicio
+        return total
+
+    # Aquecimento (caches, importações tardias) fora das amostras
+    amostra(1)
+    if chamadas is None:
+        # Dobra as chamadas até a amostra durar tempo_minimo (timeit.autorange)
+        chamadas = 1
+        while amostra(chamadas) < tempo_minimo:
+            chamadas *= 2
+
+    tempos = np.array([amostra(chamadas) / chamadas for _ in range(amostras)]) * 1000
+    return {
+        "mediana_ms": float(np.median(tempos)),
+        "p95_ms": float(np.percentile(tempos, 95)),
+        "min_ms": float(tempos.min()),
+        "amostras": amostras,
+        "chamadas_por_amostra": chamadas,
+    }
+
+
+def ambiente() -> Dict[str, Any]:
+    """
+    Descrição da máquina em que os benchmarks rodaram (as medidas só são
+    comparáveis com uma linha de base da mesma máquina).
+    """
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "processador": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def carregar_baseline(caminho: str = CAMINHO_BASELINE) -> Dict[str, Any]:
+    """
+    Lê a linha de base (vazia se o arquivo não existir).
+    """
+    if not os.path.exists(caminho):
+        return {"ambiente": None, "resultados": {}}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_baseline(
+    resultados: Dict[str, Dict[str, float]], caminho: str = CAMINHO_BASELINE
+):
+    """
+    Grava os resultados na linha de base, mantendo os benchmarks que não
+    foram executados desta vez.
+    """
+    baseline = carregar_baseline(caminho)
+    baseline["ambiente"] = ambiente()
+    baseline["resultados"].update(resultados)
+    baseline["resultados"] = dict(sorted(baseline["resultados"].items()))
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(baseline, arquivo, indent=2, ensure_ascii=False)
+        arquivo.write("\n")
+
+
+def comparar(
+    resultados: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    limite: float,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compara a menor amostra de cada benchmark com a da linha de base.
+
+    Args:
+        resultados: Resultados atuais, por nome do benchmark.
+        baseline: Resultados da linha de base, por nome do benchmark.
+        limite: Aumento relativo máximo do tempo (0.25 = 25% mais lento).
+
+    Returns:
+        Por benchmark: tempos atual e da linha de base, variação relativa
+        (None sem linha de base) e se é uma regressão.
+    """
+    comparacao = {}
+    for nome, medidas in resultados.items():
+        atual = medidas["min_ms"]
+        base = baseline.get(nome, {}).get("min_ms")
+        variacao = atual / base - 1 if base else None
+        comparacao[nome] = {
+            "atual_ms": atual,
+            "baseline_ms": base,
+            "variacao": variacao,
+            "regressao": variacao is not None and variacao > limite,
+        }
+    return comparacao
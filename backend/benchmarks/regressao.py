@@ -0,0 +1,146 @@
+"""
+Executa os benchmarks e compara os resultados com a linha de base.
+
+Roda os benchmarks da calculadora (benchmarks/calculadora.py) e do CRUD de
+simulações (benchmarks/simulacao_crud.py, que precisa de um PostgreSQL
+local), grava os resultados em JSON e termina com código 1 quando o tempo
+de algum benchmark (a menor amostra, ver benchmarks/medicao.py) passa o da
+linha de base (benchmarks/baseline.json) em mais de ``--limite``.
+Benchmarks sem linha de base são apenas registrados. Os da calculadora
+acima do limite são medidos de novo (``--confirmacoes`` vezes, ficando a
+menor medida) antes de contarem como regressão, o que filtra picos
+passageiros de carga na máquina.
+
+As medidas só são comparáveis na mesma máquina: a linha de base versionada
+é uma referência; em outra máquina, grave a sua com ``--atualizar-baseline``
+antes de comparar.
+
+Uso (a partir de backend/):
+
+    python -m benchmarks.regressao --saida resultados.json
+    python -m benchmarks.regressao --sem-banco --limite 0.3
+    python -m benchmarks.regressao --atualizar-baseline
+"""
+
+import argparse
+import json
+import sys
+from typing import List
+
+from benchmarks import calculadora
+from benchmarks.medicao import (
+    CAMINHO_BASELINE,
+    ambiente,
+    carregar_baseline,
+    comparar,
+    salvar_baseline,
+)
+
+
+def main(argumentos: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks com comparação contra a linha de base"
+    )
+    parser.add_argument(
+        "--limite",
+        type=float,
+        default=0.25,
+        help="Aumento relativo máximo do tempo (padrão: 0.25 = 25%%)",
+    )
+    parser.add_argument("--baseline", default=CAMINHO_BASELINE)
+    parser.add_argument(
+        "--saida", default=None, help="Arquivo JSON dos resultados ('-' = stdout)"
+    )
+    parser.add_argument(
+        "--sem-banco",
+        action="store_true",
+        help="Não executa o benchmark do CRUD (PostgreSQL)",
+    )
+    parser.add_argument(
+        "--atualizar-baseline",
+        action="store_true",
+        help="Grava os resultados como linha de base em vez de comparar",
+    )
+    parser.add_argument(
+        "--pontos", type=int, nargs="+", default=calculadora.PONTOS_PADRAO
+    )
+    parser.add_argument("--simulacoes", type=int, default=1000)
+    parser.add_argument("--amostras", type=int, default=15)
+    parser.add_argument("--amostras-banco", type=int, default=50)
+    parser.add_argument("--confirmacoes", type=int, default=2)
+    args = parser.parse_args(argumentos)
+
+    resultados = calculadora.executar(args.pontos, args.amostras)
+    if not args.sem_banco:
+        # Importado só aqui: o benchmark da calculadora não precisa do banco
+        from benchmarks import simulacao_crud
+
+        resultados.update(simulacao_crud.executar(args.simulacoes, args.amostras_banco))
+
+    if args.atualizar_baseline:
+        salvar_baseline(resultados, args.baseline)
+        print(f"Linha de base gravada em {args.baseline}", file=sys.stderr)
+        return 0
+
+    baseline = carregar_baseline(args.baseline)
+    comparacao = comparar(resultados, baseline["resultados"], args.limite)
+    for _ in range(args.confirmacoes):
+        suspeitos = [
+            nome
+            for nome, item in comparacao.items()
+            if item["regressao"] and nome.startswith("calculadora.")
+        ]
+        if not suspeitos:
+            break
+        medidas = calculadora.executar(args.pontos, args.amostras, nomes=suspeitos)
+        for nome, nova in medidas.items():
+            if nova["min_ms"] < resultados[nome]["min_ms"]:
+                resultados[nome] = nova
+        comparacao = comparar(resultados, baseline["resultados"], args.limite)
+    regressoes = [nome for nome, item in comparacao.items() if item["regressao"]]
+
+    relatorio = {
+        "ambiente": ambiente(),
+        "ambiente_baseline": baseline["ambiente"],
+        "limite": args.limite,
+        "resultados": resultados,
+        "comparacao": comparacao,
+        "regressoes": regressoes,
+    }
+    if args.saida == "-":
+        json.dump(relatorio, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write("\n")
+
+    # Tabela legível na saída de erro (a saída padrão pode ser o JSON)
+    print(
+        f"{'benchmark':60s} {'mínimo':>11s} {'baseline':>11s} {'variação':>9s}",
+        file=sys.stderr,
+    )
+    for nome, item in comparacao.items():
+        base = (
+            f"{item['baseline_ms']:9.4f}ms" if item["baseline_ms"] is not None else "-"
+        )
+        variacao = (
+            f"{item['variacao']:+8.1%}" if item["variacao"] is not None else "novo"
+        )
+        marca = "  REGRESSÃO" if item["regressao"] else ""
+        print(
+            f"{nome:60s} {item['atual_ms']:9.4f}ms {base:>11s} {variacao:>9s}{marca}",
+            file=sys.stderr,
+        )
+
+    if regressoes:
+        print(
+            f"{len(regressoes)} benchmark(s) acima do limite de {args.limite:.0%}",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Benchmark das operações CRUD de SimulacaoService em um PostgreSQL local.
+
+Usa o banco configurado nas variáveis de ambiente (DB_HOST, DB_NAME, ...),
+com as migrações aplicadas. Cria um usuário e um projeto próprios, com
+``--simulacoes`` simulações para a listagem, e os remove ao final.
+
+Uso (a partir de backend/):
+
+    python -m benchmarks.simulacao_crud --simulacoes 1000 --amostras 50
+"""
+
+import argparse
+import itertools
+import uuid
+from typing import Dict
+
+from benchmarks.medicao import medir
+from Connections.postgre import postgreConnection
+from models.projeto import ProjetoCriar
+from models.simulacao import SimulacaoAtualizar, SimulacaoCriar
+from services.projeto import ProjetoService
+from services.simulacao import SimulacaoService
+
+
+def _simulacao(indice: int) -> SimulacaoCriar:
+    return SimulacaoCriar(
+        nome_produto=f"Produto {indice:06d}",
+        demanda_anual=1000 + indice,
+        custo_pedido=50 + indice % 100,
+        custo_manutencao=2 + indice % 10,
+        lote_atual_empresa=300 + indice % 500,
+    )
+
+
+def _criar_usuario(db: postgreConnection) -> int:
+    # Direto no banco: o hash da senha não faz parte do benchmark
+    with db.conexao() as conn:
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                """
+                INSERT INTO usuarios (nome, email, senha)
+                VALUES (%s, %s, %s)
+                RETURNING id_usuario
+                """,
+                ("Benchmark", f"benchmark-{uuid.uuid4().hex}@exemplo.com", "-"),
+            )
+            id_usuario = cursor.fetchone()[0]
+            conn.commit()
+            return id_usuario
+
+        finally:
+            cursor.close()
+
+
+def _remover_usuario(db: postgreConnection, id_usuario: int):
+    with db.conexao() as conn:
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("DELETE FROM usuarios WHERE id_usuario = %s", (id_usuario,))
+            conn.commit()
+
+        finally:
+            cursor.close()
+
+
+def executar(simulacoes: int, amostras: int = 50) -> Dict[str, Dict[str, float]]:
+    db = postgreConnection()
+    projetos = ProjetoService()
+    service = SimulacaoService()
+
+    id_usuario = _criar_usuario(db)
+    id_projeto = None
+    try:
+        id_projeto = projetos.criar_projeto(
+            ProjetoCriar(nome_grupo="Benchmark CRUD"), id_usuario
+        ).id_grupo
+        service.criar_simulacoes_lote(
+            [_simulacao(indice) for indice in range(simulacoes)], id_projeto, id_usuario
+        )
+
+        indices = itertools.count(simulacoes)
+        criadas = []
+
+        def criar():
+            criadas.append(
+                service.criar_simulacao(
+                    _simulacao(next(indices)), id_projeto, id_usuario
+                ).id
+            )
+
+        resultados = {
+            "simulacao.criar_simulacao": medir(criar, amostras=amostras, chamadas=1)
+        }
+        # Cada operação usa uma das simulações criadas acima
+        alvo = itertools.cycle(criadas)
+        atual = [criadas[0]]
+
+        def proxima():
+            atual[0] = next(alvo)
+
+        resultados["simulacao.obter_simulacao"] = medir(
+            lambda: service.obter_simulacao(atual[0], id_projeto, id_usuario),
+            amostras=amostras,
+            chamadas=1,
+            preparar=proxima,
+        )
+        resultados["simulacao.listar_simulacoes_projeto"] = medir(
+            lambda: service.listar_simulacoes_projeto(id_projeto, id_usuario),
+            amostras=amostras,
+            chamadas=1,
+        )
+        custos = itertools.count(1)
+        resultados["simulacao.atualizar_simulacao"] = medir(
+            lambda: service.atualizar_simulacao(
+                atual[0],
+                id_projeto,
+                id_usuario,
+                SimulacaoAtualizar(custo_pedido=40 + next(custos) % 60),
+            ),
+            amostras=amostras,
+            chamadas=1,
+            preparar=proxima,
+        )
+
+        # Remove as simulações criadas (o aquecimento também remove uma)
+        removidas = iter(criadas)
+        resultados["simulacao.deletar_simulacao"] = medir(
+            lambda: service.deletar_simulacao(next(removidas), id_projeto, id_usuario),
+            amostras=min(amostras, len(criadas) - 1),
+            chamadas=1,
+        )
+        return resultados
+
+    finally:
+        if id_projeto is not None:
+            projetos.deletar_projeto(id_projeto, id_usuario)
+        _remover_usuario(db, id_usuario)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tempo por chamada das operações CRUD de SimulacaoService"
+    )
+    parser.add_argument("--simulacoes", type=int, default=1000)
+    parser.add_argument("--amostras", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'benchmark':40s} {'mediana':>11s} {'p95':>11s}")
+    for nome, medidas in executar(args.simulacoes, args.amostras).items():
+        print(f"{nome:40s} {medidas['mediana_ms']:9.4f}ms {medidas['p95_ms']:9.4f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+-- Esquema de referência. Alterações no banco são feitas com migrações
+-- em data/migracoes (python -m Connections.migracoes).
+
 CREATE TABLE usuarios (
     id_usuario SERIAL PRIMARY KEY,
 
@@ -0,0 +1,12 @@
+-- Índices das listagens mais frequentes.
+
+-- listar_simulacoes_projeto: WHERE id_projeto = ? ORDER BY data_simulacao DESC.
+-- O id desempata simulações com a mesma data e o índice também atende
+-- a exclusão em cascata quando um projeto é removido.
+CREATE INDEX IF NOT EXISTS idx_simulacoes_projeto_data
+    ON simulacoes (id_projeto, data_simulacao DESC, id DESC);
+
+-- listar_projetos_usuario: WHERE id_usuario = ? ORDER BY data_criacao DESC.
+-- Também atende as junções de verificação de propriedade do projeto.
+CREATE INDEX IF NOT EXISTS idx_projeto_usuario_data
+    ON projeto (id_usuario, data_criacao DESC);
@@ -0,0 +1,9 @@
+-- A paginação por cursor compara (data_simulacao, id); a data passa a
+-- ser obrigatória para que nenhuma simulação fique fora das páginas.
+UPDATE simulacoes SET data_simulacao = NOW() WHERE data_simulacao IS NULL;
+
+ALTER TABLE simulacoes ALTER COLUMN data_simulacao SET NOT NULL;
+
+-- Filtro por prefixo do nome do produto (LIKE 'texto%') dentro do projeto
+CREATE INDEX IF NOT EXISTS idx_simulacoes_projeto_nome
+    ON simulacoes (id_projeto, nome_produto text_pattern_ops);
@@ -0,0 +1,131 @@
+-- Totais por projeto mantidos de forma incremental.
+--
+-- Triggers por comando (FOR EACH STATEMENT) com tabelas de transição
+-- agregam as linhas afetadas e aplicam a diferença em projeto_resumo com
+-- um único UPDATE/UPSERT por projeto, inclusive em INSERT de várias
+-- linhas e em COPY. A reconstrução completa é feita por
+-- ProjetoService.reconciliar_resumos (python manutencao.py reconciliar-resumos).
+
+CREATE TABLE IF NOT EXISTS projeto_resumo (
+    id_projeto INTEGER PRIMARY KEY
+        REFERENCES projeto (id_grupo) ON DELETE CASCADE,
+
+    quantidade_produtos BIGINT NOT NULL DEFAULT 0,
+    soma_custo_total_atual NUMERIC NOT NULL DEFAULT 0,
+    soma_custo_total_otimo NUMERIC NOT NULL DEFAULT 0,
+    soma_economia_anual NUMERIC NOT NULL DEFAULT 0,
+
+    atualizado_em TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION atualizar_projeto_resumo() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        -- Apenas UPDATE: na exclusão em cascata de um projeto a linha do
+        -- resumo já foi removida e não deve ser recriada
+        UPDATE projeto_resumo r
+        SET quantidade_produtos = r.quantidade_produtos - d.quantidade,
+            soma_custo_total_atual = r.soma_custo_total_atual - d.custo_atual,
+            soma_custo_total_otimo = r.soma_custo_total_otimo - d.custo_otimo,
+            soma_economia_anual = r.soma_economia_anual - d.economia,
+            atualizado_em = NOW()
+        FROM (
+            SELECT id_projeto,
+                   COUNT(*) AS quantidade,
+                   COALESCE(SUM(custo_total_atual), 0) AS custo_atual,
+                   COALESCE(SUM(custo_total_otimo), 0) AS custo_otimo,
+                   COALESCE(SUM(economia_anual), 0) AS economia
+            FROM antigas
+            GROUP BY id_projeto
+        ) d
+        WHERE r.id_projeto = d.id_projeto;
+
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO projeto_resumo AS r (
+            id_projeto, quantidade_produtos, soma_custo_total_atual,
+            soma_custo_total_otimo, soma_economia_anual
+        )
+        SELECT id_projeto,
+               COUNT(*),
+               COALESCE(SUM(custo_total_atual), 0),
+               COALESCE(SUM(custo_total_otimo), 0),
+               COALESCE(SUM(economia_anual), 0)
+        FROM novas
+        GROUP BY id_projeto
+        ON CONFLICT (id_projeto) DO UPDATE
+        SET quantidade_produtos = r.quantidade_produtos + EXCLUDED.quantidade_produtos,
+            soma_custo_total_atual = r.soma_custo_total_atual + EXCLUDED.soma_custo_total_atual,
+            soma_custo_total_otimo = r.soma_custo_total_otimo + EXCLUDED.soma_custo_total_otimo,
+            soma_economia_anual = r.soma_economia_anual + EXCLUDED.soma_economia_anual,
+            atualizado_em = NOW();
+
+        RETURN NULL;
+    END IF;
+
+    -- UPDATE: soma as linhas novas e subtrai as antigas
+    INSERT INTO projeto_resumo AS r (
+        id_projeto, quantidade_produtos, soma_custo_total_atual,
+        soma_custo_total_otimo, soma_economia_anual
+    )
+    SELECT id_projeto, SUM(quantidade), SUM(custo_atual), SUM(custo_otimo), SUM(economia)
+    FROM (
+        SELECT id_projeto, 1 AS quantidade,
+               COALESCE(custo_total_atual, 0) AS custo_atual,
+               COALESCE(custo_total_otimo, 0) AS custo_otimo,
+               COALESCE(economia_anual, 0) AS economia
+        FROM novas
+        UNION ALL
+        SELECT id_projeto, -1,
+               -COALESCE(custo_total_atual, 0),
+               -COALESCE(custo_total_otimo, 0),
+               -COALESCE(economia_anual, 0)
+        FROM antigas
+    ) diferencas
+    GROUP BY id_projeto
+    ON CONFLICT (id_projeto) DO UPDATE
+    SET quantidade_produtos = r.quantidade_produtos + EXCLUDED.quantidade_produtos,
+        soma_custo_total_atual = r.soma_custo_total_atual + EXCLUDED.soma_custo_total_atual,
+        soma_custo_total_otimo = r.soma_custo_total_otimo + EXCLUDED.soma_custo_total_otimo,
+        soma_economia_anual = r.soma_economia_anual + EXCLUDED.soma_economia_anual,
+        atualizado_em = NOW();
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_resumo_simulacoes_insert ON simulacoes;
+CREATE TRIGGER trg_resumo_simulacoes_insert
+    AFTER INSERT ON simulacoes
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION atualizar_projeto_resumo();
+
+DROP TRIGGER IF EXISTS trg_resumo_simulacoes_update ON simulacoes;
+CREATE TRIGGER trg_resumo_simulacoes_update
+    AFTER UPDATE ON simulacoes
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION atualizar_projeto_resumo();
+
+DROP TRIGGER IF EXISTS trg_resumo_simulacoes_delete ON simulacoes;
+CREATE TRIGGER trg_resumo_simulacoes_delete
+    AFTER DELETE ON simulacoes
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION atualizar_projeto_resumo();
+
+-- Carga inicial a partir das simulações existentes
+INSERT INTO projeto_resumo (
+    id_projeto, quantidade_produtos, soma_custo_total_atual,
+    soma_custo_total_otimo, soma_economia_anual
+)
+SELECT p.id_grupo,
+       COUNT(s.id),
+       COALESCE(SUM(s.custo_total_atual), 0),
+       COALESCE(SUM(s.custo_total_otimo), 0),
+       COALESCE(SUM(s.economia_anual), 0)
+FROM projeto p
+LEFT JOIN simulacoes s ON s.id_projeto = p.id_grupo
+GROUP BY p.id_grupo
+ON CONFLICT (id_projeto) DO NOTHING;
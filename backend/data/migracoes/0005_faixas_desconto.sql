@@ -0,0 +1,10 @@
+-- Tabela de descontos por quantidade opcional de cada simulação: lista
+-- JSON de faixas {"quantidade_minima", "preco_unitario"} e o tipo de
+-- desconto. Com faixas, os custos gravados incluem o custo de compra.
+ALTER TABLE simulacoes
+    ADD COLUMN IF NOT EXISTS faixas_desconto JSONB,
+    ADD COLUMN IF NOT EXISTS tipo_desconto VARCHAR(20);
+
+ALTER TABLE simulacoes DROP CONSTRAINT IF EXISTS ck_simulacoes_tipo_desconto;
+ALTER TABLE simulacoes ADD CONSTRAINT ck_simulacoes_tipo_desconto
+    CHECK (tipo_desconto IN ('todas_unidades', 'incremental'));
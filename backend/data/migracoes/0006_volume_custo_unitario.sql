@@ -0,0 +1,5 @@
+-- Volume e custo por unidade de cada produto, usados pela otimização de
+-- lotes do projeto com restrição de capacidade e de orçamento.
+ALTER TABLE simulacoes
+    ADD COLUMN IF NOT EXISTS volume_unitario NUMERIC(14, 6),
+    ADD COLUMN IF NOT EXISTS custo_unitario NUMERIC(12, 2);
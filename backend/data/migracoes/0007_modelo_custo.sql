@@ -0,0 +1,9 @@
+-- Modelo de custo de cada simulação (registro em utils/modelos_custo.py):
+-- "lec" (clássico), "lep" (lote econômico de produção, com taxa de
+-- produção anual) ou "lec_faltas" (faltas planejadas, com custo de falta
+-- por unidade por ano). Os nomes válidos são conferidos pela aplicação,
+-- para que novos modelos não exijam migração.
+ALTER TABLE simulacoes
+    ADD COLUMN IF NOT EXISTS modelo VARCHAR(20) NOT NULL DEFAULT 'lec',
+    ADD COLUMN IF NOT EXISTS taxa_producao NUMERIC(10, 2),
+    ADD COLUMN IF NOT EXISTS custo_falta_anual NUMERIC(10, 2);
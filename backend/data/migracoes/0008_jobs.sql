@@ -0,0 +1,38 @@
+-- Fila de jobs em segundo plano (services/job.py), processada pelo worker
+-- (python worker.py). O worker reivindica os jobs com
+-- SELECT ... FOR UPDATE SKIP LOCKED; cada pedaço processado grava o
+-- progresso (processados, ultimo_id) na mesma transação das alterações,
+-- de modo que um job interrompido é retomado do último pedaço confirmado.
+-- atualizado_em funciona como sinal de vida do job em execução.
+CREATE TABLE IF NOT EXISTS jobs (
+    id SERIAL PRIMARY KEY,
+
+    tipo VARCHAR(40) NOT NULL,
+    id_usuario INTEGER NOT NULL
+        REFERENCES usuarios (id_usuario) ON DELETE CASCADE,
+    id_projeto INTEGER
+        REFERENCES projeto (id_grupo) ON DELETE CASCADE,
+    parametros JSONB NOT NULL DEFAULT '{}',
+
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    total INTEGER NOT NULL DEFAULT 0,
+    processados INTEGER NOT NULL DEFAULT 0,
+    -- Último id de simulação confirmado (os pedaços seguem a ordem do id)
+    ultimo_id INTEGER NOT NULL DEFAULT 0,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    erro TEXT,
+
+    criado_em TIMESTAMP NOT NULL DEFAULT NOW(),
+    iniciado_em TIMESTAMP,
+    atualizado_em TIMESTAMP NOT NULL DEFAULT NOW(),
+    concluido_em TIMESTAMP
+);
+
+-- Busca do próximo job do worker (apenas os não finalizados)
+CREATE INDEX IF NOT EXISTS idx_jobs_fila
+    ON jobs (id)
+    WHERE status IN ('pendente', 'executando');
+
+-- Pedaços do recálculo: WHERE id_projeto = ? AND id > ? ORDER BY id
+CREATE INDEX IF NOT EXISTS idx_simulacoes_projeto_id
+    ON simulacoes (id_projeto, id);
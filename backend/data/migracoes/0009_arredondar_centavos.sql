@@ -0,0 +1,34 @@
+-- Arredondamento para 2 casas idêntico ao da aplicação (_arredondar em
+-- utils/lote_economico.py), usado pelo recálculo das simulações em SQL
+-- (utils/lote_sql.py).
+--
+-- Fora da vizinhança de um empate vale o np.round: round(x * 100) / 100,
+-- com o round de double precision (rint, empate para o par). A menos de
+-- 1e-6 de um empate a aplicação usa o round() do Python, que decide pelo
+-- valor binário exato de x; aqui a diferença exata 200x - (2k + 1) é
+-- obtida com o produto sem erro de Dekker (separação de Veltkamp), de modo
+-- que o lado do empate, ou o empate exato, também é o mesmo.
+CREATE OR REPLACE FUNCTION arredondar_centavos(x double precision)
+RETURNS double precision
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+    SELECT CASE
+        WHEN abs(y - k - 0.5::float8) >= 1e-6::float8 THEN round(y) / 100::float8
+        WHEN diferenca > 0 THEN (k + 1) / 100::float8
+        WHEN diferenca < 0 THEN k / 100::float8
+        -- Empate exato: o dígito par
+        WHEN k - 2 * floor(k / 2) = 0 THEN k / 100::float8
+        ELSE (k + 1) / 100::float8
+    END
+    FROM (
+        SELECT y, k,
+               (x * 200::float8 - (2 * k + 1))
+               + ((xa * 200::float8 - x * 200::float8) + (x - xa) * 200::float8)
+                   AS diferenca
+        FROM (
+            SELECT x * 100::float8 AS y,
+                   floor(x * 100::float8) AS k,
+                   134217729::float8 * x - (134217729::float8 * x - x) AS xa
+        ) partes
+    ) produto
+$$;
@@ -1,17 +1,69 @@
-from fastapi import FastAPI
+import os
+import multiprocessing
+from contextlib import asynccontextmanager
+import anyio.to_thread
+from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from routes import auth, projeto, simulacao
+from routes import auth, projeto, simulacao, job
+from utils.auth import obter_usuario_atual, token_manager
+from Connections.migracoes import aplicar_migracoes
+from utils.cache import cache_resultados
+from utils.senha import hasher_senha
+from utils.pool_calculo import pool_calculo
+from worker import executar_worker
+from utils.instrumentacao import contar_consultas_sql, metricas_consultas
 from dotenv import load_dotenv
 
 # Carrega as variáveis de ambiente
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Configura os recursos compartilhados da aplicação.
+    """
+    # As chamadas ao banco rodam no pool de threads do AnyIO; o limite
+    # define quantas operações bloqueantes podem ocorrer em paralelo
+    limitador = anyio.to_thread.current_default_thread_limiter()
+    limitador.total_tokens = int(os.getenv("API_MAX_THREADS", "40"))
+
+    # Aplica as migrações pendentes do banco antes de aceitar requisições
+    if os.getenv("DB_MIGRAR_NA_INICIALIZACAO", "false").lower() == "true":
+        await anyio.to_thread.run_sync(aplicar_migracoes)
+
+    # Processos dos cálculos pesados, já aquecidos antes da primeira requisição
+    await anyio.to_thread.run_sync(pool_calculo.iniciar)
+
+    # Worker dos jobs (recálculo de projetos) em um processo próprio; em
+    # produção pode rodar separado (python worker.py)
+    worker = None
+    if os.getenv("JOBS_WORKER_NA_INICIALIZACAO", "false").lower() == "true":
+        contexto = multiprocessing.get_context("spawn")
+        parar_worker = contexto.Event()
+        worker = contexto.Process(
+            target=executar_worker, args=(parar_worker,), daemon=True
+        )
+        worker.start()
+
+    yield
+
+    if worker is not None:
+        # O worker termina o pedaço em andamento e devolve o job à fila
+        parar_worker.set()
+        await anyio.to_thread.run_sync(worker.join)
+
+    hasher_senha.encerrar()
+    pool_calculo.encerrar()
+
+
 # Cria a aplicação FastAPI
 app = FastAPI(
     title="OptiStock API",
     description="API para otimização de estoque",
     version="1.0.0",
     swagger_ui_parameters={"persistAuthorization": True},
+    lifespan=lifespan,
 )
 
 # Configuração CORS
@@ -21,12 +73,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Consultas-SQL", "X-Proximo-Cursor"],
 )
 
+# Conta as consultas SQL de cada requisição (cabeçalho X-Consultas-SQL)
+app.middleware("http")(contar_consultas_sql)
+
 # Registra as rotas
 app.include_router(auth.router)
 app.include_router(projeto.router)
 app.include_router(simulacao.router)
+app.include_router(job.router)
 
 
 @app.get("/")
@@ -35,3 +92,22 @@ async def root():
     Endpoint raiz da API.
     """
     return {"mensagem": "API OptiStock - Sistema de Otimização de Estoque"}
+
+
+@app.get("/metricas")
+async def metricas(id_usuario: int = Depends(obter_usuario_atual)):
+    """
+    Contadores internos da API (caches e consultas SQL por rota).
+
+    Exige autenticação e só existe com METRICAS_HABILITADAS=true (caso
+    contrário responde 404).
+    """
+    if os.getenv("METRICAS_HABILITADAS", "false").lower() != "true":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    return {
+        "cache_resultados": cache_resultados.metricas(),
+        "cache_tokens": token_manager.cache.metricas(),
+        "cache_usuarios": auth.auth_service.cache_perfis.metricas(),
+        "consultas_sql": metricas_consultas.metricas(),
+    }
@@ -0,0 +1,60 @@
+"""
+Tarefas de manutenção do banco de dados executadas pela linha de comando.
+
+Uso (a partir de backend/):
+
+    python manutencao.py reconciliar-resumos [--projeto ID]
+    python manutencao.py verificar-recalculo-sql [--linhas N] [--semente S]
+"""
+
+import argparse
+import sys
+from typing import List
+
+from services.projeto import ProjetoService
+from services.simulacao import SimulacaoService
+
+
+def main(argumentos: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tarefas de manutenção")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    reconciliar = comandos.add_parser(
+        "reconciliar-resumos",
+        help="Reconstrói os totais de projeto_resumo a partir das simulações",
+    )
+    reconciliar.add_argument("--projeto", type=int, default=None)
+    verificar = comandos.add_parser(
+        "verificar-recalculo-sql",
+        help="Compara o recálculo em SQL com o da calculadora em Python",
+    )
+    verificar.add_argument("--linhas", type=int, default=100000)
+    verificar.add_argument("--semente", type=int, default=None)
+    args = parser.parse_args(argumentos)
+
+    if args.comando == "reconciliar-resumos":
+        corrigidos = ProjetoService().reconciliar_resumos(args.projeto)
+        if corrigidos:
+            print(f"Resumos corrigidos: {', '.join(map(str, corrigidos))}")
+        else:
+            print("Nenhum resumo divergente")
+
+    elif args.comando == "verificar-recalculo-sql":
+        relatorio = SimulacaoService().verificar_recalculo_sql(
+            args.linhas, args.semente
+        )
+        print(f"Linhas comparadas: {relatorio['linhas']}")
+        divergente = relatorio["linhas"] != args.linhas
+        for coluna, resultado in relatorio["colunas"].items():
+            print(
+                f"{coluna}: {resultado['divergencias']} divergências"
+                f" (diferença máxima {resultado['diferenca_maxima']:g})"
+            )
+            divergente = divergente or resultado["divergencias"] > 0
+        if divergente:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
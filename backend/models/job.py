@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+
+class JobResponse(BaseModel):
+    """
+    Modelo para resposta com o estado e o progresso de um job.
+    """
+
+    id: int
+    tipo: str
+    id_projeto: Optional[int]
+    parametros: Dict[str, Any]
+    # "pendente", "executando", "concluido" ou "erro"
+    status: str
+    total: int
+    processados: int
+    percentual: float
+    tentativas: int
+    erro: Optional[str]
+    criado_em: datetime
+    iniciado_em: Optional[datetime]
+    atualizado_em: datetime
+    concluido_em: Optional[datetime]
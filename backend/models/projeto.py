@@ -44,6 +44,78 @@ class ProjetoComSimulacoesResponse(BaseModel):
     descricao: Optional[str]
     data_criacao: str
     simulacoes: List = []
+    # Cursor da próxima página de simulações (None se todas vieram)
+    proximo_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+class ProjetoResumoResponse(BaseModel):
+    """
+    Modelo para resposta com os totais das simulações de um projeto.
+    """
+
+    id_projeto: int
+    quantidade_produtos: int
+    soma_custo_total_atual: float
+    soma_custo_total_otimo: float
+    soma_economia_anual: float
+    atualizado_em: Optional[datetime] = None
+
+
+class OtimizacaoLotesRequest(BaseModel):
+    """
+    Limites globais para a otimização dos lotes do projeto.
+    """
+
+    # Limite de sum(volume_unitario * lote) das simulações
+    capacidade: Optional[float] = Field(None, gt=0)
+    # Limite de sum(custo_unitario * lote) das simulações
+    orcamento: Optional[float] = Field(None, gt=0)
+
+
+class LoteRestritoItem(BaseModel):
+    """
+    Lote de uma simulação com e sem as restrições do projeto.
+    """
+
+    id_simulacao: int
+    nome_produto: str
+    lote_otimo: float
+    lote_restrito: float
+    custo_total_otimo: float
+    custo_total_restrito: float
+
+
+class OtimizacaoLotesResponse(BaseModel):
+    """
+    Modelo de resposta para a otimização de lotes do projeto.
+    """
+
+    id_projeto: int
+    quantidade_itens: int
+    capacidade: Optional[float]
+    orcamento: Optional[float]
+    uso_capacidade: Optional[float]
+    uso_orcamento: Optional[float]
+    multiplicador_capacidade: Optional[float]
+    multiplicador_orcamento: Optional[float]
+    custo_total_irrestrito: float
+    custo_total_restrito: float
+    itens: List[LoteRestritoItem]
+
+
+class RecalculoProjetoRequest(BaseModel):
+    """
+    Novos custos aplicados a todas as simulações do projeto no recálculo.
+
+    Cada custo pode receber um novo valor ou um fator sobre o valor atual
+    (por exemplo, 1.1 para um aumento de 10%), mas não os dois. Sem nenhum
+    campo, as simulações são apenas recalculadas.
+    """
+
+    custo_pedido: Optional[float] = Field(None, gt=0)
+    custo_manutencao: Optional[float] = Field(None, gt=0)
+    fator_custo_pedido: Optional[float] = Field(None, gt=0)
+    fator_custo_manutencao: Optional[float] = Field(None, gt=0)
@@ -1,11 +1,27 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
 
+class FaixaDesconto(BaseModel):
+    """
+    Faixa de preço de uma tabela de descontos por quantidade.
+    """
+
+    quantidade_minima: float = Field(..., ge=0)
+    preco_unitario: float = Field(..., ge=0)
+
+
 class SimulacaoBase(BaseModel):
     """
     Modelo base para simulação.
+
+    Com faixas_desconto o lote ótimo considera o custo de compra e os custos
+    passam a incluí-lo; tipo_desconto padrão é "todas_unidades".
+
+    modelo escolhe o modelo de custo: "lec" (padrão), "lep" (exige
+    taxa_producao maior que a demanda anual) ou "lec_faltas" (exige
+    custo_falta_anual). As faixas de desconto só se aplicam ao "lec".
     """
 
     nome_produto: str = Field(..., min_length=1, max_length=255)
@@ -13,6 +29,13 @@ class SimulacaoBase(BaseModel):
     custo_pedido: float = Field(..., gt=0)
     custo_manutencao: float = Field(..., gt=0)
     lote_atual_empresa: Optional[float] = Field(None, gt=0)
+    faixas_desconto: Optional[List[FaixaDesconto]] = Field(None, max_length=50)
+    tipo_desconto: Optional[Literal["todas_unidades", "incremental"]] = None
+    volume_unitario: Optional[float] = Field(None, ge=0)
+    custo_unitario: Optional[float] = Field(None, ge=0)
+    modelo: str = Field("lec", min_length=1, max_length=20)
+    taxa_producao: Optional[float] = Field(None, gt=0)
+    custo_falta_anual: Optional[float] = Field(None, gt=0)
 
 
 class SimulacaoCriar(SimulacaoBase):
@@ -23,6 +46,54 @@ class SimulacaoCriar(SimulacaoBase):
     pass
 
 
+class SimulacaoLoteCriar(BaseModel):
+    """
+    Modelo para criar várias simulações de uma só vez.
+    """
+
+    simulacoes: List[SimulacaoCriar] = Field(..., min_length=1, max_length=10000)
+
+
+class SimulacaoLoteItemResponse(BaseModel):
+    """
+    Identificação de uma simulação criada em lote.
+    """
+
+    id: int
+    data_simulacao: datetime
+
+
+class SimulacaoLoteResponse(BaseModel):
+    """
+    Modelo de resposta para criação de simulações em lote.
+    """
+
+    total: int
+    simulacoes: List[SimulacaoLoteItemResponse]
+
+
+class ErroImportacaoLinha(BaseModel):
+    """
+    Erro de validação de uma linha do arquivo importado.
+    """
+
+    linha: int
+    erro: str
+
+
+class ImportacaoCsvResponse(BaseModel):
+    """
+    Modelo de resposta para importação de catálogo em CSV.
+    """
+
+    total_linhas: int
+    importadas: int
+    com_erro: int
+    erros: List[ErroImportacaoLinha]
+    duracao_segundos: float
+    linhas_por_segundo: float
+
+
 class SimulacaoResponse(SimulacaoBase):
     """
     Modelo de resposta para simulação.
@@ -50,6 +121,14 @@ class SimulacaoAtualizar(BaseModel):
     custo_pedido: Optional[float] = Field(None, gt=0)
     custo_manutencao: Optional[float] = Field(None, gt=0)
     lote_atual_empresa: Optional[float] = Field(None, gt=0)
+    # Lista vazia remove a tabela de descontos
+    faixas_desconto: Optional[List[FaixaDesconto]] = Field(None, max_length=50)
+    tipo_desconto: Optional[Literal["todas_unidades", "incremental"]] = None
+    volume_unitario: Optional[float] = Field(None, ge=0)
+    custo_unitario: Optional[float] = Field(None, ge=0)
+    modelo: Optional[str] = Field(None, min_length=1, max_length=20)
+    taxa_producao: Optional[float] = Field(None, gt=0)
+    custo_falta_anual: Optional[float] = Field(None, gt=0)
 
 
 class AnaliseMatematicaResponse(BaseModel):
@@ -68,6 +147,8 @@ class AnaliseMatematicaResponse(BaseModel):
     economia_anual: Optional[float]
     percentual_economia: Optional[float]
     verificacao_otimalidade: Dict[str, Any]
+    modelo: str
+    indicadores_modelo: Dict[str, float]
     parametros: Dict[str, float]
 
     class Config:
@@ -86,3 +167,80 @@ class DadosGraficoResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SensibilidadeResponse(BaseModel):
+    """
+    Modelo de resposta para a análise de sensibilidade.
+    """
+
+    limites: Dict[str, float]
+    base: Dict[str, Optional[float]]
+    fatores: List[float]
+    tornado: List[Dict[str, Any]]
+    curvas: Dict[str, Dict[str, List[Optional[float]]]]
+    mapa: Dict[str, Any]
+
+
+class SimulacaoEstocasticaRequest(BaseModel):
+    """
+    Parâmetros da simulação de Monte Carlo da política (Q, r).
+    """
+
+    desvio_demanda_diaria: float = Field(..., ge=0)
+    lead_time_dias: float = Field(..., gt=0, le=365)
+    desvio_lead_time_dias: float = Field(0, ge=0, le=365)
+    custo_falta: float = Field(0, ge=0)
+    nivel_servico: float = Field(0.95, gt=0, lt=1)
+    ponto_pedido: Optional[float] = Field(None, ge=0)
+    lote: Optional[float] = Field(None, gt=0)
+    replicacoes: int = Field(10000, ge=1, le=100000)
+    horizonte_dias: int = Field(365, ge=1, le=3650)
+    semente: Optional[int] = Field(None, ge=0)
+
+
+class ResumoMetrica(BaseModel):
+    """
+    Média, intervalo de confiança de 95% e percentis de uma métrica.
+    """
+
+    media: float
+    ic95_min: float
+    ic95_max: float
+    p5: float
+    p50: float
+    p95: float
+
+
+class RecomendacaoPontoPedido(BaseModel):
+    """
+    Ponto de pedido recomendado para o nível de serviço desejado.
+    """
+
+    ponto_pedido: float
+    estoque_seguranca: float
+    demanda_media_lead_time: float
+
+
+class SimulacaoEstocasticaResponse(BaseModel):
+    """
+    Modelo de resposta para a simulação de Monte Carlo da política (Q, r).
+    """
+
+    semente: int
+    replicacoes: int
+    horizonte_dias: int
+    lote: float
+    ponto_pedido: float
+    estoque_seguranca: float
+    nivel_servico_alvo: float
+    recomendacao: RecomendacaoPontoPedido
+    taxa_atendimento: ResumoMetrica
+    probabilidade_falta_ciclo: float
+    nivel_servico_ciclo: float
+    pedidos_por_ano: float
+    estoque_medio: float
+    custo_total_anual: ResumoMetrica
+    custo_pedidos_anual: float
+    custo_manutencao_anual: float
+    custo_falta_anual: float
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from models.auth import (
     UsuarioRegistro,
     UsuarioLogin,
@@ -27,7 +28,7 @@ async def registrar(usuario: UsuarioRegistro):
         Token de autenticação (ID do usuário).
     """
     try:
-        token = auth_service.registrar_usuario(usuario)
+        token = await run_in_threadpool(auth_service.registrar_usuario, usuario)
         return token
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -50,7 +51,7 @@ async def login(credenciais: UsuarioLogin):
         Token de autenticação (ID do usuário).
     """
     try:
-        token = auth_service.fazer_login(credenciais)
+        token = await run_in_threadpool(auth_service.fazer_login, credenciais)
         return token
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
@@ -73,7 +74,7 @@ async def obter_usuario(token: str):
         Dados do usuário.
     """
     try:
-        usuario = auth_service.obter_usuario_por_token(token)
+        usuario = await run_in_threadpool(auth_service.obter_usuario_por_token, token)
         if not usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado"
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from models.job import JobResponse
+from services.job import JobService
+from utils.auth import obter_usuario_atual
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+job_service = JobService()
+
+
+@router.get(
+    "/{id_job}",
+    response_model=JobResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def obter_job(
+    id_job: int,
+    acompanhar: bool = False,
+    id_usuario: int = Depends(obter_usuario_atual),
+):
+    """
+    Obtém o estado e o progresso de um job do usuário autenticado.
+    Com acompanhar=true a resposta é um NDJSON com uma linha a cada
+    mudança de progresso, encerrado quando o job termina.
+    """
+    try:
+        if acompanhar:
+            linhas = await run_in_threadpool(
+                job_service.acompanhar_job, id_job, id_usuario
+            )
+            if linhas is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Job não encontrado"
+                )
+            return StreamingResponse(linhas, media_type="application/x-ndjson")
+
+        job = await run_in_threadpool(job_service.obter_job, id_job, id_usuario)
+
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Job não encontrado"
+            )
+
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao obter job: {str(e)}",
+        )
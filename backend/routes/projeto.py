@@ -1,19 +1,34 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from models.projeto import (
     ProjetoCriar,
     ProjetoAtualizar,
     ProjetoResponse,
     ProjetoComSimulacoesResponse,
+    ProjetoResumoResponse,
+    OtimizacaoLotesRequest,
+    OtimizacaoLotesResponse,
+    RecalculoProjetoRequest,
 )
+from models.job import JobResponse
 from services.projeto import ProjetoService
+from services.job import JobService
+from services.acesso import AcessoProjetoError
 from services.simulacao import SimulacaoService
 from utils.auth import obter_usuario_atual
-from typing import List
+from utils.paginacao import (
+    CABECALHO_PROXIMO_CURSOR,
+    LIMITE_MAXIMO_PAGINA,
+    LIMITE_PADRAO_PAGINA,
+)
+from typing import List, Literal, Optional
 
 router = APIRouter(prefix="/projetos", tags=["Projetos"])
 
 projeto_service = ProjetoService()
 simulacao_service = SimulacaoService()
+job_service = JobService()
 
 
 @router.post("/", response_model=ProjetoResponse, status_code=status.HTTP_201_CREATED)
@@ -25,7 +40,9 @@ async def criar_projeto(
     Cria um novo projeto para o usuário autenticado.
     """
     try:
-        return projeto_service.criar_projeto(projeto, id_usuario)
+        return await run_in_threadpool(
+            projeto_service.criar_projeto, projeto, id_usuario
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -34,12 +51,35 @@ async def criar_projeto(
 
 
 @router.get("/", response_model=List[ProjetoResponse])
-async def listar_projetos(id_usuario: int = Depends(obter_usuario_atual)):
+async def listar_projetos(
+    response: Response,
+    limite: int = Query(LIMITE_PADRAO_PAGINA, ge=1, le=LIMITE_MAXIMO_PAGINA),
+    cursor: Optional[str] = None,
+    nome_prefixo: Optional[str] = Query(None, max_length=120),
+    ordenar_por: Literal["data_criacao", "nome_grupo"] = "data_criacao",
+    ordem: Literal["asc", "desc"] = "desc",
+    id_usuario: int = Depends(obter_usuario_atual),
+):
     """
-    Lista todos os projetos do usuário autenticado.
+    Lista os projetos do usuário autenticado, uma página por vez.
+    O cursor da próxima página vem no cabeçalho X-Proximo-Cursor
+    (ausente na última página).
     """
     try:
-        return projeto_service.listar_projetos_usuario(id_usuario)
+        pagina = await run_in_threadpool(
+            projeto_service.listar_projetos_usuario,
+            id_usuario,
+            limite,
+            cursor,
+            nome_prefixo,
+            ordenar_por,
+            ordem,
+        )
+        if pagina.proximo_cursor:
+            response.headers[CABECALHO_PROXIMO_CURSOR] = pagina.proximo_cursor
+        return pagina.itens
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -53,18 +93,24 @@ async def obter_projeto(
     id_usuario: int = Depends(obter_usuario_atual)
 ):
     """
-    Obtém um projeto específico do usuário autenticado com suas simulações.
+    Obtém um projeto específico do usuário autenticado com a primeira
+    página das suas simulações. As demais páginas são obtidas em
+    GET /projetos/{id}/simulacoes com o proximo_cursor retornado.
     """
     try:
-        projeto = projeto_service.obter_projeto(id_grupo, id_usuario)
+        projeto = await run_in_threadpool(
+            projeto_service.obter_projeto, id_grupo, id_usuario
+        )
 
         if not projeto:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Projeto não encontrado"
             )
 
-        # Busca as simulações do projeto
-        simulacoes = simulacao_service.listar_simulacoes_projeto(id_grupo)
+        # Busca a primeira página das simulações do projeto
+        pagina = await run_in_threadpool(
+            simulacao_service.listar_simulacoes_projeto, id_grupo, id_usuario
+        )
 
         # Retorna projeto com simulações
         return ProjetoComSimulacoesResponse(
@@ -73,7 +119,8 @@ async def obter_projeto(
             nome_grupo=projeto.nome_grupo,
             descricao=projeto.descricao,
             data_criacao=projeto.data_criacao,
-            simulacoes=simulacoes,
+            simulacoes=pagina.itens,
+            proximo_cursor=pagina.proximo_cursor,
         )
     except HTTPException:
         raise
@@ -84,6 +131,107 @@ async def obter_projeto(
         )
 
 
+@router.get("/{id_grupo}/resumo", response_model=ProjetoResumoResponse)
+async def obter_resumo_projeto(
+    id_grupo: int, id_usuario: int = Depends(obter_usuario_atual)
+):
+    """
+    Obtém os totais das simulações do projeto (quantidade de produtos,
+    custos totais e economia anual) sem percorrer as simulações.
+    """
+    try:
+        resumo = await run_in_threadpool(
+            projeto_service.obter_resumo, id_grupo, id_usuario
+        )
+
+        if not resumo:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Projeto não encontrado"
+            )
+
+        return resumo
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao obter resumo do projeto: {str(e)}",
+        )
+
+
+@router.post("/{id_grupo}/otimizar-lotes", response_model=OtimizacaoLotesResponse)
+async def otimizar_lotes_projeto(
+    id_grupo: int,
+    limites: OtimizacaoLotesRequest,
+    id_usuario: int = Depends(obter_usuario_atual),
+):
+    """
+    Calcula os lotes de todas as simulações do projeto sob uma capacidade
+    e/ou um orçamento globais (LEC multi-item com multiplicadores de
+    Lagrange), sem alterar as simulações salvas.
+    """
+    try:
+        resultado = await run_in_threadpool(
+            projeto_service.otimizar_lotes,
+            id_grupo,
+            id_usuario,
+            limites.capacidade,
+            limites.orcamento,
+        )
+
+        if not resultado:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Projeto não encontrado"
+            )
+
+        # Projetos grandes: serializa direto, sem a validação do response_model
+        return JSONResponse(resultado)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao otimizar lotes do projeto: {str(e)}",
+        )
+
+
+@router.post(
+    "/{id_grupo}/recalcular",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def recalcular_projeto(
+    id_grupo: int,
+    dados: RecalculoProjetoRequest,
+    response: Response,
+    id_usuario: int = Depends(obter_usuario_atual),
+):
+    """
+    Enfileira o recálculo de todas as simulações do projeto com os novos
+    custos de pedido e/ou de manutenção. O progresso é acompanhado em
+    GET /jobs/{id} (endereço também no cabeçalho Location).
+    """
+    try:
+        job = await run_in_threadpool(
+            job_service.enfileirar_recalculo, id_grupo, id_usuario, dados
+        )
+        response.headers["Location"] = f"/jobs/{job.id}"
+        return job
+    except HTTPException:
+        raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao enfileirar o recálculo do projeto: {str(e)}",
+        )
+
+
 @router.put("/{id_grupo}", response_model=ProjetoResponse)
 async def atualizar_projeto(
     id_grupo: int, 
@@ -94,7 +242,9 @@ async def atualizar_projeto(
     Atualiza um projeto do usuário autenticado.
     """
     try:
-        projeto = projeto_service.atualizar_projeto(id_grupo, id_usuario, dados)
+        projeto = await run_in_threadpool(
+            projeto_service.atualizar_projeto, id_grupo, id_usuario, dados
+        )
 
         if not projeto:
             raise HTTPException(
@@ -120,7 +270,9 @@ async def deletar_projeto(
     Deleta um projeto do usuário autenticado.
     """
     try:
-        deletado = projeto_service.deletar_projeto(id_grupo, id_usuario)
+        deletado = await run_in_threadpool(
+            projeto_service.deletar_projeto, id_grupo, id_usuario
+        )
 
         if not deletado:
             raise HTTPException(
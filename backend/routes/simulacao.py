@@ -1,32 +1,59 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    status,
+    Depends,
+    File,
+    UploadFile,
+    Query,
+    Response,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from models.simulacao import (
     SimulacaoCriar,
+    SimulacaoLoteCriar,
+    SimulacaoLoteResponse,
+    ImportacaoCsvResponse,
     SimulacaoAtualizar,
     SimulacaoResponse,
     AnaliseMatematicaResponse,
     DadosGraficoResponse,
+    SensibilidadeResponse,
+    SimulacaoEstocasticaRequest,
+    SimulacaoEstocasticaResponse,
 )
 from services.simulacao import SimulacaoService
-from services.projeto import ProjetoService
+from services.acesso import AcessoProjetoError
 from utils.auth import obter_usuario_atual
-from typing import List
+from utils.lote_economico import (
+    ESCALA_LINEAR,
+    MAX_PONTOS_GRAFICO,
+    LIMITE_PONTOS_GRAFICO,
+)
+from utils.sensibilidade import MAX_PONTOS_SENSIBILIDADE
+from utils.pool_calculo import TempoCalculoEsgotadoError
+from utils.paginacao import (
+    CABECALHO_PROXIMO_CURSOR,
+    LIMITE_MAXIMO_PAGINA,
+    LIMITE_PADRAO_PAGINA,
+)
+from typing import List, Optional, Literal
+import numpy as np
 
 router = APIRouter(prefix="/projetos/{id_projeto}/simulacoes", tags=["Simulações"])
 
 simulacao_service = SimulacaoService()
-projeto_service = ProjetoService()
 
 
-def validar_acesso_projeto(id_projeto: int, id_usuario: int):
+def _lista_com_nulos(valores: np.ndarray) -> list:
     """
-    Valida se o usuário tem acesso ao projeto.
+    Converte o array para lista, com None no lugar de NaN (o JSON não
+    aceita NaN).
     """
-    projeto = projeto_service.obter_projeto(id_projeto, id_usuario)
-    if not projeto:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Projeto não encontrado ou você não tem acesso a ele",
-        )
+    if not np.isnan(valores).any():
+        return valores.tolist()
+    return np.where(np.isnan(valores), None, valores).tolist()
 
 
 @router.post("/", response_model=SimulacaoResponse, status_code=status.HTTP_201_CREATED)
@@ -39,10 +66,15 @@ async def criar_simulacao(
     Cria uma nova simulação para o projeto.
     """
     try:
-        validar_acesso_projeto(id_projeto, id_usuario)
-        return simulacao_service.criar_simulacao(simulacao, id_projeto)
+        return await run_in_threadpool(
+            simulacao_service.criar_simulacao, simulacao, id_projeto, id_usuario
+        )
     except HTTPException:
         raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -50,6 +82,99 @@ async def criar_simulacao(
         )
 
 
+@router.post(
+    "/lote", response_model=SimulacaoLoteResponse, status_code=status.HTTP_201_CREATED
+)
+async def criar_simulacoes_lote(
+    id_projeto: int,
+    lote: SimulacaoLoteCriar,
+    id_usuario: int = Depends(obter_usuario_atual),
+):
+    """
+    Cria várias simulações para o projeto em uma única transação.
+    """
+    try:
+        return await run_in_threadpool(
+            simulacao_service.criar_simulacoes_lote,
+            lote.simulacoes,
+            id_projeto,
+            id_usuario,
+        )
+    except HTTPException:
+        raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao criar simulações em lote: {str(e)}",
+        )
+
+
+@router.post(
+    "/importar",
+    response_model=ImportacaoCsvResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def importar_simulacoes_csv(
+    id_projeto: int,
+    arquivo: UploadFile = File(...),
+    id_usuario: int = Depends(obter_usuario_atual),
+):
+    """
+    Importa um catálogo de produtos em CSV para o projeto.
+    O arquivo deve conter as colunas nome_produto, demanda_anual,
+    custo_pedido, custo_manutencao e, opcionalmente, lote_atual_empresa,
+    volume_unitario, custo_unitario, modelo, taxa_producao e
+    custo_falta_anual.
+    """
+    try:
+        return await run_in_threadpool(
+            simulacao_service.importar_csv, arquivo.file, id_projeto, id_usuario
+        )
+    except HTTPException:
+        raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao importar simulações: {str(e)}",
+        )
+
+
+@router.get(
+    "/exportar",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def exportar_simulacoes(
+    id_projeto: int, id_usuario: int = Depends(obter_usuario_atual)
+):
+    """
+    Exporta todas as simulações do projeto em NDJSON (uma simulação por
+    linha), enviadas à medida que são lidas do banco.
+    """
+    try:
+        linhas = await run_in_threadpool(
+            simulacao_service.exportar_simulacoes_ndjson, id_projeto, id_usuario
+        )
+        return StreamingResponse(linhas, media_type="application/x-ndjson")
+    except HTTPException:
+        raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao exportar simulações: {str(e)}",
+        )
+
+
 @router.get(
     "/{id_simulacao}/analise-matematica", response_model=AnaliseMatematicaResponse
 )
@@ -61,9 +186,11 @@ async def obter_analise_matematica(
     Inclui derivadas, pontos críticos, verificação de otimalidade.
     """
     try:
-        validar_acesso_projeto(id_projeto, id_usuario)
-        analise = simulacao_service.gerar_analise_matematica_detalhada(
-            id_simulacao, id_projeto
+        analise = await run_in_threadpool(
+            simulacao_service.gerar_analise_matematica_detalhada,
+            id_simulacao,
+            id_projeto,
+            id_usuario,
         )
 
         if not analise:
@@ -75,6 +202,8 @@ async def obter_analise_matematica(
         return AnaliseMatematicaResponse(**analise)
     except HTTPException:
         raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -82,22 +211,42 @@ async def obter_analise_matematica(
         )
 
 
-@router.get("/{id_simulacao}/grafico", response_model=DadosGraficoResponse)
+@router.get(
+    "/{id_simulacao}/grafico",
+    response_model=DadosGraficoResponse,
+    responses={200: {"content": {"application/octet-stream": {}}}},
+)
 async def obter_dados_grafico(
     id_projeto: int,
     id_simulacao: int,
-    q_min: float = 10,
-    q_max: float = 200,
-    pontos: int = 100,
+    q_min: Optional[float] = Query(None, gt=0),
+    q_max: Optional[float] = Query(None, gt=0),
+    pontos: int = Query(100, ge=2, le=MAX_PONTOS_GRAFICO),
+    escala: Literal["linear", "log", "adaptativa"] = ESCALA_LINEAR,
+    max_pontos: int = Query(LIMITE_PONTOS_GRAFICO, ge=3, le=LIMITE_PONTOS_GRAFICO),
+    formato: Literal["json", "binario"] = "json",
     id_usuario: int = Depends(obter_usuario_atual),
 ):
     """
     Obtém dados para plotagem do gráfico de custo x lote.
+
+    Sem q_min/q_max o intervalo é centrado no lote ótimo. Curvas com mais
+    de max_pontos pontos são reduzidas no servidor (LTTB). Com
+    formato=binario a resposta é um array float32 little-endian com os
+    lotes seguidos dos custos; o número de pontos vai no cabeçalho X-Pontos.
     """
     try:
-        validar_acesso_projeto(id_projeto, id_usuario)
-        dados = simulacao_service.gerar_dados_grafico(
-            id_simulacao, id_projeto, q_min, q_max, pontos
+        dados = await run_in_threadpool(
+            simulacao_service.gerar_dados_grafico,
+            id_simulacao,
+            id_projeto,
+            id_usuario,
+            q_min,
+            q_max,
+            pontos,
+            escala,
+            max_pontos,
+            formato == "binario",
         )
 
         if not dados:
@@ -106,9 +255,27 @@ async def obter_dados_grafico(
                 detail="Simulação não encontrada",
             )
 
+        if formato == "binario":
+            serie = np.concatenate(
+                (dados["valores_lote"], dados["valores_custo"])
+            ).astype("<f4")
+            return Response(
+                content=serie.tobytes(),
+                media_type="application/octet-stream",
+                headers={"X-Pontos": str(dados["valores_lote"].size)},
+            )
+
         return DadosGraficoResponse(**dados)
     except HTTPException:
         raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except TempoCalculoEsgotadoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -116,19 +283,214 @@ async def obter_dados_grafico(
         )
 
 
+@router.get(
+    "/{id_simulacao}/sensibilidade",
+    response_model=SensibilidadeResponse,
+    responses={200: {"content": {"application/octet-stream": {}}}},
+)
+async def obter_sensibilidade(
+    id_projeto: int,
+    id_simulacao: int,
+    variacao_min: float = Query(-0.3, gt=-1),
+    variacao_max: float = Query(0.3, le=10),
+    pontos: int = Query(21, ge=2, le=MAX_PONTOS_SENSIBILIDADE),
+    eixo_x: Literal[
+        "demanda_anual", "custo_pedido", "custo_manutencao"
+    ] = "demanda_anual",
+    eixo_y: Literal[
+        "demanda_anual", "custo_pedido", "custo_manutencao"
+    ] = "custo_manutencao",
+    pontos_mapa: Optional[int] = Query(None, ge=2, le=MAX_PONTOS_SENSIBILIDADE),
+    metrica_mapa: Literal[
+        "lote_otimo", "custo_total_otimo", "custo_total_atual", "economia_anual"
+    ] = "custo_total_otimo",
+    formato: Literal["json", "binario"] = "json",
+    id_usuario: int = Depends(obter_usuario_atual),
+):
+    """
+    Análise de sensibilidade da simulação, sem alterar os dados salvos.
+
+    Cada parâmetro varia de (1 + variacao_min) a (1 + variacao_max) vezes o
+    valor base: o tornado mostra o impacto nos extremos, as curvas variam
+    um parâmetro por vez e o mapa varia eixo_x e eixo_y juntos (grade de
+    pontos_mapa x pontos_mapa). Com formato=binario apenas o mapa é
+    enviado, como float32 little-endian: valores do eixo x, do eixo y e a
+    superfície linha a linha; os tamanhos vão em X-Colunas e X-Linhas.
+
+    Quando o modelo limita a demanda (LEP: abaixo da taxa de produção), o
+    limite vem em ``limites`` e os pontos da grade acima dele são null no
+    JSON (NaN no formato binário).
+    """
+    try:
+        analise = await run_in_threadpool(
+            simulacao_service.gerar_analise_sensibilidade,
+            id_simulacao,
+            id_projeto,
+            id_usuario,
+            variacao_min,
+            variacao_max,
+            pontos,
+            eixo_x,
+            eixo_y,
+            pontos_mapa,
+            metrica_mapa,
+        )
+
+        if not analise:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Simulação não encontrada",
+            )
+
+        mapa = analise["mapa"]
+        if formato == "binario":
+            serie = np.concatenate(
+                (mapa["valores_x"], mapa["valores_y"], mapa["valores"].ravel())
+            ).astype("<f4")
+            return Response(
+                content=serie.tobytes(),
+                media_type="application/octet-stream",
+                headers={
+                    "X-Colunas": str(mapa["valores_x"].size),
+                    "X-Linhas": str(mapa["valores_y"].size),
+                },
+            )
+
+        # Grades grandes: serializa direto, sem a validação do response_model
+        return JSONResponse(
+            {
+                "limites": analise["limites"],
+                "base": analise["base"],
+                "fatores": analise["fatores"].tolist(),
+                "tornado": analise["tornado"],
+                "curvas": {
+                    parametro: {
+                        nome: _lista_com_nulos(serie) for nome, serie in curva.items()
+                    }
+                    for parametro, curva in analise["curvas"].items()
+                },
+                "mapa": {
+                    chave: (
+                        _lista_com_nulos(valor)
+                        if isinstance(valor, np.ndarray)
+                        else valor
+                    )
+                    for chave, valor in mapa.items()
+                },
+            }
+        )
+    except HTTPException:
+        raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except TempoCalculoEsgotadoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao gerar análise de sensibilidade: {str(e)}",
+        )
+
+
+@router.post(
+    "/{id_simulacao}/estocastica", response_model=SimulacaoEstocasticaResponse
+)
+async def simular_politica_estocastica(
+    id_projeto: int,
+    id_simulacao: int,
+    parametros: SimulacaoEstocasticaRequest,
+    id_usuario: int = Depends(obter_usuario_atual),
+):
+    """
+    Simulação de Monte Carlo da política (Q, r) com demanda diária e lead
+    time aleatórios, sem alterar os dados salvos.
+
+    Retorna taxa de atendimento, probabilidade de falta por ciclo, custo
+    anual esperado (com intervalo de confiança de 95%) e o ponto de pedido
+    e estoque de segurança recomendados para o nível de serviço. Informe
+    a semente para repetir exatamente o mesmo resultado.
+    """
+    try:
+        resultado = await run_in_threadpool(
+            simulacao_service.simular_politica_estocastica,
+            id_simulacao,
+            id_projeto,
+            id_usuario,
+            parametros,
+        )
+
+        if not resultado:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Simulação não encontrada",
+            )
+
+        return resultado
+    except HTTPException:
+        raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except TempoCalculoEsgotadoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro na simulação estocástica: {str(e)}",
+        )
+
+
 @router.get("/", response_model=List[SimulacaoResponse])
 async def listar_simulacoes(
-    id_projeto: int, 
-    id_usuario: int = Depends(obter_usuario_atual)
+    id_projeto: int,
+    response: Response,
+    limite: int = Query(LIMITE_PADRAO_PAGINA, ge=1, le=LIMITE_MAXIMO_PAGINA),
+    cursor: Optional[str] = None,
+    nome_prefixo: Optional[str] = Query(None, max_length=255),
+    economia_min: Optional[float] = None,
+    economia_max: Optional[float] = None,
+    ordenar_por: Literal[
+        "data_simulacao", "nome_produto", "economia_anual"
+    ] = "data_simulacao",
+    ordem: Literal["asc", "desc"] = "desc",
+    id_usuario: int = Depends(obter_usuario_atual),
 ):
     """
-    Lista todas as simulações do projeto.
+    Lista as simulações do projeto, uma página por vez.
+
+    Filtros: prefixo do nome do produto e faixa de economia anual.
+    O cursor da próxima página vem no cabeçalho X-Proximo-Cursor
+    (ausente na última página) e deve ser usado com a mesma ordenação.
     """
     try:
-        validar_acesso_projeto(id_projeto, id_usuario)
-        return simulacao_service.listar_simulacoes_projeto(id_projeto)
+        pagina = await run_in_threadpool(
+            simulacao_service.listar_simulacoes_projeto,
+            id_projeto,
+            id_usuario,
+            limite,
+            cursor,
+            nome_prefixo,
+            economia_min,
+            economia_max,
+            ordenar_por,
+            ordem,
+        )
+        if pagina.proximo_cursor:
+            response.headers[CABECALHO_PROXIMO_CURSOR] = pagina.proximo_cursor
+        return pagina.itens
     except HTTPException:
         raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -146,8 +508,9 @@ async def obter_simulacao(
     Obtém uma simulação específica do projeto.
     """
     try:
-        validar_acesso_projeto(id_projeto, id_usuario)
-        simulacao = simulacao_service.obter_simulacao(id_simulacao, id_projeto)
+        simulacao = await run_in_threadpool(
+            simulacao_service.obter_simulacao, id_simulacao, id_projeto, id_usuario
+        )
 
         if not simulacao:
             raise HTTPException(
@@ -158,6 +521,8 @@ async def obter_simulacao(
         return simulacao
     except HTTPException:
         raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -176,9 +541,12 @@ async def atualizar_simulacao(
     Atualiza uma simulação do projeto.
     """
     try:
-        validar_acesso_projeto(id_projeto, id_usuario)
-        simulacao = simulacao_service.atualizar_simulacao(
-            id_simulacao, id_projeto, dados
+        simulacao = await run_in_threadpool(
+            simulacao_service.atualizar_simulacao,
+            id_simulacao,
+            id_projeto,
+            id_usuario,
+            dados,
         )
 
         if not simulacao:
@@ -190,6 +558,10 @@ async def atualizar_simulacao(
         return simulacao
     except HTTPException:
         raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -207,8 +579,9 @@ async def deletar_simulacao(
     Deleta uma simulação do projeto.
     """
     try:
-        validar_acesso_projeto(id_projeto, id_usuario)
-        deletado = simulacao_service.deletar_simulacao(id_simulacao, id_projeto)
+        deletado = await run_in_threadpool(
+            simulacao_service.deletar_simulacao, id_simulacao, id_projeto, id_usuario
+        )
 
         if not deletado:
             raise HTTPException(
@@ -219,6 +592,8 @@ async def deletar_simulacao(
         return None
     except HTTPException:
         raise
+    except AcessoProjetoError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,130 @@
+"""
+Controle de acesso dos usuários aos projetos.
+
+As consultas dos serviços já filtram pelo dono do projeto; este módulo
+define os erros usados para distinguir projeto inexistente de projeto de
+outro usuário e um cache curto das propriedades já confirmadas.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class AcessoProjetoError(Exception):
+    """
+    O projeto não pode ser usado pelo usuário.
+    """
+
+    mensagem = "Projeto não encontrado ou você não tem acesso a ele"
+
+    def __init__(self, id_projeto: int):
+        super().__init__(self.mensagem)
+        self.id_projeto = id_projeto
+
+
+class ProjetoNaoEncontradoError(AcessoProjetoError):
+    """
+    O projeto não existe.
+    """
+
+
+class AcessoNegadoError(AcessoProjetoError):
+    """
+    O projeto existe, mas pertence a outro usuário.
+    """
+
+
+class CacheAcessoProjeto:
+    """
+    Cache com TTL curto das propriedades (usuário, projeto) confirmadas.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entradas: int = 50_000):
+        """
+        Inicializa o cache.
+
+        Args:
+            ttl: Segundos em que uma propriedade confirmada é reutilizada
+            max_entradas: Número máximo de pares armazenados
+        """
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        # (id_usuario, id_projeto) -> momento de expiração
+        self._expira_em: Dict[Tuple[int, int], float] = {}
+
+    def confirmado(self, id_usuario: int, id_projeto: int) -> bool:
+        """
+        Indica se o usuário teve a propriedade do projeto confirmada há pouco.
+        """
+        chave = (id_usuario, id_projeto)
+        with self._lock:
+            expira_em = self._expira_em.get(chave)
+            if expira_em is None:
+                return False
+            if expira_em < time.monotonic():
+                del self._expira_em[chave]
+                return False
+            return True
+
+    def registrar(self, id_usuario: int, id_projeto: int):
+        """
+        Registra que o usuário é dono do projeto.
+        """
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._expira_em) >= self.max_entradas:
+                agora = time.monotonic()
+                self._expira_em = {
+                    k: v for k, v in self._expira_em.items() if v >= agora
+                }
+                if len(self._expira_em) >= self.max_entradas:
+                    self._expira_em.clear()
+            self._expira_em[(id_usuario, id_projeto)] = time.monotonic() + self.ttl
+
+    def invalidar_projeto(self, id_projeto: int):
+        """
+        Remove as propriedades registradas de um projeto.
+        """
+        with self._lock:
+            for chave in [k for k in self._expira_em if k[1] == id_projeto]:
+                del self._expira_em[chave]
+
+
+def verificar_acesso_projeto(cursor, id_projeto: int, id_usuario: int):
+    """
+    Confirma a propriedade do projeto com uma consulta ao banco.
+
+    Raises:
+        ProjetoNaoEncontradoError: Se o projeto não existir.
+        AcessoNegadoError: Se o projeto pertencer a outro usuário.
+    """
+    if cache_acesso.confirmado(id_usuario, id_projeto):
+        return
+
+    cursor.execute("SELECT id_usuario FROM projeto WHERE id_grupo = %s", (id_projeto,))
+    linha = cursor.fetchone()
+    levantar_se_sem_acesso(linha[0] if linha else None, id_projeto, id_usuario)
+
+
+def levantar_se_sem_acesso(dono: Optional[int], id_projeto: int, id_usuario: int):
+    """
+    Converte o dono retornado por uma consulta no erro correspondente
+    e registra a propriedade confirmada no cache.
+
+    Raises:
+        ProjetoNaoEncontradoError: Se o projeto não existir (dono None).
+        AcessoNegadoError: Se o projeto pertencer a outro usuário.
+    """
+    if dono is None:
+        raise ProjetoNaoEncontradoError(id_projeto)
+    if dono != id_usuario:
+        raise AcessoNegadoError(id_projeto)
+    cache_acesso.registrar(id_usuario, id_projeto)
+
+
+# Instância global para reutilização
+cache_acesso = CacheAcessoProjeto(ttl=float(os.getenv("ACESSO_CACHE_TTL", "30")))
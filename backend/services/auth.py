@@ -1,7 +1,9 @@
 from Connections.postgre import postgreConnection
 from models.auth import UsuarioRegistro, UsuarioLogin, TokenResponse, UsuarioResponse
 from utils.auth import token_manager
-import hashlib
+from utils.senha import hasher_senha
+from utils.cache import CacheTTL
+import os
 import psycopg2.extras
 from typing import Optional
 
@@ -16,23 +18,19 @@ class AuthService:
         Inicializa o serviço de autenticação.
         """
         self.db = postgreConnection()
-
-    def _hash_senha(self, senha: str) -> str:
-        """
-        Gera hash SHA256 da senha.
-
-        Args:
-            senha: Senha em texto plano.
-
-        Returns:
-            Hash da senha.
-        """
-        return hashlib.sha256(senha.encode()).hexdigest()
+        # Perfis de usuário lidos recentemente (chave: id_usuario)
+        self.cache_perfis = CacheTTL(
+            max_entradas=int(os.getenv("USUARIO_CACHE_MAX_ENTRADAS", "10000")),
+            ttl=float(os.getenv("USUARIO_CACHE_TTL", "60")),
+        )
 
     def registrar_usuario(self, usuario: UsuarioRegistro) -> TokenResponse:
         """
         Registra um novo usuário no banco de dados.
 
+        O hash da senha é calculado antes de retirar a conexão do pool e o
+        email duplicado é detectado pelo próprio INSERT (ON CONFLICT).
+
         Args:
             usuario: Dados do usuário para registro.
 
@@ -42,48 +40,49 @@ class AuthService:
         Raises:
             ValueError: Se o email já estiver cadastrado.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-        try:
-            # Verifica se o email já existe
-            cursor.execute(
-                "SELECT id_usuario FROM usuarios WHERE email = %s", (usuario.email,)
-            )
-            if cursor.fetchone():
-                raise ValueError("Email já cadastrado")
-
-            # Hash da senha
-            senha_hash = self._hash_senha(usuario.senha)
-
-            # Insere o novo usuário
-            cursor.execute(
-                """
-                INSERT INTO usuarios (nome, email, senha)
-                VALUES (%s, %s, %s)
-                RETURNING id_usuario
-                """,
-                (usuario.nome, usuario.email, senha_hash),
-            )
-
-            result = cursor.fetchone()
-            conn.commit()
-
-            token = token_manager.criar_token(result["id_usuario"])
-
-            return TokenResponse(token=token, mensagem="Usuário registrado com sucesso")
-        except ValueError:
-            raise
-        except Exception as e:
-            conn.rollback()
-            raise Exception(f"Erro ao registrar usuário: {str(e)}")
-        finally:
-            cursor.close()
+        senha_hash = hasher_senha.gerar_hash(usuario.senha)
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO usuarios (nome, email, senha)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (email) DO NOTHING
+                    RETURNING id_usuario
+                    """,
+                    (usuario.nome, usuario.email, senha_hash),
+                )
+
+                result = cursor.fetchone()
+                if not result:
+                    raise ValueError("Email já cadastrado")
+
+                conn.commit()
+
+                token = token_manager.criar_token(result["id_usuario"])
+
+                return TokenResponse(
+                    token=token, mensagem="Usuário registrado com sucesso"
+                )
+            except ValueError:
+                raise
+            except Exception as e:
+                conn.rollback()
+                raise Exception(f"Erro ao registrar usuário: {str(e)}")
+            finally:
+                cursor.close()
 
     def fazer_login(self, credenciais: UsuarioLogin) -> TokenResponse:
         """
         Autentica um usuário e retorna o token (ID do usuário).
 
+        A senha é verificada fora da conexão com o banco. Hashes no formato
+        antigo (SHA-256) ou com parâmetros desatualizados são refeitos
+        após um login bem-sucedido.
+
         Args:
             credenciais: Email e senha do usuário.
 
@@ -93,28 +92,22 @@ class AuthService:
         Raises:
             ValueError: Se as credenciais forem inválidas.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
         try:
-            # Hash da senha fornecida
-            senha_hash = self._hash_senha(credenciais.senha)
-
-            # Busca o usuário
-            cursor.execute(
-                """
-                SELECT id_usuario, nome, email
-                FROM usuarios
-                WHERE email = %s AND senha = %s
-                """,
-                (credenciais.email, senha_hash),
-            )
-
-            usuario = cursor.fetchone()
+            usuario = self._buscar_credenciais(credenciais.email)
 
-            if not usuario:
+            valida, refazer_hash = hasher_senha.verificar(
+                credenciais.senha, usuario["senha"] if usuario else None
+            )
+            if not valida:
                 raise ValueError("Email ou senha inválidos")
 
+            if refazer_hash:
+                self._atualizar_hash_senha(
+                    usuario["id_usuario"],
+                    usuario["senha"],
+                    hasher_senha.gerar_hash(credenciais.senha),
+                )
+
             token = token_manager.criar_token(usuario["id_usuario"])
 
             return TokenResponse(token=token, mensagem="Login realizado com sucesso")
@@ -122,12 +115,46 @@ class AuthService:
             raise
         except Exception as e:
             raise Exception(f"Erro ao fazer login: {str(e)}")
-        finally:
-            cursor.close()
+
+    def _buscar_credenciais(self, email: str) -> Optional[dict]:
+        """
+        Busca o ID e o hash da senha do usuário com o email informado.
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(
+                    "SELECT id_usuario, senha FROM usuarios WHERE email = %s",
+                    (email,),
+                )
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+
+    def _atualizar_hash_senha(self, id_usuario: int, hash_antigo: str, novo: str):
+        """
+        Substitui o hash da senha, se ele não tiver sido alterado nesse meio tempo.
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    """
+                    UPDATE usuarios SET senha = %s
+                    WHERE id_usuario = %s AND senha = %s
+                    """,
+                    (novo, id_usuario, hash_antigo),
+                )
+                conn.commit()
+            finally:
+                cursor.close()
 
     def obter_usuario_por_token(self, token: str) -> Optional[UsuarioResponse]:
         """
         Obtém os dados de um usuário pelo token.
+        Perfis lidos recentemente são servidos do cache (USUARIO_CACHE_TTL).
 
         Args:
             token: Token criptografado do usuário.
@@ -135,37 +162,47 @@ class AuthService:
         Returns:
             Dados do usuário ou None se não encontrado.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
         try:
             # Valida o token e obtém o ID
             id_usuario = token_manager.validar_token(token)
-
-            cursor.execute(
-                """
-                SELECT id_usuario, nome, email, data_criacao
-                FROM usuarios
-                WHERE id_usuario = %s
-                """,
-                (id_usuario,),
-            )
-
-            usuario = cursor.fetchone()
-
-            if not usuario:
-                return None
-
-            return UsuarioResponse(
-                id_usuario=usuario["id_usuario"],
-                nome=usuario["nome"],
-                email=usuario["email"],
-                data_criacao=str(usuario["data_criacao"]),
-            )
         except Exception as e:
             raise Exception(f"Erro ao obter usuário: {str(e)}")
-        finally:
-            cursor.close()
+
+        perfil = self.cache_perfis.obter(id_usuario)
+        if perfil is not None:
+            return perfil
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(
+                    """
+                    SELECT id_usuario, nome, email, data_criacao
+                    FROM usuarios
+                    WHERE id_usuario = %s
+                    """,
+                    (id_usuario,),
+                )
+
+                usuario = cursor.fetchone()
+
+                if not usuario:
+                    return None
+
+                perfil = UsuarioResponse(
+                    id_usuario=usuario["id_usuario"],
+                    nome=usuario["nome"],
+                    email=usuario["email"],
+                    data_criacao=str(usuario["data_criacao"]),
+                )
+                self.cache_perfis.definir(id_usuario, perfil)
+
+                return perfil
+            except Exception as e:
+                raise Exception(f"Erro ao obter usuário: {str(e)}")
+            finally:
+                cursor.close()
 
     def close(self):
         """
@@ -0,0 +1,433 @@
+"""
+Jobs em segundo plano guardados na tabela jobs do Postgres.
+
+A API apenas enfileira o job; o worker (python worker.py) o reivindica com
+SELECT ... FOR UPDATE SKIP LOCKED, de modo que vários workers podem rodar
+ao mesmo tempo sem processar o mesmo job. O recálculo de um projeto anda em
+pedaços na ordem do id das simulações, e cada pedaço grava as simulações e
+o progresso do job (processados, ultimo_id) na mesma transação: um job
+interrompido (queda do worker) é retomado do último pedaço confirmado, sem
+aplicar duas vezes os fatores de custo.
+
+O worker roda em outro processo e não alcança o cache da API. Por isso a
+API não guarda as linhas das simulações em cache (obter_simulacao sempre
+lê do banco); os resultados calculados em cache têm chaves formadas pelos
+parâmetros da simulação, e os recálculos do worker geram chaves novas.
+"""
+
+import os
+import time
+from threading import Event
+from typing import Any, Dict, Iterator, Optional
+
+import psycopg2.extras
+
+from Connections.postgre import postgreConnection
+from models.job import JobResponse
+from models.projeto import RecalculoProjetoRequest
+from services.acesso import verificar_acesso_projeto
+from services.simulacao import SimulacaoService
+
+TIPO_RECALCULO_PROJETO = "recalculo_projeto"
+
+STATUS_PENDENTE = "pendente"
+STATUS_EXECUTANDO = "executando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+STATUS_FINAIS = (STATUS_CONCLUIDO, STATUS_ERRO)
+
+# Simulações por pedaço (uma transação por pedaço)
+TAMANHO_PEDACO_RECALCULO = int(os.getenv("JOBS_TAMANHO_PEDACO", "1000"))
+
+# Sem progresso por esse tempo, um job em execução é considerado abandonado
+# (worker interrompido) e volta a ser reivindicado
+JOB_ABANDONADO_APOS_SEGUNDOS = float(os.getenv("JOBS_ABANDONADO_APOS_SEGUNDOS", "300"))
+
+# Reivindicações de um job abandonado antes de marcá-lo com erro
+MAX_TENTATIVAS_JOB = 3
+
+# Intervalo entre as leituras do progresso no acompanhamento de um job
+INTERVALO_ACOMPANHAMENTO_SEGUNDOS = 1.0
+
+_COLUNAS_JOB = """
+    id, tipo, id_projeto, parametros, status, total, processados,
+    tentativas, erro, criado_em, iniciado_em, atualizado_em, concluido_em
+"""
+
+
+class JobService:
+    """
+    Serviço de enfileiramento, acompanhamento e execução dos jobs.
+    """
+
+    def __init__(self):
+        """
+        Inicializa o serviço de jobs.
+        """
+        self.db = postgreConnection()
+        self.simulacao_service = SimulacaoService()
+
+    def enfileirar_recalculo(
+        self, id_projeto: int, id_usuario: int, dados: RecalculoProjetoRequest
+    ) -> JobResponse:
+        """
+        Enfileira o recálculo de todas as simulações do projeto com os
+        novos custos.
+
+        Raises:
+            ValueError: Se um custo receber um novo valor e um fator.
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
+        """
+        if dados.custo_pedido is not None and dados.fator_custo_pedido is not None:
+            raise ValueError("Informe o novo custo de pedido ou o fator, não os dois")
+        if (
+            dados.custo_manutencao is not None
+            and dados.fator_custo_manutencao is not None
+        ):
+            raise ValueError(
+                "Informe o novo custo de manutenção ou o fator, não os dois"
+            )
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                verificar_acesso_projeto(cursor, id_projeto, id_usuario)
+
+                cursor.execute(
+                    f"""
+                    INSERT INTO jobs (tipo, id_usuario, id_projeto, parametros, total)
+                    SELECT %s, %s, %s, %s, COUNT(*)
+                    FROM simulacoes
+                    WHERE id_projeto = %s
+                    RETURNING {_COLUNAS_JOB}
+                    """,
+                    (
+                        TIPO_RECALCULO_PROJETO,
+                        id_usuario,
+                        id_projeto,
+                        psycopg2.extras.Json(dados.model_dump(exclude_none=True)),
+                        id_projeto,
+                    ),
+                )
+                job = cursor.fetchone()
+                conn.commit()
+
+                return _linha_para_job(job)
+
+            finally:
+                cursor.close()
+
+    def obter_job(self, id_job: int, id_usuario: int) -> Optional[JobResponse]:
+        """
+        Obtém o estado de um job do usuário (None se não existir ou for
+        de outro usuário).
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    f"""
+                    SELECT {_COLUNAS_JOB}
+                    FROM jobs
+                    WHERE id = %s AND id_usuario = %s
+                    """,
+                    (id_job, id_usuario),
+                )
+                job = cursor.fetchone()
+
+                return _linha_para_job(job) if job else None
+
+            finally:
+                cursor.close()
+
+    def acompanhar_job(
+        self,
+        id_job: int,
+        id_usuario: int,
+        intervalo: float = INTERVALO_ACOMPANHAMENTO_SEGUNDOS,
+    ) -> Optional[Iterator[bytes]]:
+        """
+        Acompanha o progresso de um job em NDJSON: uma linha com o estado
+        atual e uma nova a cada mudança de status ou de progresso, até o
+        job terminar. Retorna None (antes do início da resposta) se o job
+        não existir.
+        """
+        job = self.obter_job(id_job, id_usuario)
+        if job is None:
+            return None
+        return self._gerar_progresso(job, id_usuario, intervalo)
+
+    def _gerar_progresso(
+        self, job: JobResponse, id_usuario: int, intervalo: float
+    ) -> Iterator[bytes]:
+        """
+        Gera as linhas do acompanhamento (ver acompanhar_job). Cada leitura
+        retira uma conexão do pool só durante a consulta.
+        """
+        anterior = None
+        while job is not None:
+            estado = (job.status, job.processados, job.total)
+            if estado != anterior:
+                yield (job.model_dump_json() + "\n").encode("utf-8")
+                anterior = estado
+            if job.status in STATUS_FINAIS:
+                return
+            time.sleep(intervalo)
+            job = self.obter_job(job.id, id_usuario)
+
+    def reivindicar_job(self) -> Optional[Dict[str, Any]]:
+        """
+        Reivindica o próximo job pendente ou abandonado, marcando-o como
+        em execução. Jobs abandonados MAX_TENTATIVAS_JOB vezes são marcados
+        com erro.
+
+        Returns:
+            Dicionário com id, tipo, id_projeto, parametros e ultimo_id do
+            job, ou None se a fila estiver vazia.
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    """
+                    UPDATE jobs
+                    SET status = %s,
+                        erro = 'Job interrompido ' || tentativas || ' vez(es)',
+                        concluido_em = NOW(),
+                        atualizado_em = NOW()
+                    WHERE status = %s
+                      AND tentativas >= %s
+                      AND atualizado_em < NOW() - make_interval(secs => %s)
+                    """,
+                    (
+                        STATUS_ERRO,
+                        STATUS_EXECUTANDO,
+                        MAX_TENTATIVAS_JOB,
+                        JOB_ABANDONADO_APOS_SEGUNDOS,
+                    ),
+                )
+
+                cursor.execute(
+                    """
+                    UPDATE jobs
+                    SET status = %s,
+                        tentativas = tentativas + 1,
+                        iniciado_em = COALESCE(iniciado_em, NOW()),
+                        atualizado_em = NOW()
+                    WHERE id = (
+                        SELECT id
+                        FROM jobs
+                        WHERE status = %s
+                           OR (status = %s
+                               AND atualizado_em
+                                   < NOW() - make_interval(secs => %s))
+                        ORDER BY id
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, tipo, id_projeto, parametros, ultimo_id
+                    """,
+                    (
+                        STATUS_EXECUTANDO,
+                        STATUS_PENDENTE,
+                        STATUS_EXECUTANDO,
+                        JOB_ABANDONADO_APOS_SEGUNDOS,
+                    ),
+                )
+                job = cursor.fetchone()
+                conn.commit()
+
+                if not job:
+                    return None
+
+                return {
+                    "id": job[0],
+                    "tipo": job[1],
+                    "id_projeto": job[2],
+                    "parametros": job[3],
+                    "ultimo_id": job[4],
+                }
+
+            finally:
+                cursor.close()
+
+    def executar_job(
+        self, job: Dict[str, Any], parar: Optional[Event] = None
+    ) -> Optional[str]:
+        """
+        Executa um job reivindicado, pedaço por pedaço. Com o sinal de
+        parada o job volta à fila entre dois pedaços.
+
+        Returns:
+            Status final do job, ou None se ele foi devolvido à fila ou
+            assumido por outro worker.
+        """
+        try:
+            if job["tipo"] != TIPO_RECALCULO_PROJETO:
+                raise ValueError(f"Tipo de job desconhecido: {job['tipo']}")
+
+            ultimo_id = job["ultimo_id"]
+            while True:
+                if parar is not None and parar.is_set():
+                    self._devolver_job(job["id"], ultimo_id)
+                    return None
+
+                avancou, ultimo_id = self._processar_pedaco(job, ultimo_id)
+                if not avancou:
+                    return None
+                if ultimo_id is None:
+                    return STATUS_CONCLUIDO
+
+        except Exception as e:
+            self._falhar_job(job["id"], str(e))
+            return STATUS_ERRO
+
+    def _processar_pedaco(self, job: Dict[str, Any], ultimo_id: int):
+        """
+        Recalcula um pedaço e registra o progresso na mesma transação. O
+        progresso só é gravado se ultimo_id ainda for o do job; caso
+        contrário outro worker assumiu o job e o pedaço é desfeito.
+
+        Returns:
+            Tupla (avançou, novo ultimo_id ou None se o job terminou).
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                quantidade, novo_ultimo_id = self.simulacao_service.recalcular_pedaco(
+                    cursor,
+                    job["id_projeto"],
+                    ultimo_id,
+                    TAMANHO_PEDACO_RECALCULO,
+                    **job["parametros"],
+                )
+
+                if quantidade:
+                    cursor.execute(
+                        """
+                        UPDATE jobs
+                        SET processados = processados + %s,
+                            total = GREATEST(total, processados + %s),
+                            ultimo_id = %s,
+                            atualizado_em = NOW()
+                        WHERE id = %s AND ultimo_id = %s AND status = %s
+                        """,
+                        (
+                            quantidade,
+                            quantidade,
+                            novo_ultimo_id,
+                            job["id"],
+                            ultimo_id,
+                            STATUS_EXECUTANDO,
+                        ),
+                    )
+                else:
+                    cursor.execute(
+                        """
+                        UPDATE jobs
+                        SET status = %s,
+                            total = processados,
+                            erro = NULL,
+                            concluido_em = NOW(),
+                            atualizado_em = NOW()
+                        WHERE id = %s AND ultimo_id = %s AND status = %s
+                        """,
+                        (STATUS_CONCLUIDO, job["id"], ultimo_id, STATUS_EXECUTANDO),
+                    )
+
+                if not cursor.rowcount:
+                    conn.rollback()
+                    return False, ultimo_id
+
+                conn.commit()
+                return True, novo_ultimo_id
+
+            finally:
+                cursor.close()
+
+    def _devolver_job(self, id_job: int, ultimo_id: int):
+        """
+        Devolve à fila um job em execução (parada do worker, que não conta
+        como tentativa).
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    """
+                    UPDATE jobs
+                    SET status = %s,
+                        tentativas = tentativas - 1,
+                        atualizado_em = NOW()
+                    WHERE id = %s AND ultimo_id = %s AND status = %s
+                    """,
+                    (STATUS_PENDENTE, id_job, ultimo_id, STATUS_EXECUTANDO),
+                )
+                conn.commit()
+
+            finally:
+                cursor.close()
+
+    def _falhar_job(self, id_job: int, erro: str):
+        """
+        Marca o job com erro (os pedaços já confirmados permanecem).
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    """
+                    UPDATE jobs
+                    SET status = %s, erro = %s,
+                        concluido_em = NOW(), atualizado_em = NOW()
+                    WHERE id = %s AND status = %s
+                    """,
+                    (STATUS_ERRO, erro, id_job, STATUS_EXECUTANDO),
+                )
+                conn.commit()
+
+            finally:
+                cursor.close()
+
+    def processar_proximo(self, parar: Optional[Event] = None) -> bool:
+        """
+        Reivindica e executa o próximo job da fila.
+
+        Returns:
+            True se algum job foi reivindicado.
+        """
+        job = self.reivindicar_job()
+        if job is None:
+            return False
+        self.executar_job(job, parar)
+        return True
+
+
+def _linha_para_job(linha) -> JobResponse:
+    """
+    Converte uma linha da tabela jobs (colunas de _COLUNAS_JOB) em
+    JobResponse.
+    """
+    total, processados = linha[5], linha[6]
+    return JobResponse(
+        id=linha[0],
+        tipo=linha[1],
+        id_projeto=linha[2],
+        parametros=linha[3],
+        status=linha[4],
+        total=total,
+        processados=processados,
+        percentual=round(100 * processados / total, 2) if total else 100.0,
+        tentativas=linha[7],
+        erro=linha[8],
+        criado_em=linha[9],
+        iniciado_em=linha[10],
+        atualizado_em=linha[11],
+        concluido_em=linha[12],
+    )
@@ -1,7 +1,31 @@
 from Connections.postgre import postgreConnection
-from models.projeto import ProjetoCriar, ProjetoAtualizar, ProjetoResponse
+from models.projeto import (
+    ProjetoCriar,
+    ProjetoAtualizar,
+    ProjetoResponse,
+    ProjetoResumoResponse,
+)
+from utils.cache import cache_resultados
+from utils.lote_restrito import CalculadoraLoteEconomicoRestrito
+from services.acesso import cache_acesso
+from utils.paginacao import (
+    LIMITE_PADRAO_PAGINA,
+    ColunaOrdenacao,
+    Pagina,
+    codificar_cursor,
+    condicao_keyset,
+    decodificar_cursor,
+    escapar_prefixo_like,
+    ordenacao_keyset,
+)
 import psycopg2.extras
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+# Colunas aceitas na ordenação da listagem de projetos
+ORDENACOES_PROJETO = {
+    "data_criacao": ColunaOrdenacao("data_criacao"),
+    "nome_grupo": ColunaOrdenacao("nome_grupo"),
+}
 
 
 class ProjetoService:
@@ -26,62 +50,113 @@ class ProjetoService:
         Returns:
             Dados do projeto criado.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-        try:
-            cursor.execute(
-                """
-                INSERT INTO projeto (id_usuario, nome_grupo, descricao)
-                VALUES (%s, %s, %s)
-                RETURNING id_grupo, id_usuario, nome_grupo, descricao, data_criacao
-                """,
-                (id_usuario, projeto.nome_grupo, projeto.descricao),
-            )
-
-            result = cursor.fetchone()
-            conn.commit()
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO projeto (id_usuario, nome_grupo, descricao)
+                    VALUES (%s, %s, %s)
+                    RETURNING id_grupo, id_usuario, nome_grupo, descricao, data_criacao
+                    """,
+                    (id_usuario, projeto.nome_grupo, projeto.descricao),
+                )
 
-            return ProjetoResponse(
-                id_grupo=result["id_grupo"],
-                id_usuario=result["id_usuario"],
-                nome_grupo=result["nome_grupo"],
-                descricao=result["descricao"],
-                data_criacao=str(result["data_criacao"]),
-            )
-        except Exception as e:
-            conn.rollback()
-            raise Exception(f"Erro ao criar projeto: {str(e)}")
-        finally:
-            cursor.close()
+                result = cursor.fetchone()
+                conn.commit()
 
-    def listar_projetos_usuario(self, id_usuario: int) -> List[ProjetoResponse]:
+                return ProjetoResponse(
+                    id_grupo=result["id_grupo"],
+                    id_usuario=result["id_usuario"],
+                    nome_grupo=result["nome_grupo"],
+                    descricao=result["descricao"],
+                    data_criacao=str(result["data_criacao"]),
+                )
+            except Exception as e:
+                conn.rollback()
+                raise Exception(f"Erro ao criar projeto: {str(e)}")
+            finally:
+                cursor.close()
+
+    def listar_projetos_usuario(
+        self,
+        id_usuario: int,
+        limite: int = LIMITE_PADRAO_PAGINA,
+        cursor_pagina: Optional[str] = None,
+        nome_prefixo: Optional[str] = None,
+        ordenar_por: str = "data_criacao",
+        ordem: str = "desc",
+    ) -> Pagina:
         """
-        Lista todos os projetos de um usuário.
+        Lista uma página dos projetos de um usuário.
 
         Args:
             id_usuario: ID do usuário.
+            limite: Quantidade máxima de projetos na página.
+            cursor_pagina: proximo_cursor da página anterior.
+            nome_prefixo: Filtra projetos cujo nome começa com o texto.
+            ordenar_por: Coluna de ordenação (data_criacao ou nome_grupo).
+            ordem: "asc" ou "desc".
 
         Returns:
-            Lista de projetos do usuário.
-        """
-        conn = self.db.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            Pagina com os projetos e o cursor da próxima página (None na última).
 
-        try:
-            cursor.execute(
-                """
-                SELECT id_grupo, id_usuario, nome_grupo, descricao, data_criacao
-                FROM projeto
-                WHERE id_usuario = %s
-                ORDER BY data_criacao DESC
-                """,
-                (id_usuario,),
+        Raises:
+            ValueError: Se a ordenação ou o cursor forem inválidos.
+        """
+        coluna = ORDENACOES_PROJETO.get(ordenar_por)
+        if coluna is None or ordem not in ("asc", "desc"):
+            raise ValueError(f"Ordenação inválida: {ordenar_por} {ordem}")
+
+        condicoes = ["id_usuario = %s"]
+        parametros: List[Any] = [id_usuario]
+
+        if nome_prefixo:
+            condicoes.append("nome_grupo LIKE %s")
+            parametros.append(escapar_prefixo_like(nome_prefixo))
+        if cursor_pagina:
+            valor, id_item = decodificar_cursor(cursor_pagina, ordenar_por, ordem)
+            condicao, valores = condicao_keyset(
+                coluna, "id_grupo", ordem, valor, id_item
             )
+            condicoes.append(condicao)
+            parametros.extend(valores)
+
+        # Um item a mais indica se existe próxima página
+        parametros.append(limite + 1)
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(
+                    f"""
+                    SELECT id_grupo, id_usuario, nome_grupo, descricao, data_criacao
+                    FROM projeto
+                    WHERE {" AND ".join(condicoes)}
+                    ORDER BY {ordenacao_keyset(coluna, "id_grupo", ordem)}
+                    LIMIT %s
+                    """,
+                    parametros,
+                )
 
-            projetos = cursor.fetchall()
+                projetos = cursor.fetchall()
+            except Exception as e:
+                raise Exception(f"Erro ao listar projetos: {str(e)}")
+            finally:
+                cursor.close()
+
+        proximo_cursor = None
+        if len(projetos) > limite:
+            projetos = projetos[:limite]
+            ultimo = projetos[-1]
+            proximo_cursor = codificar_cursor(
+                ordenar_por, ordem, ultimo[ordenar_por], ultimo["id_grupo"]
+            )
 
-            return [
+        return Pagina(
+            itens=[
                 ProjetoResponse(
                     id_grupo=p["id_grupo"],
                     id_usuario=p["id_usuario"],
@@ -90,11 +165,9 @@ class ProjetoService:
                     data_criacao=str(p["data_criacao"]),
                 )
                 for p in projetos
-            ]
-        except Exception as e:
-            raise Exception(f"Erro ao listar projetos: {str(e)}")
-        finally:
-            cursor.close()
+            ],
+            proximo_cursor=proximo_cursor,
+        )
 
     def obter_projeto(
         self, id_grupo: int, id_usuario: int
@@ -109,35 +182,37 @@ class ProjetoService:
         Returns:
             Dados do projeto ou None se não encontrado.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(
+                    """
+                    SELECT id_grupo, id_usuario, nome_grupo, descricao, data_criacao
+                    FROM projeto
+                    WHERE id_grupo = %s AND id_usuario = %s
+                    """,
+                    (id_grupo, id_usuario),
+                )
 
-        try:
-            cursor.execute(
-                """
-                SELECT id_grupo, id_usuario, nome_grupo, descricao, data_criacao
-                FROM projeto
-                WHERE id_grupo = %s AND id_usuario = %s
-                """,
-                (id_grupo, id_usuario),
-            )
+                projeto = cursor.fetchone()
 
-            projeto = cursor.fetchone()
+                if not projeto:
+                    return None
 
-            if not projeto:
-                return None
+                cache_acesso.registrar(id_usuario, id_grupo)
 
-            return ProjetoResponse(
-                id_grupo=projeto["id_grupo"],
-                id_usuario=projeto["id_usuario"],
-                nome_grupo=projeto["nome_grupo"],
-                descricao=projeto["descricao"],
-                data_criacao=str(projeto["data_criacao"]),
-            )
-        except Exception as e:
-            raise Exception(f"Erro ao obter projeto: {str(e)}")
-        finally:
-            cursor.close()
+                return ProjetoResponse(
+                    id_grupo=projeto["id_grupo"],
+                    id_usuario=projeto["id_usuario"],
+                    nome_grupo=projeto["nome_grupo"],
+                    descricao=projeto["descricao"],
+                    data_criacao=str(projeto["data_criacao"]),
+                )
+            except Exception as e:
+                raise Exception(f"Erro ao obter projeto: {str(e)}")
+            finally:
+                cursor.close()
 
     def atualizar_projeto(
         self, id_grupo: int, id_usuario: int, dados: ProjetoAtualizar
@@ -153,54 +228,54 @@ class ProjetoService:
         Returns:
             Dados do projeto atualizado ou None se não encontrado.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
-        try:
-            # Monta a query dinamicamente apenas com campos fornecidos
-            campos_atualizacao = []
-            valores = []
+            try:
+                # Monta a query dinamicamente apenas com campos fornecidos
+                campos_atualizacao = []
+                valores = []
 
-            if dados.nome_grupo is not None:
-                campos_atualizacao.append("nome_grupo = %s")
-                valores.append(dados.nome_grupo)
+                if dados.nome_grupo is not None:
+                    campos_atualizacao.append("nome_grupo = %s")
+                    valores.append(dados.nome_grupo)
 
-            if dados.descricao is not None:
-                campos_atualizacao.append("descricao = %s")
-                valores.append(dados.descricao)
+                if dados.descricao is not None:
+                    campos_atualizacao.append("descricao = %s")
+                    valores.append(dados.descricao)
 
-            if not campos_atualizacao:
-                # Nenhum campo para atualizar
-                return self.obter_projeto(id_grupo, id_usuario)
+                if not campos_atualizacao:
+                    # Nenhum campo para atualizar
+                    return self.obter_projeto(id_grupo, id_usuario)
 
-            valores.extend([id_grupo, id_usuario])
+                valores.extend([id_grupo, id_usuario])
 
-            query = f"""
-                UPDATE projeto
-                SET {', '.join(campos_atualizacao)}
-                WHERE id_grupo = %s AND id_usuario = %s
-                RETURNING id_grupo, id_usuario, nome_grupo, descricao, data_criacao
-            """
+                query = f"""
+                    UPDATE projeto
+                    SET {', '.join(campos_atualizacao)}
+                    WHERE id_grupo = %s AND id_usuario = %s
+                    RETURNING id_grupo, id_usuario, nome_grupo, descricao, data_criacao
+                """
 
-            cursor.execute(query, valores)
-            result = cursor.fetchone()
-            conn.commit()
+                cursor.execute(query, valores)
+                result = cursor.fetchone()
+                conn.commit()
 
-            if not result:
-                return None
+                if not result:
+                    return None
 
-            return ProjetoResponse(
-                id_grupo=result["id_grupo"],
-                id_usuario=result["id_usuario"],
-                nome_grupo=result["nome_grupo"],
-                descricao=result["descricao"],
-                data_criacao=str(result["data_criacao"]),
-            )
-        except Exception as e:
-            conn.rollback()
-            raise Exception(f"Erro ao atualizar projeto: {str(e)}")
-        finally:
-            cursor.close()
+                return ProjetoResponse(
+                    id_grupo=result["id_grupo"],
+                    id_usuario=result["id_usuario"],
+                    nome_grupo=result["nome_grupo"],
+                    descricao=result["descricao"],
+                    data_criacao=str(result["data_criacao"]),
+                )
+            except Exception as e:
+                conn.rollback()
+                raise Exception(f"Erro ao atualizar projeto: {str(e)}")
+            finally:
+                cursor.close()
 
     def deletar_projeto(self, id_grupo: int, id_usuario: int) -> bool:
         """
@@ -213,25 +288,302 @@ class ProjetoService:
         Returns:
             True se deletado, False se não encontrado.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    """
+                    DELETE FROM projeto
+                    WHERE id_grupo = %s AND id_usuario = %s
+                    """,
+                    (id_grupo, id_usuario),
+                )
 
-        try:
-            cursor.execute(
-                """
-                DELETE FROM projeto
-                WHERE id_grupo = %s AND id_usuario = %s
-                """,
-                (id_grupo, id_usuario),
+                conn.commit()
+                if cursor.rowcount > 0:
+                    # As simulações do projeto são removidas em cascata
+                    cache_resultados.invalidar(f"projeto:{id_grupo}")
+                    cache_acesso.invalidar_projeto(id_grupo)
+                return cursor.rowcount > 0
+            except Exception as e:
+                conn.rollback()
+                raise Exception(f"Erro ao deletar projeto: {str(e)}")
+            finally:
+                cursor.close()
+
+    def obter_resumo(
+        self, id_grupo: int, id_usuario: int
+    ) -> Optional[ProjetoResumoResponse]:
+        """
+        Obtém os totais das simulações de um projeto do usuário.
+
+        Os totais são lidos da tabela projeto_resumo, mantida pelos
+        triggers da tabela simulacoes, sem percorrer as simulações.
+
+        Args:
+            id_grupo: ID do projeto.
+            id_usuario: ID do usuário (para validar propriedade).
+
+        Returns:
+            Totais do projeto ou None se não encontrado.
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(
+                    """
+                    SELECT p.id_grupo,
+                           COALESCE(r.quantidade_produtos, 0) AS quantidade_produtos,
+                           COALESCE(r.soma_custo_total_atual, 0) AS soma_custo_total_atual,
+                           COALESCE(r.soma_custo_total_otimo, 0) AS soma_custo_total_otimo,
+                           COALESCE(r.soma_economia_anual, 0) AS soma_economia_anual,
+                           r.atualizado_em
+                    FROM projeto p
+                    LEFT JOIN projeto_resumo r ON r.id_projeto = p.id_grupo
+                    WHERE p.id_grupo = %s AND p.id_usuario = %s
+                    """,
+                    (id_grupo, id_usuario),
+                )
+
+                resumo = cursor.fetchone()
+
+                if not resumo:
+                    return None
+
+                cache_acesso.registrar(id_usuario, id_grupo)
+
+                return ProjetoResumoResponse(
+                    id_projeto=resumo["id_grupo"],
+                    quantidade_produtos=resumo["quantidade_produtos"],
+                    soma_custo_total_atual=resumo["soma_custo_total_atual"],
+                    soma_custo_total_otimo=resumo["soma_custo_total_otimo"],
+                    soma_economia_anual=resumo["soma_economia_anual"],
+                    atualizado_em=resumo["atualizado_em"],
+                )
+            except Exception as e:
+                raise Exception(f"Erro ao obter resumo do projeto: {str(e)}")
+            finally:
+                cursor.close()
+
+    def otimizar_lotes(
+        self,
+        id_grupo: int,
+        id_usuario: int,
+        capacidade: Optional[float] = None,
+        orcamento: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Calcula os lotes de todas as simulações do projeto respeitando uma
+        capacidade (soma de volume_unitario * lote) e/ou um orçamento
+        (soma de custo_unitario * lote) globais, sem gravar nada.
+
+        Sem custo_unitario, o preço da primeira faixa de desconto da
+        simulação é usado no orçamento. Os lotes seguem o modelo de custo
+        de cada simulação (sem o custo de compra dos descontos).
+
+        Args:
+            id_grupo: ID do projeto.
+            id_usuario: ID do usuário (para validar propriedade).
+            capacidade: Capacidade total (opcional).
+            orcamento: Orçamento total (opcional).
+
+        Returns:
+            Resultado da otimização ou None se o projeto não for encontrado.
+
+        Raises:
+            ValueError: Se nenhum limite for informado, faltarem volumes
+                ou custos unitários ou um modelo de custo não for suportado.
+        """
+        if capacidade is None and orcamento is None:
+            raise ValueError("Informe a capacidade e/ou o orçamento")
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    """
+                    SELECT s.id, s.nome_produto, s.demanda_anual::float8,
+                           s.custo_pedido::float8, s.custo_manutencao::float8,
+                           s.volume_unitario::float8,
+                           COALESCE(
+                               s.custo_unitario,
+                               (s.faixas_desconto -> 0 ->> 'preco_unitario')::numeric
+                           )::float8,
+                           s.modelo, s.taxa_producao::float8,
+                           s.custo_falta_anual::float8
+                    FROM projeto p
+                    LEFT JOIN simulacoes s ON s.id_projeto = p.id_grupo
+                    WHERE p.id_grupo = %s AND p.id_usuario = %s
+                    ORDER BY s.id
+                    """,
+                    (id_grupo, id_usuario),
+                )
+                linhas = cursor.fetchall()
+            except Exception as e:
+                raise Exception(f"Erro ao otimizar lotes do projeto: {str(e)}")
+            finally:
+                cursor.close()
+
+        if not linhas:
+            return None
+
+        cache_acesso.registrar(id_usuario, id_grupo)
+        # Projeto sem simulações: uma única linha com as colunas nulas
+        linhas = [linha for linha in linhas if linha[0] is not None]
+
+        resultado = {
+            "id_projeto": id_grupo,
+            "quantidade_itens": len(linhas),
+            "capacidade": capacidade,
+            "orcamento": orcamento,
+            "uso_capacidade": None,
+            "uso_orcamento": None,
+            "multiplicador_capacidade": None,
+            "multiplicador_orcamento": None,
+            "custo_total_irrestrito": 0.0,
+            "custo_total_restrito": 0.0,
+            "itens": [],
+        }
+        if not linhas:
+            return resultado
+
+        (
+            ids,
+            nomes,
+            demanda,
+            pedido,
+            manutencao,
+            volume,
+            custo,
+            modelo,
+            taxa_producao,
+            custo_falta_anual,
+        ) = zip(*linhas)
+        calculadora = CalculadoraLoteEconomicoRestrito(
+            demanda_anual=demanda,
+            custo_pedido=pedido,
+            custo_manutencao=manutencao,
+            volume_unitario=volume,
+            custo_unitario=custo,
+            modelo=modelo,
+            parametros_modelo={
+                "taxa_producao": taxa_producao,
+                "custo_falta_anual": custo_falta_anual,
+            },
+        )
+        otimizacao = calculadora.otimizar(capacidade, orcamento)
+
+        for chave in (
+            "uso_capacidade",
+            "uso_orcamento",
+            "multiplicador_capacidade",
+            "multiplicador_orcamento",
+        ):
+            if otimizacao[chave] is not None:
+                resultado[chave] = round(otimizacao[chave], 6)
+        resultado["custo_total_irrestrito"] = round(
+            float(otimizacao["custo_total_irrestrito"].sum()), 2
+        )
+        resultado["custo_total_restrito"] = round(
+            float(otimizacao["custo_total_restrito"].sum()), 2
+        )
+        resultado["itens"] = [
+            {
+                "id_simulacao": id_simulacao,
+                "nome_produto": nome,
+                "lote_otimo": lote_otimo,
+                "lote_restrito": lote_restrito,
+                "custo_total_otimo": custo_otimo,
+                "custo_total_restrito": custo_restrito,
+            }
+            for id_simulacao, nome, lote_otimo, lote_restrito, custo_otimo, custo_restrito in zip(
+                ids,
+                nomes,
+                otimizacao["lote_irrestrito"].tolist(),
+                otimizacao["lote_restrito"].tolist(),
+                otimizacao["custo_total_irrestrito"].tolist(),
+                otimizacao["custo_total_restrito"].tolist(),
             )
+        ]
+
+        return resultado
+
+    def reconciliar_resumos(self, id_grupo: Optional[int] = None) -> List[int]:
+        """
+        Recalcula projeto_resumo a partir das simulações e corrige as
+        linhas divergentes.
+
+        A tabela fica bloqueada para escrita durante a reconstrução, de modo
+        que alterações concorrentes nas simulações são aplicadas depois
+        sobre os totais já corrigidos.
+
+        Args:
+            id_grupo: Reconcilia apenas este projeto (todos se None).
+
+        Returns:
+            IDs dos projetos cujos totais foram corrigidos.
+        """
+        filtro = "WHERE p.id_grupo = %s" if id_grupo is not None else ""
+        parametros = (id_grupo,) if id_grupo is not None else ()
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute("LOCK TABLE projeto_resumo IN SHARE ROW EXCLUSIVE MODE")
+                cursor.execute(
+                    f"""
+                    WITH calculado AS (
+                        SELECT p.id_grupo AS id_projeto,
+                               COUNT(s.id) AS quantidade_produtos,
+                               COALESCE(SUM(s.custo_total_atual), 0)
+                                   AS soma_custo_total_atual,
+                               COALESCE(SUM(s.custo_total_otimo), 0)
+                                   AS soma_custo_total_otimo,
+                               COALESCE(SUM(s.economia_anual), 0)
+                                   AS soma_economia_anual
+                        FROM projeto p
+                        LEFT JOIN simulacoes s ON s.id_projeto = p.id_grupo
+                        {filtro}
+                        GROUP BY p.id_grupo
+                    )
+                    INSERT INTO projeto_resumo AS r (
+                        id_projeto, quantidade_produtos, soma_custo_total_atual,
+                        soma_custo_total_otimo, soma_economia_anual
+                    )
+                    SELECT c.*
+                    FROM calculado c
+                    LEFT JOIN projeto_resumo atual USING (id_projeto)
+                    WHERE (
+                        atual.quantidade_produtos, atual.soma_custo_total_atual,
+                        atual.soma_custo_total_otimo, atual.soma_economia_anual
+                    ) IS DISTINCT FROM (
+                        c.quantidade_produtos, c.soma_custo_total_atual,
+                        c.soma_custo_total_otimo, c.soma_economia_anual
+                    )
+                    ON CONFLICT (id_projeto) DO UPDATE
+                    SET quantidade_produtos = EXCLUDED.quantidade_produtos,
+                        soma_custo_total_atual = EXCLUDED.soma_custo_total_atual,
+                        soma_custo_total_otimo = EXCLUDED.soma_custo_total_otimo,
+                        soma_economia_anual = EXCLUDED.soma_economia_anual,
+                        atualizado_em = NOW()
+                    RETURNING r.id_projeto
+                    """,
+                    parametros,
+                )
+
+                corrigidos = [linha[0] for linha in cursor.fetchall()]
+                conn.commit()
 
-            conn.commit()
-            return cursor.rowcount > 0
-        except Exception as e:
-            conn.rollback()
-            raise Exception(f"Erro ao deletar projeto: {str(e)}")
-        finally:
-            cursor.close()
+                return corrigidos
+            except Exception as e:
+                conn.rollback()
+                raise Exception(f"Erro ao reconciliar resumos: {str(e)}")
+            finally:
+                cursor.close()
 
     def close(self):
         """
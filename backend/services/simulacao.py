@@ -1,7 +1,91 @@
 from Connections.postgre import postgreConnection
-from models.simulacao import SimulacaoCriar, SimulacaoAtualizar, SimulacaoResponse
-from utils.lote_economico import CalculadoraLoteEconomico
-from typing import List, Optional, Dict, Any
+from models.simulacao import (
+    SimulacaoBase,
+    SimulacaoCriar,
+    SimulacaoAtualizar,
+    SimulacaoResponse,
+    SimulacaoLoteItemResponse,
+    SimulacaoLoteResponse,
+    ErroImportacaoLinha,
+    ImportacaoCsvResponse,
+    SimulacaoEstocasticaRequest,
+)
+from utils.lote_economico import (
+    CalculadoraLoteEconomico,
+    CalculadoraLoteEconomicoLote,
+    CalculadoraLoteEconomicoDesconto,
+    DESCONTO_TODAS_UNIDADES,
+    ESCALA_ADAPTATIVA,
+    ESCALA_LINEAR,
+    LIMITE_PONTOS_GRAFICO,
+)
+from utils.modelos_custo import MODELO_LEC, obter_modelo, parametros_modelos
+from utils.sensibilidade import AnaliseSensibilidade
+from utils.estoque_estocastico import SimuladorEstoqueEstocastico
+from utils.cache import cache_resultados, tags_simulacao
+from utils.pool_calculo import pool_calculo
+from utils.lote_sql import (
+    COLUNAS_ORIGEM,
+    comando_recalculo,
+    consulta_analise,
+    simulacoes_aleatorias,
+)
+from utils.paginacao import (
+    LIMITE_PADRAO_PAGINA,
+    ColunaOrdenacao,
+    Pagina,
+    codificar_cursor,
+    condicao_keyset,
+    decodificar_cursor,
+    escapar_prefixo_like,
+    ordenacao_keyset,
+)
+from services.acesso import (
+    ProjetoNaoEncontradoError,
+    cache_acesso,
+    levantar_se_sem_acesso,
+    verificar_acesso_projeto,
+)
+from pydantic import ValidationError
+import csv
+import io
+import json
+import time
+import numpy as np
+import psycopg2.extras
+from decimal import Decimal, ROUND_HALF_UP
+from functools import partial
+from typing import List, Optional, Dict, Any, BinaryIO, Iterator, Tuple
+
+# Colunas esperadas no CSV de importação (mesmos campos de SimulacaoBase)
+COLUNAS_IMPORTACAO = (
+    "nome_produto",
+    "demanda_anual",
+    "custo_pedido",
+    "custo_manutencao",
+    "lote_atual_empresa",
+    "volume_unitario",
+    "custo_unitario",
+    "modelo",
+    "taxa_producao",
+    "custo_falta_anual",
+)
+COLUNAS_OBRIGATORIAS_IMPORTACAO = COLUNAS_IMPORTACAO[:4]
+# Colunas de texto (as demais são numéricas)
+COLUNAS_TEXTO_IMPORTACAO = ("nome_produto", "modelo")
+
+# Limite de erros detalhados na resposta da importação
+MAX_ERROS_IMPORTACAO = 1000
+
+# Linhas buscadas por ida ao banco (e agrupadas por pedaço) na exportação
+TAMANHO_LOTE_EXPORTACAO = 2000
+
+# Colunas aceitas na ordenação das listagens de simulações
+ORDENACOES_SIMULACAO = {
+    "data_simulacao": ColunaOrdenacao("s.data_simulacao"),
+    "nome_produto": ColunaOrdenacao("s.nome_produto"),
+    "economia_anual": ColunaOrdenacao("s.economia_anual", anulavel=True),
+}
 
 
 class SimulacaoService:
@@ -11,40 +95,340 @@ class SimulacaoService:
 
     def __init__(self):
         self.db = postgreConnection()
+        self.cache = cache_resultados
 
     def criar_simulacao(
-        self, simulacao: SimulacaoCriar, id_projeto: int
+        self, simulacao: SimulacaoCriar, id_projeto: int, id_usuario: int
     ) -> SimulacaoResponse:
         """
         Cria uma nova simulação usando SymPy para cálculos matemáticos.
+        A propriedade do projeto é verificada no próprio INSERT.
+
+        Raises:
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                # Apenas os valores numéricos da análise são persistidos
+                analise = self._analisar(simulacao)
+                faixas, tipo_desconto = _normalizar_desconto(
+                    simulacao.faixas_desconto, simulacao.tipo_desconto
+                )
+
+                query = """
+                    INSERT INTO simulacoes (
+                        id_projeto, nome_produto, demanda_anual, custo_pedido,
+                        custo_manutencao, lote_atual_empresa, lote_otimo_calculado,
+                        custo_total_atual, custo_total_otimo, economia_anual,
+                        faixas_desconto, tipo_desconto, volume_unitario,
+                        custo_unitario, modelo, taxa_producao, custo_falta_anual
+                    )
+                    SELECT id_grupo, %s, %s::numeric, %s::numeric,
+                           %s::numeric, %s::numeric, %s::numeric,
+                           %s::numeric, %s::numeric, %s::numeric,
+                           %s::jsonb, %s, %s::numeric, %s::numeric,
+                           %s, %s::numeric, %s::numeric
+                    FROM projeto
+                    WHERE id_grupo = %s AND id_usuario = %s
+                    RETURNING id, data_simulacao
+                """
+
+                cursor.execute(
+                    query,
+                    (
+                        simulacao.nome_produto,
+                        simulacao.demanda_anual,
+                        simulacao.custo_pedido,
+                        simulacao.custo_manutencao,
+                        analise["lote_atual_empresa"],
+                        analise["lote_otimo_calculado"],
+                        analise["custo_total_atual"],
+                        analise["custo_total_otimo"],
+                        analise["economia_anual"],
+                        _json_ou_nulo(faixas),
+                        tipo_desconto,
+                        simulacao.volume_unitario,
+                        simulacao.custo_unitario,
+                        simulacao.modelo,
+                        simulacao.taxa_producao,
+                        simulacao.custo_falta_anual,
+                        id_projeto,
+                        id_usuario,
+                    ),
+                )
+
+                result = cursor.fetchone()
+                if not result:
+                    # Nada foi inserido: descobre se o projeto não existe
+                    # ou se pertence a outro usuário
+                    cache_acesso.invalidar_projeto(id_projeto)
+                    verificar_acesso_projeto(cursor, id_projeto, id_usuario)
+                    raise ProjetoNaoEncontradoError(id_projeto)
+
+                conn.commit()
+                cache_acesso.registrar(id_usuario, id_projeto)
+
+                return SimulacaoResponse(
+                    id=result[0],
+                    id_projeto=id_projeto,
+                    nome_produto=simulacao.nome_produto,
+                    demanda_anual=simulacao.demanda_anual,
+                    custo_pedido=simulacao.custo_pedido,
+                    custo_manutencao=simulacao.custo_manutencao,
+                    lote_atual_empresa=analise["lote_atual_empresa"],
+                    lote_otimo_calculado=analise["lote_otimo_calculado"],
+                    custo_total_atual=analise["custo_total_atual"],
+                    custo_total_otimo=analise["custo_total_otimo"],
+                    economia_anual=analise["economia_anual"],
+                    faixas_desconto=faixas,
+                    tipo_desconto=tipo_desconto,
+                    volume_unitario=simulacao.volume_unitario,
+                    custo_unitario=simulacao.custo_unitario,
+                    modelo=simulacao.modelo,
+                    taxa_producao=simulacao.taxa_producao,
+                    custo_falta_anual=simulacao.custo_falta_anual,
+                    data_simulacao=result[1],
+                )
+
+            finally:
+                cursor.close()
+
+    def criar_simulacoes_lote(
+        self, simulacoes: List[SimulacaoCriar], id_projeto: int, id_usuario: int
+    ) -> SimulacaoLoteResponse:
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        Cria várias simulações em uma única transação.
+        Os cálculos são vetorizados e as linhas são gravadas com INSERT
+        de múltiplas linhas (execute_values).
 
-        try:
-            # Cria calculadora com SymPy
-            calculadora = CalculadoraLoteEconomico(
-                demanda_anual=simulacao.demanda_anual,
-                custo_pedido=simulacao.custo_pedido,
-                custo_manutencao=simulacao.custo_manutencao,
-                lote_atual=simulacao.lote_atual_empresa,
+        Raises:
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
+        """
+        analises = self._analisar_lote(simulacoes)
+        descontos = [
+            _normalizar_desconto(s.faixas_desconto, s.tipo_desconto) for s in simulacoes
+        ]
+
+        valores = [
+            (
+                id_projeto,
+                simulacao.nome_produto,
+                simulacao.demanda_anual,
+                simulacao.custo_pedido,
+                simulacao.custo_manutencao,
+                analise["lote_atual_empresa"],
+                analise["lote_otimo_calculado"],
+                analise["custo_total_atual"],
+                analise["custo_total_otimo"],
+                analise["economia_anual"],
+                _json_ou_nulo(faixas),
+                tipo_desconto,
+                simulacao.volume_unitario,
+                simulacao.custo_unitario,
+                simulacao.modelo,
+                simulacao.taxa_producao,
+                simulacao.custo_falta_anual,
+            )
+            for simulacao, analise, (faixas, tipo_desconto) in zip(
+                simulacoes, analises, descontos
             )
+        ]
 
-            # Gera análise completa usando SymPy
-            analise = calculadora.gerar_analise_completa()
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
 
-            query = """
-                INSERT INTO simulacoes (
-                    id_projeto, nome_produto, demanda_anual, custo_pedido,
-                    custo_manutencao, lote_atual_empresa, lote_otimo_calculado,
-                    custo_total_atual, custo_total_otimo, economia_anual
+            try:
+                verificar_acesso_projeto(cursor, id_projeto, id_usuario)
+
+                query = """
+                    INSERT INTO simulacoes (
+                        id_projeto, nome_produto, demanda_anual, custo_pedido,
+                        custo_manutencao, lote_atual_empresa, lote_otimo_calculado,
+                        custo_total_atual, custo_total_otimo, economia_anual,
+                        faixas_desconto, tipo_desconto, volume_unitario,
+                        custo_unitario, modelo, taxa_producao, custo_falta_anual
+                    )
+                    VALUES %s
+                    RETURNING id, data_simulacao
+                """
+
+                resultados = psycopg2.extras.execute_values(
+                    cursor, query, valores, page_size=1000, fetch=True
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id, data_simulacao
-            """
+                conn.commit()
 
-            cursor.execute(
-                query,
+                return SimulacaoLoteResponse(
+                    total=len(resultados),
+                    simulacoes=[
+                        SimulacaoLoteItemResponse(id=r[0], data_simulacao=r[1])
+                        for r in resultados
+                    ],
+                )
+
+            except Exception:
+                conn.rollback()
+                raise
+
+            finally:
+                cursor.close()
+
+    def importar_csv(
+        self,
+        arquivo: BinaryIO,
+        id_projeto: int,
+        id_usuario: int,
+        tamanho_bloco: int = 5000,
+    ) -> ImportacaoCsvResponse:
+        """
+        Importa um catálogo de produtos em CSV para o projeto.
+
+        O arquivo é lido em blocos de linhas: cada bloco é validado,
+        calculado de forma vetorizada e enviado ao banco com COPY FROM STDIN,
+        de modo que a memória usada não depende do tamanho do arquivo.
+        Linhas inválidas são ignoradas e relatadas ao final.
+
+        Raises:
+            ValueError: Se o cabeçalho não tiver as colunas obrigatórias.
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
+        """
+        inicio = time.perf_counter()
+        texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+
+        cabecalho = texto.readline()
+        delimitador = ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+        colunas = []
+        if cabecalho:
+            colunas = [
+                c.strip().lower()
+                for c in next(csv.reader([cabecalho], delimiter=delimitador))
+            ]
+
+        faltantes = [c for c in COLUNAS_OBRIGATORIAS_IMPORTACAO if c not in colunas]
+        if faltantes:
+            raise ValueError(
+                f"Colunas obrigatórias ausentes no arquivo: {', '.join(faltantes)}"
+            )
+
+        indices = {c: colunas.index(c) for c in COLUNAS_IMPORTACAO if c in colunas}
+        leitor = csv.reader(texto, delimiter=delimitador)
+
+        total_linhas = 0
+        importadas = 0
+        com_erro = 0
+        erros: List[ErroImportacaoLinha] = []
+        bloco: List[SimulacaoCriar] = []
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                verificar_acesso_projeto(cursor, id_projeto, id_usuario)
+
+                # A linha 1 é o cabeçalho
+                for numero_linha, linha in enumerate(leitor, start=2):
+                    if not any(campo.strip() for campo in linha):
+                        continue
+
+                    total_linhas += 1
+                    try:
+                        bloco.append(
+                            self._ler_linha_importacao(linha, indices, delimitador)
+                        )
+                    except (ValidationError, ValueError, IndexError) as e:
+                        com_erro += 1
+                        if len(erros) < MAX_ERROS_IMPORTACAO:
+                            erros.append(
+                                ErroImportacaoLinha(
+                                    linha=numero_linha, erro=self._resumir_erro(e)
+                                )
+                            )
+                        continue
+
+                    if len(bloco) >= tamanho_bloco:
+                        importadas += self._copiar_bloco(cursor, bloco, id_projeto)
+                        bloco = []
+
+                if bloco:
+                    importadas += self._copiar_bloco(cursor, bloco, id_projeto)
+
+                conn.commit()
+
+            except Exception:
+                conn.rollback()
+                raise
+
+            finally:
+                cursor.close()
+                texto.detach()
+
+            duracao = time.perf_counter() - inicio
+
+            return ImportacaoCsvResponse(
+                total_linhas=total_linhas,
+                importadas=importadas,
+                com_erro=com_erro,
+                erros=erros,
+                duracao_segundos=round(duracao, 3),
+                linhas_por_segundo=round(total_linhas / duracao, 2) if duracao else 0.0,
+            )
+
+    def _ler_linha_importacao(
+        self, linha: List[str], indices: Dict[str, int], delimitador: str
+    ) -> SimulacaoCriar:
+        """
+        Converte uma linha do CSV em SimulacaoCriar, aplicando as validações
+        do modelo e do modelo de custo. Com delimitador ";" aceita vírgula
+        como separador decimal.
+        """
+        valores: Dict[str, Any] = {}
+        for coluna, indice in indices.items():
+            valor = linha[indice].strip() if indice < len(linha) else ""
+            if coluna != "nome_produto":
+                if not valor:
+                    # Coluna vazia: usa o padrão do campo
+                    continue
+                if (
+                    coluna not in COLUNAS_TEXTO_IMPORTACAO
+                    and delimitador == ";"
+                    and "," in valor
+                ):
+                    valor = valor.replace(".", "").replace(",", ".")
+            valores[coluna] = valor
+
+        simulacao = SimulacaoCriar(**valores)
+        _validar_modelo(simulacao)
+        return simulacao
+
+    def _resumir_erro(self, erro: Exception) -> str:
+        """
+        Gera uma mensagem curta para o erro de uma linha importada.
+        """
+        if isinstance(erro, ValidationError):
+            return "; ".join(
+                f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}"
+                for e in erro.errors()
+            )
+        if isinstance(erro, IndexError):
+            return "Linha com número de colunas insuficiente"
+        return str(erro)
+
+    def _copiar_bloco(
+        self, cursor, bloco: List[SimulacaoCriar], id_projeto: int
+    ) -> int:
+        """
+        Calcula um bloco de simulações e grava via COPY FROM STDIN.
+
+        Returns:
+            Quantidade de linhas gravadas.
+        """
+        analises = self._calculadora_lote(bloco).gerar_registros()
+
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for simulacao, analise in zip(bloco, analises):
+            escritor.writerow(
                 (
                     id_projeto,
                     simulacao.nome_produto,
@@ -56,275 +440,837 @@ class SimulacaoService:
                     analise["custo_total_atual"],
                     analise["custo_total_otimo"],
                     analise["economia_anual"],
-                ),
+                    simulacao.volume_unitario,
+                    simulacao.custo_unitario,
+                    simulacao.modelo,
+                    simulacao.taxa_producao,
+                    simulacao.custo_falta_anual,
+                )
             )
+        buffer.seek(0)
 
-            result = cursor.fetchone()
-            conn.commit()
-
-            return SimulacaoResponse(
-                id=result[0],
-                id_projeto=id_projeto,
-                nome_produto=simulacao.nome_produto,
-                demanda_anual=simulacao.demanda_anual,
-                custo_pedido=simulacao.custo_pedido,
-                custo_manutencao=simulacao.custo_manutencao,
-                lote_atual_empresa=analise["lote_atual_empresa"],
-                lote_otimo_calculado=analise["lote_otimo_calculado"],
-                custo_total_atual=analise["custo_total_atual"],
-                custo_total_otimo=analise["custo_total_otimo"],
-                economia_anual=analise["economia_anual"],
-                data_simulacao=result[1],
+        cursor.copy_expert(
+            """
+            COPY simulacoes (
+                id_projeto, nome_produto, demanda_anual, custo_pedido,
+                custo_manutencao, lote_atual_empresa, lote_otimo_calculado,
+                custo_total_atual, custo_total_otimo, economia_anual,
+                volume_unitario, custo_unitario, modelo, taxa_producao,
+                custo_falta_anual
             )
+            FROM STDIN WITH (FORMAT csv)
+            """,
+            buffer,
+        )
 
-        finally:
-            cursor.close()
+        return len(bloco)
 
-    def listar_simulacoes_projeto(self, id_projeto: int) -> List[SimulacaoResponse]:
+    def listar_simulacoes_projeto(
+        self,
+        id_projeto: int,
+        id_usuario: int,
+        limite: int = LIMITE_PADRAO_PAGINA,
+        cursor_pagina: Optional[str] = None,
+        nome_prefixo: Optional[str] = None,
+        economia_min: Optional[float] = None,
+        economia_max: Optional[float] = None,
+        ordenar_por: str = "data_simulacao",
+        ordem: str = "desc",
+    ) -> Pagina:
         """
-        Lista todas as simulações de um projeto.
+        Lista uma página das simulações de um projeto do usuário.
+
+        A paginação é por cursor (keyset): cursor_pagina é o proximo_cursor
+        da página anterior e deve ser usado com a mesma ordenação.
+
+        Returns:
+            Pagina com as simulações e o cursor da próxima página
+            (None na última).
+
+        Raises:
+            ValueError: Se a ordenação ou o cursor forem inválidos.
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        coluna = ORDENACOES_SIMULACAO.get(ordenar_por)
+        if coluna is None or ordem not in ("asc", "desc"):
+            raise ValueError(f"Ordenação inválida: {ordenar_por} {ordem}")
 
-        try:
-            query = """
-                SELECT id, id_projeto, nome_produto, demanda_anual, custo_pedido,
-                       custo_manutencao, lote_atual_empresa, lote_otimo_calculado,
-                       custo_total_atual, custo_total_otimo, economia_anual,
-                       data_simulacao
-                FROM simulacoes
-                WHERE id_projeto = %s
-                ORDER BY data_simulacao DESC
-            """
+        condicoes = ["s.id_projeto = %s", "p.id_usuario = %s"]
+        parametros: List[Any] = [id_projeto, id_usuario]
+
+        if nome_prefixo:
+            condicoes.append("s.nome_produto LIKE %s")
+            parametros.append(escapar_prefixo_like(nome_prefixo))
+        if economia_min is not None:
+            condicoes.append("s.economia_anual >= %s")
+            parametros.append(economia_min)
+        if economia_max is not None:
+            condicoes.append("s.economia_anual <= %s")
+            parametros.append(economia_max)
+        if cursor_pagina:
+            valor, id_item = decodificar_cursor(cursor_pagina, ordenar_por, ordem)
+            condicao, valores = condicao_keyset(coluna, "s.id", ordem, valor, id_item)
+            condicoes.append(condicao)
+            parametros.extend(valores)
+
+        # Um item a mais indica se existe próxima página
+        parametros.append(limite + 1)
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                query = f"""
+                    SELECT s.id, s.id_projeto, s.nome_produto, s.demanda_anual,
+                           s.custo_pedido, s.custo_manutencao, s.lote_atual_empresa,
+                           s.lote_otimo_calculado, s.custo_total_atual,
+                           s.custo_total_otimo, s.economia_anual, s.data_simulacao,
+                           s.faixas_desconto, s.tipo_desconto,
+                           s.volume_unitario, s.custo_unitario,
+                           s.modelo, s.taxa_producao, s.custo_falta_anual
+                    FROM simulacoes s
+                    JOIN projeto p ON p.id_grupo = s.id_projeto
+                    WHERE {" AND ".join(condicoes)}
+                    ORDER BY {ordenacao_keyset(coluna, "s.id", ordem)}
+                    LIMIT %s
+                """
+
+                cursor.execute(query, parametros)
+                simulacoes = cursor.fetchall()
 
-            cursor.execute(query, (id_projeto,))
-            simulacoes = cursor.fetchall()
-
-            return [
-                SimulacaoResponse(
-                    id=s[0],
-                    id_projeto=s[1],
-                    nome_produto=s[2],
-                    demanda_anual=s[3],
-                    custo_pedido=s[4],
-                    custo_manutencao=s[5],
-                    lote_atual_empresa=s[6],
-                    lote_otimo_calculado=s[7],
-                    custo_total_atual=s[8],
-                    custo_total_otimo=s[9],
-                    economia_anual=s[10],
-                    data_simulacao=s[11],
+                if simulacoes:
+                    cache_acesso.registrar(id_usuario, id_projeto)
+                else:
+                    # Página vazia: sem simulações (ou filtradas) ou sem acesso
+                    verificar_acesso_projeto(cursor, id_projeto, id_usuario)
+
+            finally:
+                cursor.close()
+
+        proximo_cursor = None
+        if len(simulacoes) > limite:
+            simulacoes = simulacoes[:limite]
+            ultima = self._linha_para_resposta(simulacoes[-1])
+            proximo_cursor = codificar_cursor(
+                ordenar_por, ordem, getattr(ultima, ordenar_por), ultima.id
+            )
+
+        return Pagina(
+            itens=[self._linha_para_resposta(s) for s in simulacoes],
+            proximo_cursor=proximo_cursor,
+        )
+
+    def exportar_simulacoes_ndjson(
+        self,
+        id_projeto: int,
+        id_usuario: int,
+        tamanho_lote: int = TAMANHO_LOTE_EXPORTACAO,
+    ) -> Iterator[bytes]:
+        """
+        Exporta todas as simulações de um projeto em NDJSON (um objeto JSON
+        por linha), na ordem da listagem padrão.
+
+        A propriedade do projeto é verificada antes de retornar, para que o
+        erro aconteça antes do início da resposta. As linhas são lidas com
+        um cursor no servidor (named cursor) em lotes de tamanho_lote e
+        convertidas à medida que chegam, de modo que a memória usada não
+        depende do tamanho do projeto. A conexão fica retirada do pool
+        enquanto o iterador é consumido.
+
+        Raises:
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+            try:
+                verificar_acesso_projeto(cursor, id_projeto, id_usuario)
+            finally:
+                cursor.close()
+
+        return self._gerar_ndjson(id_projeto, id_usuario, tamanho_lote)
+
+    def _gerar_ndjson(
+        self, id_projeto: int, id_usuario: int, tamanho_lote: int
+    ) -> Iterator[bytes]:
+        """
+        Gera os pedaços NDJSON da exportação (ver exportar_simulacoes_ndjson).
+        """
+        with self.db.conexao() as conn:
+            cursor = conn.cursor(name=f"exportar_simulacoes_{id_projeto}")
+            cursor.itersize = tamanho_lote
+
+            try:
+                cursor.execute(
+                    """
+                    SELECT s.id, s.id_projeto, s.nome_produto, s.demanda_anual,
+                           s.custo_pedido, s.custo_manutencao, s.lote_atual_empresa,
+                           s.lote_otimo_calculado, s.custo_total_atual,
+                           s.custo_total_otimo, s.economia_anual, s.data_simulacao,
+                           s.faixas_desconto, s.tipo_desconto,
+                           s.volume_unitario, s.custo_unitario,
+                           s.modelo, s.taxa_producao, s.custo_falta_anual
+                    FROM simulacoes s
+                    JOIN projeto p ON p.id_grupo = s.id_projeto
+                    WHERE s.id_projeto = %s AND p.id_usuario = %s
+                    ORDER BY s.data_simulacao DESC, s.id DESC
+                    """,
+                    (id_projeto, id_usuario),
                 )
-                for s in simulacoes
-            ]
 
-        finally:
-            cursor.close()
+                linhas = []
+                for s in cursor:
+                    linhas.append(
+                        json.dumps(
+                            {
+                                "id": s[0],
+                                "id_projeto": s[1],
+                                "nome_produto": s[2],
+                                "demanda_anual": _numero(s[3]),
+                                "custo_pedido": _numero(s[4]),
+                                "custo_manutencao": _numero(s[5]),
+                                "lote_atual_empresa": _numero(s[6]),
+                                "lote_otimo_calculado": _numero(s[7]),
+                                "custo_total_atual": _numero(s[8]),
+                                "custo_total_otimo": _numero(s[9]),
+                                "economia_anual": _numero(s[10]),
+                                "data_simulacao": s[11].isoformat(),
+                                "faixas_desconto": s[12],
+                                "tipo_desconto": s[13],
+                                "volume_unitario": _numero(s[14]),
+                                "custo_unitario": _numero(s[15]),
+                                "modelo": s[16],
+                                "taxa_producao": _numero(s[17]),
+                                "custo_falta_anual": _numero(s[18]),
+                            },
+                            ensure_ascii=False,
+                        )
+                    )
+                    if len(linhas) >= tamanho_lote:
+                        yield ("\n".join(linhas) + "\n").encode("utf-8")
+                        linhas = []
+
+                if linhas:
+                    yield ("\n".join(linhas) + "\n").encode("utf-8")
+
+            finally:
+                cursor.close()
 
     def obter_simulacao(
-        self, id_simulacao: int, id_projeto: int
+        self, id_simulacao: int, id_projeto: int, id_usuario: int
     ) -> Optional[SimulacaoResponse]:
         """
-        Obtém uma simulação específica de um projeto.
+        Obtém uma simulação específica de um projeto do usuário.
+        O dono do projeto é lido na mesma consulta da simulação.
+
+        A linha é sempre lida do banco: ela pode ser alterada por outro
+        worker da API ou pelo worker de jobs, cujas invalidações este
+        processo não vê. Só os resultados calculados ficam em cache, com
+        chaves formadas pelos parâmetros da simulação.
+
+        Returns:
+            A simulação ou None se ela não existir no projeto.
+
+        Raises:
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
 
-        try:
-            query = """
-                SELECT id, id_projeto, nome_produto, demanda_anual, custo_pedido,
-                       custo_manutencao, lote_atual_empresa, lote_otimo_calculado,
-                       custo_total_atual, custo_total_otimo, economia_anual,
-                       data_simulacao
-                FROM simulacoes
-                WHERE id = %s AND id_projeto = %s
-            """
+            try:
+                linha = self._buscar_com_dono(cursor, id_simulacao, id_projeto)
+            finally:
+                cursor.close()
 
-            cursor.execute(query, (id_simulacao, id_projeto))
-            s = cursor.fetchone()
-
-            if not s:
-                return None
-
-            return SimulacaoResponse(
-                id=s[0],
-                id_projeto=s[1],
-                nome_produto=s[2],
-                demanda_anual=s[3],
-                custo_pedido=s[4],
-                custo_manutencao=s[5],
-                lote_atual_empresa=s[6],
-                lote_otimo_calculado=s[7],
-                custo_total_atual=s[8],
-                custo_total_otimo=s[9],
-                economia_anual=s[10],
-                data_simulacao=s[11],
-            )
+        levantar_se_sem_acesso(linha and linha[0], id_projeto, id_usuario)
+        if linha[1] is None:
+            return None
 
-        finally:
-            cursor.close()
+        return self._linha_para_resposta(linha[1:])
 
     def atualizar_simulacao(
-        self, id_simulacao: int, id_projeto: int, dados: SimulacaoAtualizar
+        self,
+        id_simulacao: int,
+        id_projeto: int,
+        id_usuario: int,
+        dados: SimulacaoAtualizar,
     ) -> Optional[SimulacaoResponse]:
         """
         Atualiza uma simulação usando SymPy para recalcular valores.
+        A leitura dos dados atuais (com o dono do projeto) e o UPDATE
+        usam a mesma conexão.
+
+        Raises:
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
-        try:
-            # Primeiro, busca os dados atuais
-            simulacao_atual = self.obter_simulacao(id_simulacao, id_projeto)
-            if not simulacao_atual:
-                return None
-
-            # Prepara os novos valores
-            nome_produto = dados.nome_produto or simulacao_atual.nome_produto
-            demanda_anual = dados.demanda_anual or simulacao_atual.demanda_anual
-            custo_pedido = dados.custo_pedido or simulacao_atual.custo_pedido
-            custo_manutencao = (
-                dados.custo_manutencao or simulacao_atual.custo_manutencao
-            )
-            lote_atual_empresa = (
-                dados.lote_atual_empresa
-                if dados.lote_atual_empresa is not None
-                else simulacao_atual.lote_atual_empresa
-            )
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
 
-            # Recalcula usando SymPy
-            calculadora = CalculadoraLoteEconomico(
-                demanda_anual=demanda_anual,
-                custo_pedido=custo_pedido,
-                custo_manutencao=custo_manutencao,
-                lote_atual=lote_atual_empresa,
-            )
+            try:
+                linha = self._buscar_com_dono(cursor, id_simulacao, id_projeto)
+                levantar_se_sem_acesso(linha and linha[0], id_projeto, id_usuario)
+                if linha[1] is None:
+                    return None
+
+                simulacao_atual = self._linha_para_resposta(linha[1:])
+
+                # Prepara os novos valores
+                nome_produto = dados.nome_produto or simulacao_atual.nome_produto
+                demanda_anual = dados.demanda_anual or simulacao_atual.demanda_anual
+                custo_pedido = dados.custo_pedido or simulacao_atual.custo_pedido
+                custo_manutencao = (
+                    dados.custo_manutencao or simulacao_atual.custo_manutencao
+                )
+                lote_atual_empresa = (
+                    dados.lote_atual_empresa
+                    if dados.lote_atual_empresa is not None
+                    else simulacao_atual.lote_atual_empresa
+                )
+                volume_unitario = (
+                    dados.volume_unitario
+                    if dados.volume_unitario is not None
+                    else simulacao_atual.volume_unitario
+                )
+                custo_unitario = (
+                    dados.custo_unitario
+                    if dados.custo_unitario is not None
+                    else simulacao_atual.custo_unitario
+                )
+                modelo = dados.modelo or simulacao_atual.modelo
+                taxa_producao = (
+                    dados.taxa_producao
+                    if dados.taxa_producao is not None
+                    else simulacao_atual.taxa_producao
+                )
+                custo_falta_anual = (
+                    dados.custo_falta_anual
+                    if dados.custo_falta_anual is not None
+                    else simulacao_atual.custo_falta_anual
+                )
+                faixas, tipo_desconto = _normalizar_desconto(
+                    (
+                        dados.faixas_desconto
+                        if dados.faixas_desconto is not None
+                        else simulacao_atual.faixas_desconto
+                    ),
+                    dados.tipo_desconto or simulacao_atual.tipo_desconto,
+                )
+
+                analise = self._analisar(
+                    SimulacaoBase(
+                        nome_produto=nome_produto,
+                        demanda_anual=demanda_anual,
+                        custo_pedido=custo_pedido,
+                        custo_manutencao=custo_manutencao,
+                        lote_atual_empresa=lote_atual_empresa,
+                        faixas_desconto=faixas,
+                        tipo_desconto=tipo_desconto,
+                        modelo=modelo,
+                        taxa_producao=taxa_producao,
+                        custo_falta_anual=custo_falta_anual,
+                    )
+                )
+
+                query = """
+                    UPDATE simulacoes
+                    SET nome_produto = %s,
+                        demanda_anual = %s,
+                        custo_pedido = %s,
+                        custo_manutencao = %s,
+                        lote_atual_empresa = %s,
+                        lote_otimo_calculado = %s,
+                        custo_total_atual = %s,
+                        custo_total_otimo = %s,
+                        economia_anual = %s,
+                        faixas_desconto = %s,
+                        tipo_desconto = %s,
+                        volume_unitario = %s,
+                        custo_unitario = %s,
+                        modelo = %s,
+                        taxa_producao = %s,
+                        custo_falta_anual = %s
+                    WHERE id = %s AND id_projeto = %s
+                    RETURNING data_simulacao
+                """
+
+                cursor.execute(
+                    query,
+                    (
+                        nome_produto,
+                        demanda_anual,
+                        custo_pedido,
+                        custo_manutencao,
+                        analise["lote_atual_empresa"],
+                        analise["lote_otimo_calculado"],
+                        analise["custo_total_atual"],
+                        analise["custo_total_otimo"],
+                        analise["economia_anual"],
+                        _json_ou_nulo(faixas),
+                        tipo_desconto,
+                        volume_unitario,
+                        custo_unitario,
+                        modelo,
+                        taxa_producao,
+                        custo_falta_anual,
+                        id_simulacao,
+                        id_projeto,
+                    ),
+                )
+
+                result = cursor.fetchone()
+                if not result:
+                    return None
+
+                conn.commit()
+                self.cache.invalidar(f"simulacao:{id_simulacao}")
+
+                return SimulacaoResponse(
+                    id=id_simulacao,
+                    id_projeto=id_projeto,
+                    nome_produto=nome_produto,
+                    demanda_anual=demanda_anual,
+                    custo_pedido=custo_pedido,
+                    custo_manutencao=custo_manutencao,
+                    lote_atual_empresa=analise["lote_atual_empresa"],
+                    lote_otimo_calculado=analise["lote_otimo_calculado"],
+                    custo_total_atual=analise["custo_total_atual"],
+                    custo_total_otimo=analise["custo_total_otimo"],
+                    economia_anual=analise["economia_anual"],
+                    faixas_desconto=faixas,
+                    tipo_desconto=tipo_desconto,
+                    volume_unitario=volume_unitario,
+                    custo_unitario=custo_unitario,
+                    modelo=modelo,
+                    taxa_producao=taxa_producao,
+                    custo_falta_anual=custo_falta_anual,
+                    data_simulacao=result[0],
+                )
+
+            finally:
+                cursor.close()
+
+    def recalcular_projeto_sql(
+        self,
+        id_projeto: int,
+        custo_pedido: Optional[float] = None,
+        custo_manutencao: Optional[float] = None,
+        fator_custo_pedido: Optional[float] = None,
+        fator_custo_manutencao: Optional[float] = None,
+        nome_prefixo: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        Aplica os novos custos e recalcula, em uma transação, todas as
+        simulações do projeto (ou as com nome iniciado por nome_prefixo)
+        com um UPDATE no próprio banco (ver utils/lote_sql.py). Não
+        verifica o dono do projeto (manutenção e jobs).
+
+        Returns:
+            Quantidade de simulações recalculadas em SQL e em Python.
+
+        Raises:
+            ValueError: Se algum custo resultante não for positivo.
+        """
+        condicao = "s.id_projeto = %(id_projeto)s"
+        parametros = {"id_projeto": id_projeto}
+        if nome_prefixo:
+            condicao += " AND s.nome_produto LIKE %(nome_prefixo)s"
+            parametros["nome_prefixo"] = escapar_prefixo_like(nome_prefixo)
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
 
-            analise = calculadora.gerar_analise_completa()
-
-            query = """
-                UPDATE simulacoes
-                SET nome_produto = %s,
-                    demanda_anual = %s,
-                    custo_pedido = %s,
-                    custo_manutencao = %s,
-                    lote_atual_empresa = %s,
-                    lote_otimo_calculado = %s,
-                    custo_total_atual = %s,
-                    custo_total_otimo = %s,
-                    economia_anual = %s
-                WHERE id = %s AND id_projeto = %s
-                RETURNING data_simulacao
+            try:
+                em_sql, em_python = self._recalcular(
+                    cursor,
+                    condicao,
+                    parametros,
+                    custo_pedido,
+                    custo_manutencao,
+                    fator_custo_pedido,
+                    fator_custo_manutencao,
+                )
+                conn.commit()
+                # Resultados deste processo; os demais não guardam as linhas
+                # em cache (ver obter_simulacao)
+                self.cache.invalidar(f"projeto:{id_projeto}")
+
+                return {"recalculadas_sql": em_sql, "recalculadas_python": em_python}
+
+            finally:
+                cursor.close()
+
+    def recalcular_pedaco(
+        self,
+        cursor,
+        id_projeto: int,
+        apos_id: int,
+        limite: int,
+        custo_pedido: Optional[float] = None,
+        custo_manutencao: Optional[float] = None,
+        fator_custo_pedido: Optional[float] = None,
+        fator_custo_manutencao: Optional[float] = None,
+    ) -> Tuple[int, Optional[int]]:
+        """
+        Aplica os novos custos e recalcula até ``limite`` simulações do
+        projeto com id maior que apos_id, em ordem de id (pedaço de um
+        recálculo do projeto). Usa a transação do cursor informado: as
+        linhas ficam bloqueadas até o commit, que fica com quem chama.
+
+        Returns:
+            Tupla (simulações recalculadas, último id do pedaço ou None).
+
+        Raises:
+            ValueError: Se algum custo resultante não for positivo.
+        """
+        cursor.execute(
             """
+            SELECT s.id
+            FROM simulacoes s
+            WHERE s.id_projeto = %s AND s.id > %s
+            ORDER BY s.id
+            LIMIT %s
+            FOR UPDATE
+            """,
+            (id_projeto, apos_id, limite),
+        )
+        ids = cursor.fetchall()
+        if not ids:
+            return 0, None
+
+        self._recalcular(
+            cursor,
+            "s.id_projeto = %(id_projeto)s"
+            " AND s.id > %(apos_id)s AND s.id <= %(ate_id)s",
+            {"id_projeto": id_projeto, "apos_id": apos_id, "ate_id": ids[-1][0]},
+            custo_pedido,
+            custo_manutencao,
+            fator_custo_pedido,
+            fator_custo_manutencao,
+        )
+        return len(ids), ids[-1][0]
 
+    def _recalcular(
+        self,
+        cursor,
+        condicao: str,
+        parametros: Dict[str, Any],
+        custo_pedido: Optional[float],
+        custo_manutencao: Optional[float],
+        fator_custo_pedido: Optional[float],
+        fator_custo_manutencao: Optional[float],
+    ) -> Tuple[int, int]:
+        """
+        Recalcula as simulações que atendem à condição (SQL sobre o alias
+        s, com parâmetros nomeados): um UPDATE no banco para as que têm
+        forma fechada em SQL e o cálculo vetorizado em Python para as
+        demais (faixas de desconto), na transação do cursor.
+
+        Returns:
+            Tupla (recalculadas em SQL, recalculadas em Python).
+        """
+        custos = {
+            "custo_pedido": custo_pedido,
+            "custo_manutencao": custo_manutencao,
+            "fator_custo_pedido": fator_custo_pedido,
+            "fator_custo_manutencao": fator_custo_manutencao,
+        }
+        if fator_custo_pedido is not None or fator_custo_manutencao is not None:
             cursor.execute(
-                query,
+                f"""
+                SELECT LEAST(
+                    round(MIN(s.custo_pedido) * %(fator_custo_pedido)s::numeric, 2),
+                    round(
+                        MIN(s.custo_manutencao) * %(fator_custo_manutencao)s::numeric, 2
+                    )
+                )
+                FROM simulacoes s
+                WHERE {condicao}
+                """,
+                {**parametros, **custos},
+            )
+            menor = cursor.fetchone()[0]
+            if menor is not None and menor <= 0:
+                raise ValueError(
+                    f"O custo recalculado ({menor:g}) deve ser maior que zero"
+                )
+
+        comando, condicao_sql = comando_recalculo(condicao)
+        cursor.execute(comando, {**parametros, **custos})
+        em_sql = cursor.rowcount
+
+        cursor.execute(
+            f"""
+            SELECT s.id, s.id_projeto, s.nome_produto, s.demanda_anual,
+                   s.custo_pedido, s.custo_manutencao, s.lote_atual_empresa,
+                   s.lote_otimo_calculado, s.custo_total_atual,
+                   s.custo_total_otimo, s.economia_anual, s.data_simulacao,
+                   s.faixas_desconto, s.tipo_desconto,
+                   s.volume_unitario, s.custo_unitario,
+                   s.modelo, s.taxa_producao, s.custo_falta_anual
+            FROM simulacoes s
+            WHERE ({condicao}) AND NOT ({condicao_sql})
+            FOR UPDATE
+            """,
+            parametros,
+        )
+        linhas = cursor.fetchall()
+        if not linhas:
+            return em_sql, 0
+
+        simulacoes = []
+        for linha in linhas:
+            simulacao = self._linha_para_resposta(linha)
+            simulacoes.append(
+                simulacao.model_copy(
+                    update={
+                        "custo_pedido": _custo_recalculado(
+                            simulacao.custo_pedido, custo_pedido, fator_custo_pedido
+                        ),
+                        "custo_manutencao": _custo_recalculado(
+                            simulacao.custo_manutencao,
+                            custo_manutencao,
+                            fator_custo_manutencao,
+                        ),
+                    }
+                )
+            )
+        analises = self._analisar_lote(simulacoes)
+
+        psycopg2.extras.execute_values(
+            cursor,
+            """
+            UPDATE simulacoes s
+            SET custo_pedido = v.custo_pedido,
+                custo_manutencao = v.custo_manutencao,
+                lote_otimo_calculado = v.lote_otimo_calculado,
+                custo_total_atual = v.custo_total_atual,
+                custo_total_otimo = v.custo_total_otimo,
+                economia_anual = v.economia_anual
+            FROM (VALUES %s) AS v (
+                id, custo_pedido, custo_manutencao, lote_otimo_calculado,
+                custo_total_atual, custo_total_otimo, economia_anual
+            )
+            WHERE s.id = v.id
+            """,
+            [
                 (
-                    nome_produto,
-                    demanda_anual,
-                    custo_pedido,
-                    custo_manutencao,
-                    analise["lote_atual_empresa"],
+                    simulacao.id,
+                    simulacao.custo_pedido,
+                    simulacao.custo_manutencao,
                     analise["lote_otimo_calculado"],
                     analise["custo_total_atual"],
                     analise["custo_total_otimo"],
                     analise["economia_anual"],
-                    id_simulacao,
-                    id_projeto,
-                ),
-            )
+                )
+                for simulacao, analise in zip(simulacoes, analises)
+            ],
+            # Tipos explícitos: colunas só com nulos seriam lidas como texto
+            template="(%s, %s::numeric, %s::numeric, %s::numeric,"
+            " %s::numeric, %s::numeric, %s::numeric)",
+            page_size=1000,
+        )
+
+        return em_sql, len(simulacoes)
+
+    def verificar_recalculo_sql(
+        self, linhas: int = 100000, semente: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Compara o cálculo em SQL de utils/lote_sql.py com o da
+        CalculadoraLoteEconomicoLote sobre um conjunto aleatório de
+        simulações, enviado como arrays (nada é gravado no banco).
 
-            result = cursor.fetchone()
-            if not result:
-                return None
-
-            conn.commit()
-
-            return SimulacaoResponse(
-                id=id_simulacao,
-                id_projeto=id_projeto,
-                nome_produto=nome_produto,
-                demanda_anual=demanda_anual,
-                custo_pedido=custo_pedido,
-                custo_manutencao=custo_manutencao,
-                lote_atual_empresa=analise["lote_atual_empresa"],
-                lote_otimo_calculado=analise["lote_otimo_calculado"],
-                custo_total_atual=analise["custo_total_atual"],
-                custo_total_otimo=analise["custo_total_otimo"],
-                economia_anual=analise["economia_anual"],
-                data_simulacao=result[0],
+        Returns:
+            Dicionário com a quantidade de linhas e, por coluna, as
+            divergências e a maior diferença absoluta.
+        """
+        dados = simulacoes_aleatorias(linhas, semente)
+        arrays = ", ".join(
+            (
+                "%s::int[]"
+                if coluna == "id"
+                else "%s::text[]" if coluna == "modelo" else "%s::numeric[]"
             )
+            for coluna in COLUNAS_ORIGEM
+        )
+        origem = f"SELECT * FROM unnest({arrays}) AS o ({', '.join(COLUNAS_ORIGEM)})"
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(
+                    f"""
+                    SELECT id, lote_otimo_calculado, custo_total_otimo,
+                           custo_total_atual, economia_anual
+                    FROM ({consulta_analise(origem)}) c
+                    ORDER BY id
+                    """,
+                    [dados[coluna] for coluna in COLUNAS_ORIGEM],
+                )
+                resultado_sql = cursor.fetchall()
 
-        finally:
-            cursor.close()
+            finally:
+                cursor.close()
 
-    def deletar_simulacao(self, id_simulacao: int, id_projeto: int) -> bool:
+        esperado = CalculadoraLoteEconomicoLote(
+            demanda_anual=dados["demanda_anual"],
+            custo_pedido=dados["custo_pedido"],
+            custo_manutencao=dados["custo_manutencao"],
+            lote_atual=dados["lote_atual_empresa"],
+            modelo=dados["modelo"],
+            parametros_modelo={nome: dados[nome] for nome in parametros_modelos()},
+        ).gerar_analise_completa()
+
+        colunas = (
+            "lote_otimo_calculado",
+            "custo_total_otimo",
+            "custo_total_atual",
+            "economia_anual",
+        )
+        relatorio = {"linhas": len(resultado_sql), "colunas": {}}
+        for indice, coluna in enumerate(colunas, start=1):
+            obtido = np.array(
+                [
+                    np.nan if linha[indice] is None else linha[indice]
+                    for linha in resultado_sql
+                ],
+                dtype=float,
+            )
+            referencia = np.asarray(esperado[coluna], dtype=float)
+            iguais = (obtido == referencia) | (np.isnan(obtido) & np.isnan(referencia))
+            diferencas = np.abs(obtido - referencia)[~iguais]
+            relatorio["colunas"][coluna] = {
+                "divergencias": int((~iguais).sum()),
+                "diferenca_maxima": (
+                    float(np.nan_to_num(diferencas, nan=np.inf).max())
+                    if diferencas.size
+                    else 0.0
+                ),
+            }
+        return relatorio
+
+    def deletar_simulacao(
+        self, id_simulacao: int, id_projeto: int, id_usuario: int
+    ) -> bool:
         """
-        Deleta uma simulação.
+        Deleta uma simulação de um projeto do usuário.
+
+        Raises:
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                query = """
+                    DELETE FROM simulacoes s
+                    USING projeto p
+                    WHERE s.id = %s AND s.id_projeto = %s
+                      AND p.id_grupo = s.id_projeto AND p.id_usuario = %s
+                """
+                cursor.execute(query, (id_simulacao, id_projeto, id_usuario))
+                removidas = cursor.rowcount
+                conn.commit()
 
-        try:
-            query = "DELETE FROM simulacoes WHERE id = %s AND id_projeto = %s"
-            cursor.execute(query, (id_simulacao, id_projeto))
-            conn.commit()
+                if not removidas:
+                    verificar_acesso_projeto(cursor, id_projeto, id_usuario)
+                    return False
 
-            return cursor.rowcount > 0
+                cache_acesso.registrar(id_usuario, id_projeto)
+                self.cache.invalidar(f"simulacao:{id_simulacao}")
 
-        finally:
-            cursor.close()
+                return True
+
+            finally:
+                cursor.close()
 
     def gerar_analise_matematica_detalhada(
-        self, id_simulacao: int, id_projeto: int
+        self, id_simulacao: int, id_projeto: int, id_usuario: int
     ) -> Optional[Dict[str, Any]]:
         """
         Gera análise matemática detalhada de uma simulação usando SymPy.
         Inclui derivadas, pontos críticos e verificação de otimalidade.
         """
-        simulacao = self.obter_simulacao(id_simulacao, id_projeto)
+        simulacao = self.obter_simulacao(id_simulacao, id_projeto, id_usuario)
         if not simulacao:
             return None
 
-        calculadora = CalculadoraLoteEconomico(
-            demanda_anual=simulacao.demanda_anual,
-            custo_pedido=simulacao.custo_pedido,
-            custo_manutencao=simulacao.custo_manutencao,
-            lote_atual=simulacao.lote_atual_empresa,
-        )
+        chave = ("analise",) + self._parametros_cache(simulacao)
+        relatorio = self.cache.obter(chave)
+        if relatorio is not None:
+            return relatorio
+
+        calculadora = self._calculadora(simulacao)
 
-        return calculadora.gerar_relatorio_detalhado()
+        relatorio = calculadora.gerar_relatorio_detalhado()
+        self.cache.definir(chave, relatorio, tags_simulacao(id_simulacao, id_projeto))
+
+        return relatorio
 
     def gerar_dados_grafico(
         self,
         id_simulacao: int,
         id_projeto: int,
-        q_min: float = 10,
-        q_max: float = 200,
+        id_usuario: int,
+        q_min: Optional[float] = None,
+        q_max: Optional[float] = None,
         pontos: int = 100,
+        escala: str = ESCALA_LINEAR,
+        max_pontos: int = LIMITE_PONTOS_GRAFICO,
+        como_array: bool = False,
     ) -> Optional[Dict[str, Any]]:
         """
         Gera dados para plotagem do gráfico de custo x lote.
+        Com como_array=True as séries são devolvidas como arrays NumPy
+        (usado pelo formato binário).
         """
-        simulacao = self.obter_simulacao(id_simulacao, id_projeto)
+        simulacao = self.obter_simulacao(id_simulacao, id_projeto, id_usuario)
         if not simulacao:
             return None
 
-        calculadora = CalculadoraLoteEconomico(
-            demanda_anual=simulacao.demanda_anual,
-            custo_pedido=simulacao.custo_pedido,
-            custo_manutencao=simulacao.custo_manutencao,
-            lote_atual=simulacao.lote_atual_empresa,
-        )
+        chave = ("curva",) + self._parametros_cache(simulacao)
+        chave += (q_min, q_max, pontos, escala, max_pontos)
+        curva = self.cache.obter(chave)
+
+        if curva is None:
+            calculadora = self._calculadora(simulacao)
+            funcao_custo = None
+            if simulacao.faixas_desconto:
+                # Curva com o custo de compra; o intervalo automático
+                # também cobre o lote ótimo com desconto
+                desconto = self._calculadora_desconto([simulacao])
+                funcao_custo = partial(_custo_curva_desconto, desconto)
+                if q_max is None:
+                    q_max = max(
+                        calculadora.intervalo_grafico(q_min, None)[1],
+                        simulacao.lote_otimo_calculado * 1.2,
+                    )
+            curva = pool_calculo.executar(
+                calculadora.calcular_curva,
+                q_min,
+                q_max,
+                pontos,
+                escala,
+                max_pontos,
+                funcao_custo,
+                # A escala adaptativa avalia 8 pontos por ponto retornado
+                custo=pontos * 8 if escala == ESCALA_ADAPTATIVA else pontos,
+            )
+            self.cache.definir(chave, curva, tags_simulacao(id_simulacao, id_projeto))
 
-        dados_grafico = calculadora.gerar_dados_grafico(q_min, q_max, pontos)
+        valores_lote, valores_custo = curva
+
+        dados_grafico = {
+            "valores_lote": valores_lote if como_array else valores_lote.tolist(),
+            "valores_custo": valores_custo if como_array else valores_custo.tolist(),
+        }
 
         # Adiciona pontos de interesse
         dados_grafico["ponto_otimo"] = {
             "lote": simulacao.lote_otimo_calculado,
             "custo": simulacao.custo_total_otimo,
         }
+        dados_grafico["ponto_atual"] = None
 
         if simulacao.lote_atual_empresa:
             dados_grafico["ponto_atual"] = {
@@ -333,3 +1279,368 @@ class SimulacaoService:
             }
 
         return dados_grafico
+
+    def gerar_analise_sensibilidade(
+        self,
+        id_simulacao: int,
+        id_projeto: int,
+        id_usuario: int,
+        variacao_min: float = -0.3,
+        variacao_max: float = 0.3,
+        pontos: int = 21,
+        eixo_x: str = "demanda_anual",
+        eixo_y: str = "custo_manutencao",
+        pontos_mapa: Optional[int] = None,
+        metrica_mapa: str = "custo_total_otimo",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Gera a análise de sensibilidade de uma simulação (tornado, curvas
+        de um parâmetro por vez e mapa de dois parâmetros), sem persistir
+        nada. As séries são devolvidas como arrays NumPy.
+
+        Raises:
+            ValueError: Se as faixas, eixos ou métrica forem inválidos.
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
+        """
+        simulacao = self.obter_simulacao(id_simulacao, id_projeto, id_usuario)
+        if not simulacao:
+            return None
+
+        chave = ("sensibilidade",) + self._parametros_cache(simulacao)
+        chave += (variacao_min, variacao_max, pontos, eixo_x, eixo_y)
+        chave += (pontos_mapa, metrica_mapa)
+        analise = self.cache.obter(chave)
+
+        if analise is None:
+            calculadora = self._calculadora(simulacao)
+            analise = pool_calculo.executar(
+                AnaliseSensibilidade(calculadora).gerar_analise,
+                variacao_min,
+                variacao_max,
+                pontos,
+                eixo_x,
+                eixo_y,
+                pontos_mapa,
+                metrica_mapa,
+                custo=(pontos_mapa or pontos) ** 2 + 3 * pontos,
+            )
+            self.cache.definir(chave, analise, tags_simulacao(id_simulacao, id_projeto))
+
+        return analise
+
+    def simular_politica_estocastica(
+        self,
+        id_simulacao: int,
+        id_projeto: int,
+        id_usuario: int,
+        parametros: SimulacaoEstocasticaRequest,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Simula por Monte Carlo a política (Q, r) do produto com demanda e
+        lead time aleatórios, sem persistir nada. Sem lote informado usa o
+        lote ótimo; sem ponto de pedido usa o recomendado para o nível de
+        serviço. Com semente o resultado é reproduzível e fica em cache.
+
+        Raises:
+            ValueError: Se os parâmetros forem inválidos.
+            AcessoProjetoError: Se o projeto não pertencer ao usuário.
+        """
+        simulacao = self.obter_simulacao(id_simulacao, id_projeto, id_usuario)
+        if not simulacao:
+            return None
+
+        chave = None
+        if parametros.semente is not None:
+            chave = ("estocastica",) + self._parametros_cache(simulacao)
+            chave += tuple(parametros.model_dump().values())
+            resultado = self.cache.obter(chave)
+            if resultado is not None:
+                return resultado
+
+        calculadora = self._calculadora(simulacao)
+        simulador = SimuladorEstoqueEstocastico(
+            calculadora,
+            desvio_demanda_diaria=parametros.desvio_demanda_diaria,
+            lead_time_dias=parametros.lead_time_dias,
+            desvio_lead_time_dias=parametros.desvio_lead_time_dias,
+            custo_falta=parametros.custo_falta,
+        )
+        resultado = pool_calculo.executar(
+            simulador.simular,
+            parametros.ponto_pedido,
+            parametros.lote,
+            parametros.nivel_servico,
+            parametros.replicacoes,
+            parametros.horizonte_dias,
+            parametros.semente,
+            custo=parametros.replicacoes * parametros.horizonte_dias,
+        )
+
+        if chave is not None:
+            self.cache.definir(
+                chave, resultado, tags_simulacao(id_simulacao, id_projeto)
+            )
+
+        return resultado
+
+    def _analisar(self, simulacao: SimulacaoBase) -> Dict[str, Any]:
+        """
+        Calcula lote ótimo, custos e economia de uma simulação pelo seu
+        modelo de custo (com o custo de compra quando houver faixas de
+        desconto).
+
+        Raises:
+            ValueError: Se o modelo de custo ou os seus parâmetros forem
+                inválidos.
+        """
+        if simulacao.faixas_desconto:
+            return self._analisar_lote([simulacao])[0]
+
+        calculadora = self._calculadora(simulacao)
+        return calculadora.gerar_analise_completa(incluir_expressoes=False)
+
+    def _analisar_lote(self, simulacoes: List[SimulacaoBase]) -> List[Dict[str, Any]]:
+        """
+        Calcula várias simulações de forma vetorizada: as que têm tabela
+        de desconto em uma passada da calculadora de descontos e as demais
+        em uma passada por modelo de custo.
+
+        Raises:
+            ValueError: Se algum modelo de custo ou os seus parâmetros forem
+                inválidos.
+        """
+        com_desconto = [bool(s.faixas_desconto) for s in simulacoes]
+        if not any(com_desconto):
+            return self._calculadora_lote(simulacoes).gerar_registros()
+
+        for simulacao, desconto in zip(simulacoes, com_desconto):
+            if desconto:
+                _validar_modelo(simulacao)
+        if all(com_desconto):
+            return self._calculadora_desconto(simulacoes).gerar_registros()
+
+        registros_desconto = iter(
+            self._calculadora_desconto(
+                [s for s, desconto in zip(simulacoes, com_desconto) if desconto]
+            ).gerar_registros()
+        )
+        registros_modelo = iter(
+            self._calculadora_lote(
+                [s for s, desconto in zip(simulacoes, com_desconto) if not desconto]
+            ).gerar_registros()
+        )
+        return [
+            next(registros_desconto) if desconto else next(registros_modelo)
+            for desconto in com_desconto
+        ]
+
+    def _calculadora(self, simulacao: SimulacaoBase) -> CalculadoraLoteEconomico:
+        return CalculadoraLoteEconomico(
+            demanda_anual=simulacao.demanda_anual,
+            custo_pedido=simulacao.custo_pedido,
+            custo_manutencao=simulacao.custo_manutencao,
+            lote_atual=simulacao.lote_atual_empresa,
+            modelo=simulacao.modelo,
+            parametros_modelo=_parametros_modelo(simulacao),
+        )
+
+    def _calculadora_lote(
+        self, simulacoes: List[SimulacaoBase]
+    ) -> CalculadoraLoteEconomicoLote:
+        return CalculadoraLoteEconomicoLote(
+            demanda_anual=[s.demanda_anual for s in simulacoes],
+            custo_pedido=[s.custo_pedido for s in simulacoes],
+            custo_manutencao=[s.custo_manutencao for s in simulacoes],
+            lote_atual=[s.lote_atual_empresa for s in simulacoes],
+            modelo=[s.modelo for s in simulacoes],
+            parametros_modelo={
+                nome: [getattr(s, nome) for s in simulacoes]
+                for nome in parametros_modelos()
+            },
+        )
+
+    def _calculadora_desconto(
+        self, simulacoes: List[SimulacaoBase]
+    ) -> CalculadoraLoteEconomicoDesconto:
+        descontos = [
+            _normalizar_desconto(s.faixas_desconto, s.tipo_desconto) for s in simulacoes
+        ]
+        return CalculadoraLoteEconomicoDesconto(
+            demanda_anual=[s.demanda_anual for s in simulacoes],
+            custo_pedido=[s.custo_pedido for s in simulacoes],
+            custo_manutencao=[s.custo_manutencao for s in simulacoes],
+            faixas_desconto=[
+                (
+                    [(f["quantidade_minima"], f["preco_unitario"]) for f in faixas]
+                    if faixas
+                    else None
+                )
+                for faixas, _ in descontos
+            ],
+            tipo_desconto=[tipo or DESCONTO_TODAS_UNIDADES for _, tipo in descontos],
+            lote_atual=[s.lote_atual_empresa for s in simulacoes],
+        )
+
+    def _buscar_com_dono(self, cursor, id_simulacao: int, id_projeto: int):
+        """
+        Busca o dono do projeto e a simulação em uma única consulta.
+
+        Returns:
+            Tupla (id_usuario, colunas da simulação...) com as colunas da
+            simulação nulas se ela não existir, ou None se o projeto não
+            existir.
+        """
+        cursor.execute(
+            """
+            SELECT p.id_usuario, s.id, s.id_projeto, s.nome_produto,
+                   s.demanda_anual, s.custo_pedido, s.custo_manutencao,
+                   s.lote_atual_empresa, s.lote_otimo_calculado,
+                   s.custo_total_atual, s.custo_total_otimo, s.economia_anual,
+                   s.data_simulacao, s.faixas_desconto, s.tipo_desconto,
+                   s.volume_unitario, s.custo_unitario, s.modelo,
+                   s.taxa_producao, s.custo_falta_anual
+            FROM projeto p
+            LEFT JOIN simulacoes s ON s.id_projeto = p.id_grupo AND s.id = %s
+            WHERE p.id_grupo = %s
+            """,
+            (id_simulacao, id_projeto),
+        )
+        return cursor.fetchone()
+
+    def _linha_para_resposta(self, s) -> SimulacaoResponse:
+        """
+        Converte uma linha da tabela simulacoes em SimulacaoResponse.
+        """
+        return SimulacaoResponse(
+            id=s[0],
+            id_projeto=s[1],
+            nome_produto=s[2],
+            demanda_anual=s[3],
+            custo_pedido=s[4],
+            custo_manutencao=s[5],
+            lote_atual_empresa=s[6],
+            lote_otimo_calculado=s[7],
+            custo_total_atual=s[8],
+            custo_total_otimo=s[9],
+            economia_anual=s[10],
+            data_simulacao=s[11],
+            faixas_desconto=s[12],
+            tipo_desconto=s[13],
+            volume_unitario=s[14],
+            custo_unitario=s[15],
+            modelo=s[16],
+            taxa_producao=s[17],
+            custo_falta_anual=s[18],
+        )
+
+    def _parametros_cache(self, simulacao: SimulacaoResponse) -> tuple:
+        """
+        Parâmetros que determinam os resultados calculados de uma simulação.
+        """
+        return (
+            float(simulacao.demanda_anual),
+            float(simulacao.custo_pedido),
+            float(simulacao.custo_manutencao),
+            float(simulacao.lote_atual_empresa or 0),
+            tuple(
+                (faixa.quantidade_minima, faixa.preco_unitario)
+                for faixa in simulacao.faixas_desconto or ()
+            ),
+            simulacao.tipo_desconto,
+            simulacao.modelo,
+            tuple(_parametros_modelo(simulacao).values()),
+        )
+
+
+def _numero(valor) -> Optional[float]:
+    """
+    Converte um NUMERIC do banco para float (mantendo nulos).
+    """
+    return None if valor is None else float(valor)
+
+
+def _parametros_modelo(simulacao: SimulacaoBase) -> Dict[str, Optional[float]]:
+    """
+    Parâmetros adicionais dos modelos de custo informados na simulação.
+    """
+    return {nome: getattr(simulacao, nome) for nome in parametros_modelos()}
+
+
+def _validar_modelo(simulacao: SimulacaoBase) -> None:
+    """
+    Confere o modelo de custo da simulação e os seus parâmetros.
+
+    Raises:
+        ValueError: Se o modelo não existir, faltarem parâmetros ou houver
+            faixas de desconto em um modelo diferente do LEC.
+    """
+    modelo = obter_modelo(simulacao.modelo)
+    if simulacao.faixas_desconto and modelo.nome != MODELO_LEC:
+        raise ValueError("As faixas de desconto só se aplicam ao modelo lec")
+    modelo.validar(simulacao.demanda_anual, _parametros_modelo(simulacao))
+
+
+def _normalizar_desconto(
+    faixas, tipo_desconto: Optional[str]
+) -> Tuple[Optional[List[Dict[str, float]]], Optional[str]]:
+    """
+    Faixas de desconto ordenadas pela quantidade mínima, no formato gravado
+    no banco, e o tipo de desconto (None em ambos quando não há faixas).
+    """
+    if not faixas:
+        return None, None
+
+    faixas = sorted(
+        (
+            {
+                "quantidade_minima": float(f.quantidade_minima),
+                "preco_unitario": float(f.preco_unitario),
+            }
+            for f in faixas
+        ),
+        key=lambda f: f["quantidade_minima"],
+    )
+    return faixas, tipo_desconto or DESCONTO_TODAS_UNIDADES
+
+
+def _custo_recalculado(
+    atual: float, novo: Optional[float], fator: Optional[float]
+) -> float:
+    """
+    Custo de uma simulação no recálculo do projeto: o novo valor, o atual
+    multiplicado pelo fator (com 2 casas, como na coluna) ou o atual.
+
+    Raises:
+        ValueError: Se o custo resultante não for positivo.
+    """
+    if novo is None and fator is None:
+        return atual
+    if novo is not None:
+        custo = novo
+    else:
+        # Em decimal, como o round() de NUMERIC do recálculo em SQL
+        custo = float(
+            (Decimal(str(atual)) * Decimal(str(fator))).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
+        )
+    if custo <= 0:
+        raise ValueError(f"O custo recalculado ({custo:g}) deve ser maior que zero")
+    return custo
+
+
+def _custo_curva_desconto(
+    desconto: CalculadoraLoteEconomicoDesconto, lotes: np.ndarray
+) -> np.ndarray:
+    """
+    Custo com descontos de um array de lotes (curva do gráfico). Função de
+    módulo para poder ser enviada ao pool de cálculo.
+    """
+    return desconto.calcular_custo_total(lotes.reshape(1, -1))[0]
+
+
+def _json_ou_nulo(valor):
+    """
+    Adapta um valor para uma coluna JSONB (mantendo nulos).
+    """
+    return None if valor is None else psycopg2.extras.Json(valor)
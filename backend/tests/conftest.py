@@ -0,0 +1,109 @@
+"""
+Configuração dos testes (a partir de backend/):
+
+    python -m pytest tests
+
+Os testes que usam o PostgreSQL recebem a fixture ``banco``: eles rodam no
+banco indicado em TESTE_DB_NAME (com as demais credenciais DB_*), onde as
+migrações são aplicadas, e são ignorados quando a variável não está
+definida ou o banco não responde. O banco de DB_NAME nunca é usado.
+"""
+
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def banco():
+    nome = os.getenv("TESTE_DB_NAME")
+    if not nome:
+        pytest.skip("TESTE_DB_NAME não definido")
+    os.environ["DB_NAME"] = nome
+
+    from Connections.migracoes import aplicar_migracoes
+    from Connections.postgre import postgreConnection
+
+    db = postgreConnection()
+    try:
+        with db.conexao():
+            pass
+    except Exception as erro:
+        pytest.skip(f"PostgreSQL indisponível: {erro}")
+
+    aplicar_migracoes(db)
+    return db
+
+
+@contextmanager
+def _usuario_temporario(banco):
+    """
+    Cria um usuário direto no banco e o remove ao final com os seus projetos.
+    """
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            # Direto no banco: o hash da senha não faz parte dos testes
+            cursor.execute(
+                """
+                INSERT INTO usuarios (nome, email, senha)
+                VALUES (%s, %s, %s)
+                RETURNING id_usuario
+                """,
+                ("Teste", f"teste-{uuid.uuid4().hex}@exemplo.invalid", "-"),
+            )
+            id_usuario = cursor.fetchone()[0]
+            conn.commit()
+        finally:
+            cursor.close()
+
+    try:
+        yield id_usuario
+    finally:
+        with banco.conexao() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    "DELETE FROM usuarios WHERE id_usuario = %s", (id_usuario,)
+                )
+                conn.commit()
+            finally:
+                cursor.close()
+
+
+@pytest.fixture
+def usuario(banco):
+    """
+    Usuário próprio do teste, removido ao final com os seus projetos.
+    """
+    with _usuario_temporario(banco) as id_usuario:
+        yield id_usuario
+
+
+@pytest.fixture
+def outro_usuario(banco):
+    """
+    Segundo usuário do teste, sem acesso aos projetos de ``usuario``.
+    """
+    with _usuario_temporario(banco) as id_usuario:
+        yield id_usuario
+
+
+@pytest.fixture
+def projeto(usuario):
+    """
+    Projeto vazio do usuário do teste.
+    """
+    from models.projeto import ProjetoCriar
+    from services.projeto import ProjetoService
+
+    return (
+        ProjetoService()
+        .criar_projeto(ProjetoCriar(nome_grupo="Projeto de teste"), usuario)
+        .id_grupo
+    )
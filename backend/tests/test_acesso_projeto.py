@@ -0,0 +1,133 @@
+"""
+Acesso aos projetos (services/acesso.py): projeto inexistente e projeto de
+outro usuário são distinguidos no serviço e viram 404 nas rotas, e o cache
+de propriedades confirmadas expira e é por usuário.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models.simulacao import SimulacaoAtualizar, SimulacaoCriar
+from services.acesso import (
+    AcessoNegadoError,
+    CacheAcessoProjeto,
+    ProjetoNaoEncontradoError,
+    levantar_se_sem_acesso,
+)
+from services.simulacao import SimulacaoService
+
+
+def test_dono_retornado_pela_consulta_vira_erro():
+    with pytest.raises(ProjetoNaoEncontradoError):
+        levantar_se_sem_acesso(None, 10, 1)
+    with pytest.raises(AcessoNegadoError):
+        levantar_se_sem_acesso(2, 10, 1)
+    levantar_se_sem_acesso(1, 10, 1)
+
+
+def test_cache_de_acesso_expira_e_e_por_usuario(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr("services.acesso.time.monotonic", lambda: agora[0])
+    cache = CacheAcessoProjeto(ttl=30)
+
+    cache.registrar(1, 10)
+    assert cache.confirmado(1, 10)
+    assert not cache.confirmado(2, 10)
+    assert not cache.confirmado(1, 11)
+
+    agora[0] += 31
+    assert not cache.confirmado(1, 10)
+
+    cache.registrar(1, 10)
+    cache.invalidar_projeto(10)
+    assert not cache.confirmado(1, 10)
+
+
+def test_cache_de_acesso_desligado():
+    cache = CacheAcessoProjeto(ttl=0)
+
+    cache.registrar(1, 10)
+
+    assert not cache.confirmado(1, 10)
+
+
+@pytest.mark.parametrize(
+    "erro", [ProjetoNaoEncontradoError(10), AcessoNegadoError(10), None]
+)
+def test_rota_responde_404_sem_revelar_o_motivo(monkeypatch, erro):
+    from main import app
+    from routes.simulacao import simulacao_service
+    from utils.auth import obter_usuario_atual
+
+    def obter_simulacao(*args):
+        if erro:
+            raise erro
+        return None
+
+    monkeypatch.setattr(simulacao_service, "obter_simulacao", obter_simulacao)
+    app.dependency_overrides[obter_usuario_atual] = lambda: 1
+    try:
+        resposta = TestClient(app).get("/projetos/10/simulacoes/5")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resposta.status_code == 404
+    if erro:
+        # A mesma mensagem para inexistente e de outro usuário
+        assert resposta.json()["detail"] == AcessoNegadoError.mensagem
+
+
+@pytest.fixture
+def simulacao(projeto, usuario):
+    return (
+        SimulacaoService()
+        .criar_simulacoes_lote(
+            [
+                SimulacaoCriar(
+                    nome_produto="Produto",
+                    demanda_anual=1000,
+                    custo_pedido=50,
+                    custo_manutencao=2,
+                )
+            ],
+            projeto,
+            usuario,
+        )
+        .simulacoes[0]
+        .id
+    )
+
+
+def test_outro_usuario_nao_acessa_o_projeto(projeto, usuario, outro_usuario, simulacao):
+    service = SimulacaoService()
+    # O dono acessa primeiro: a propriedade confirmada fica no cache
+    assert service.obter_simulacao(simulacao, projeto, usuario) is not None
+
+    with pytest.raises(AcessoNegadoError):
+        service.obter_simulacao(simulacao, projeto, outro_usuario)
+    with pytest.raises(AcessoNegadoError):
+        service.atualizar_simulacao(
+            simulacao, projeto, outro_usuario, SimulacaoAtualizar(custo_pedido=1)
+        )
+    with pytest.raises(AcessoNegadoError):
+        service.deletar_simulacao(simulacao, projeto, outro_usuario)
+    with pytest.raises(AcessoNegadoError):
+        service.listar_simulacoes_projeto(projeto, outro_usuario)
+
+    # Nada foi alterado pelas tentativas
+    atual = service.obter_simulacao(simulacao, projeto, usuario)
+    assert atual.custo_pedido == 50
+
+
+def test_projeto_inexistente_e_simulacao_inexistente(projeto, usuario, simulacao):
+    service = SimulacaoService()
+    inexistente = projeto + 1_000_000
+
+    with pytest.raises(ProjetoNaoEncontradoError):
+        service.obter_simulacao(simulacao, inexistente, usuario)
+    with pytest.raises(ProjetoNaoEncontradoError):
+        service.deletar_simulacao(simulacao, inexistente, usuario)
+
+    # Projeto do usuário, simulação que não está nele
+    assert service.obter_simulacao(simulacao + 1_000_000, projeto, usuario) is None
+    assert not service.deletar_simulacao(simulacao + 1_000_000, projeto, usuario)
@@ -0,0 +1,198 @@
+"""
+Caches em memória (utils/cache.py): despejo LRU por entradas e por bytes,
+invalidação por tag, expiração do CacheTTL e contadores, e a invalidação
+feita pelo SimulacaoService ao atualizar e remover simulações.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from utils import cache as modulo_cache
+from utils.cache import (
+    BackendCache,
+    CacheMemoriaLRU,
+    CacheTTL,
+    cache_resultados,
+    estimar_tamanho,
+    tags_simulacao,
+)
+
+
+def test_backend_cache_e_abstrato():
+    with pytest.raises(TypeError):
+        BackendCache()
+
+    class CacheIncompleto(BackendCache):
+        def obter(self, chave):
+            return None
+
+    with pytest.raises(TypeError):
+        CacheIncompleto()
+
+
+def test_lru_despeja_a_entrada_usada_ha_mais_tempo():
+    cache = CacheMemoriaLRU(max_entradas=2)
+    cache.definir("a", 1)
+    cache.definir("b", 2)
+    assert cache.obter("a") == 1  # "b" passa a ser a mais antiga
+
+    cache.definir("c", 3)
+
+    assert cache.obter("b") is None
+    assert cache.obter("a") == 1
+    assert cache.obter("c") == 3
+    assert cache.metricas()["despejos"] == 1
+
+
+def test_lru_despeja_por_bytes():
+    valor = np.zeros(1000)
+    tamanho = estimar_tamanho(valor)
+    cache = CacheMemoriaLRU(max_bytes=2 * tamanho + tamanho // 2)
+    for chave in "abc":
+        cache.definir(chave, np.zeros(1000))
+
+    assert cache.obter("a") is None
+    assert cache.obter("b") is not None and cache.obter("c") is not None
+    assert cache.metricas()["bytes"] == 2 * tamanho
+
+
+def test_lru_ignora_valor_maior_que_o_limite():
+    cache = CacheMemoriaLRU(max_bytes=100)
+    cache.definir("grande", np.zeros(1000))
+
+    assert cache.obter("grande") is None
+    assert cache.metricas()["entradas"] == 0
+
+
+def test_invalidar_remove_so_as_entradas_da_tag():
+    cache = CacheMemoriaLRU()
+    cache.definir("analise-1", 1, tags_simulacao(1, 10))
+    cache.definir("curva-1", 2, tags_simulacao(1, 10))
+    cache.definir("analise-2", 3, tags_simulacao(2, 10))
+    cache.definir("analise-3", 4, tags_simulacao(3, 20))
+
+    assert cache.invalidar("simulacao:1") == 2
+    assert cache.obter("analise-1") is None and cache.obter("curva-1") is None
+    assert cache.obter("analise-2") == 3
+
+    assert cache.invalidar("projeto:10") == 1
+    assert cache.obter("analise-2") is None
+    assert cache.obter("analise-3") == 4
+    assert cache.invalidar("projeto:10") == 0
+    assert cache.metricas()["invalidacoes"] == 3
+
+
+def test_redefinir_troca_as_tags_da_entrada():
+    cache = CacheMemoriaLRU()
+    cache.definir("chave", 1, ["antiga"])
+    cache.definir("chave", 2, ["nova"])
+
+    assert cache.invalidar("antiga") == 0
+    assert cache.obter("chave") == 2
+    assert cache.invalidar("nova") == 1
+    assert cache.metricas()["bytes"] == 0
+
+
+def test_contadores_de_acertos_e_falhas():
+    cache = CacheMemoriaLRU()
+    cache.definir("a", 1)
+    cache.obter("a")
+    cache.obter("a")
+    cache.obter("b")
+
+    metricas = cache.metricas()
+    assert (metricas["acertos"], metricas["falhas"]) == (2, 1)
+    assert metricas["taxa_acerto"] == pytest.approx(2 / 3, abs=1e-4)
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """
+    Relógio controlado pelo teste no lugar de time.time do módulo.
+    """
+    agora = SimpleNamespace(valor=1000.0)
+    monkeypatch.setattr(modulo_cache, "time", SimpleNamespace(time=lambda: agora.valor))
+    return agora
+
+
+def test_ttl_expira_pelo_ttl_padrao(relogio):
+    cache = CacheTTL(ttl=60)
+    cache.definir("token", 1)
+
+    relogio.valor += 59
+    assert cache.obter("token") == 1
+    relogio.valor += 1
+    assert cache.obter("token") is None
+    assert cache.metricas()["entradas"] == 0
+
+
+def test_ttl_respeita_expiracao_informada(relogio):
+    cache = CacheTTL(ttl=60)
+    cache.definir("token", 1, expira_em=relogio.valor + 5)
+    cache.definir("vencido", 2, expira_em=relogio.valor)
+
+    assert cache.obter("vencido") is None
+    relogio.valor += 5
+    assert cache.obter("token") is None
+
+
+def test_ttl_despeja_a_entrada_usada_ha_mais_tempo(relogio):
+    cache = CacheTTL(max_entradas=2)
+    cache.definir("a", 1)
+    cache.definir("b", 2)
+    cache.obter("a")
+    cache.definir("c", 3)
+
+    assert cache.obter("b") is None
+    assert cache.obter("a") == 1 and cache.obter("c") == 3
+    assert cache.metricas()["despejos"] == 1
+
+
+def test_ttl_sem_entradas_nao_armazena(relogio):
+    cache = CacheTTL(max_entradas=0)
+    cache.definir("a", 1)
+
+    assert cache.obter("a") is None
+
+
+def _criar(projeto, usuario, **campos):
+    from models.simulacao import SimulacaoCriar
+    from services.simulacao import SimulacaoService
+
+    dados = dict(
+        nome_produto="Produto",
+        demanda_anual=1000,
+        custo_pedido=50,
+        custo_manutencao=2,
+        lote_atual_empresa=300,
+    )
+    dados.update(campos)
+    return SimulacaoService().criar_simulacao(SimulacaoCriar(**dados), projeto, usuario)
+
+
+def _chave_analise(service, simulacao):
+    return ("analise",) + service._parametros_cache(simulacao)
+
+
+def test_atualizar_e_deletar_invalidam_os_resultados(projeto, usuario):
+    from models.simulacao import SimulacaoAtualizar
+    from services.simulacao import SimulacaoService
+
+    service = SimulacaoService()
+    cache_resultados.limpar()
+    simulacao = _criar(projeto, usuario)
+    service.gerar_analise_matematica_detalhada(simulacao.id, projeto, usuario)
+    chave = _chave_analise(service, simulacao)
+    assert cache_resultados.obter(chave) is not None
+
+    service.atualizar_simulacao(
+        simulacao.id, projeto, usuario, SimulacaoAtualizar(nome_produto="Outro")
+    )
+    assert cache_resultados.obter(chave) is None
+
+    service.gerar_analise_matematica_detalhada(simulacao.id, projeto, usuario)
+    assert cache_resultados.obter(chave) is not None
+    assert service.deletar_simulacao(simulacao.id, projeto, usuario)
+    assert cache_resultados.obter(chave) is None
@@ -0,0 +1,69 @@
+"""
+Simulação de Monte Carlo da política (Q, r): reprodutibilidade pela
+semente e nível de serviço atingido pelo ponto de pedido recomendado.
+"""
+
+import pytest
+
+from utils.estoque_estocastico import SimuladorEstoqueEstocastico
+from utils.lote_economico import CalculadoraLoteEconomico
+
+
+def _simulador(demanda=3650, desvio=6, lead_time=7, desvio_lead_time=2):
+    return SimuladorEstoqueEstocastico(
+        CalculadoraLoteEconomico(demanda, 50, 2),
+        desvio_demanda_diaria=desvio,
+        lead_time_dias=lead_time,
+        desvio_lead_time_dias=desvio_lead_time,
+        custo_falta=5,
+    )
+
+
+def test_mesma_semente_reproduz_o_resultado():
+    primeiro = _simulador().simular(replicacoes=500, semente=42)
+    segundo = _simulador().simular(replicacoes=500, semente=42)
+
+    assert primeiro == segundo
+
+
+def test_sementes_diferentes_mudam_o_resultado():
+    primeiro = _simulador().simular(replicacoes=500, semente=1)
+    segundo = _simulador().simular(replicacoes=500, semente=2)
+
+    assert primeiro["custo_total_anual"] != segundo["custo_total_anual"]
+    assert primeiro["recomendacao"] != segundo["recomendacao"]
+
+
+def test_sem_semente_devolve_a_sorteada():
+    resultado = _simulador().simular(replicacoes=200)
+    repeticao = _simulador().simular(replicacoes=200, semente=resultado["semente"])
+
+    assert resultado == repeticao
+
+
+@pytest.mark.parametrize(
+    "demanda, desvio, lead_time, desvio_lead_time",
+    [(3650, 3, 5, 0), (3650, 6, 7, 2), (10000, 10, 3, 1), (1000, 2, 10, 0)],
+)
+@pytest.mark.parametrize("nivel_servico", [0.9, 0.95, 0.99])
+def test_ponto_pedido_recomendado_atinge_o_nivel_de_servico(
+    demanda, desvio, lead_time, desvio_lead_time, nivel_servico
+):
+    resultado = _simulador(demanda, desvio, lead_time, desvio_lead_time).simular(
+        nivel_servico=nivel_servico, replicacoes=2000, semente=7
+    )
+
+    assert resultado["nivel_servico_ciclo"] == pytest.approx(nivel_servico, abs=0.01)
+
+
+def test_ponto_pedido_maior_aumenta_o_nivel_de_servico():
+    simulador = _simulador()
+    recomendado = simulador.simular(replicacoes=1000, semente=5)
+    folgado = simulador.simular(
+        ponto_pedido=recomendado["ponto_pedido"] * 1.3, replicacoes=1000, semente=5
+    )
+
+    assert folgado["nivel_servico_ciclo"] > recomendado["nivel_servico_ciclo"]
+    assert (
+        folgado["taxa_atendimento"]["media"] >= recomendado["taxa_atendimento"]["media"]
+    )
@@ -0,0 +1,100 @@
+"""
+Exportação das simulações em NDJSON (SimulacaoService.exportar_simulacoes_ndjson
+e GET /projetos/{id}/simulacoes/exportar): um objeto JSON por linha, com os
+campos de SimulacaoResponse, na ordem da listagem padrão e em pedaços de
+tamanho_lote linhas.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models.simulacao import FaixaDesconto, SimulacaoCriar, SimulacaoResponse
+from services.acesso import AcessoNegadoError
+from services.simulacao import SimulacaoService
+
+
+def _criar(projeto, usuario):
+    simulacoes = [
+        SimulacaoCriar(
+            nome_produto=f"Produto ção {indice}",
+            demanda_anual=1000 + indice,
+            custo_pedido=50,
+            custo_manutencao=2,
+            lote_atual_empresa=None if indice % 2 else 300,
+        )
+        for indice in range(6)
+    ]
+    simulacoes.append(
+        SimulacaoCriar(
+            nome_produto="Com desconto",
+            demanda_anual=1000,
+            custo_pedido=50,
+            custo_manutencao=2,
+            faixas_desconto=[
+                FaixaDesconto(quantidade_minima=0, preco_unitario=10),
+                FaixaDesconto(quantidade_minima=500, preco_unitario=9),
+            ],
+        )
+    )
+    SimulacaoService().criar_simulacoes_lote(simulacoes, projeto, usuario)
+
+
+def test_linhas_com_os_campos_da_simulacao(projeto, usuario):
+    _criar(projeto, usuario)
+    service = SimulacaoService()
+
+    pedacos = list(service.exportar_simulacoes_ndjson(projeto, usuario, 3))
+
+    # 7 linhas em pedaços de até 3, cada um terminado em quebra de linha
+    assert [pedaco.count(b"\n") for pedaco in pedacos] == [3, 3, 1]
+    assert all(pedaco.endswith(b"\n") for pedaco in pedacos)
+
+    objetos = [json.loads(linha) for linha in b"".join(pedacos).splitlines()]
+    assert all(set(objeto) == set(SimulacaoResponse.model_fields) for objeto in objetos)
+
+    listadas = service.listar_simulacoes_projeto(projeto, usuario, limite=100).itens
+    assert [SimulacaoResponse(**objeto) for objeto in objetos] == listadas
+
+    desconto = next(o for o in objetos if o["nome_produto"] == "Com desconto")
+    assert desconto["faixas_desconto"] == [
+        {"quantidade_minima": 0, "preco_unitario": 10},
+        {"quantidade_minima": 500, "preco_unitario": 9},
+    ]
+    assert "Produto ção 1".encode("utf-8") in b"".join(pedacos)
+
+
+def test_projeto_vazio_nao_gera_linhas(projeto, usuario):
+    assert list(SimulacaoService().exportar_simulacoes_ndjson(projeto, usuario)) == []
+
+
+def test_acesso_verificado_antes_da_resposta(projeto, outro_usuario):
+    # O erro vem na chamada, não ao consumir o iterador
+    with pytest.raises(AcessoNegadoError):
+        SimulacaoService().exportar_simulacoes_ndjson(projeto, outro_usuario)
+
+
+def test_rota_envia_ndjson(monkeypatch):
+    from main import app
+    from routes.simulacao import simulacao_service
+    from utils.auth import obter_usuario_atual
+
+    def exportar(id_projeto, id_usuario):
+        assert (id_projeto, id_usuario) == (10, 1)
+        return iter([b'{"id": 2}\n{"id": 1}\n', b'{"id": 0}\n'])
+
+    monkeypatch.setattr(simulacao_service, "exportar_simulacoes_ndjson", exportar)
+    app.dependency_overrides[obter_usuario_atual] = lambda: 1
+    try:
+        resposta = TestClient(app).get("/projetos/10/simulacoes/exportar")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(linha)["id"] for linha in resposta.text.splitlines()] == [
+        2,
+        1,
+        0,
+    ]
@@ -0,0 +1,102 @@
+"""
+Importação de catálogo em CSV (SimulacaoService.importar_csv): linhas
+inválidas são relatadas e ignoradas, e uma linha recusada pelo banco no
+COPY desfaz a importação inteira.
+"""
+
+import io
+
+import psycopg2
+import pytest
+
+from services.simulacao import SimulacaoService
+
+
+def _arquivo(
+    linhas, cabecalho="nome_produto,demanda_anual,custo_pedido,custo_manutencao"
+):
+    return io.BytesIO(("\n".join([cabecalho, *linhas]) + "\n").encode("utf-8"))
+
+
+def _nomes(banco, projeto):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT nome_produto FROM simulacoes WHERE id_projeto = %s"
+                " ORDER BY id",
+                (projeto,),
+            )
+            return [linha[0] for linha in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+def test_linhas_invalidas_sao_relatadas_e_ignoradas(banco, projeto, usuario):
+    arquivo = _arquivo(
+        [
+            "a,1000,50,2",
+            "b,-1,50,2",  # demanda não positiva
+            "",  # linhas vazias não contam
+            "c,1000,50",  # colunas insuficientes
+            "d,mil,50,2",
+            "e,2000,10,1",
+        ]
+    )
+
+    resultado = SimulacaoService().importar_csv(
+        arquivo, projeto, usuario, tamanho_bloco=1
+    )
+
+    assert (resultado.total_linhas, resultado.importadas, resultado.com_erro) == (
+        5,
+        2,
+        3,
+    )
+    assert [erro.linha for erro in resultado.erros] == [3, 5, 6]
+    assert "demanda_anual" in resultado.erros[0].erro
+    assert _nomes(banco, projeto) == ["a", "e"]
+
+
+def test_ponto_e_virgula_com_virgula_decimal(banco, projeto, usuario):
+    arquivo = _arquivo(
+        ["a;1.234,5;50,25;2"],
+        cabecalho="nome_produto;demanda_anual;custo_pedido;custo_manutencao",
+    )
+
+    resultado = SimulacaoService().importar_csv(arquivo, projeto, usuario)
+
+    assert resultado.importadas == 1
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT demanda_anual, custo_pedido FROM simulacoes"
+                " WHERE id_projeto = %s",
+                (projeto,),
+            )
+            assert [float(v) for v in cursor.fetchone()] == [1234.5, 50.25]
+        finally:
+            cursor.close()
+
+
+def test_linha_recusada_pelo_banco_desfaz_a_importacao(banco, projeto, usuario):
+    # 1e9 é válido para o modelo, mas não cabe em NUMERIC(10, 2); com blocos
+    # de 2 linhas os dois primeiros blocos já foram copiados
+    arquivo = _arquivo(
+        ["a,1000,50,2", "b,1000,50,2", "c,1000,50,2", "d,1000,50,2", "e,1e9,50,2"]
+    )
+
+    with pytest.raises(psycopg2.DataError):
+        SimulacaoService().importar_csv(arquivo, projeto, usuario, tamanho_bloco=2)
+
+    assert _nomes(banco, projeto) == []
+
+
+def test_cabecalho_sem_colunas_obrigatorias(banco, projeto, usuario):
+    with pytest.raises(ValueError, match="custo_manutencao"):
+        SimulacaoService().importar_csv(
+            _arquivo(["a,1000,50"], "nome_produto,demanda_anual,custo_pedido"),
+            projeto,
+            usuario,
+        )
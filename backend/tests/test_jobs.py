@@ -0,0 +1,174 @@
+"""
+Jobs de recálculo do projeto (services/job.py): cada pedaço grava as
+simulações e o progresso (ultimo_id) na mesma transação, de modo que um job
+parado ou interrompido é retomado do último pedaço confirmado sem aplicar
+os fatores de custo duas vezes.
+"""
+
+from threading import Event
+
+import pytest
+
+import services.job as modulo_job
+from models.projeto import RecalculoProjetoRequest
+from models.simulacao import SimulacaoCriar
+from services.job import (
+    STATUS_CONCLUIDO,
+    STATUS_ERRO,
+    STATUS_EXECUTANDO,
+    STATUS_PENDENTE,
+    JobService,
+)
+from services.simulacao import SimulacaoService
+
+
+@pytest.fixture
+def simulacoes(projeto, usuario, monkeypatch):
+    """
+    Dez simulações com custo de pedido 50, recalculadas em pedaços de 4.
+    """
+    monkeypatch.setattr(modulo_job, "TAMANHO_PEDACO_RECALCULO", 4)
+    criadas = SimulacaoService().criar_simulacoes_lote(
+        [
+            SimulacaoCriar(
+                nome_produto=f"Produto {indice}",
+                demanda_anual=1000 + indice,
+                custo_pedido=50,
+                custo_manutencao=2,
+                lote_atual_empresa=300,
+            )
+            for indice in range(10)
+        ],
+        projeto,
+        usuario,
+    )
+    return sorted(item.id for item in criadas.simulacoes)
+
+
+def _enfileirar(projeto, usuario):
+    return JobService().enfileirar_recalculo(
+        projeto, usuario, RecalculoProjetoRequest(fator_custo_pedido=2)
+    )
+
+
+def _reivindicar(id_job):
+    job = JobService().reivindicar_job()
+    assert job is not None and job["id"] == id_job
+    return job
+
+
+def _estado(banco, id_job):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT status, processados, ultimo_id, tentativas FROM jobs"
+                " WHERE id = %s",
+                (id_job,),
+            )
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+
+def _custos_pedido(banco, ids):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT custo_pedido FROM simulacoes WHERE id = ANY(%s) ORDER BY id",
+                (ids,),
+            )
+            return [float(linha[0]) for linha in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+def test_job_parado_volta_a_fila_e_continua_do_ultimo_pedaco(
+    banco, projeto, usuario, simulacoes, monkeypatch
+):
+    id_job = _enfileirar(projeto, usuario).id
+    service = JobService()
+    parar = Event()
+    processar_pedaco = service._processar_pedaco
+
+    def parar_depois_do_primeiro(job, ultimo_id):
+        resultado = processar_pedaco(job, ultimo_id)
+        parar.set()
+        return resultado
+
+    monkeypatch.setattr(service, "_processar_pedaco", parar_depois_do_primeiro)
+    assert service.executar_job(_reivindicar(id_job), parar) is None
+
+    # A parada não conta como tentativa
+    assert _estado(banco, id_job) == (STATUS_PENDENTE, 4, simulacoes[3], 0)
+    assert _custos_pedido(banco, simulacoes) == [100] * 4 + [50] * 6
+
+    job = _reivindicar(id_job)
+    assert job["ultimo_id"] == simulacoes[3]
+    assert JobService().executar_job(job) == STATUS_CONCLUIDO
+
+    assert _estado(banco, id_job) == (STATUS_CONCLUIDO, 10, simulacoes[-1], 1)
+    assert _custos_pedido(banco, simulacoes) == [100] * 10
+
+
+def test_job_interrompido_e_retomado_apos_abandono(
+    banco, projeto, usuario, simulacoes, monkeypatch
+):
+    id_job = _enfileirar(projeto, usuario).id
+
+    # O worker confirma um pedaço e para de responder no meio do seguinte
+    job = _reivindicar(id_job)
+    avancou, ultimo_id = JobService()._processar_pedaco(job, job["ultimo_id"])
+    assert (avancou, ultimo_id) == (True, simulacoes[3])
+    assert _estado(banco, id_job)[0] == STATUS_EXECUTANDO
+
+    # Sem sinal de vida além do limite, outro worker assume o job
+    monkeypatch.setattr(modulo_job, "JOB_ABANDONADO_APOS_SEGUNDOS", 0)
+    job = _reivindicar(id_job)
+    assert job["ultimo_id"] == simulacoes[3]
+    assert JobService().executar_job(job) == STATUS_CONCLUIDO
+
+    assert _estado(banco, id_job) == (STATUS_CONCLUIDO, 10, simulacoes[-1], 2)
+    assert _custos_pedido(banco, simulacoes) == [100] * 10
+
+
+def test_pedaco_com_erro_e_desfeito(banco, projeto, usuario, simulacoes):
+    id_job = _enfileirar(projeto, usuario).id
+    service = JobService()
+    recalcular_pedaco = service.simulacao_service.recalcular_pedaco
+    chamadas = []
+
+    def falhar_no_segundo(*args, **kwargs):
+        resultado = recalcular_pedaco(*args, **kwargs)
+        chamadas.append(resultado)
+        if len(chamadas) == 2:
+            raise RuntimeError("falha no meio do pedaço")
+        return resultado
+
+    service.simulacao_service.recalcular_pedaco = falhar_no_segundo
+    assert service.executar_job(_reivindicar(id_job)) == STATUS_ERRO
+
+    # Só o primeiro pedaço, confirmado antes do erro, permanece
+    assert _estado(banco, id_job)[:3] == (STATUS_ERRO, 4, simulacoes[3])
+    assert _custos_pedido(banco, simulacoes) == [100] * 4 + [50] * 6
+
+
+def test_job_que_outro_worker_assumiu_nao_grava(
+    banco, projeto, usuario, simulacoes, monkeypatch
+):
+    id_job = _enfileirar(projeto, usuario).id
+    antigo = _reivindicar(id_job)
+
+    monkeypatch.setattr(modulo_job, "JOB_ABANDONADO_APOS_SEGUNDOS", 0)
+    novo = _reivindicar(id_job)
+    assert JobService()._processar_pedaco(novo, novo["ultimo_id"]) == (
+        True,
+        simulacoes[3],
+    )
+
+    # O worker antigo ainda acha que o job começa do zero: o pedaço dele
+    # é desfeito e ele desiste do job
+    assert JobService().executar_job(antigo) is None
+    assert _custos_pedido(banco, simulacoes) == [100] * 4 + [50] * 6
+    assert _estado(banco, id_job)[:3] == (STATUS_EXECUTANDO, 4, simulacoes[3])
@@ -0,0 +1,187 @@
+"""
+Lote econômico com descontos por quantidade (CalculadoraLoteEconomicoDesconto)
+contra uma busca exaustiva do custo total com a compra, nos modos
+"todas_unidades" e "incremental", e o campo faixas_desconto da API.
+"""
+
+import numpy as np
+import pytest
+
+from utils.lote_economico import (
+    DESCONTO_INCREMENTAL,
+    DESCONTO_TODAS_UNIDADES,
+    CalculadoraLoteEconomicoDesconto,
+)
+
+
+def _custo_exaustivo(lotes, demanda, pedido, manutencao, faixas, tipo):
+    """
+    CT(Q) = D * (compra de Q) / Q + DS/Q + HQ/2, calculado faixa a faixa.
+    Lotes abaixo da primeira faixa não são permitidos (custo infinito).
+    """
+    minimos = np.array([faixa[0] for faixa in faixas])
+    precos = np.array([faixa[1] for faixa in faixas])
+    if tipo == DESCONTO_TODAS_UNIDADES:
+        faixa = np.searchsorted(minimos, lotes, side="right") - 1
+        compra = precos[np.maximum(faixa, 0)] * lotes
+    else:
+        maximos = np.append(minimos[1:], np.inf)
+        unidades = np.clip(lotes[:, np.newaxis] - minimos, 0, maximos - minimos)
+        compra = unidades @ precos
+    custo = demanda * compra / lotes + demanda * pedido / lotes + manutencao * lotes / 2
+    return np.where(lotes >= minimos[0], custo, np.inf)
+
+
+def _minimo_exaustivo(demanda, pedido, manutencao, faixas, tipo):
+    minimos = [faixa[0] for faixa in faixas]
+    inicio = max(minimos[0], 0.01)
+    # No incremental a compra das faixas anteriores age como custo de pedido
+    # adicional, de no máximo (primeiro preço) * (último mínimo)
+    pedido_maximo = pedido + faixas[0][1] * minimos[-1]
+    fim = 4 * max(minimos[-1], np.sqrt(2 * demanda * pedido_maximo / manutencao))
+    lotes = np.concatenate(
+        [np.geomspace(inicio, fim, 400_000), [m for m in minimos if m >= inicio]]
+    )
+    custos = _custo_exaustivo(lotes, demanda, pedido, manutencao, faixas, tipo)
+    return float(custos.min())
+
+
+def _tabela(gerador, tipo, primeiro_minimo):
+    quantidade = int(gerador.integers(1, 5))
+    minimos = [primeiro_minimo]
+    for _ in range(quantidade - 1):
+        minimos.append(round(minimos[-1] + float(gerador.uniform(10, 800)), 2))
+    precos = [round(float(gerador.uniform(5, 50)), 2)]
+    for _ in range(quantidade - 1):
+        precos.append(round(precos[-1] * float(gerador.uniform(0.8, 1.0)), 2))
+    return list(zip(minimos, precos))
+
+
+def _casos(tipo, quantidade, semente):
+    gerador = np.random.default_rng(semente)
+    casos = []
+    for indice in range(quantidade):
+        if tipo == DESCONTO_INCREMENTAL:
+            primeiro = 0.0
+        else:
+            # Metade das tabelas com compra mínima acima de zero
+            primeiro = round(float(gerador.uniform(1, 600)), 2) if indice % 2 else 0.0
+        casos.append(
+            (
+                round(float(gerador.uniform(100, 50_000)), 2),
+                round(float(gerador.uniform(5, 500)), 2),
+                round(float(gerador.uniform(0.1, 20)), 2),
+                _tabela(gerador, tipo, primeiro),
+            )
+        )
+    return casos
+
+
+@pytest.mark.parametrize(
+    "tipo, semente",
+    [(DESCONTO_TODAS_UNIDADES, 1), (DESCONTO_INCREMENTAL, 2)],
+)
+def test_lote_otimo_confere_com_busca_exaustiva(tipo, semente):
+    casos = _casos(tipo, 40, semente)
+    calculadora = CalculadoraLoteEconomicoDesconto(
+        [caso[0] for caso in casos],
+        [caso[1] for caso in casos],
+        [caso[2] for caso in casos],
+        [caso[3] for caso in casos],
+        tipo,
+    )
+    lotes = calculadora.calcular_lote_otimo()
+    custos = calculadora.calcular_custo_total(lotes)
+
+    for (demanda, pedido, manutencao, faixas), lote, custo in zip(casos, lotes, custos):
+        exaustivo = _minimo_exaustivo(demanda, pedido, manutencao, faixas, tipo)
+        no_lote = _custo_exaustivo(
+            np.array([lote]), demanda, pedido, manutencao, faixas, tipo
+        )[0]
+
+        assert lote >= faixas[0][0]
+        assert no_lote == pytest.approx(exaustivo, rel=1e-6), (faixas, lote)
+        assert custo == pytest.approx(no_lote, abs=0.005)
+
+
+@pytest.mark.parametrize("tipo", [DESCONTO_TODAS_UNIDADES, DESCONTO_INCREMENTAL])
+def test_produtos_com_e_sem_tabela_e_tipos_misturados(tipo):
+    faixas = [(0.0, 10.0), (500.0, 9.0), (2000.0, 8.5)]
+    calculadora = CalculadoraLoteEconomicoDesconto(
+        [12_000, 12_000],
+        [80, 80],
+        [2.5, 2.5],
+        [faixas, None],
+        [tipo, DESCONTO_TODAS_UNIDADES],
+    )
+    lotes = calculadora.calcular_lote_otimo()
+
+    exaustivo = _minimo_exaustivo(12_000, 80, 2.5, faixas, tipo)
+    no_lote = _custo_exaustivo(np.array([lotes[0]]), 12_000, 80, 2.5, faixas, tipo)
+    assert no_lote[0] == pytest.approx(exaustivo, rel=1e-6)
+    # Sem tabela: LEC clássico
+    assert lotes[1] == round(np.sqrt(2 * 12_000 * 80 / 2.5), 2)
+
+
+def test_primeira_faixa_acima_de_zero_e_lote_minimo():
+    # O LEC (~98) fica abaixo da compra mínima de 1000 unidades
+    calculadora = CalculadoraLoteEconomicoDesconto(
+        [1200], [20], [5], [[(1000.0, 4.0), (3000.0, 3.9)]]
+    )
+
+    assert calculadora.calcular_lote_otimo()[0] == 1000.0
+
+
+@pytest.mark.parametrize(
+    "faixas, tipo, mensagem",
+    [
+        ([(100.0, 5.0), (100.0, 4.0)], DESCONTO_TODAS_UNIDADES, "crescentes"),
+        ([(0.0, 5.0), (100.0, 6.0)], DESCONTO_TODAS_UNIDADES, "aumentar"),
+        ([(10.0, 5.0), (100.0, 4.0)], DESCONTO_INCREMENTAL, "começar em 0"),
+        ([(0.0, -1.0)], DESCONTO_TODAS_UNIDADES, "negativos"),
+    ],
+)
+def test_tabelas_invalidas(faixas, tipo, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        CalculadoraLoteEconomicoDesconto([1000], [50], [2], [faixas], tipo)
+
+
+def test_faixas_desconto_na_simulacao(projeto, usuario):
+    from models.simulacao import FaixaDesconto, SimulacaoCriar
+    from services.simulacao import SimulacaoService
+
+    faixas = [(2000.0, 8.5), (0.0, 10.0), (500.0, 9.0)]
+    service = SimulacaoService()
+    criada = service.criar_simulacao(
+        SimulacaoCriar(
+            nome_produto="Com desconto",
+            demanda_anual=12_000,
+            custo_pedido=80,
+            custo_manutencao=2.5,
+            faixas_desconto=[
+                FaixaDesconto(quantidade_minima=m, preco_unitario=p) for m, p in faixas
+            ],
+            tipo_desconto=DESCONTO_INCREMENTAL,
+        ),
+        projeto,
+        usuario,
+    )
+    lida = service.obter_simulacao(criada.id, projeto, usuario)
+
+    ordenadas = sorted(faixas)
+    assert [
+        (f.quantidade_minima, f.preco_unitario) for f in lida.faixas_desconto
+    ] == ordenadas
+    assert lida.tipo_desconto == DESCONTO_INCREMENTAL
+    no_lote = _custo_exaustivo(
+        np.array([lida.lote_otimo_calculado]),
+        12_000,
+        80,
+        2.5,
+        ordenadas,
+        DESCONTO_INCREMENTAL,
+    )[0]
+    assert no_lote == pytest.approx(
+        _minimo_exaustivo(12_000, 80, 2.5, ordenadas, DESCONTO_INCREMENTAL), rel=1e-6
+    )
+    assert float(lida.custo_total_otimo) == pytest.approx(no_lote, abs=0.01)
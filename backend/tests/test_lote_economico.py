@@ -0,0 +1,157 @@
+"""
+Paridade entre os modos numérico (forma fechada) e simbólico (SymPy) de
+CalculadoraLoteEconomico e entre o cálculo individual e o vetorizado
+(CalculadoraLoteEconomicoLote): os campos arredondados de
+gerar_analise_completa devem ser iguais.
+"""
+
+import numpy as np
+import pytest
+
+from utils.lote_economico import (
+    LOTE_MINIMO,
+    MODO_NUMERICO,
+    MODO_SIMBOLICO,
+    CalculadoraLoteEconomico,
+    CalculadoraLoteEconomicoLote,
+)
+
+CAMPOS = (
+    "lote_otimo_calculado",
+    "custo_total_otimo",
+    "lote_atual_empresa",
+    "custo_total_atual",
+    "economia_anual",
+    "percentual_economia",
+)
+
+
+def _parametros_modelo(modelo, demanda, manutencao):
+    if modelo == "lep":
+        return {"taxa_producao": round(demanda * 1.7 + 0.01, 2)}
+    if modelo == "lec_faltas":
+        return {"custo_falta_anual": round(manutencao * 3 + 0.01, 2)}
+    return {}
+
+
+def _analise(modo, demanda, pedido, manutencao, lote_atual, modelo):
+    return CalculadoraLoteEconomico(
+        demanda,
+        pedido,
+        manutencao,
+        lote_atual,
+        modo=modo,
+        modelo=modelo,
+        parametros_modelo=_parametros_modelo(modelo, demanda, manutencao),
+    ).gerar_analise_completa(incluir_expressoes=False)
+
+
+def _casos_aleatorios(quantidade, semente):
+    gerador = np.random.default_rng(semente)
+
+    def valor(minimo, maximo):
+        return max(
+            round(float(np.exp(gerador.uniform(np.log(minimo), np.log(maximo)))), 2),
+            0.01,
+        )
+
+    for _ in range(quantidade):
+        lote_atual = gerador.choice([None, 0, valor(1, 1e5)])
+        yield valor(0.01, 1e9), valor(0.01, 1e6), valor(0.01, 1e4), lote_atual
+
+
+def _casos_empate():
+    # Q* = sqrt(2DS/H) sobre um empate da 3ª casa (D = Q² H / 2S)
+    for lote in (0.015, 1.005, 12.345, 2.675, 1234.565, 98765.435):
+        yield lote**2, 1.0, 2.0, None
+    # Custos sobre um empate: CT(1) = H/2 + SD
+    yield 1.0, 1.0, 0.01, 1.0
+    yield 2.0, 0.5, 0.03, 1.0
+    yield 1000.0, 50.0, 2.0, 1000.005
+
+
+CASOS_BORDA = [
+    # Valores mínimos e lote ótimo que arredondaria para zero
+    (0.01, 0.01, 0.01, 0.01),
+    (0.01, 0.01, 1e4, 5.0),
+    (0.01, 0.01, 1e4, None),
+    # Valores enormes
+    (1e9, 1e6, 0.01, 1e5),
+    (1e9, 1e6, 1e4, 0),
+    (1e12, 0.01, 0.01, 1.0),
+    # Sem lote atual (None e zero)
+    (1000.0, 50.0, 2.0, None),
+    (1000.0, 50.0, 2.0, 0),
+    (1000.0, 50.0, 2.0, 0.0),
+]
+
+CASOS = list(_casos_aleatorios(40, semente=1)) + list(_casos_empate()) + CASOS_BORDA
+
+
+@pytest.mark.parametrize("modelo", ["lec", "lep", "lec_faltas"])
+@pytest.mark.parametrize("demanda, pedido, manutencao, lote_atual", CASOS)
+def test_modos_numerico_e_simbolico_iguais(
+    demanda, pedido, manutencao, lote_atual, modelo
+):
+    numerico = _analise(MODO_NUMERICO, demanda, pedido, manutencao, lote_atual, modelo)
+    simbolico = _analise(
+        MODO_SIMBOLICO, demanda, pedido, manutencao, lote_atual, modelo
+    )
+
+    assert {campo: numerico[campo] for campo in CAMPOS} == {
+        campo: simbolico[campo] for campo in CAMPOS
+    }
+
+
+@pytest.mark.parametrize("lote_atual", [None, 0, 0.0])
+def test_sem_lote_atual_nao_compara(lote_atual):
+    analise = _analise(MODO_NUMERICO, 1000.0, 50.0, 2.0, lote_atual, "lec")
+
+    assert analise["lote_atual_empresa"] is None
+    assert analise["custo_total_atual"] is None
+    assert analise["economia_anual"] is None
+    assert analise["percentual_economia"] is None
+
+
+@pytest.mark.parametrize("modo", [MODO_NUMERICO, MODO_SIMBOLICO])
+def test_lote_otimo_nunca_abaixo_do_minimo(modo):
+    analise = _analise(modo, 0.01, 0.01, 1e4, 5.0, "lec")
+
+    assert analise["lote_otimo_calculado"] == LOTE_MINIMO
+    assert np.isfinite(analise["custo_total_otimo"])
+
+
+def _analise_lote(casos, modelos):
+    parametros = [
+        _parametros_modelo(modelo, demanda, manutencao)
+        for (demanda, _, manutencao, _), modelo in zip(casos, modelos)
+    ]
+    demanda, pedido, manutencao, lote_atual = zip(*casos)
+    return CalculadoraLoteEconomicoLote(
+        demanda,
+        pedido,
+        manutencao,
+        list(lote_atual),
+        modelo=modelos,
+        parametros_modelo={
+            nome: [p.get(nome) for p in parametros]
+            for nome in ("taxa_producao", "custo_falta_anual")
+        },
+    ).gerar_registros()
+
+
+@pytest.mark.parametrize("modelo", ["lec", "lep", "lec_faltas", "misto"])
+def test_lote_igual_ao_calculo_individual(modelo):
+    if modelo == "misto":
+        modelos = [("lec", "lep", "lec_faltas")[i % 3] for i in range(len(CASOS))]
+    else:
+        modelos = [modelo] * len(CASOS)
+
+    registros = _analise_lote(CASOS, modelos)
+
+    assert len(registros) == len(CASOS)
+    for caso, modelo_caso, registro in zip(CASOS, modelos, registros):
+        individual = _analise(MODO_NUMERICO, *caso, modelo_caso)
+        assert {campo: registro[campo] for campo in CAMPOS} == {
+            campo: individual[campo] for campo in CAMPOS
+        }, (caso, modelo_caso)
@@ -0,0 +1,141 @@
+"""
+Lotes restritos (CalculadoraLoteEconomicoRestrito) contra uma busca exaustiva
+sobre as restrições ativas, com uma e com as duas restrições, e limites que
+não comportam o lote mínimo.
+"""
+
+import numpy as np
+import pytest
+
+from utils.lote_economico import LOTE_MINIMO
+from utils.lote_restrito import CalculadoraLoteEconomicoRestrito
+
+DEMANDA = np.array([1000.0, 800.0, 1200.0])
+PEDIDO = np.array([50.0, 40.0, 60.0])
+MANUTENCAO = np.array([2.0, 1.5, 3.0])
+VOLUME = np.array([1.0, 3.0, 1.0])
+CUSTO = np.array([4.0, 1.0, 1.0])
+
+
+def _calculadora():
+    return CalculadoraLoteEconomicoRestrito(
+        DEMANDA,
+        PEDIDO,
+        MANUTENCAO,
+        volume_unitario=VOLUME,
+        custo_unitario=CUSTO,
+    )
+
+
+def _custo(lotes):
+    """
+    Custo total dos itens para lotes com uma linha por candidato.
+    """
+    return np.sum(DEMANDA * PEDIDO / lotes + MANUTENCAO * lotes / 2, axis=-1)
+
+
+def _minimo_exaustivo(candidatos):
+    candidatos = candidatos[np.all(candidatos >= LOTE_MINIMO, axis=1)]
+    custos = _custo(candidatos)
+    return candidatos[np.argmin(custos)], float(custos.min())
+
+
+def test_uma_restricao_ativa_confere_com_busca_exaustiva():
+    capacidade = 500.0
+    resultado = _calculadora().otimizar(capacidade=capacidade)
+
+    # Com a capacidade ativa: Q3 = capacidade - Q1 - 3 Q2
+    q1, q2 = np.meshgrid(
+        np.linspace(0.01, 500, 2001), np.linspace(0.01, 170, 2001), indexing="ij"
+    )
+    q1, q2 = q1.ravel(), q2.ravel()
+    candidatos = np.column_stack([q1, q2, capacidade - q1 - 3 * q2])
+    lotes, custo = _minimo_exaustivo(candidatos)
+
+    assert resultado["multiplicador_capacidade"] > 0
+    assert resultado["uso_capacidade"] <= capacidade
+    np.testing.assert_allclose(resultado["lote_restrito"], lotes, atol=0.3)
+    assert float(_custo(resultado["lote_restrito"])) == pytest.approx(custo, rel=1e-4)
+
+
+def test_duas_restricoes_ativas_conferem_com_busca_exaustiva():
+    capacidade, orcamento = 600.0, 700.0
+    resultado = _calculadora().otimizar(capacidade=capacidade, orcamento=orcamento)
+
+    # Com as duas ativas resta um grau de liberdade: Q2 e Q3 saem de Q1
+    q1 = np.linspace(0.01, 175, 200_001)
+    matriz = np.array([VOLUME[1:], CUSTO[1:]])
+    restantes = np.linalg.solve(
+        matriz,
+        np.array([capacidade - VOLUME[0] * q1, orcamento - CUSTO[0] * q1]),
+    )
+    lotes, custo = _minimo_exaustivo(np.column_stack([q1, restantes.T]))
+
+    assert resultado["multiplicador_capacidade"] > 0
+    assert resultado["multiplicador_orcamento"] > 0
+    assert capacidade - 0.1 <= resultado["uso_capacidade"] <= capacidade
+    assert orcamento - 0.1 <= resultado["uso_orcamento"] <= orcamento
+    np.testing.assert_allclose(resultado["lote_restrito"], lotes, atol=0.02)
+    # Os lotes arredondados para baixo custam um pouco mais que o ótimo exato
+    assert float(_custo(resultado["lote_restrito"])) == pytest.approx(custo, rel=1e-4)
+
+
+@pytest.mark.parametrize(
+    "capacidade, orcamento, ativa",
+    [(500.0, 900.0, "capacidade"), (800.0, 600.0, "orcamento")],
+)
+def test_so_uma_das_duas_restricoes_ativa(capacidade, orcamento, ativa):
+    resultado = _calculadora().otimizar(capacidade=capacidade, orcamento=orcamento)
+
+    inativa = "orcamento" if ativa == "capacidade" else "capacidade"
+    assert resultado[f"multiplicador_{ativa}"] > 0
+    assert resultado[f"multiplicador_{inativa}"] == 0
+    assert resultado["uso_capacidade"] <= capacidade
+    assert resultado["uso_orcamento"] <= orcamento
+
+
+def test_restricoes_folgadas_mantem_o_lote_irrestrito():
+    resultado = _calculadora().otimizar(capacidade=1e6, orcamento=1e6)
+
+    assert resultado["multiplicador_capacidade"] == 0
+    assert resultado["multiplicador_orcamento"] == 0
+    np.testing.assert_array_equal(
+        resultado["lote_restrito"], resultado["lote_irrestrito"]
+    )
+
+
+@pytest.mark.parametrize(
+    "limites",
+    [
+        {"capacidade": 0.005},
+        {"orcamento": 0.05},
+        {"capacidade": 1000.0, "orcamento": 0.05},
+    ],
+)
+def test_limite_abaixo_do_lote_minimo_e_inviavel(limites):
+    with pytest.raises(ValueError, match="lote mínimo"):
+        _calculadora().otimizar(**limites)
+
+
+def test_limite_apertado_fica_no_lote_minimo():
+    # Uso com todos os lotes no mínimo: 0.05 de capacidade
+    resultado = _calculadora().otimizar(capacidade=0.05)
+
+    np.testing.assert_array_equal(resultado["lote_restrito"], LOTE_MINIMO)
+    assert np.all(np.isfinite(resultado["custo_total_restrito"]))
+    assert resultado["uso_capacidade"] == pytest.approx(0.05)
+
+
+def test_item_pequeno_fica_no_lote_minimo_e_os_demais_ajustam():
+    calculadora = CalculadoraLoteEconomicoRestrito(
+        [1000, 500, 1e-4],
+        [50, 20, 0.01],
+        [2, 1, 100],
+        volume_unitario=[1, 1, 1],
+    )
+    resultado = calculadora.otimizar(capacidade=0.5)
+
+    assert resultado["lote_restrito"][2] == LOTE_MINIMO
+    assert np.all(resultado["lote_restrito"] >= LOTE_MINIMO)
+    assert np.all(np.isfinite(resultado["custo_total_restrito"]))
+    assert resultado["uso_capacidade"] <= 0.5
@@ -0,0 +1,84 @@
+"""
+Paridade do lote econômico calculado em SQL (utils/lote_sql.py) com o da
+CalculadoraLoteEconomicoLote: os resultados devem ser iguais bit a bit.
+"""
+
+import pytest
+
+from models.simulacao import SimulacaoCriar
+from services.simulacao import SimulacaoService
+from utils.lote_sql import COLUNAS_ORIGEM, consulta_analise, simulacoes_aleatorias
+
+
+@pytest.mark.parametrize("semente", [1, 2, 3])
+def test_consulta_analise_igual_a_calculadora(banco, semente):
+    relatorio = SimulacaoService().verificar_recalculo_sql(50_000, semente)
+
+    assert relatorio["linhas"] == 50_000
+    for coluna, resultado in relatorio["colunas"].items():
+        assert resultado["divergencias"] == 0, (coluna, resultado)
+
+
+def test_consulta_analise_sem_lote_atual(banco):
+    dados = simulacoes_aleatorias(200, semente=4)
+    dados["lote_atual_empresa"] = [None] * 100 + [0.0] * 100
+    origem = (
+        "SELECT * FROM unnest("
+        + ", ".join(
+            (
+                "%s::int[]"
+                if coluna == "id"
+                else "%s::text[]" if coluna == "modelo" else "%s::numeric[]"
+            )
+            for coluna in COLUNAS_ORIGEM
+        )
+        + f") AS o ({', '.join(COLUNAS_ORIGEM)})"
+    )
+
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"""
+                SELECT lote_otimo_calculado, custo_total_atual, economia_anual
+                FROM ({consulta_analise(origem)}) c
+                """,
+                [dados[coluna] for coluna in COLUNAS_ORIGEM],
+            )
+            linhas = cursor.fetchall()
+        finally:
+            cursor.close()
+
+    assert len(linhas) == 200
+    assert all(lote is not None for lote, _, _ in linhas)
+    assert all(atual is None and economia is None for _, atual, economia in linhas)
+
+
+def test_recalculo_por_prefixo_trata_curingas_como_texto(projeto, usuario):
+    service = SimulacaoService()
+    criadas = service.criar_simulacoes_lote(
+        [
+            SimulacaoCriar(
+                nome_produto=nome,
+                demanda_anual=1000,
+                custo_pedido=50,
+                custo_manutencao=2,
+            )
+            for nome in ("50% off", "50 reais", "500")
+        ],
+        projeto,
+        usuario,
+    )
+
+    resultado = service.recalcular_projeto_sql(
+        projeto, custo_pedido=80, nome_prefixo="50%"
+    )
+
+    assert resultado["recalculadas_sql"] + resultado["recalculadas_python"] == 1
+    custos = {
+        item.nome_produto: service.obter_simulacao(
+            item.id, projeto, usuario
+        ).custo_pedido
+        for item in criadas.simulacoes
+    }
+    assert custos == {"50% off": 80, "50 reais": 50, "500": 50}
@@ -0,0 +1,34 @@
+"""
+Migrações aplicadas em um banco de teste e planos das listagens: com os
+índices das migrações, as consultas de CONSULTAS_INDEXADAS não fazem Seq
+Scan.
+"""
+
+import pytest
+
+from Connections.migracoes import (
+    CONSULTAS_INDEXADAS,
+    listar_migracoes,
+    verificar_indices,
+    versoes_aplicadas,
+)
+
+
+def test_todas_as_migracoes_aplicadas(banco):
+    aplicadas = versoes_aplicadas(banco)
+
+    assert [m.versao for m in listar_migracoes()] == sorted(aplicadas)
+
+
+@pytest.fixture(scope="module")
+def planos(banco):
+    return verificar_indices(linhas=50_000, db=banco)
+
+
+@pytest.mark.parametrize("consulta", sorted(CONSULTAS_INDEXADAS))
+def test_listagem_usa_o_indice(planos, consulta):
+    plano = planos[consulta]
+
+    assert plano["indice_esperado"] in plano["indices_usados"], plano
+    assert plano["seq_scans"] == [], plano
+    assert plano["aprovado"]
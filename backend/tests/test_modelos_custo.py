@@ -0,0 +1,85 @@
+"""
+As formas fechadas dos modelos de custo registrados conferem com a
+expressão simbólica de cada modelo.
+"""
+
+import numpy as np
+import pytest
+import sympy as sp
+
+from utils.modelos_custo import (
+    MODELOS_CUSTO,
+    D,
+    H,
+    ModeloLEC,
+    ModeloManutencaoEquivalente,
+    Q,
+    S,
+    registrar_modelo,
+)
+
+
+def _valores(modelo, gerador, tamanho):
+    demanda = gerador.uniform(10, 1e5, tamanho)
+    extras = {}
+    for nome in modelo.parametros:
+        if nome == "taxa_producao":
+            extras[nome] = demanda * gerador.uniform(1.01, 10, tamanho)
+        else:
+            extras[nome] = gerador.uniform(0.1, 500, tamanho)
+    return (
+        demanda,
+        gerador.uniform(1, 5000, tamanho),
+        gerador.uniform(0.1, 500, tamanho),
+        extras,
+    )
+
+
+@pytest.mark.parametrize("nome", sorted(MODELOS_CUSTO))
+def test_forma_fechada_confere_com_expressao(nome):
+    modelo = MODELOS_CUSTO[nome]
+    custo = modelo.expressao_custo()
+    argumentos = (Q,) + modelo.simbolos
+    custo_simbolico = sp.lambdify(argumentos, custo, "numpy")
+    derivada = sp.lambdify(argumentos, sp.diff(custo, Q), "numpy")
+    segunda = sp.lambdify(argumentos, sp.diff(custo, Q, 2), "numpy")
+
+    demanda, pedido, manutencao, extras = _valores(
+        modelo, np.random.default_rng(21), 500
+    )
+    adicionais = [extras[nome] for nome in modelo.parametros]
+    lote = modelo.lote_otimo(demanda, pedido, manutencao, **extras)
+
+    np.testing.assert_allclose(
+        modelo.custo_total(lote, demanda, pedido, manutencao, **extras),
+        custo_simbolico(lote, demanda, pedido, manutencao, *adicionais),
+        rtol=1e-10,
+    )
+    np.testing.assert_allclose(
+        modelo.segunda_derivada(lote, demanda, pedido, manutencao, **extras),
+        segunda(lote, demanda, pedido, manutencao, *adicionais),
+        rtol=1e-10,
+    )
+    # O lote ótimo anula a derivada (relativa ao custo por unidade de lote)
+    inclinacao = derivada(lote, demanda, pedido, manutencao, *adicionais)
+    escala = custo_simbolico(lote, demanda, pedido, manutencao, *adicionais) / lote
+    assert np.all(np.abs(inclinacao / escala) < 1e-10)
+
+
+def test_modelo_incompleto_falha_no_registro():
+    class ModeloSemCusto(ModeloManutencaoEquivalente):
+        nome = "sem_custo"
+
+        def expressao_custo(self):
+            return (H * Q) / 2 + (S * D) / Q
+
+    with pytest.raises(TypeError):
+        registrar_modelo(ModeloSemCusto)
+    assert "sem_custo" not in MODELOS_CUSTO
+
+
+def test_parametros_dos_modelos_sao_imutaveis():
+    for modelo in MODELOS_CUSTO.values():
+        with pytest.raises(TypeError):
+            modelo.parametros["novo"] = Q
+    assert dict(ModeloLEC.parametros) == {}
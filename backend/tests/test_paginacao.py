@@ -0,0 +1,230 @@
+"""
+Paginação por cursor (utils/paginacao.py): cursor opaco, condição keyset
+por coluna de ordenação (com empates e nulos no fim) e o padrão LIKE dos
+filtros por prefixo.
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from utils.paginacao import (
+    ColunaOrdenacao,
+    codificar_cursor,
+    condicao_keyset,
+    decodificar_cursor,
+    escapar_prefixo_like,
+    ordenacao_keyset,
+)
+
+
+@pytest.mark.parametrize(
+    "valor, esperado",
+    [
+        (datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc), None),
+        (Decimal("1234.50"), "1234.50"),
+        ("Produto ção", "Produto ção"),
+        (None, None),
+        (12.5, "12.5"),
+    ],
+)
+def test_cursor_ida_e_volta(valor, esperado):
+    cursor = codificar_cursor("economia_anual", "desc", valor, 42)
+
+    assert "=" not in cursor
+    if isinstance(valor, datetime):
+        esperado = valor.isoformat()
+    assert decodificar_cursor(cursor, "economia_anual", "desc") == (esperado, 42)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "não é base64!",
+        "e30",  # {} sem as chaves
+        "bm90IGpzb24",  # "not json"
+        codificar_cursor("nome_produto", "asc", "a", 1)[:-3],  # truncado
+        codificar_cursor("nome_produto", "asc", "a", 1).replace("i", "x"),
+    ],
+)
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError, match="inválido"):
+        decodificar_cursor(cursor, "nome_produto", "asc")
+
+
+def test_cursor_com_id_adulterado():
+    import base64
+    import json
+
+    texto = json.dumps({"o": "nome_produto", "d": "asc", "v": "a", "i": "1; --"})
+    cursor = base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+    with pytest.raises(ValueError, match="inválido"):
+        decodificar_cursor(cursor, "nome_produto", "asc")
+
+
+@pytest.mark.parametrize(
+    "ordenar_por, ordem", [("data_simulacao", "asc"), ("nome_produto", "desc")]
+)
+def test_cursor_de_outra_ordenacao(ordenar_por, ordem):
+    cursor = codificar_cursor("nome_produto", "asc", "a", 1)
+
+    with pytest.raises(ValueError, match="outra ordenação"):
+        decodificar_cursor(cursor, ordenar_por, ordem)
+
+
+@pytest.mark.parametrize(
+    "cursor", ["%%%", "e30", codificar_cursor("nome_produto", "asc", "a", 1)]
+)
+def test_cursor_invalido_na_rota_responde_400(cursor):
+    from main import app
+    from utils.auth import obter_usuario_atual
+
+    app.dependency_overrides[obter_usuario_atual] = lambda: 1
+    try:
+        resposta = TestClient(app).get(
+            "/projetos/1/simulacoes/", params={"cursor": cursor}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resposta.status_code == 400
+    assert "cursor" in resposta.json()["detail"].lower()
+
+
+def test_condicao_keyset_coluna_obrigatoria():
+    coluna = ColunaOrdenacao("s.nome_produto")
+
+    assert condicao_keyset(coluna, "s.id", "desc", "b", 7) == (
+        "(s.nome_produto, s.id) < (%s, %s)",
+        ["b", 7],
+    )
+    assert condicao_keyset(coluna, "s.id", "asc", "b", 7)[0] == (
+        "(s.nome_produto, s.id) > (%s, %s)"
+    )
+    assert ordenacao_keyset(coluna, "s.id", "asc") == "s.nome_produto ASC, s.id ASC"
+
+
+def test_condicao_keyset_coluna_anulavel():
+    coluna = ColunaOrdenacao("s.economia_anual", anulavel=True)
+
+    sql, parametros = condicao_keyset(coluna, "s.id", "asc", "10.5", 3)
+    # Depois de um valor: maiores, empates com id maior e todos os nulos
+    assert sql == (
+        "(s.economia_anual > %s OR (s.economia_anual = %s AND s.id > %s)"
+        " OR s.economia_anual IS NULL)"
+    )
+    assert parametros == ["10.5", "10.5", 3]
+
+    # Depois de um nulo: só os nulos seguintes, pelo id
+    assert condicao_keyset(coluna, "s.id", "desc", None, 3) == (
+        "(s.economia_anual IS NULL AND s.id < %s)",
+        [3],
+    )
+    assert ordenacao_keyset(coluna, "s.id", "desc") == (
+        "s.economia_anual DESC NULLS LAST, s.id DESC"
+    )
+
+
+@pytest.mark.parametrize(
+    "prefixo, padrao",
+    [
+        ("Produto", "Produto%"),
+        ("50%", "50\\%%"),
+        ("a_b", "a\\_b%"),
+        ("c:\\dir", "c:\\\\dir%"),
+        ("\\%_", "\\\\\\%\\_%"),
+        ("", "%"),
+    ],
+)
+def test_escapar_prefixo_like(prefixo, padrao):
+    assert escapar_prefixo_like(prefixo) == padrao
+
+
+def _criar_simulacoes(projeto, usuario, nomes_e_lotes):
+    from models.simulacao import SimulacaoCriar
+    from services.simulacao import SimulacaoService
+
+    SimulacaoService().criar_simulacoes_lote(
+        [
+            SimulacaoCriar(
+                nome_produto=nome,
+                demanda_anual=1000,
+                custo_pedido=50,
+                custo_manutencao=2,
+                lote_atual_empresa=lote,
+            )
+            for nome, lote in nomes_e_lotes
+        ],
+        projeto,
+        usuario,
+    )
+
+
+def _todas_as_paginas(projeto, usuario, limite, **filtros):
+    from services.simulacao import SimulacaoService
+
+    service = SimulacaoService()
+    itens, cursor = [], None
+    while True:
+        pagina = service.listar_simulacoes_projeto(
+            projeto, usuario, limite=limite, cursor_pagina=cursor, **filtros
+        )
+        itens.extend(pagina.itens)
+        cursor = pagina.proximo_cursor
+        if cursor is None:
+            return itens
+
+
+def _ordem_esperada(itens, ordenar_por, ordem):
+    reverso = ordem == "desc"
+    com_valor = [s for s in itens if getattr(s, ordenar_por) is not None]
+    nulos = [s for s in itens if getattr(s, ordenar_por) is None]
+    esperado = sorted(
+        com_valor, key=lambda s: (getattr(s, ordenar_por), s.id), reverse=reverso
+    )
+    return esperado + sorted(nulos, key=lambda s: s.id, reverse=reverso)
+
+
+@pytest.mark.parametrize(
+    "ordenar_por", ["data_simulacao", "nome_produto", "economia_anual"]
+)
+@pytest.mark.parametrize("ordem", ["asc", "desc"])
+def test_paginas_percorrem_a_ordenacao_com_empates_e_nulos(
+    projeto, usuario, ordenar_por, ordem
+):
+    # Nomes e lotes repetidos (empates), sem lote atual (economia nula) e
+    # o mesmo data_simulacao em cada lote de criação
+    _criar_simulacoes(
+        projeto,
+        usuario,
+        [("b", 300), ("a", 300), ("a", None), ("c", 500), ("a", 300), ("b", None)],
+    )
+    _criar_simulacoes(projeto, usuario, [("a", 500), ("c", None), ("b", 300)])
+
+    for limite in (1, 2, 4):
+        itens = _todas_as_paginas(
+            projeto, usuario, limite, ordenar_por=ordenar_por, ordem=ordem
+        )
+        assert len(itens) == 9
+        assert [s.id for s in itens] == [
+            s.id for s in _ordem_esperada(itens, ordenar_por, ordem)
+        ]
+
+
+def test_filtro_por_prefixo_trata_curingas_como_texto(projeto, usuario):
+    _criar_simulacoes(
+        projeto,
+        usuario,
+        [("50% off", 300), ("50 reais", 300), ("a_b", 300), ("axb", 300)],
+    )
+
+    nomes = lambda prefixo: sorted(  # noqa: E731
+        s.nome_produto
+        for s in _todas_as_paginas(projeto, usuario, 10, nome_prefixo=prefixo)
+    )
+    assert nomes("50%") == ["50% off"]
+    assert nomes("a_") == ["a_b"]
+    assert nomes("50") == ["50 reais", "50% off"]
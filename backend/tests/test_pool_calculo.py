@@ -0,0 +1,85 @@
+"""
+Pool de processos dos cálculos pesados (utils/pool_calculo.py): tarefas
+pequenas ou sem pool rodam na thread atual, as demais em outro processo,
+com tempo limite e recriação do pool quando um processo morre.
+"""
+
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from utils.pool_calculo import PoolCalculo, TempoCalculoEsgotadoError
+
+
+def _pid(*_):
+    return os.getpid()
+
+
+def _dormir(segundos):
+    time.sleep(segundos)
+    return segundos
+
+
+def _falhar(mensagem):
+    raise ValueError(mensagem)
+
+
+def _morrer():
+    os._exit(1)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = PoolCalculo(max_processos=2, timeout_segundos=30, limite_inline=100)
+    pool.iniciar()
+    yield pool
+    pool.encerrar()
+
+
+def test_sem_pool_roda_na_thread_atual():
+    pool = PoolCalculo(max_processos=2, limite_inline=100)
+
+    assert not pool.ativo
+    assert pool.executar(_pid, custo=10**9) == os.getpid()
+
+
+def test_pool_desativado_nao_cria_processos():
+    pool = PoolCalculo(max_processos=0, limite_inline=100)
+
+    pool.iniciar()
+
+    assert not pool.ativo
+    assert pool.executar(_pid, custo=10**9) == os.getpid()
+
+
+def test_tarefa_pequena_fica_na_thread_e_grande_vai_ao_pool(pool):
+    assert pool.ativo
+    assert pool.executar(_pid, custo=99) == os.getpid()
+    assert pool.executar(_pid, custo=100) != os.getpid()
+
+
+def test_erro_da_tarefa_chega_a_quem_chamou(pool):
+    with pytest.raises(ValueError, match="cálculo inválido"):
+        pool.executar(_falhar, "cálculo inválido", custo=100)
+
+
+def test_tempo_limite(pool):
+    inicio = time.perf_counter()
+
+    with pytest.raises(TempoCalculoEsgotadoError) as erro:
+        pool.executar(_dormir, 2, custo=100, timeout_segundos=0.2)
+
+    assert erro.value.timeout_segundos == 0.2
+    assert time.perf_counter() - inicio < 1.5
+    # O outro processo continua atendendo enquanto o primeiro termina
+    assert pool.executar(_dormir, 0.01, custo=100) == 0.01
+
+
+def test_processo_morto_recria_o_pool(pool):
+    with pytest.raises(BrokenProcessPool):
+        pool.executar(_morrer, custo=100)
+
+    assert pool.ativo
+    assert pool.executar(_pid, custo=100) != os.getpid()
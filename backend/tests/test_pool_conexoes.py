@@ -0,0 +1,244 @@
+"""
+Comportamento de _PoolConexoes com conexões falsas no lugar do psycopg2:
+espera com timeout, pre-ping, reciclagem, rollback na devolução e
+devolução da conexão quando a operação levanta uma exceção. Com um
+PostgreSQL local (fixture ``banco``), a vazão de operações presas ao banco
+cresce com o tamanho do pool.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+import pytest
+
+from Connections.postgre import _PoolConexoes, postgreConnection
+
+
+class _CursorFalso:
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+    def execute(self, sql, parametros=None):
+        if self.conexao.morta:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.conexao.info.transaction_status = (
+            psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        )
+
+
+class _ConexaoFalsa:
+    def __init__(self):
+        self.closed = 0
+        self.morta = False
+        self.rollbacks = 0
+        self.info = SimpleNamespace(
+            transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+
+    def cursor(self):
+        return _CursorFalso(self)
+
+    def rollback(self):
+        if self.morta:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.rollbacks += 1
+        self.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def conexoes(monkeypatch):
+    """
+    Substitui psycopg2.connect; retorna a lista das conexões abertas.
+    """
+    abertas = []
+
+    def conectar(**parametros):
+        conn = _ConexaoFalsa()
+        abertas.append(conn)
+        return conn
+
+    monkeypatch.setattr(psycopg2, "connect", conectar)
+    return abertas
+
+
+def _pool(minimo=0, maximo=2, timeout=0.2, reciclar_apos=0, ping_apos=3600):
+    return _PoolConexoes(
+        minimo=minimo,
+        maximo=maximo,
+        timeout=timeout,
+        reciclar_apos=reciclar_apos,
+        ping_apos=ping_apos,
+    )
+
+
+def test_pool_esgotado_espera_ate_o_timeout(conexoes):
+    pool = _pool(maximo=2, timeout=0.2)
+    pool.obter()
+    pool.obter()
+
+    inicio = time.monotonic()
+    with pytest.raises(psycopg2.pool.PoolError):
+        pool.obter()
+
+    assert time.monotonic() - inicio >= 0.2
+    assert len(conexoes) == 2
+
+
+def test_pool_esgotado_entrega_a_conexao_devolvida(conexoes):
+    pool = _pool(maximo=1, timeout=1)
+    conn = pool.obter()
+    pool.devolver(conn)
+
+    assert pool.obter() is conn
+    assert len(conexoes) == 1
+
+
+def test_conexao_morta_no_ping_e_substituida(conexoes):
+    pool = _pool(minimo=1, ping_apos=0)
+    morta = conexoes[0]
+    morta.morta = True
+
+    conn = pool.obter()
+
+    assert conn is not morta
+    assert morta.closed
+    assert len(conexoes) == 2
+    assert pool._abertas == 1
+
+
+def test_conexao_viva_no_ping_e_reaproveitada(conexoes):
+    pool = _pool(minimo=1, ping_apos=0)
+
+    assert pool.obter() is conexoes[0]
+    assert conexoes[0].info.transaction_status == (
+        psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    )
+
+
+def test_conexao_antiga_e_reciclada(conexoes):
+    pool = _pool(minimo=1, reciclar_apos=0.05)
+    antiga = conexoes[0]
+    time.sleep(0.06)
+
+    conn = pool.obter()
+
+    assert conn is not antiga
+    assert antiga.closed
+    assert pool._abertas == 1
+
+
+def test_conexao_antiga_e_fechada_na_devolucao(conexoes):
+    pool = _pool(reciclar_apos=0.05)
+    conn = pool.obter()
+    time.sleep(0.06)
+
+    pool.devolver(conn)
+
+    assert conn.closed
+    assert pool._abertas == 0
+    assert not pool._livres
+
+
+def test_devolucao_desfaz_transacao_pendente(conexoes):
+    pool = _pool()
+    conn = pool.obter()
+    conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+    pool.devolver(conn)
+
+    assert conn.rollbacks == 1
+    assert not conn.closed
+    assert pool.obter() is conn
+
+
+def test_devolucao_descarta_conexao_com_rollback_falho(conexoes):
+    pool = _pool()
+    conn = pool.obter()
+    conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_INERROR
+    conn.morta = True
+
+    pool.devolver(conn)
+
+    assert conn.closed
+    assert pool._abertas == 0
+
+
+def test_excecao_na_operacao_devolve_a_conexao(conexoes, monkeypatch):
+    pool = _pool(maximo=1, timeout=0.2)
+    db = postgreConnection()
+    monkeypatch.setattr(db, "_obter_pool", lambda: pool)
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            with db.conexao() as conn:
+                cursor = conn.cursor()
+                cursor.execute("UPDATE simulacoes SET nome_produto = 'x'")
+                raise RuntimeError("falha na operação")
+
+    assert len(conexoes) == 1
+    assert conexoes[0].rollbacks == 3
+    assert pool._abertas == 1
+    assert len(pool._livres) == 1
+
+
+# Vazão com o PostgreSQL (pg_sleep mantém cada conexão ocupada)
+OPERACOES = 64
+THREADS = 16
+DURACAO_CONSULTA = 0.02
+
+
+def _vazao(banco, tamanho):
+    """
+    Operações por segundo com THREADS threads disputando o pool.
+    """
+    pool = _PoolConexoes(
+        minimo=tamanho,
+        maximo=tamanho,
+        timeout=30,
+        reciclar_apos=0,
+        ping_apos=3600,
+        host=banco.host,
+        port=banco.port,
+        database=banco.database,
+        user=banco.user,
+        password=banco.password,
+    )
+
+    def operacao(_):
+        conn = pool.obter()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_sleep(%s)", (DURACAO_CONSULTA,))
+        finally:
+            pool.devolver(conn)
+
+    try:
+        with ThreadPoolExecutor(THREADS) as executor:
+            inicio = time.perf_counter()
+            list(executor.map(operacao, range(OPERACOES)))
+            return OPERACOES / (time.perf_counter() - inicio)
+    finally:
+        pool.fechar()
+
+
+def test_vazao_cresce_com_o_tamanho_do_pool(banco):
+    vazoes = {tamanho: _vazao(banco, tamanho) for tamanho in (1, 2, 4, 8)}
+
+    # Uma conexão serializa as operações: no máximo 1/DURACAO_CONSULTA
+    assert vazoes[1] <= 1 / DURACAO_CONSULTA * 1.1
+    for menor, maior in ((1, 2), (2, 4), (4, 8)):
+        assert vazoes[maior] > vazoes[menor] * 1.5, vazoes
+    assert vazoes[8] > vazoes[1] * 4, vazoes
@@ -0,0 +1,140 @@
+"""
+Totais por projeto (projeto_resumo): os triggers das simulações mantêm os
+mesmos valores que a reconstrução de ProjetoService.reconciliar_resumos
+depois de INSERT, COPY, UPDATE e DELETE.
+"""
+
+import io
+
+from models.simulacao import SimulacaoAtualizar, SimulacaoCriar
+from services.projeto import ProjetoService
+from services.simulacao import SimulacaoService
+
+
+def _simulacao(indice, lote_atual=300):
+    return SimulacaoCriar(
+        nome_produto=f"Produto {indice}",
+        demanda_anual=1000 + 7 * indice,
+        custo_pedido=50,
+        custo_manutencao=2,
+        lote_atual_empresa=lote_atual,
+    )
+
+
+def _totais(projeto, usuario):
+    resumo = ProjetoService().obter_resumo(projeto, usuario)
+    return (
+        resumo.quantidade_produtos,
+        resumo.soma_custo_total_atual,
+        resumo.soma_custo_total_otimo,
+        resumo.soma_economia_anual,
+    )
+
+
+def _totais_das_simulacoes(banco, projeto):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(custo_total_atual), 0),
+                       COALESCE(SUM(custo_total_otimo), 0),
+                       COALESCE(SUM(economia_anual), 0)
+                FROM simulacoes
+                WHERE id_projeto = %s
+                """,
+                (projeto,),
+            )
+            quantidade, *somas = cursor.fetchone()
+            return (quantidade, *(float(soma) for soma in somas))
+        finally:
+            cursor.close()
+
+
+def _conferir(banco, projeto, usuario):
+    assert _totais(projeto, usuario) == _totais_das_simulacoes(banco, projeto)
+    # Nada a corrigir: os triggers já deixaram os totais certos
+    assert ProjetoService().reconciliar_resumos(projeto) == []
+
+
+def test_totais_acompanham_as_alteracoes(banco, projeto, usuario):
+    service = SimulacaoService()
+
+    unica = service.criar_simulacao(_simulacao(0), projeto, usuario)
+    _conferir(banco, projeto, usuario)
+
+    # INSERT de várias linhas, com e sem lote atual
+    lote = service.criar_simulacoes_lote(
+        [_simulacao(i, None if i % 3 == 0 else 300 + i) for i in range(1, 40)],
+        projeto,
+        usuario,
+    )
+    _conferir(banco, projeto, usuario)
+
+    # COPY
+    csv = (
+        "nome_produto,demanda_anual,custo_pedido,custo_manutencao,lote_atual_empresa\n"
+    )
+    csv += "".join(f"Importado {i},{500 + i},40,3,{100 + i}\n" for i in range(25))
+    service.importar_csv(
+        io.BytesIO(csv.encode("utf-8")), projeto, usuario, tamanho_bloco=10
+    )
+    _conferir(banco, projeto, usuario)
+
+    # UPDATE de uma linha e de todas as do projeto
+    service.atualizar_simulacao(
+        unica.id, projeto, usuario, SimulacaoAtualizar(custo_pedido=75)
+    )
+    _conferir(banco, projeto, usuario)
+    service.recalcular_projeto_sql(projeto, fator_custo_manutencao=1.5)
+    _conferir(banco, projeto, usuario)
+
+    # DELETE
+    for item in lote.simulacoes[:10]:
+        assert service.deletar_simulacao(item.id, projeto, usuario)
+    _conferir(banco, projeto, usuario)
+
+    assert _totais(projeto, usuario)[0] == 1 + 39 + 25 - 10
+
+
+def test_reconciliacao_corrige_totais_divergentes(banco, projeto, usuario):
+    SimulacaoService().criar_simulacoes_lote(
+        [_simulacao(i) for i in range(5)], projeto, usuario
+    )
+    esperado = _totais(projeto, usuario)
+
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "UPDATE projeto_resumo SET quantidade_produtos = 0,"
+                " soma_economia_anual = 1 WHERE id_projeto = %s",
+                (projeto,),
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+    assert _totais(projeto, usuario) != esperado
+
+    assert ProjetoService().reconciliar_resumos(projeto) == [projeto]
+    assert _totais(projeto, usuario) == esperado
+    assert ProjetoService().reconciliar_resumos(projeto) == []
+
+
+def test_exclusao_do_projeto_nao_recria_o_resumo(banco, projeto, usuario):
+    SimulacaoService().criar_simulacoes_lote(
+        [_simulacao(i) for i in range(3)], projeto, usuario
+    )
+
+    assert ProjetoService().deletar_projeto(projeto, usuario)
+
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT COUNT(*) FROM projeto_resumo WHERE id_projeto = %s",
+                (projeto,),
+            )
+            assert cursor.fetchone()[0] == 0
+        finally:
+            cursor.close()
@@ -0,0 +1,115 @@
+"""
+Hash de senhas (utils/senha.py): scrypt com sal aleatório, hashes SHA-256
+antigos aceitos e marcados para serem refeitos, e a troca do hash no login
+(AuthService.fazer_login).
+"""
+
+import hashlib
+import uuid
+
+import pytest
+
+from utils.senha import PREFIXO_SCRYPT, HasherSenha
+
+# Custo baixo para os testes
+N_TESTE = 2**10
+
+
+@pytest.fixture(scope="module")
+def hasher():
+    hasher = HasherSenha(max_concorrencia=2, n=N_TESTE)
+    yield hasher
+    hasher.encerrar()
+
+
+def test_scrypt_verifica_a_senha(hasher):
+    hash_senha = hasher.gerar_hash("segredo ção")
+
+    prefixo, n, r, p, _, _ = hash_senha.split("$")
+    assert (prefixo, int(n), int(r), int(p)) == (PREFIXO_SCRYPT, N_TESTE, 8, 1)
+    assert hasher.verificar("segredo ção", hash_senha) == (True, False)
+    assert hasher.verificar("segredo cao", hash_senha) == (False, False)
+    # Sal aleatório: a mesma senha gera hashes diferentes
+    assert hasher.gerar_hash("segredo ção") != hash_senha
+
+
+def test_hash_legado_e_aceito_e_marcado_para_refazer(hasher):
+    legado = hashlib.sha256("segredo".encode()).hexdigest()
+
+    assert hasher.verificar("segredo", legado) == (True, True)
+    assert hasher.verificar("outra", legado)[0] is False
+
+
+def test_parametros_desatualizados_sao_marcados_para_refazer(hasher):
+    antigo = HasherSenha(max_concorrencia=1, n=N_TESTE // 2)
+    try:
+        hash_antigo = antigo.gerar_hash("segredo")
+    finally:
+        antigo.encerrar()
+
+    assert hasher.verificar("segredo", hash_antigo) == (True, True)
+    assert hasher.verificar("outra", hash_antigo) == (False, True)
+
+
+@pytest.mark.parametrize(
+    "hash_armazenado",
+    [
+        "",
+        "-",
+        "bcrypt$1024$8$1$c2Fs$Y2hhdmU",
+        "scrypt$1024$8$1$c2Fs",
+        "scrypt$mil$8$1$c2Fs$Y2hhdmU",
+        "A" * 64,  # SHA-256 só em minúsculas
+    ],
+)
+def test_hash_invalido_nunca_confere(hasher, hash_armazenado):
+    assert hasher.verificar("", hash_armazenado) == (False, False)
+
+
+def test_usuario_inexistente(hasher):
+    assert hasher.verificar("segredo", None) == (False, False)
+
+
+def test_login_refaz_hash_legado(banco, usuario):
+    from models.auth import UsuarioLogin
+    from services.auth import AuthService
+    from utils.senha import hasher_senha
+
+    email = f"legado-{uuid.uuid4().hex}@exemplo.com"
+    legado = hashlib.sha256("segredo".encode()).hexdigest()
+
+    def senha_armazenada():
+        with banco.conexao() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    "SELECT senha FROM usuarios WHERE id_usuario = %s", (usuario,)
+                )
+                return cursor.fetchone()[0]
+            finally:
+                cursor.close()
+
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "UPDATE usuarios SET email = %s, senha = %s WHERE id_usuario = %s",
+                (email, legado, usuario),
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+
+    service = AuthService()
+    with pytest.raises(ValueError):
+        service.fazer_login(UsuarioLogin(email=email, senha="outra"))
+    assert senha_armazenada() == legado
+
+    assert service.fazer_login(UsuarioLogin(email=email, senha="segredo")).token
+    novo = senha_armazenada()
+    assert novo.startswith(f"{PREFIXO_SCRYPT}$")
+    assert hasher_senha.verificar("segredo", novo) == (True, False)
+
+    # Com o hash novo o login continua funcionando e não o refaz
+    service.fazer_login(UsuarioLogin(email=email, senha="segredo"))
+    assert senha_armazenada() == novo
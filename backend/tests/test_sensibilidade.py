@@ -0,0 +1,55 @@
+"""
+Análise de sensibilidade com modelos que limitam a demanda anual.
+"""
+
+import numpy as np
+
+from utils.lote_economico import CalculadoraLoteEconomico
+from utils.sensibilidade import AnaliseSensibilidade
+
+
+def _lep(taxa_producao: float) -> AnaliseSensibilidade:
+    return AnaliseSensibilidade(
+        CalculadoraLoteEconomico(
+            1000,
+            50,
+            2,
+            300,
+            modelo="lep",
+            parametros_modelo={"taxa_producao": taxa_producao},
+        )
+    )
+
+
+def test_pontos_acima_da_taxa_de_producao_sao_nan():
+    analise = _lep(1200).gerar_analise()
+
+    assert analise["limites"] == {"demanda_anual": 1200.0}
+    curva = analise["curvas"]["demanda_anual"]
+    inviaveis = curva["valores"] >= 1200
+    assert inviaveis.any()
+    assert np.isnan(curva["lote_otimo"][inviaveis]).all()
+    assert not np.isnan(curva["lote_otimo"][~inviaveis]).any()
+
+    mapa = analise["mapa"]
+    colunas_inviaveis = mapa["valores_x"] >= 1200
+    assert np.isnan(mapa["valores"][:, colunas_inviaveis]).all()
+    assert not np.isnan(mapa["valores"][:, ~colunas_inviaveis]).any()
+
+
+def test_tornado_usa_extremos_viaveis_da_demanda():
+    barras = {b["parametro"]: b for b in _lep(1200).gerar_analise()["tornado"]}
+
+    assert barras["demanda_anual"]["valor_min"] == 700
+    assert barras["demanda_anual"]["valor_max"] < 1200
+    assert barras["custo_pedido"]["valor_max"] == 65
+
+
+def test_sem_limite_mantem_a_analise():
+    analise = AnaliseSensibilidade(
+        CalculadoraLoteEconomico(1000, 50, 2, 300)
+    ).gerar_analise()
+
+    assert analise["limites"] == {}
+    assert len(analise["tornado"]) == 3
+    assert not np.isnan(analise["mapa"]["valores"]).any()
@@ -0,0 +1,62 @@
+"""
+Criação de simulações em lote (SimulacaoService.criar_simulacoes_lote):
+tudo ou nada em uma transação, mesmo quando o INSERT é enviado em várias
+páginas.
+"""
+
+import psycopg2
+import pytest
+
+from models.simulacao import SimulacaoCriar
+from services.simulacao import SimulacaoService
+
+
+def _simulacao(indice, demanda_anual=1000):
+    return SimulacaoCriar(
+        nome_produto=f"Produto {indice}",
+        demanda_anual=demanda_anual,
+        custo_pedido=50,
+        custo_manutencao=2,
+        lote_atual_empresa=100 + indice,
+    )
+
+
+def _quantidade(banco, projeto):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT COUNT(*) FROM simulacoes WHERE id_projeto = %s", (projeto,)
+            )
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+
+def test_lote_grava_todas_na_ordem(banco, projeto, usuario):
+    service = SimulacaoService()
+
+    criadas = service.criar_simulacoes_lote(
+        [_simulacao(indice) for indice in range(1500)], projeto, usuario
+    )
+
+    assert criadas.total == 1500
+    assert _quantidade(banco, projeto) == 1500
+    primeira = service.obter_simulacao(criadas.simulacoes[0].id, projeto, usuario)
+    ultima = service.obter_simulacao(criadas.simulacoes[-1].id, projeto, usuario)
+    assert (primeira.nome_produto, ultima.nome_produto) == (
+        "Produto 0",
+        "Produto 1499",
+    )
+
+
+def test_linha_recusada_pelo_banco_desfaz_o_lote(banco, projeto, usuario):
+    simulacoes = [_simulacao(indice) for indice in range(1500)]
+    # Válida para o modelo, mas não cabe em NUMERIC(10, 2); fica na segunda
+    # página do INSERT, depois de a primeira já ter sido enviada
+    simulacoes[1200] = _simulacao(1200, demanda_anual=1e9)
+
+    with pytest.raises(psycopg2.DataError):
+        SimulacaoService().criar_simulacoes_lote(simulacoes, projeto, usuario)
+
+    assert _quantidade(banco, projeto) == 0
@@ -0,0 +1,92 @@
+"""
+Cache de tokens verificados (TokenManager.validar_token): um token válido
+só é decodificado uma vez, a entrada expira junto com o exp do token e
+tokens inválidos ou vencidos nunca ficam em cache.
+"""
+
+import math
+import time
+
+import jwt
+import pytest
+
+import utils.auth as modulo_auth
+from utils.auth import TokenManager
+
+
+@pytest.fixture
+def gerenciador():
+    return TokenManager()
+
+
+@pytest.fixture
+def decodificacoes(monkeypatch):
+    """
+    Conta as chamadas a jwt.decode feitas pelo TokenManager.
+    """
+    chamadas = []
+    decode = jwt.decode
+
+    def contar(*args, **kwargs):
+        chamadas.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(modulo_auth.jwt, "decode", contar)
+    return chamadas
+
+
+def _token(gerenciador, id_usuario, exp):
+    return jwt.encode(
+        {"id": id_usuario, "exp": exp}, gerenciador.secret_key, gerenciador.algorithm
+    )
+
+
+def test_token_valido_e_decodificado_uma_vez(gerenciador, decodificacoes):
+    token = gerenciador.criar_token(7)
+    outro = gerenciador.criar_token(8)
+
+    assert [gerenciador.validar_token(token) for _ in range(5)] == [7] * 5
+    assert gerenciador.validar_token(outro) == 8
+    assert decodificacoes == [token, outro]
+
+
+def test_cache_expira_com_o_token(gerenciador, decodificacoes):
+    exp = math.ceil(time.time()) + 1
+    token = _token(gerenciador, 7, exp)
+
+    assert gerenciador.validar_token(token) == 7
+    assert gerenciador.validar_token(token) == 7
+    assert len(decodificacoes) == 1
+
+    time.sleep(exp - time.time() + 0.05)
+
+    # O cache não serve mais o token: o decode volta a rodar e o recusa
+    with pytest.raises(ValueError, match="expirado"):
+        gerenciador.validar_token(token)
+    assert len(decodificacoes) == 2
+    assert gerenciador.cache.metricas()["entradas"] == 0
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "nao-e-um-jwt",
+        jwt.encode({"id": 7, "exp": 2**40}, "outra-chave", "HS256"),
+    ],
+)
+def test_token_invalido_nao_fica_em_cache(gerenciador, decodificacoes, token):
+    for _ in range(3):
+        with pytest.raises(ValueError, match="inválido"):
+            gerenciador.validar_token(token)
+
+    assert len(decodificacoes) == 3
+    assert gerenciador.cache.metricas()["entradas"] == 0
+
+
+def test_token_vencido_nao_fica_em_cache(gerenciador):
+    token = _token(gerenciador, 7, int(time.time()) - 10)
+
+    with pytest.raises(ValueError, match="expirado"):
+        gerenciador.validar_token(token)
+    assert gerenciador.obter_id_usuario(token) is None
+    assert gerenciador.cache.metricas()["entradas"] == 0
@@ -1,9 +1,11 @@
 import jwt
+import hashlib
 from datetime import datetime, timedelta
 import os
 from typing import Optional
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from utils.cache import CacheTTL
 
 security = HTTPBearer()
 
@@ -20,6 +22,10 @@ class TokenManager:
         self.secret_key = os.getenv("JWT_SECRET_KEY", "sua-chave-secreta-padrao")
         self.algorithm = "HS256"
         self.expiration_hours = 24
+        # Tokens já verificados (chave: SHA-256 do token), válidos até o exp
+        self.cache = CacheTTL(
+            max_entradas=int(os.getenv("TOKEN_CACHE_MAX_ENTRADAS", "10000"))
+        )
 
     def criar_token(self, id_usuario: int) -> str:
         """
@@ -41,6 +47,7 @@ class TokenManager:
     def validar_token(self, token: str) -> int:
         """
         Valida o token JWT e retorna o ID do usuário.
+        Tokens já verificados são reconhecidos pelo cache sem novo decode.
 
         Args:
             token: Token JWT.
@@ -51,8 +58,16 @@ class TokenManager:
         Raises:
             ValueError: Se o token estiver expirado ou inválido.
         """
+        chave = hashlib.sha256(token.encode()).digest()
+        id_usuario = self.cache.obter(chave)
+        if id_usuario is not None:
+            return id_usuario
+
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            # O cache expira junto com o token; depois disso o jwt.decode
+            # volta a ser executado e rejeita o token expirado
+            self.cache.definir(chave, payload["id"], expira_em=payload["exp"])
             return payload["id"]
         except jwt.ExpiredSignatureError:
             raise ValueError("Token expirado")
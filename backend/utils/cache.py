@@ -0,0 +1,273 @@
+"""
+Cache de resultados em memória para análises e gráficos de simulações.
+
+O cache é acessado através da interface BackendCache, de modo que a
+implementação em processo (CacheMemoriaLRU) possa ser trocada por um
+backend compartilhado sem alterar os serviços.
+"""
+
+from abc import ABC, abstractmethod
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+
+class BackendCache(ABC):
+    """
+    Interface dos backends de cache.
+    """
+
+    @abstractmethod
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor armazenado ou None se não estiver no cache.
+        """
+
+    @abstractmethod
+    def definir(self, chave: Hashable, valor: Any, tags: Iterable[str] = ()):
+        """
+        Armazena um valor associado a um conjunto de tags de invalidação.
+        """
+
+    @abstractmethod
+    def invalidar(self, tag: str) -> int:
+        """
+        Remove todas as entradas marcadas com a tag.
+
+        Returns:
+            Quantidade de entradas removidas.
+        """
+
+    @abstractmethod
+    def limpar(self):
+        """
+        Remove todas as entradas.
+        """
+
+    @abstractmethod
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache.
+        """
+
+
+def estimar_tamanho(valor: Any) -> int:
+    """
+    Estima em bytes a memória ocupada por um valor armazenado no cache.
+    """
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes + sys.getsizeof(valor)
+    if isinstance(valor, BaseModel):
+        return estimar_tamanho(valor.__dict__)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            estimar_tamanho(k) + estimar_tamanho(v) for k, v in valor.items()
+        )
+    if isinstance(valor, (list, tuple, set)):
+        return sys.getsizeof(valor) + sum(estimar_tamanho(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheMemoriaLRU(BackendCache):
+    """
+    Cache LRU thread-safe limitado por número de entradas e por bytes.
+    """
+
+    def __init__(self, max_entradas: int = 10_000, max_bytes: int = 64 * 1024**2):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entradas: Número máximo de entradas
+            max_bytes: Memória máxima estimada ocupada pelos valores
+        """
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # chave -> (valor, tamanho em bytes, tags)
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, int, Tuple[str, ...]]]" = (
+            OrderedDict()
+        )
+        self._por_tag: Dict[str, Set[Hashable]] = {}
+        self._bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.invalidacoes = 0
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada[0]
+
+    def definir(self, chave: Hashable, valor: Any, tags: Iterable[str] = ()):
+        tamanho = estimar_tamanho(valor)
+        if tamanho > self.max_bytes:
+            return
+
+        tags = tuple(tags)
+        with self._lock:
+            if chave in self._entradas:
+                self._remover(chave)
+
+            self._entradas[chave] = (valor, tamanho, tags)
+            self._bytes += tamanho
+            for tag in tags:
+                self._por_tag.setdefault(tag, set()).add(chave)
+
+            while (
+                len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes
+            ):
+                antiga = next(iter(self._entradas))
+                self._remover(antiga)
+                self.despejos += 1
+
+    def invalidar(self, tag: str) -> int:
+        with self._lock:
+            chaves = self._por_tag.pop(tag, set())
+            for chave in chaves:
+                if chave in self._entradas:
+                    self._remover(chave)
+            self.invalidacoes += len(chaves)
+            return len(chaves)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._por_tag.clear()
+            self._bytes = 0
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+                "despejos": self.despejos,
+                "invalidacoes": self.invalidacoes,
+            }
+
+    def _remover(self, chave: Hashable):
+        """
+        Remove uma entrada e as suas referências nas tags (com o lock já obtido).
+        """
+        _, tamanho, tags = self._entradas.pop(chave)
+        self._bytes -= tamanho
+        for tag in tags:
+            chaves = self._por_tag.get(tag)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._por_tag[tag]
+
+
+class CacheTTL:
+    """
+    Cache LRU thread-safe com expiração por entrada, para valores pequenos
+    (tokens verificados, perfis de usuário).
+    """
+
+    def __init__(self, max_entradas: int = 10_000, ttl: float = 60.0):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entradas: Número máximo de entradas
+            ttl: Validade padrão das entradas em segundos
+        """
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # chave -> (valor, expira_em em segundos desde a época)
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor armazenado ou None se ausente ou expirado.
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[1] <= time.time():
+                if entrada is not None:
+                    del self._entradas[chave]
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada[0]
+
+    def definir(self, chave: Hashable, valor: Any, expira_em: Optional[float] = None):
+        """
+        Armazena um valor até expira_em (segundos desde a época) ou, se não
+        informado, pelo ttl padrão.
+        """
+        if expira_em is None:
+            expira_em = time.time() + self.ttl
+        if self.max_entradas <= 0 or expira_em <= time.time():
+            return
+
+        with self._lock:
+            self._entradas[chave] = (valor, expira_em)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.despejos += 1
+
+    def invalidar(self, chave: Hashable):
+        """
+        Remove uma entrada.
+        """
+        with self._lock:
+            self._entradas.pop(chave, None)
+
+    def limpar(self):
+        """
+        Remove todas as entradas.
+        """
+        with self._lock:
+            self._entradas.clear()
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache.
+        """
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "entradas": len(self._entradas),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+                "despejos": self.despejos,
+            }
+
+
+def tags_simulacao(id_simulacao: int, id_projeto: int) -> Tuple[str, str]:
+    """
+    Tags de invalidação das entradas derivadas de uma simulação.
+    """
+    return (f"simulacao:{id_simulacao}", f"projeto:{id_projeto}")
+
+
+# Instância global para reutilização
+cache_resultados: BackendCache = CacheMemoriaLRU(
+    max_entradas=int(os.getenv("CACHE_MAX_ENTRADAS", "10000")),
+    max_bytes=int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024**2))),
+)
@@ -0,0 +1,385 @@
+"""
+Simulação de Monte Carlo de políticas (Q, r) com demanda estocástica.
+
+Complementa o LEC determinístico: a demanda diária segue uma distribuição
+gama com a média e a variância informadas, o lead time pode ser fixo ou
+aleatório e a política pede Q unidades sempre que a posição de estoque
+(estoque líquido + pedidos em trânsito) cai para r ou abaixo. Faltas viram
+pendências (backorder) atendidas na chegada do pedido seguinte.
+
+As replicações são simuladas juntas, dia a dia, com arrays NumPy. Elas são
+divididas em blocos de tamanho fixo (limitando a memória), cada um com a
+sua semente derivada por SeedSequence, então o resultado depende apenas da
+semente e do número de replicações. A simulação inteira roda em um
+processo do pool de cálculos (utils/pool_calculo.py).
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from utils.lote_economico import CalculadoraLoteEconomico
+
+DIAS_POR_ANO = 365
+MAX_REPLICACOES = 1_000_000
+TAMANHO_BLOCO_REPLICACOES = 25_000
+# Valor z para o intervalo de confiança de 95% das médias
+Z_CONFIANCA_95 = 1.959964
+
+
+def _parametros_gama(media: float, desvio: float):
+    """
+    Forma e escala da distribuição gama com a média e o desvio informados.
+    """
+    variancia = desvio**2
+    return media**2 / variancia, variancia / media
+
+
+def _sortear_demanda(
+    rng: np.random.Generator, media: float, desvio: float, tamanho
+) -> np.ndarray:
+    if desvio == 0:
+        return np.full(tamanho, media)
+    forma, escala = _parametros_gama(media, desvio)
+    return rng.gamma(forma, escala, tamanho)
+
+
+def _sortear_lead_time(
+    rng: np.random.Generator, media: float, desvio: float, maximo: int, tamanho
+) -> np.ndarray:
+    """
+    Lead times inteiros em dias, entre 1 e maximo.
+    """
+    if desvio == 0:
+        return np.full(tamanho, max(1, round(media)), dtype=np.int64)
+    sorteio = np.rint(rng.normal(media, desvio, tamanho))
+    return np.clip(sorteio, 1, maximo).astype(np.int64)
+
+
+def _simular_bloco(
+    semente: np.random.SeedSequence,
+    replicacoes: int,
+    horizonte_dias: int,
+    demanda_diaria: float,
+    desvio_demanda_diaria: float,
+    lead_time_dias: float,
+    desvio_lead_time_dias: float,
+    lead_time_maximo: int,
+    lote: float,
+    ponto_pedido: float,
+) -> Dict[str, np.ndarray]:
+    """
+    Simula um bloco de replicações e devolve os totais de cada uma.
+
+    Em cada dia a demanda é atendida, os pedidos do dia chegam e a posição
+    de estoque é revista. Os pedidos em trânsito ficam em um buffer
+    circular indexado pelo dia de chegada: um pedido feito no dia t com
+    lead time L chega no fim do dia t + L, depois de L dias de demanda.
+    """
+    rng = np.random.default_rng(semente)
+    colunas = np.arange(replicacoes)
+
+    estoque_liquido = np.full(replicacoes, ponto_pedido + lote)
+    em_transito = np.zeros(replicacoes)
+    chegadas = np.zeros((lead_time_maximo + 1, replicacoes))
+
+    demanda_total = np.zeros(replicacoes)
+    atendido = np.zeros(replicacoes)
+    estoque_acumulado = np.zeros(replicacoes)
+    pedidos = np.zeros(replicacoes)
+    ciclos = np.zeros(replicacoes)
+    ciclos_com_falta = np.zeros(replicacoes)
+
+    for dia in range(horizonte_dias):
+        demanda = _sortear_demanda(
+            rng, demanda_diaria, desvio_demanda_diaria, replicacoes
+        )
+        demanda_total += demanda
+        atendido += np.minimum(demanda, np.maximum(estoque_liquido, 0))
+        estoque_liquido -= demanda
+
+        posicao = dia % chegadas.shape[0]
+        chegada = chegadas[posicao]
+        recebeu = chegada > 0
+        # Entre duas chegadas o estoque líquido só diminui: o ciclo teve
+        # falta se ele estava negativo logo antes da chegada
+        ciclos += recebeu
+        ciclos_com_falta += recebeu & (estoque_liquido < 0)
+        estoque_liquido += chegada
+        em_transito -= chegada
+        chegadas[posicao] = 0
+        estoque_acumulado += np.maximum(estoque_liquido, 0)
+
+        posicao_estoque = estoque_liquido + em_transito
+        pedir = np.flatnonzero(posicao_estoque <= ponto_pedido)
+        if pedir.size:
+            # Múltiplos de Q suficientes para a posição passar de r
+            quantidade = (
+                np.floor((ponto_pedido - posicao_estoque[pedir]) / lote) + 1
+            ) * lote
+            lead_time = _sortear_lead_time(
+                rng, lead_time_dias, desvio_lead_time_dias, lead_time_maximo, pedir.size
+            )
+            chegadas[
+                (dia + lead_time) % chegadas.shape[0], colunas[pedir]
+            ] += quantidade
+            em_transito[pedir] += quantidade
+            pedidos[pedir] += 1
+
+    return {
+        "demanda": demanda_total,
+        "atendido": atendido,
+        "estoque_acumulado": estoque_acumulado,
+        "pedidos": pedidos,
+        "ciclos": ciclos,
+        "ciclos_com_falta": ciclos_com_falta,
+    }
+
+
+def _resumo(valores: np.ndarray) -> Dict[str, float]:
+    """
+    Média, intervalo de confiança de 95% e percentis de uma métrica.
+    """
+    media = float(valores.mean())
+    margem = (
+        Z_CONFIANCA_95 * float(valores.std(ddof=1)) / math.sqrt(valores.size)
+        if valores.size > 1
+        else 0.0
+    )
+    p5, p50, p95 = np.percentile(valores, [5, 50, 95])
+    return {
+        "media": round(media, 4),
+        "ic95_min": round(media - margem, 4),
+        "ic95_max": round(media + margem, 4),
+        "p5": round(float(p5), 4),
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+    }
+
+
+class SimuladorEstoqueEstocastico:
+    """
+    Simulação de Monte Carlo de uma política (Q, r) para um produto.
+    """
+
+    def __init__(
+        self,
+        calculadora: CalculadoraLoteEconomico,
+        desvio_demanda_diaria: float,
+        lead_time_dias: float,
+        desvio_lead_time_dias: float = 0.0,
+        custo_falta: float = 0.0,
+    ):
+        """
+        Inicializa o simulador com os parâmetros do produto.
+
+        Args:
+            calculadora: Calculadora do produto (D, S e H anuais)
+            desvio_demanda_diaria: Desvio padrão da demanda diária
+            lead_time_dias: Lead time médio em dias
+            desvio_lead_time_dias: Desvio padrão do lead time (0 = fixo)
+            custo_falta: Custo por unidade atendida com atraso
+
+        Raises:
+            ValueError: Se algum parâmetro for inválido.
+        """
+        if desvio_demanda_diaria < 0 or desvio_lead_time_dias < 0:
+            raise ValueError("Os desvios padrão não podem ser negativos")
+        if lead_time_dias <= 0:
+            raise ValueError("O lead time deve ser maior que zero")
+        if custo_falta < 0:
+            raise ValueError("O custo de falta não pode ser negativo")
+
+        self.calculadora = calculadora
+        self.demanda_diaria = calculadora.demanda_anual / DIAS_POR_ANO
+        self.desvio_demanda_diaria = desvio_demanda_diaria
+        self.lead_time_dias = lead_time_dias
+        self.desvio_lead_time_dias = desvio_lead_time_dias
+        self.custo_falta = custo_falta
+        self.lead_time_maximo = max(
+            1, math.ceil(lead_time_dias + 4 * desvio_lead_time_dias)
+        )
+
+    def recomendar_ponto_pedido(
+        self,
+        nivel_servico: float,
+        amostras: int = 100_000,
+        semente: Optional[int] = None,
+    ) -> Dict[str, float]:
+        """
+        Ponto de pedido que atinge o nível de serviço de ciclo desejado
+        (probabilidade de não faltar durante o lead time).
+
+        É o quantil, entre as amostras, da demanda durante o lead time
+        somada ao quanto a posição de estoque já está abaixo de r quando o
+        pedido é feito (revisão diária). Esse excesso segue a distribuição
+        de equilíbrio da demanda diária: uma fração uniforme de uma demanda
+        sorteada com viés de tamanho, que para a gama é outra gama com a
+        forma acrescida de 1.
+
+        Returns:
+            Ponto de pedido, estoque de segurança e demanda média no lead time.
+
+        Raises:
+            ValueError: Se o nível de serviço não estiver entre 0 e 1.
+        """
+        if not 0 < nivel_servico < 1:
+            raise ValueError("O nível de serviço deve estar entre 0 e 1")
+
+        rng = np.random.default_rng(semente)
+        lead_time = _sortear_lead_time(
+            rng,
+            self.lead_time_dias,
+            self.desvio_lead_time_dias,
+            self.lead_time_maximo,
+            amostras,
+        )
+        if self.desvio_demanda_diaria == 0:
+            demanda_lead_time = self.demanda_diaria * lead_time
+            # Sem variação o excesso depende só da fase: usa o pior caso
+            excesso = np.full(amostras, self.demanda_diaria)
+        else:
+            # A soma de L demandas diárias gama é gama com forma L vezes maior
+            forma, escala = _parametros_gama(
+                self.demanda_diaria, self.desvio_demanda_diaria
+            )
+            demanda_lead_time = rng.gamma(forma * lead_time, escala)
+            excesso = rng.random(amostras) * rng.gamma(forma + 1, escala, amostras)
+
+        media = float(demanda_lead_time.mean())
+        ponto_pedido = float(np.quantile(demanda_lead_time + excesso, nivel_servico))
+        return {
+            "ponto_pedido": round(ponto_pedido, 2),
+            "estoque_seguranca": round(max(ponto_pedido - media, 0.0), 2),
+            "demanda_media_lead_time": round(media, 2),
+        }
+
+    def simular(
+        self,
+        ponto_pedido: Optional[float] = None,
+        lote: Optional[float] = None,
+        nivel_servico: float = 0.95,
+        replicacoes: int = 10_000,
+        horizonte_dias: int = DIAS_POR_ANO,
+        semente: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Simula a política (Q, r) em várias replicações.
+
+        Args:
+            ponto_pedido: Ponto de pedido r (padrão: o recomendado para o
+                nível de serviço)
+            lote: Tamanho do pedido Q (padrão: lote ótimo do LEC)
+            nivel_servico: Nível de serviço de ciclo usado na recomendação
+            replicacoes: Número de replicações
+            horizonte_dias: Dias simulados em cada replicação
+            semente: Semente do gerador; sem ela uma é sorteada e devolvida
+
+        Returns:
+            Taxa de atendimento, probabilidade de falta por ciclo, custo
+            anual esperado (com intervalo de confiança) e ponto de pedido /
+            estoque de segurança recomendados.
+
+        Raises:
+            ValueError: Se algum parâmetro for inválido.
+        """
+        if not 1 <= replicacoes <= MAX_REPLICACOES:
+            raise ValueError(
+                f"O número de replicações deve estar entre 1 e {MAX_REPLICACOES}"
+            )
+        if horizonte_dias < 1:
+            raise ValueError("O horizonte deve ter pelo menos um dia")
+        if lote is not None and lote <= 0:
+            raise ValueError("O lote deve ser maior que zero")
+        if ponto_pedido is not None and ponto_pedido < 0:
+            raise ValueError("O ponto de pedido não pode ser negativo")
+
+        if semente is None:
+            semente = int(np.random.SeedSequence().generate_state(1)[0])
+        sementes = np.random.SeedSequence(semente)
+        semente_recomendacao, semente_blocos = sementes.spawn(2)
+
+        recomendacao = self.recomendar_ponto_pedido(
+            nivel_servico, semente=semente_recomendacao
+        )
+        if ponto_pedido is None:
+            ponto_pedido = recomendacao["ponto_pedido"]
+            estoque_seguranca = recomendacao["estoque_seguranca"]
+        else:
+            estoque_seguranca = round(
+                ponto_pedido - recomendacao["demanda_media_lead_time"], 2
+            )
+        if lote is None:
+            lote = self.calculadora.calcular_lote_otimo(incluir_expressoes=False)[
+                "lote_otimo"
+            ]
+
+        tamanhos = [TAMANHO_BLOCO_REPLICACOES] * (
+            replicacoes // TAMANHO_BLOCO_REPLICACOES
+        )
+        if replicacoes % TAMANHO_BLOCO_REPLICACOES:
+            tamanhos.append(replicacoes % TAMANHO_BLOCO_REPLICACOES)
+        argumentos = (
+            horizonte_dias,
+            self.demanda_diaria,
+            self.desvio_demanda_diaria,
+            self.lead_time_dias,
+            self.desvio_lead_time_dias,
+            self.lead_time_maximo,
+            lote,
+            ponto_pedido,
+        )
+
+        resultados = [
+            _simular_bloco(semente_bloco, tamanho, *argumentos)
+            for semente_bloco, tamanho in zip(
+                semente_blocos.spawn(len(tamanhos)), tamanhos
+            )
+        ]
+
+        totais = {
+            chave: np.concatenate([r[chave] for r in resultados])
+            for chave in resultados[0]
+        }
+
+        anos = horizonte_dias / DIAS_POR_ANO
+        faltas = totais["demanda"] - totais["atendido"]
+        custo_pedidos = totais["pedidos"] * self.calculadora.custo_pedido / anos
+        custo_manutencao = (
+            totais["estoque_acumulado"] / horizonte_dias
+        ) * self.calculadora.custo_manutencao
+        custo_falta = faltas * self.custo_falta / anos
+        custo_total = custo_pedidos + custo_manutencao + custo_falta
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            taxa_atendimento = np.where(
+                totais["demanda"] > 0, totais["atendido"] / totais["demanda"], 1.0
+            )
+
+        ciclos = totais["ciclos"].sum()
+        probabilidade_falta = (
+            float(totais["ciclos_com_falta"].sum() / ciclos) if ciclos else 0.0
+        )
+
+        return {
+            "semente": semente,
+            "replicacoes": replicacoes,
+            "horizonte_dias": horizonte_dias,
+            "lote": lote,
+            "ponto_pedido": ponto_pedido,
+            "estoque_seguranca": estoque_seguranca,
+            "nivel_servico_alvo": nivel_servico,
+            "recomendacao": recomendacao,
+            "taxa_atendimento": _resumo(taxa_atendimento),
+            "probabilidade_falta_ciclo": round(probabilidade_falta, 4),
+            "nivel_servico_ciclo": round(1 - probabilidade_falta, 4),
+            "pedidos_por_ano": round(float(totais["pedidos"].mean() / anos), 4),
+            "estoque_medio": round(
+                float(totais["estoque_acumulado"].mean() / horizonte_dias), 4
+            ),
+            "custo_total_anual": _resumo(custo_total),
+            "custo_pedidos_anual": round(float(custo_pedidos.mean()), 2),
+            "custo_manutencao_anual": round(float(custo_manutencao.mean()), 2),
+            "custo_falta_anual": round(float(custo_falta.mean()), 2),
+        }
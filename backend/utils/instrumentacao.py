@@ -0,0 +1,91 @@
+"""
+Contagem de consultas SQL por requisição.
+
+Um observador registrado no módulo de conexão incrementa o contador da
+requisição em andamento (guardado em uma ContextVar, que é copiada para as
+threads de run_in_threadpool). O middleware devolve o total no cabeçalho
+X-Consultas-SQL e acumula médias por rota.
+"""
+
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+
+from Connections.postgre import registrar_observador_consultas
+
+CABECALHO_CONSULTAS = "X-Consultas-SQL"
+
+# Lista mutável de um elemento com o total da requisição em andamento
+_consultas_requisicao: ContextVar[Optional[List[int]]] = ContextVar(
+    "consultas_requisicao", default=None
+)
+
+
+def _contar_consulta(sql):
+    contador = _consultas_requisicao.get()
+    if contador is not None:
+        contador[0] += 1
+
+
+registrar_observador_consultas(_contar_consulta)
+
+
+class MetricasConsultas:
+    """
+    Acumula o número de consultas SQL por rota.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # "MÉTODO rota" -> [requisições, consultas, máximo]
+        self._por_rota: Dict[str, List[int]] = {}
+
+    def registrar(self, rota: str, consultas: int):
+        with self._lock:
+            valores = self._por_rota.setdefault(rota, [0, 0, 0])
+            valores[0] += 1
+            valores[1] += consultas
+            valores[2] = max(valores[2], consultas)
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                rota: {
+                    "requisicoes": requisicoes,
+                    "consultas": consultas,
+                    "media_por_requisicao": round(consultas / requisicoes, 3),
+                    "maximo_por_requisicao": maximo,
+                }
+                for rota, (requisicoes, consultas, maximo) in sorted(
+                    self._por_rota.items()
+                )
+            }
+
+
+# Instância global para reutilização
+metricas_consultas = MetricasConsultas()
+
+
+async def contar_consultas_sql(request: Request, call_next):
+    """
+    Middleware HTTP que conta as consultas SQL de cada requisição.
+    """
+    contador = [0]
+    token = _consultas_requisicao.set(contador)
+    try:
+        response = await call_next(request)
+    finally:
+        _consultas_requisicao.reset(token)
+
+    response.headers[CABECALHO_CONSULTAS] = str(contador[0])
+
+    rota = request.scope.get("route")
+    if rota is not None:
+        metricas_consultas.registrar(
+            f"{request.method} {getattr(rota, 'path', request.url.path)}",
+            contador[0],
+        )
+
+    return response
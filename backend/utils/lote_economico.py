@@ -1,12 +1,131 @@
 """
 Módulo de cálculo do Lote Econômico de Compra (LEC) usando SymPy.
 Baseado na metodologia demonstrada no demo_2.ipynb.
+
+Os valores numéricos (lote ótimo, custos e segunda derivada) são obtidos
+pela forma fechada do modelo no modo numérico (padrão). As expressões
+legíveis (função de custo e derivadas) vêm de um modelo simbólico com
+parâmetros derivado uma única vez; o SymPy por instância fica reservado
+para o modo simbólico completo. A função de custo vem do modelo de custo
+da simulação (ver utils.modelos_custo): LEC clássico, lote econômico de
+produção ou LEC com faltas planejadas.
 """
 
+import math
 import sympy as sp
-from typing import Dict, Any, List, Tuple
+from functools import lru_cache
+from mpmath.libmp import from_float, to_str
+from typing import Dict, Any, List, Tuple, Callable, Optional
 import numpy as np
 
+from utils.modelos_custo import D, H, MODELO_LEC, Q, S, ModeloCusto, obter_modelo
+
+MODO_NUMERICO = "numerico"
+MODO_SIMBOLICO = "simbolico"
+
+# Menor lote com 2 casas: um lote ótimo que arredondaria para zero fica
+# nele, para que o custo total seja finito
+LOTE_MINIMO = 0.01
+
+# Amostragem do gráfico de custo x lote
+ESCALA_LINEAR = "linear"
+ESCALA_LOG = "log"
+ESCALA_ADAPTATIVA = "adaptativa"
+MAX_PONTOS_GRAFICO = 100_000
+LIMITE_PONTOS_GRAFICO = 5_000
+# Intervalo automático do gráfico, relativo ao lote ótimo
+FATOR_INTERVALO_MIN = 0.1
+FATOR_INTERVALO_MAX = 3.0
+
+# Tipos de tabela de desconto por quantidade
+DESCONTO_TODAS_UNIDADES = "todas_unidades"
+DESCONTO_INCREMENTAL = "incremental"
+TIPOS_DESCONTO = (DESCONTO_TODAS_UNIDADES, DESCONTO_INCREMENTAL)
+
+
+class ExpressaoParametrizada:
+    """
+    Expressão em Q com coeficientes que dependem dos parâmetros do modelo
+    (D, S, H e os adicionais).
+
+    A expressão é decomposta uma única vez em termos c(D, S, H, ...) * Q**k;
+    para um produto específico basta avaliar os coeficientes e formatar o
+    texto, que sai idêntico ao str() do SymPy para a expressão substituída.
+    """
+
+    def __init__(self, expressao: sp.Expr, simbolos: Tuple[sp.Symbol, ...] = (D, S, H)):
+        self.expressao = expressao
+        termos = sp.collect(sp.expand(expressao), Q, evaluate=False)
+
+        self._termos: List[Tuple[int, Callable[..., float]]] = []
+        for fator, coeficiente in termos.items():
+            base, expoente = fator.as_base_exp()
+            potencia = int(expoente) if base == Q else 0
+            self._termos.append((potencia, sp.lambdify(simbolos, coeficiente, "math")))
+
+        # Mesma ordem do impressor do SymPy: maior potência de Q primeiro
+        self._termos.sort(key=lambda termo: termo[0], reverse=True)
+
+    def formatar(self, *valores: float) -> str:
+        """
+        Gera o texto da expressão para os parâmetros informados (na ordem
+        dos símbolos).
+        """
+        partes = []
+        for potencia, coeficiente in self._termos:
+            valor = float(coeficiente(*valores))
+            texto = _formatar_float(abs(valor)) + _sufixo_potencia(potencia)
+            if not partes:
+                partes.append(f"-{texto}" if valor < 0 else texto)
+            else:
+                partes.append(f" - {texto}" if valor < 0 else f" + {texto}")
+        return "".join(partes)
+
+
+def _formatar_float(valor: float) -> str:
+    """
+    Formata um float como o SymPy imprime um Float dentro de uma expressão.
+    """
+    texto = to_str(from_float(valor), 15, strip_zeros=True)
+    if texto.startswith("."):
+        texto = "0" + texto
+    return texto
+
+
+def _sufixo_potencia(potencia: int) -> str:
+    """
+    Texto do fator Q**k como impresso pelo SymPy.
+    """
+    if potencia == 0:
+        return ""
+    if potencia == 1:
+        return f"*{Q}"
+    if potencia > 1:
+        return f"*{Q}**{potencia}"
+    if potencia == -1:
+        return f"/{Q}"
+    return f"/{Q}**{-potencia}"
+
+
+@lru_cache(maxsize=None)
+def modelo_simbolico(modelo: str = MODELO_LEC) -> Dict[str, ExpressaoParametrizada]:
+    """
+    Monta e deriva a função de custo de um modelo uma única vez por processo.
+
+    Returns:
+        Dicionário com a função de custo, a primeira e a segunda derivada
+    """
+    modelo_custo = obter_modelo(modelo)
+    funcao_custo = modelo_custo.expressao_custo()
+    simbolos = modelo_custo.simbolos
+    return {
+        "funcao_custo": ExpressaoParametrizada(funcao_custo, simbolos),
+        "derivada": ExpressaoParametrizada(sp.diff(funcao_custo, Q), simbolos),
+        "segunda_derivada": ExpressaoParametrizada(
+            sp.diff(funcao_custo, Q, 2), simbolos
+        ),
+    }
+
 
 class CalculadoraLoteEconomico:
     """
@@ -20,6 +139,9 @@ class CalculadoraLoteEconomico:
         custo_pedido: float,
         custo_manutencao: float,
         lote_atual: float = None,
+        modo: str = MODO_NUMERICO,
+        modelo: str = MODELO_LEC,
+        parametros_modelo: Optional[Dict[str, Optional[float]]] = None,
     ):
         """
         Inicializa o calculador com os parâmetros do produto.
@@ -29,46 +151,154 @@ class CalculadoraLoteEconomico:
             custo_pedido: Custo por pedido (S)
             custo_manutencao: Custo de manutenção por unidade por ano (H)
             lote_atual: Lote atual utilizado pela empresa (opcional)
+            modo: "numerico" (forma fechada, padrão) ou "simbolico" (SymPy)
+            modelo: Nome do modelo de custo registrado (padrão "lec")
+            parametros_modelo: Parâmetros adicionais do modelo, por nome
+                (por exemplo taxa_producao); os demais são ignorados
+
+        Raises:
+            ValueError: Se o modo ou o modelo forem inválidos ou faltarem
+                parâmetros do modelo.
         """
+        if modo not in (MODO_NUMERICO, MODO_SIMBOLICO):
+            raise ValueError(f"Modo de cálculo inválido: {modo}")
+
         self.demanda_anual = float(demanda_anual)
         self.custo_pedido = float(custo_pedido)
         self.custo_manutencao = float(custo_manutencao)
         self.lote_atual = float(lote_atual) if lote_atual else None
+        self.modo = modo
+
+        self.modelo_custo: ModeloCusto = obter_modelo(modelo)
+        self.modelo = self.modelo_custo.nome
+        parametros_modelo = parametros_modelo or {}
+        self.parametros_modelo = {
+            nome: float(parametros_modelo[nome])
+            for nome in self.modelo_custo.parametros
+            if parametros_modelo.get(nome) is not None
+        }
+        self.modelo_custo.validar(self.demanda_anual, self.parametros_modelo)
 
         # Símbolo para a variável de otimização
         self.Q = sp.symbols("Q", positive=True, real=True)
 
-        # Monta as funções de custo
-        self._montar_funcoes()
+        # As expressões simbólicas só são montadas quando necessárias
+        self._funcoes_montadas = False
+        if self.modo == MODO_SIMBOLICO:
+            self._montar_funcoes()
 
     def _montar_funcoes(self):
         """
-        Monta as funções de custo usando SymPy.
+        Monta a função de custo total do modelo usando SymPy, com os
+        parâmetros do produto substituídos.
+        """
+        substituicoes = dict(zip(self.modelo_custo.simbolos, self._valores_modelo()))
+        self.funcao_custo_total = self.modelo_custo.expressao_custo().subs(
+            substituicoes
+        )
+
+        self._funcoes_montadas = True
+
+    def _derivada_exata(self) -> sp.Expr:
+        """
+        Derivada da função de custo total com os parâmetros do produto
+        substituídos pelos racionais exatos dos seus floats.
+        """
+        substituicoes = {
+            simbolo: sp.Rational(valor)
+            for simbolo, valor in zip(
+                self.modelo_custo.simbolos, self._valores_modelo()
+            )
+        }
+        return sp.diff(self.modelo_custo.expressao_custo().subs(substituicoes), self.Q)
+
+    def _garantir_funcoes(self):
+        """
+        Monta as funções simbólicas apenas na primeira vez que forem usadas.
         """
-        # Custo de manter estoque: (H * Q) / 2
-        self.custo_estoque = (self.custo_manutencao * self.Q) / 2
+        if not self._funcoes_montadas:
+            self._montar_funcoes()
 
-        # Custo de pedido: (S * D) / Q
-        self.custo_pedido_formula = (self.custo_pedido * self.demanda_anual) / self.Q
+    def _valores_modelo(self) -> Tuple[float, ...]:
+        """
+        Valores dos parâmetros na ordem dos símbolos do modelo.
+        """
+        return (
+            self.demanda_anual,
+            self.custo_pedido,
+            self.custo_manutencao,
+        ) + tuple(self.parametros_modelo[nome] for nome in self.modelo_custo.parametros)
 
-        # Função de custo total: CT = Custo Estoque + Custo Pedido
-        self.funcao_custo_total = self.custo_estoque + self.custo_pedido_formula
+    def _lote_otimo_numerico(self) -> float:
+        """
+        Lote ótimo pela forma do modelo (Q* = sqrt(2DS/H) no LEC).
+        """
+        return float(
+            self.modelo_custo.lote_otimo(
+                self.demanda_anual,
+                self.custo_pedido,
+                self.custo_manutencao,
+                **self.parametros_modelo,
+            )
+        )
 
-    def calcular_lote_otimo(self) -> Dict[str, Any]:
+    def _custo_total_numerico(self, lote: float) -> float:
+        """
+        Avalia CT(Q) do modelo (HQ/2 + SD/Q no LEC, na mesma ordem de
+        operações do SymPy).
+        """
+        return float(self._custos_vetorizados(float(lote)))
+
+    def _formatar_expressao(self, nome: str) -> str:
+        """
+        Texto de uma expressão do modelo simbólico para este produto.
+        """
+        return modelo_simbolico(self.modelo)[nome].formatar(*self._valores_modelo())
+
+    def calcular_lote_otimo(self, incluir_expressoes: bool = True) -> Dict[str, Any]:
         """
         Calcula o lote ótimo usando derivadas com SymPy.
 
+        Args:
+            incluir_expressoes: Se True, inclui a função de custo e a derivada
+
         Returns:
             Dicionário com:
                 - lote_otimo: valor do lote econômico
                 - derivada: expressão da derivada
                 - pontos_criticos: todos os pontos críticos encontrados
         """
+        if self.modo == MODO_SIMBOLICO:
+            return self._calcular_lote_otimo_simbolico()
+
+        lote_otimo = self._lote_otimo_numerico()
+
+        resultado = {
+            "lote_otimo": (
+                max(round(lote_otimo, 2), LOTE_MINIMO) if lote_otimo else None
+            ),
+            "pontos_criticos": [lote_otimo],
+        }
+
+        if incluir_expressoes:
+            resultado["derivada"] = self._formatar_expressao("derivada")
+            resultado["funcao_custo"] = self._formatar_expressao("funcao_custo")
+
+        return resultado
+
+    def _calcular_lote_otimo_simbolico(self) -> Dict[str, Any]:
+        """
+        Calcula o lote ótimo resolvendo a derivada com SymPy.
+        """
+        self._garantir_funcoes()
+
         # Calcula a derivada da função de custo total
         derivada = sp.diff(self.funcao_custo_total, self.Q)
 
-        # Encontra os pontos críticos (onde derivada = 0)
-        pontos_criticos = sp.solve(derivada, self.Q)
+        # Encontra os pontos críticos (onde derivada = 0). A derivada é
+        # resolvida com os parâmetros como racionais exatos: com Floats de 15
+        # dígitos a raiz pode sair do lado errado de um empate na 3ª casa
+        pontos_criticos = sp.solve(self._derivada_exata(), self.Q)
 
         # Filtra apenas pontos positivos e reais
         lote_otimo = None
@@ -78,7 +308,9 @@ class CalculadoraLoteEconomico:
                 break
 
         return {
-            "lote_otimo": round(lote_otimo, 2) if lote_otimo else None,
+            "lote_otimo": (
+                max(round(lote_otimo, 2), LOTE_MINIMO) if lote_otimo else None
+            ),
             "derivada": str(derivada),
             "pontos_criticos": [float(p) for p in pontos_criticos if p.is_real],
             "funcao_custo": str(self.funcao_custo_total),
@@ -94,19 +326,27 @@ class CalculadoraLoteEconomico:
         Returns:
             Custo total anual
         """
-        # Substitui Q pelo valor do lote na fórmula
-        custo = self.funcao_custo_total.subs(self.Q, lote)
-        return round(float(custo), 2)
+        if self.modo == MODO_SIMBOLICO:
+            self._garantir_funcoes()
+            # Substitui Q pelo valor do lote na fórmula
+            custo = self.funcao_custo_total.subs(self.Q, lote)
+            return round(float(custo), 2)
 
-    def gerar_analise_completa(self) -> Dict[str, Any]:
+        return round(self._custo_total_numerico(lote), 2)
+
+    def gerar_analise_completa(self, incluir_expressoes: bool = True) -> Dict[str, Any]:
         """
         Gera uma análise completa incluindo lote ótimo, custos e economia.
 
+        Args:
+            incluir_expressoes: Se False, omite as expressões simbólicas
+                (funcao_custo e derivada), evitando o uso do SymPy
+
         Returns:
             Dicionário com análise completa
         """
         # Calcula lote ótimo
-        resultado_otimizacao = self.calcular_lote_otimo()
+        resultado_otimizacao = self.calcular_lote_otimo(incluir_expressoes)
         lote_otimo = resultado_otimizacao["lote_otimo"]
 
         # Calcula custo total ótimo
@@ -116,11 +356,13 @@ class CalculadoraLoteEconomico:
         analise = {
             "lote_otimo_calculado": lote_otimo,
             "custo_total_otimo": custo_total_otimo,
-            "funcao_custo": resultado_otimizacao["funcao_custo"],
-            "derivada": resultado_otimizacao["derivada"],
             "pontos_criticos": resultado_otimizacao["pontos_criticos"],
         }
 
+        if incluir_expressoes:
+            analise["funcao_custo"] = resultado_otimizacao["funcao_custo"]
+            analise["derivada"] = resultado_otimizacao["derivada"]
+
         # Se há lote atual, calcula comparação
         if self.lote_atual:
             custo_total_atual = self.calcular_custo_total(self.lote_atual)
@@ -147,50 +389,208 @@ class CalculadoraLoteEconomico:
 
         return analise
 
+    def _custos_vetorizados(self, lotes: np.ndarray) -> np.ndarray:
+        """
+        Avalia CT(Q) para um array de lotes em uma única expressão NumPy.
+        """
+        return self.modelo_custo.custo_total(
+            lotes,
+            self.demanda_anual,
+            self.custo_pedido,
+            self.custo_manutencao,
+            **self.parametros_modelo,
+        )
+
+    def intervalo_grafico(
+        self, q_min: Optional[float] = None, q_max: Optional[float] = None
+    ) -> Tuple[float, float]:
+        """
+        Define o intervalo de Q do gráfico. Limites não informados são
+        centrados no lote ótimo e ampliados para incluir o lote atual.
+
+        Args:
+            q_min: Valor mínimo de Q (opcional)
+            q_max: Valor máximo de Q (opcional)
+
+        Returns:
+            Tupla (q_min, q_max)
+
+        Raises:
+            ValueError: Se o intervalo for inválido.
+        """
+        lote_otimo = self._lote_otimo_numerico()
+
+        if q_min is None:
+            q_min = lote_otimo * FATOR_INTERVALO_MIN
+            if self.lote_atual:
+                q_min = min(q_min, self.lote_atual * 0.9)
+        if q_max is None:
+            q_max = lote_otimo * FATOR_INTERVALO_MAX
+            if self.lote_atual:
+                q_max = max(q_max, self.lote_atual * 1.1)
+
+        if q_min <= 0 or q_max <= q_min:
+            raise ValueError("Intervalo do gráfico inválido: use 0 < q_min < q_max")
+
+        return float(q_min), float(q_max)
+
+    def calcular_curva(
+        self,
+        q_min: Optional[float] = None,
+        q_max: Optional[float] = None,
+        pontos: int = 100,
+        escala: str = ESCALA_LINEAR,
+        max_pontos: Optional[int] = None,
+        funcao_custo: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcula a curva de custo total x lote de forma vetorizada.
+
+        Args:
+            q_min: Valor mínimo de Q (automático se None)
+            q_max: Valor máximo de Q (automático se None)
+            pontos: Número de pontos avaliados
+            escala: "linear", "log" ou "adaptativa" (mais pontos onde a
+                curvatura é maior)
+            max_pontos: Limite de pontos retornados; acima dele a curva
+                é reduzida com LTTB
+            funcao_custo: Custo de um array de lotes no lugar de CT(Q)
+                (por exemplo, o custo com descontos por quantidade)
+
+        Returns:
+            Tupla com os arrays de lotes e de custos (arredondados)
+
+        Raises:
+            ValueError: Se o intervalo, a escala ou o número de pontos forem inválidos.
+        """
+        if pontos < 2:
+            raise ValueError("O gráfico precisa de pelo menos 2 pontos")
+        if pontos > MAX_PONTOS_GRAFICO:
+            raise ValueError(f"O gráfico aceita no máximo {MAX_PONTOS_GRAFICO} pontos")
+
+        q_min, q_max = self.intervalo_grafico(q_min, q_max)
+
+        if escala == ESCALA_LINEAR:
+            lotes = np.linspace(q_min, q_max, pontos)
+        elif escala == ESCALA_LOG:
+            lotes = np.geomspace(q_min, q_max, pontos)
+        elif escala == ESCALA_ADAPTATIVA:
+            lotes = self._amostrar_por_curvatura(q_min, q_max, pontos, funcao_custo)
+        else:
+            raise ValueError(f"Escala de gráfico inválida: {escala}")
+
+        custos = _arredondar((funcao_custo or self._custos_vetorizados)(lotes))
+
+        if max_pontos is not None and pontos > max_pontos:
+            lotes, custos = _reduzir_lttb(lotes, custos, max_pontos)
+
+        return lotes, custos
+
+    def _amostrar_por_curvatura(
+        self,
+        q_min: float,
+        q_max: float,
+        pontos: int,
+        funcao_custo: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> np.ndarray:
+        """
+        Distribui os pontos com densidade proporcional à curvatura da curva
+        (em coordenadas normalizadas), com um piso para cobrir as regiões planas.
+        """
+        denso = np.linspace(q_min, q_max, pontos * 8)
+        custos = (funcao_custo or self._custos_vetorizados)(denso)
+
+        x = (denso - q_min) / (q_max - q_min)
+        y = (custos - custos.min()) / (np.ptp(custos) or 1.0)
+        dy = np.gradient(y, x)
+        d2y = np.gradient(dy, x)
+        curvatura = np.abs(d2y) / (1 + dy**2) ** 1.5
+
+        densidade = curvatura / (curvatura.max() or 1.0) + 0.05
+        acumulada = np.concatenate(
+            ([0.0], np.cumsum((densidade[1:] + densidade[:-1]) / 2 * np.diff(x)))
+        )
+        acumulada /= acumulada[-1]
+
+        return np.interp(np.linspace(0.0, 1.0, pontos), acumulada, denso)
+
     def gerar_dados_grafico(
-        self, q_min: float = 10, q_max: float = 200, pontos: int = 100
+        self,
+        q_min: Optional[float] = None,
+        q_max: Optional[float] = None,
+        pontos: int = 100,
+        escala: str = ESCALA_LINEAR,
+        max_pontos: Optional[int] = None,
     ) -> Dict[str, List[float]]:
         """
         Gera dados para plotagem do gráfico de custo x lote.
 
         Args:
-            q_min: Valor mínimo de Q
-            q_max: Valor máximo de Q
+            q_min: Valor mínimo de Q (automático se None)
+            q_max: Valor máximo de Q (automático se None)
             pontos: Número de pontos para o gráfico
+            escala: "linear", "log" ou "adaptativa"
+            max_pontos: Limite de pontos retornados (redução com LTTB)
 
         Returns:
             Dicionário com listas de valores de Q e custos correspondentes
         """
-        # Gera valores de Q
-        valores_q = np.linspace(q_min, q_max, pontos)
-
-        # Calcula custos para cada Q
-        custos = [self.calcular_custo_total(q) for q in valores_q]
+        valores_q, custos = self.calcular_curva(
+            q_min, q_max, pontos, escala, max_pontos
+        )
 
         return {
             "valores_lote": valores_q.tolist(),
-            "valores_custo": custos,
+            "valores_custo": custos.tolist(),
         }
 
-    def verificar_segunda_derivada(self, lote: float) -> Dict[str, Any]:
+    def verificar_segunda_derivada(
+        self, lote: float, incluir_expressoes: bool = True
+    ) -> Dict[str, Any]:
         """
         Verifica a segunda derivada para confirmar que é um ponto de mínimo.
 
         Args:
             lote: Valor do lote a verificar
+            incluir_expressoes: Se True, inclui a expressão da segunda derivada
 
         Returns:
             Dicionário com informações da segunda derivada
         """
-        segunda_derivada = sp.diff(self.funcao_custo_total, self.Q, 2)
-        valor_segunda_derivada = float(segunda_derivada.subs(self.Q, lote))
+        if self.modo == MODO_SIMBOLICO:
+            self._garantir_funcoes()
+            segunda_derivada = sp.diff(self.funcao_custo_total, self.Q, 2)
+            valor_segunda_derivada = float(segunda_derivada.subs(self.Q, lote))
 
-        return {
-            "segunda_derivada": str(segunda_derivada),
+            return {
+                "segunda_derivada": str(segunda_derivada),
+                "valor_no_ponto": valor_segunda_derivada,
+                "e_minimo": valor_segunda_derivada > 0,
+            }
+
+        # d²CT/dQ² (2SD/Q³ no LEC)
+        valor_segunda_derivada = float(
+            self.modelo_custo.segunda_derivada(
+                float(lote),
+                self.demanda_anual,
+                self.custo_pedido,
+                self.custo_manutencao,
+                **self.parametros_modelo,
+            )
+        )
+
+        verificacao = {
             "valor_no_ponto": valor_segunda_derivada,
             "e_minimo": valor_segunda_derivada > 0,
         }
 
+        if incluir_expressoes:
+            verificacao["segunda_derivada"] = self._formatar_expressao(
+                "segunda_derivada"
+            )
+
+        return verificacao
+
     def gerar_relatorio_detalhado(self) -> Dict[str, Any]:
         """
         Gera relatório completo com todas as informações matemáticas e análise.
@@ -201,14 +601,511 @@ class CalculadoraLoteEconomico:
         analise = self.gerar_analise_completa()
         verificacao = self.verificar_segunda_derivada(analise["lote_otimo_calculado"])
 
+        indicadores = self.modelo_custo.indicadores(
+            analise["lote_otimo_calculado"],
+            self.demanda_anual,
+            self.custo_pedido,
+            self.custo_manutencao,
+            **self.parametros_modelo,
+        )
+
         relatorio = {
             **analise,
             "verificacao_otimalidade": verificacao,
+            "modelo": self.modelo,
+            "indicadores_modelo": {
+                nome: round(float(valor), 2) for nome, valor in indicadores.items()
+            },
             "parametros": {
                 "demanda_anual": self.demanda_anual,
                 "custo_pedido": self.custo_pedido,
                 "custo_manutencao": self.custo_manutencao,
+                **self.parametros_modelo,
             },
         }
 
         return relatorio
+
+
+def _arredondar(valores: np.ndarray, casas: int = 2) -> np.ndarray:
+    """
+    Arredonda um array com o mesmo resultado do round() do Python.
+
+    O np.round escala o valor antes de arredondar e pode divergir do round()
+    nos casos muito próximos da metade; esses poucos casos são refeitos
+    com o round() nativo.
+    """
+    arredondado = np.round(valores, casas)
+    escala = 10.0**casas
+    with np.errstate(invalid="ignore"):
+        fracao = np.abs(valores * escala - np.floor(valores * escala) - 0.5)
+        ambiguos = np.flatnonzero(fracao < 1e-6)
+    for i in ambiguos:
+        arredondado.flat[i] = round(float(valores.flat[i]), casas)
+    return arredondado
+
+
+def _reduzir_lttb(
+    x: np.ndarray, y: np.ndarray, limite: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduz uma série para ``limite`` pontos com o algoritmo
+    Largest-Triangle-Three-Buckets, preservando a forma visual da curva.
+    """
+    n = x.size
+    if limite >= n or limite < 3:
+        return x, y
+
+    indices = np.empty(limite, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # limite - 2 baldes entre o primeiro e o último ponto
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        proximo_fim = bordas[i + 2] if i + 2 < bordas.size else n
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+
+    return x[indices], y[indices]
+
+
+class CalculadoraLoteEconomicoLote:
+    """
+    Versão vetorizada da CalculadoraLoteEconomico para vários produtos.
+    Recebe arrays de parâmetros e calcula todos os produtos em uma única
+    passada NumPy, com a mesma forma fechada e o mesmo arredondamento
+    do cálculo individual. Com modelos de custo diferentes entre os
+    produtos, cada modelo é avaliado de uma vez sobre os seus produtos.
+    """
+
+    def __init__(
+        self,
+        demanda_anual: Any,
+        custo_pedido: Any,
+        custo_manutencao: Any,
+        lote_atual: Any = None,
+        modelo: Any = MODELO_LEC,
+        parametros_modelo: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Inicializa o calculador com os parâmetros dos produtos.
+
+        Args:
+            demanda_anual: Array com a demanda anual de cada produto (D)
+            custo_pedido: Array com o custo por pedido de cada produto (S)
+            custo_manutencao: Array com o custo de manutenção de cada produto (H)
+            lote_atual: Array com o lote atual de cada produto (opcional).
+                Valores None, NaN ou zero indicam produto sem lote atual.
+            modelo: Modelo de custo de todos os produtos ou um por produto
+                (None equivale a "lec")
+            parametros_modelo: Arrays com os parâmetros adicionais dos
+                modelos, por nome (None ou NaN onde não se aplicam)
+
+        Raises:
+            ValueError: Se os arrays tiverem tamanhos diferentes, algum
+                modelo for inválido ou faltarem parâmetros de um modelo.
+        """
+        self.demanda_anual = np.asarray(demanda_anual, dtype=np.float64).ravel()
+        self.custo_pedido = np.asarray(custo_pedido, dtype=np.float64).ravel()
+        self.custo_manutencao = np.asarray(custo_manutencao, dtype=np.float64).ravel()
+
+        tamanho = self.demanda_anual.size
+        if self.custo_pedido.size != tamanho or self.custo_manutencao.size != tamanho:
+            raise ValueError("Os arrays de parâmetros devem ter o mesmo tamanho")
+
+        if lote_atual is None:
+            self.lote_atual = np.full(tamanho, np.nan)
+        else:
+            lote_atual = self._array_com_nulos(lote_atual)
+            # Mesmo critério do cálculo individual: lote zero equivale a ausente
+            self.lote_atual = np.where(lote_atual == 0, np.nan, lote_atual)
+
+        self.parametros_modelo = {
+            nome: self._array_com_nulos(valores)
+            for nome, valores in (parametros_modelo or {}).items()
+            if valores is not None
+        }
+
+        # Grupos (modelo, índices dos produtos); com um único modelo o
+        # grupo cobre todos os produtos sem cópia dos arrays
+        if modelo is None or isinstance(modelo, str):
+            self._grupos = [(obter_modelo(modelo), slice(None))]
+        else:
+            nomes = np.array([nome or MODELO_LEC for nome in modelo], dtype=object)
+            if nomes.size != tamanho:
+                raise ValueError("Os arrays de parâmetros devem ter o mesmo tamanho")
+            distintos = list(dict.fromkeys(nomes.tolist()))
+            self._grupos = [
+                (
+                    obter_modelo(nome),
+                    (
+                        slice(None)
+                        if len(distintos) == 1
+                        else np.flatnonzero(nomes == nome)
+                    ),
+                )
+                for nome in distintos
+            ]
+
+        for modelo_custo, indices in self._grupos:
+            modelo_custo.validar(
+                self.demanda_anual[indices], self._parametros(modelo_custo, indices)
+            )
+
+    def _array_com_nulos(self, valores: Any) -> np.ndarray:
+        """
+        Converte valores por produto em array float (None vira NaN).
+        """
+        array = np.array(
+            (
+                [np.nan if v is None else v for v in valores]
+                if isinstance(valores, (list, tuple))
+                else valores
+            ),
+            dtype=np.float64,
+        ).ravel()
+        if array.size != self.demanda_anual.size:
+            raise ValueError("Os arrays de parâmetros devem ter o mesmo tamanho")
+        return array
+
+    def __len__(self) -> int:
+        return self.demanda_anual.size
+
+    def _parametros(self, modelo: ModeloCusto, indices: Any) -> Dict[str, np.ndarray]:
+        """
+        Parâmetros adicionais de um modelo para os produtos indicados.
+        """
+        return {
+            nome: self.parametros_modelo[nome][indices]
+            for nome in modelo.parametros
+            if nome in self.parametros_modelo
+        }
+
+    def _avaliar(self, metodo: str, *por_produto: np.ndarray) -> np.ndarray:
+        """
+        Chama o método informado de cada modelo de custo com os arrays por
+        produto (antes de D, S e H) restritos aos produtos do modelo e
+        junta os resultados na ordem dos produtos.
+        """
+        if len(self._grupos) == 1:
+            modelo, indices = self._grupos[0]
+            return getattr(modelo, metodo)(
+                *por_produto,
+                self.demanda_anual,
+                self.custo_pedido,
+                self.custo_manutencao,
+                **self._parametros(modelo, indices),
+            )
+
+        resultado = np.empty(len(self))
+        for modelo, indices in self._grupos:
+            resultado[indices] = getattr(modelo, metodo)(
+                *(array[indices] for array in por_produto),
+                self.demanda_anual[indices],
+                self.custo_pedido[indices],
+                self.custo_manutencao[indices],
+                **self._parametros(modelo, indices),
+            )
+        return resultado
+
+    def calcular_lote_otimo(self) -> np.ndarray:
+        """
+        Calcula o lote ótimo de todos os produtos (Q* = sqrt(2DS/H) no LEC).
+
+        Returns:
+            Array com os lotes ótimos arredondados
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lote_otimo = self._avaliar("lote_otimo")
+        return np.maximum(_arredondar(lote_otimo), LOTE_MINIMO)
+
+    def manutencao_equivalente(self) -> np.ndarray:
+        """
+        Custo de manutenção equivalente h de cada produto, com
+        CT(Q) = DS/Q + hQ/2 (o próprio H no LEC).
+
+        Raises:
+            ValueError: Se algum modelo não tiver essa forma.
+        """
+        for modelo, _ in self._grupos:
+            if (
+                type(modelo).manutencao_equivalente
+                is ModeloCusto.manutencao_equivalente
+            ):
+                raise ValueError(
+                    f"O modelo {modelo.nome} não tem custo de manutenção equivalente"
+                )
+        return self._avaliar("manutencao_equivalente")
+
+    def calcular_custo_total(self, lote: Any) -> np.ndarray:
+        """
+        Calcula o custo total anual de cada produto para os lotes informados.
+
+        Args:
+            lote: Array com um tamanho de lote por produto
+
+        Returns:
+            Array com os custos totais arredondados (NaN onde o lote é NaN)
+        """
+        lote = np.asarray(lote, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            custo = self._avaliar("custo_total", lote)
+        return _arredondar(custo)
+
+    def gerar_analise_completa(self) -> Dict[str, np.ndarray]:
+        """
+        Gera a análise completa de todos os produtos.
+
+        Returns:
+            Dicionário de arrays com lote ótimo, custos e economia.
+            Produtos sem lote atual recebem NaN nos campos de comparação.
+        """
+        lote_otimo = self.calcular_lote_otimo()
+        custo_total_otimo = self.calcular_custo_total(lote_otimo)
+        custo_total_atual = self.calcular_custo_total(self.lote_atual)
+
+        economia_anual = custo_total_atual - custo_total_otimo
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentual_economia = (economia_anual / custo_total_atual) * 100
+
+        return {
+            "lote_otimo_calculado": lote_otimo,
+            "custo_total_otimo": custo_total_otimo,
+            "lote_atual_empresa": self.lote_atual,
+            "custo_total_atual": custo_total_atual,
+            "economia_anual": _arredondar(economia_anual),
+            "percentual_economia": _arredondar(percentual_economia),
+        }
+
+    def gerar_registros(self) -> List[Dict[str, Any]]:
+        """
+        Converte a análise vetorizada em uma lista de dicionários no mesmo
+        formato de CalculadoraLoteEconomico.gerar_analise_completa
+        (sem as expressões simbólicas), com None no lugar de NaN.
+
+        Returns:
+            Lista com a análise de cada produto
+        """
+        analise = self.gerar_analise_completa()
+        colunas = {
+            chave: [None if math.isnan(v) else v for v in valores.tolist()]
+            for chave, valores in analise.items()
+        }
+        return [dict(zip(colunas, linha)) for linha in zip(*colunas.values())]
+
+
+class CalculadoraLoteEconomicoDesconto(CalculadoraLoteEconomicoLote):
+    """
+    Lote econômico com descontos por quantidade para vários produtos.
+
+    Cada produto tem uma tabela de faixas (quantidade mínima, preço
+    unitário) e o custo total anual passa a incluir a compra:
+    CT(Q) = D * c(Q) + D * S / Q + H * Q / 2, com H fixo por produto.
+    Em "todas_unidades" o preço da faixa em que Q cai vale para o pedido
+    inteiro; em "incremental" cada preço vale só para as unidades dentro
+    da sua faixa. A quantidade mínima da primeira faixa funciona como lote
+    mínimo de compra. Produtos sem faixas seguem o modelo sem custo de
+    compra.
+
+    As tabelas são completadas até o mesmo número de faixas e todas as
+    faixas de todos os produtos são avaliadas em uma única passada NumPy.
+    """
+
+    def __init__(
+        self,
+        demanda_anual: Any,
+        custo_pedido: Any,
+        custo_manutencao: Any,
+        faixas_desconto: List[Optional[List[Tuple[float, float]]]],
+        tipo_desconto: Any = DESCONTO_TODAS_UNIDADES,
+        lote_atual: Any = None,
+    ):
+        """
+        Inicializa o calculador com os parâmetros e tabelas dos produtos.
+
+        Args:
+            demanda_anual, custo_pedido, custo_manutencao, lote_atual:
+                Como em CalculadoraLoteEconomicoLote
+            faixas_desconto: Por produto, lista de pares (quantidade mínima,
+                preço unitário) ou None para produto sem desconto
+            tipo_desconto: "todas_unidades" ou "incremental", um para
+                todos ou um por produto
+
+        Raises:
+            ValueError: Se as tabelas forem inválidas ou os tamanhos diferirem.
+        """
+        super().__init__(demanda_anual, custo_pedido, custo_manutencao, lote_atual)
+
+        tamanho = len(self)
+        if len(faixas_desconto) != tamanho:
+            raise ValueError("Os arrays de parâmetros devem ter o mesmo tamanho")
+        if isinstance(tipo_desconto, str):
+            tipo_desconto = [tipo_desconto] * tamanho
+        if len(tipo_desconto) != tamanho:
+            raise ValueError("Os arrays de parâmetros devem ter o mesmo tamanho")
+
+        # Produto sem tabela equivale a uma faixa única a partir de zero
+        # com preço zero: o custo volta a ser o do LEC clássico
+        tabelas = [
+            list(faixas) if faixas else [(0.0, 0.0)] for faixas in faixas_desconto
+        ]
+        maximo_faixas = max(len(tabela) for tabela in tabelas)
+
+        self.minimos = np.full((tamanho, maximo_faixas), np.inf)
+        self.precos = np.full((tamanho, maximo_faixas), np.nan)
+        for i, tabela in enumerate(tabelas):
+            self.minimos[i, : len(tabela)] = [faixa[0] for faixa in tabela]
+            self.precos[i, : len(tabela)] = [faixa[1] for faixa in tabela]
+
+        for tipo in tipo_desconto:
+            if tipo not in TIPOS_DESCONTO:
+                raise ValueError(f"Tipo de desconto inválido: {tipo}")
+        self.incremental = np.array(
+            [tipo == DESCONTO_INCREMENTAL for tipo in tipo_desconto], dtype=bool
+        )
+
+        self.validas = np.isfinite(self.minimos)
+        with np.errstate(invalid="ignore"):
+            diferencas_minimos = np.diff(self.minimos, axis=1)
+            diferencas_precos = np.diff(self.precos, axis=1)
+        seguintes = self.validas[:, 1:]
+        if np.any(self.minimos[self.validas] < 0) or np.any(
+            self.precos[self.validas] < 0
+        ):
+            raise ValueError("Quantidades mínimas e preços não podem ser negativos")
+        if np.any(diferencas_minimos[seguintes] <= 0):
+            raise ValueError(
+                "As quantidades mínimas das faixas devem ser estritamente crescentes"
+            )
+        if np.any(diferencas_precos[seguintes] > 0):
+            raise ValueError("Os preços das faixas não podem aumentar com a quantidade")
+        if np.any(self.incremental & (self.minimos[:, 0] != 0)):
+            raise ValueError(
+                "No desconto incremental a primeira faixa deve começar em 0"
+            )
+
+        # Limite superior de cada faixa: o mínimo da faixa seguinte
+        self.maximos = np.concatenate(
+            (self.minimos[:, 1:], np.full((tamanho, 1), np.inf)), axis=1
+        )
+
+        # Incremental: compra de Q na faixa j custa R_j + c_j * (Q - q_j),
+        # com R_j o custo acumulado das faixas anteriores. A parte fixa
+        # R_j - c_j * q_j se comporta como um custo de pedido adicional.
+        with np.errstate(invalid="ignore"):
+            custo_faixas = np.where(
+                seguintes, self.precos[:, :-1] * diferencas_minimos, 0.0
+            )
+        acumulado = np.concatenate(
+            (np.zeros((tamanho, 1)), np.cumsum(custo_faixas, axis=1)), axis=1
+        )
+        with np.errstate(invalid="ignore"):
+            fixo = acumulado - self.precos * self.minimos
+        self.fixo_faixas = np.where(
+            self.incremental[:, np.newaxis] & self.validas, fixo, 0.0
+        )
+
+    def _expandir(self, valores: np.ndarray, dimensoes: int) -> np.ndarray:
+        """
+        Acrescenta eixos a um array por produto para combinar com lotes de
+        dimensoes eixos (o primeiro é o produto).
+        """
+        return valores.reshape(
+            valores.shape[:1] + (1,) * (dimensoes - 1) + valores.shape[1:]
+        )
+
+    def _custo_na_faixa(
+        self, lote: np.ndarray, preco: np.ndarray, fixo: np.ndarray
+    ) -> np.ndarray:
+        dimensoes = lote.ndim
+        demanda = self._expandir(self.demanda_anual, dimensoes)
+        pedido = self._expandir(self.custo_pedido, dimensoes)
+        manutencao = self._expandir(self.custo_manutencao, dimensoes)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (
+                demanda * preco
+                + demanda * (pedido + fixo) / lote
+                + (manutencao / 2) * lote
+            )
+
+    def calcular_lote_otimo(self) -> np.ndarray:
+        """
+        Calcula o lote de menor custo total de cada produto.
+
+        Em cada faixa o custo é convexo em Q, então o melhor lote da faixa
+        é o LEC da faixa levado para dentro dos seus limites. Em
+        "todas_unidades" uma faixa cujo LEC passa do limite superior é
+        descartada: o início da faixa seguinte custa menos. O lote
+        escolhido é o de menor custo entre as faixas.
+
+        Returns:
+            Array com os lotes ótimos arredondados
+        """
+        demanda = self.demanda_anual[:, np.newaxis]
+        pedido = self.custo_pedido[:, np.newaxis]
+        manutencao = self.custo_manutencao[:, np.newaxis]
+
+        with np.errstate(invalid="ignore"):
+            lote_faixa = np.sqrt(2 * demanda * (pedido + self.fixo_faixas) / manutencao)
+            candidato = np.where(
+                self.incremental[:, np.newaxis],
+                np.clip(lote_faixa, self.minimos, self.maximos),
+                np.maximum(lote_faixa, self.minimos),
+            )
+            viavel = self.validas & (
+                self.incremental[:, np.newaxis] | (lote_faixa < self.maximos)
+            )
+
+        custos = np.where(
+            viavel,
+            self._custo_na_faixa(candidato, self.precos, self.fixo_faixas),
+            np.inf,
+        )
+        melhor = np.argmin(custos, axis=1)
+        lote_otimo = np.take_along_axis(candidato, melhor[:, np.newaxis], axis=1)[:, 0]
+        return np.maximum(_arredondar(lote_otimo), LOTE_MINIMO)
+
+    def _faixa_do_lote(self, lote: np.ndarray) -> np.ndarray:
+        """
+        Índice da faixa em que cada lote cai (lotes abaixo da primeira
+        faixa usam a primeira).
+        """
+        minimos = self._expandir(self.minimos, lote.ndim)
+        faixa = np.sum(lote[..., np.newaxis] >= minimos, axis=-1) - 1
+        return np.maximum(faixa, 0)
+
+    def calcular_custo_total(self, lote: Any) -> np.ndarray:
+        """
+        Calcula o custo total anual (com a compra) para os lotes informados.
+
+        Args:
+            lote: Array com um lote por produto, ou uma linha de lotes por
+                produto (forma (produtos, k))
+
+        Returns:
+            Array com os custos totais arredondados (NaN onde o lote é NaN)
+        """
+        lote = np.asarray(lote, dtype=np.float64)
+        faixa = self._faixa_do_lote(lote)[..., np.newaxis]
+        forma = lote.shape + (self.minimos.shape[1],)
+        preco = np.take_along_axis(
+            np.broadcast_to(self._expandir(self.precos, lote.ndim), forma),
+            faixa,
+            axis=-1,
+        )[..., 0]
+        fixo = np.take_along_axis(
+            np.broadcast_to(self._expandir(self.fixo_faixas, lote.ndim), forma),
+            faixa,
+            axis=-1,
+        )[..., 0]
+        return _arredondar(self._custo_na_faixa(lote, preco, fixo))
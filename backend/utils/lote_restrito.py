@@ -0,0 +1,290 @@
+"""
+Lote econômico de vários itens com restrições de capacidade e orçamento.
+
+Minimiza a soma dos custos anuais de pedido e manutenção dos itens,
+sum(D_i S_i / Q_i + H_i Q_i / 2), sujeita a
+
+    sum(v_i Q_i) <= capacidade   (espaço com todos os lotes recebidos)
+    sum(c_i Q_i) <= orcamento    (capital investido nos lotes)
+
+Pelas condições de KKT o lote de cada item é
+Q_i = sqrt(2 D_i S_i / (H_i + 2 λ v_i + 2 μ c_i)), com multiplicadores
+λ, μ >= 0 nulos quando a restrição correspondente folga. Os multiplicadores
+são encontrados por busca sobre os arrays de itens, sem laço por item.
+
+Cada lote tem o limite inferior LOTE_MINIMO (0.01): com ele ativo o lote do
+item fica no mínimo, Q_i = max(LOTE_MINIMO, sqrt(...)), e limites menores
+que o uso com todos os lotes no mínimo não têm solução.
+
+Nos modelos de custo com CT(Q) = DS/Q + hQ/2 (lote econômico de produção,
+faltas planejadas) H_i é o custo de manutenção equivalente h do item.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.lote_economico import LOTE_MINIMO, CalculadoraLoteEconomicoLote
+from utils.modelos_custo import MODELO_LEC
+
+# Tolerância relativa sobre o limite da restrição
+TOLERANCIA_RESTRICAO = 1e-9
+MAX_ITERACOES_NEWTON = 100
+MAX_ITERACOES_BISSECAO = 200
+
+
+class CalculadoraLoteEconomicoRestrito(CalculadoraLoteEconomicoLote):
+    """
+    Lotes de vários itens de um projeto sob restrições globais de
+    capacidade e de orçamento.
+    """
+
+    def __init__(
+        self,
+        demanda_anual: Any,
+        custo_pedido: Any,
+        custo_manutencao: Any,
+        volume_unitario: Any = None,
+        custo_unitario: Any = None,
+        modelo: Any = MODELO_LEC,
+        parametros_modelo: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Inicializa o calculador com os parâmetros dos itens.
+
+        Args:
+            demanda_anual, custo_pedido, custo_manutencao, modelo,
+                parametros_modelo: Como em CalculadoraLoteEconomicoLote
+            volume_unitario: Array com o volume de cada unidade (v)
+            custo_unitario: Array com o custo de cada unidade (c)
+
+        Raises:
+            ValueError: Se os arrays tiverem tamanhos diferentes ou algum
+                modelo de custo não tiver manutenção equivalente.
+        """
+        super().__init__(
+            demanda_anual,
+            custo_pedido,
+            custo_manutencao,
+            modelo=modelo,
+            parametros_modelo=parametros_modelo,
+        )
+        self.volume_unitario = self._array_opcional(volume_unitario)
+        self.custo_unitario = self._array_opcional(custo_unitario)
+        self._numerador = 2 * self.demanda_anual * self.custo_pedido
+        self._manutencao = self.manutencao_equivalente()
+
+    def _array_opcional(self, valores: Any) -> Optional[np.ndarray]:
+        if valores is None:
+            return None
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        if valores.size != len(self):
+            raise ValueError("Os arrays de parâmetros devem ter o mesmo tamanho")
+        return valores
+
+    def _pesos(self, pesos: Optional[np.ndarray], nome: str) -> np.ndarray:
+        """
+        Valida os pesos de uma restrição (volume ou custo unitário).
+        """
+        if pesos is None:
+            raise ValueError(f"Informe {nome} dos itens")
+        faltantes = int(np.count_nonzero(np.isnan(pesos)))
+        if faltantes:
+            raise ValueError(f"{faltantes} item(ns) sem {nome}")
+        if np.any(pesos < 0):
+            raise ValueError(f"Valores de {nome} não podem ser negativos")
+        return pesos
+
+    def lotes(self, denominador: np.ndarray) -> np.ndarray:
+        """
+        Lotes Q_i = max(LOTE_MINIMO, sqrt(2 D_i S_i / denominador_i)).
+        """
+        return np.maximum(np.sqrt(self._numerador / denominador), LOTE_MINIMO)
+
+    def _denominador(
+        self,
+        lambda_: float,
+        mu: float,
+        volume: Optional[np.ndarray],
+        custo: Optional[np.ndarray],
+    ) -> np.ndarray:
+        """
+        H_i + 2 λ v_i + 2 μ c_i (restrições ausentes não contribuem).
+        """
+        denominador = self._manutencao
+        if volume is not None:
+            denominador = denominador + 2 * lambda_ * volume
+        if custo is not None:
+            denominador = denominador + 2 * mu * custo
+        return denominador
+
+    def _resolver_multiplicador(
+        self, pesos: np.ndarray, limite: float, base: np.ndarray
+    ) -> Tuple[float, int]:
+        """
+        Menor multiplicador m >= 0 com sum(pesos * Q(base + 2 m pesos)) <= limite.
+
+        O uso da restrição é convexo e decrescente em m (os lotes no mínimo
+        não variam), então o método de Newton partindo de m = 0 se aproxima
+        da raiz sempre pela esquerda, sem ultrapassá-la.
+
+        Returns:
+            Tupla (multiplicador, iterações).
+        """
+        multiplicador = 0.0
+        for iteracao in range(MAX_ITERACOES_NEWTON):
+            denominador = base + 2 * multiplicador * pesos
+            lotes = self.lotes(denominador)
+            excesso = float(np.dot(pesos, lotes)) - limite
+            if excesso <= limite * TOLERANCIA_RESTRICAO:
+                return multiplicador, iteracao
+            livres = lotes > LOTE_MINIMO
+            derivada = -float(np.sum((pesos * pesos * lotes / denominador)[livres]))
+            multiplicador -= excesso / derivada
+        return multiplicador, MAX_ITERACOES_NEWTON
+
+    def otimizar(
+        self, capacidade: Optional[float] = None, orcamento: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Calcula os lotes restritos de todos os itens.
+
+        Com as duas restrições, testa cada uma sozinha; se nenhuma solução
+        isolada respeitar a outra, as duas estão ativas e μ é buscado por
+        bisseção, resolvendo λ por Newton a cada passo.
+
+        Args:
+            capacidade: Limite de sum(v_i Q_i) (opcional)
+            orcamento: Limite de sum(c_i Q_i) (opcional)
+
+        Returns:
+            Dicionário com os lotes irrestritos e restritos (arrays),
+            custos, uso de cada restrição e multiplicadores.
+
+        Raises:
+            ValueError: Se nenhuma restrição for informada, faltarem dados
+                ou um limite não comportar o lote mínimo de cada item.
+        """
+        if capacidade is None and orcamento is None:
+            raise ValueError("Informe a capacidade e/ou o orçamento")
+        if (capacidade is not None and capacidade <= 0) or (
+            orcamento is not None and orcamento <= 0
+        ):
+            raise ValueError("A capacidade e o orçamento devem ser maiores que zero")
+
+        volume = (
+            self._pesos(self.volume_unitario, "volume unitário")
+            if capacidade is not None
+            else None
+        )
+        custo = (
+            self._pesos(self.custo_unitario, "custo unitário")
+            if orcamento is not None
+            else None
+        )
+
+        def uso(pesos, lotes):
+            return float(np.dot(pesos, lotes)) if pesos is not None else 0.0
+
+        for pesos, limite, nome in (
+            (volume, capacidade, "A capacidade"),
+            (custo, orcamento, "O orçamento"),
+        ):
+            if pesos is None:
+                continue
+            minimo = uso(pesos, np.full(len(self), LOTE_MINIMO))
+            if minimo > limite * (1 + TOLERANCIA_RESTRICAO):
+                raise ValueError(
+                    f"{nome} não comporta o lote mínimo de {LOTE_MINIMO} de "
+                    f"cada item (uso mínimo {minimo:.4f})"
+                )
+
+        lambda_, mu, iteracoes = 0.0, 0.0, 0
+        if volume is not None:
+            lambda_, n = self._resolver_multiplicador(
+                volume, capacidade, self._manutencao
+            )
+            iteracoes += n
+
+        lotes = self.lotes(self._denominador(lambda_, mu, volume, custo))
+        if custo is not None and uso(custo, lotes) > orcamento * (
+            1 + TOLERANCIA_RESTRICAO
+        ):
+            # O orçamento também limita: tenta apenas ele
+            lambda_ = 0.0
+            mu, n = self._resolver_multiplicador(custo, orcamento, self._manutencao)
+            iteracoes += n
+
+            lotes = self.lotes(self._denominador(lambda_, mu, volume, custo))
+            if volume is not None and uso(volume, lotes) > capacidade * (
+                1 + TOLERANCIA_RESTRICAO
+            ):
+                lambda_, mu, n = self._bissecao_duas_restricoes(
+                    volume, capacidade, custo, orcamento, mu
+                )
+                iteracoes += n
+
+        denominador = self._denominador(lambda_, mu, volume, custo)
+        lote_irrestrito = self.calcular_lote_otimo()
+        if lambda_ == 0 and mu == 0:
+            lote_restrito = lote_irrestrito
+        else:
+            # Arredonda para baixo para não reabrir a restrição (o mínimo já
+            # tem 2 casas)
+            lote_restrito = np.maximum(
+                np.floor(self.lotes(denominador) * 100) / 100, LOTE_MINIMO
+            )
+
+        custo_irrestrito = self.calcular_custo_total(lote_irrestrito)
+        custo_restrito = self.calcular_custo_total(lote_restrito)
+
+        return {
+            "lote_irrestrito": lote_irrestrito,
+            "lote_restrito": lote_restrito,
+            "custo_total_irrestrito": custo_irrestrito,
+            "custo_total_restrito": custo_restrito,
+            "multiplicador_capacidade": lambda_ if volume is not None else None,
+            "multiplicador_orcamento": mu if custo is not None else None,
+            "uso_capacidade": (
+                uso(volume, lote_restrito) if volume is not None else None
+            ),
+            "uso_orcamento": uso(custo, lote_restrito) if custo is not None else None,
+            "iteracoes": iteracoes,
+        }
+
+    def _bissecao_duas_restricoes(
+        self,
+        volume: np.ndarray,
+        capacidade: float,
+        custo: np.ndarray,
+        orcamento: float,
+        mu_maximo: float,
+    ) -> Tuple[float, float, int]:
+        """
+        Busca μ em [0, mu_maximo] com as duas restrições ativas: para cada
+        μ, λ(μ) ajusta a capacidade e o uso do orçamento decresce com μ.
+
+        Returns:
+            Tupla (λ, μ, iterações).
+        """
+        inferior, superior = 0.0, mu_maximo
+        lambda_, iteracoes = 0.0, 0
+        for _ in range(MAX_ITERACOES_BISSECAO):
+            mu = (inferior + superior) / 2
+            base = self._manutencao + 2 * mu * custo
+            lambda_, n = self._resolver_multiplicador(volume, capacidade, base)
+            iteracoes += n + 1
+            uso_orcamento = float(
+                np.dot(custo, self.lotes(base + 2 * lambda_ * volume))
+            )
+            if uso_orcamento > orcamento:
+                inferior = mu
+            else:
+                superior = mu
+            if superior - inferior <= TOLERANCIA_RESTRICAO * max(superior, 1e-300):
+                break
+
+        # Fica com o lado viável do intervalo
+        base = self._manutencao + 2 * superior * custo
+        lambda_, n = self._resolver_multiplicador(volume, capacidade, base)
+        return lambda_, superior, iteracoes + n
@@ -0,0 +1,227 @@
+"""
+Lote econômico calculado em SQL, para recalcular simulações no próprio
+banco (UPDATE sobre um conjunto de linhas) sem trazê-las para o Python.
+
+As expressões repetem em double precision as operações de
+CalculadoraLoteEconomicoLote na mesma ordem, de modo que os valores
+intermediários são os mesmos doubles do NumPy (entradas NUMERIC convertidas
+para float8 com arredondamento correto, como o float() do Python). O
+arredondamento para 2 casas é a função arredondar_centavos (migração 0009),
+que reproduz _arredondar inclusive nos empates; os resultados são iguais
+aos da calculadora bit a bit (ver SimulacaoService.verificar_recalculo_sql).
+
+Simulações com faixas de desconto, ou de modelos sem expressão SQL da
+manutenção equivalente, não têm forma fechada aqui e continuam com o
+cálculo em Python.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.lote_economico import LOTE_MINIMO
+from utils.modelos_custo import MODELOS_CUSTO, parametros_modelos
+
+# Colunas que a origem de consulta_analise deve fornecer
+COLUNAS_ORIGEM = (
+    "id",
+    "demanda_anual",
+    "custo_pedido",
+    "custo_manutencao",
+    "lote_atual_empresa",
+    "modelo",
+) + parametros_modelos()
+
+# Condição SQL das simulações sem tabela de descontos
+CONDICAO_SEM_DESCONTO = "COALESCE(jsonb_array_length(s.faixas_desconto), 0) = 0"
+
+
+def _arredondar_sql(expressao: str) -> str:
+    """
+    Arredondamento para 2 casas de _arredondar, em double precision.
+    """
+    return f"arredondar_centavos({expressao})"
+
+
+def _custo_total_sql(lote: str) -> str:
+    """
+    CT(Q) = (h / 2) Q + (S D) (1 / Q), na ordem de
+    ModeloManutencaoEquivalente.custo_total.
+    """
+    return _arredondar_sql(f"(he / 2) * {lote} + (s * d) * (1 / {lote})")
+
+
+def modelos_sql() -> Dict[str, str]:
+    """
+    Expressão SQL da manutenção equivalente de cada modelo registrado que
+    pode ser recalculado no banco, sobre as colunas d, s, h e os parâmetros
+    adicionais (já em double precision).
+    """
+    expressoes = {}
+    for nome, modelo in MODELOS_CUSTO.items():
+        expressao = modelo.manutencao_equivalente_sql(
+            "d", "s", "h", **{parametro: parametro for parametro in modelo.parametros}
+        )
+        if expressao is not None:
+            expressoes[nome] = expressao
+    return expressoes
+
+
+def _literal(texto: str) -> str:
+    return "'" + texto.replace("'", "''") + "'"
+
+
+def condicao_modelos_sql(coluna: str = "s.modelo") -> str:
+    """
+    Condição SQL das simulações cujo modelo tem expressão SQL.
+    """
+    nomes = ", ".join(_literal(nome) for nome in modelos_sql())
+    return f"{coluna} IN ({nomes})"
+
+
+def consulta_analise(origem: str) -> str:
+    """
+    SELECT com a análise de cada linha da origem (subconsulta com as
+    colunas de COLUNAS_ORIGEM, de qualquer tipo numérico), no formato de
+    CalculadoraLoteEconomicoLote.gerar_analise_completa: id, custo_pedido,
+    custo_manutencao, lote_otimo_calculado, custo_total_otimo,
+    custo_total_atual e economia_anual (double precision; nulos onde não há
+    lote atual). Linhas de modelos sem expressão SQL resultam em nulos.
+    """
+    casos = " ".join(
+        f"WHEN {_literal(nome)} THEN {expressao}"
+        for nome, expressao in modelos_sql().items()
+    )
+    parametros = "".join(
+        f", o.{parametro}::float8 AS {parametro}" for parametro in parametros_modelos()
+    )
+    return f"""
+        SELECT id, custo_pedido, custo_manutencao, lote_otimo_calculado,
+               custo_total_otimo, custo_total_atual,
+               {_arredondar_sql("custo_total_atual - custo_total_otimo")}
+                   AS economia_anual
+        FROM (
+            SELECT id, custo_pedido, custo_manutencao, lote_otimo_calculado,
+                   {_custo_total_sql("lote_otimo_calculado")} AS custo_total_otimo,
+                   {_custo_total_sql("qa")} AS custo_total_atual
+            FROM (
+                SELECT *, CASE WHEN lote < {LOTE_MINIMO}::float8
+                               THEN {LOTE_MINIMO}::float8 ELSE lote END
+                           AS lote_otimo_calculado
+                FROM (
+                    SELECT *, {_arredondar_sql("sqrt(2 * s * d / he)")} AS lote
+                    FROM (
+                        SELECT *, CASE modelo {casos} END AS he
+                        FROM (
+                            SELECT o.id, o.custo_pedido, o.custo_manutencao,
+                                   o.modelo,
+                                   o.demanda_anual::float8 AS d,
+                                   o.custo_pedido::float8 AS s,
+                                   o.custo_manutencao::float8 AS h,
+                                   NULLIF(o.lote_atual_empresa, 0)::float8 AS qa
+                                   {parametros}
+                            FROM ({origem}) o
+                        ) entrada
+                    ) equivalente
+                ) arredondado
+            ) otimo
+        ) custos
+    """
+
+
+def comando_recalculo(condicao: str) -> Tuple[str, str]:
+    """
+    UPDATE que aplica os novos custos e recalcula, no banco, as simulações
+    que atendem à condição (sobre o alias s) e que podem ser calculadas em
+    SQL.
+
+    Os novos custos vêm dos parâmetros nomeados custo_pedido,
+    custo_manutencao, fator_custo_pedido e fator_custo_manutencao (nulos
+    mantêm o custo atual); o fator é aplicado em NUMERIC, com 2 casas.
+
+    Returns:
+        Tupla (comando, condição completa das linhas recalculadas em SQL).
+    """
+    condicao_sql = (
+        f"({condicao}) AND {CONDICAO_SEM_DESCONTO} AND {condicao_modelos_sql()}"
+    )
+    parametros = "".join(f", s.{parametro}" for parametro in parametros_modelos())
+    origem = f"""
+        SELECT s.id, s.demanda_anual,
+               COALESCE(
+                   %(custo_pedido)s::numeric,
+                   round(s.custo_pedido * %(fator_custo_pedido)s::numeric, 2),
+                   s.custo_pedido
+               ) AS custo_pedido,
+               COALESCE(
+                   %(custo_manutencao)s::numeric,
+                   round(s.custo_manutencao * %(fator_custo_manutencao)s::numeric, 2),
+                   s.custo_manutencao
+               ) AS custo_manutencao,
+               s.lote_atual_empresa, s.modelo{parametros}
+        FROM simulacoes s
+        WHERE {condicao_sql}
+    """
+    comando = f"""
+        UPDATE simulacoes s
+        SET custo_pedido = c.custo_pedido,
+            custo_manutencao = c.custo_manutencao,
+            lote_otimo_calculado = c.lote_otimo_calculado,
+            custo_total_otimo = c.custo_total_otimo,
+            custo_total_atual = c.custo_total_atual,
+            economia_anual = c.economia_anual
+        FROM ({consulta_analise(origem)}) c
+        WHERE s.id = c.id
+    """
+    return comando, condicao_sql
+
+
+def simulacoes_aleatorias(
+    linhas: int, semente: Optional[int] = None
+) -> Dict[str, list]:
+    """
+    Conjunto aleatório de simulações (colunas de COLUNAS_ORIGEM, com 2
+    casas como no banco) para comparar o cálculo em SQL com o do NumPy.
+    Parte dos valores é inteira ou múltipla de 0,25, o que produz mais casos
+    sobre um empate do arredondamento; parte dos lotes atuais é nula ou zero.
+    """
+    gerador = np.random.default_rng(semente)
+    nomes = sorted(modelos_sql())
+
+    def valores(minimo: float, maximo: float) -> np.ndarray:
+        aleatorios = np.exp(gerador.uniform(np.log(minimo), np.log(maximo), linhas))
+        passo = gerador.choice([0.01, 0.25, 1.0], linhas, p=[0.6, 0.2, 0.2])
+        return np.maximum(np.round(aleatorios / passo) * passo, 0.01).round(2)
+
+    demanda = valores(1, 1e6)
+    modelo = gerador.choice(nomes, linhas)
+    sorteio = gerador.random(linhas)
+    lote_atual = np.where(sorteio < 0.05, 0.0, valores(1, 1e5))
+
+    dados = {
+        "id": list(range(1, linhas + 1)),
+        "demanda_anual": demanda.tolist(),
+        "custo_pedido": valores(0.01, 5000).tolist(),
+        "custo_manutencao": valores(0.01, 500).tolist(),
+        "lote_atual_empresa": [
+            None if nulo else valor
+            for nulo, valor in zip((sorteio > 0.7).tolist(), lote_atual.tolist())
+        ],
+        "modelo": modelo.tolist(),
+    }
+    for parametro in parametros_modelos():
+        if parametro == "taxa_producao":
+            # Maior que a demanda anual
+            sorteados = np.round(demanda * gerador.uniform(1.01, 20, linhas) + 0.01, 2)
+        else:
+            sorteados = valores(0.01, 1000)
+        # Nulo nos modelos que não usam o parâmetro
+        usa = np.isin(
+            modelo,
+            [nome for nome in nomes if parametro in MODELOS_CUSTO[nome].parametros],
+        )
+        dados[parametro] = [
+            valor if usado else None
+            for usado, valor in zip(usa.tolist(), sorteados.tolist())
+        ]
+    return dados
@@ -0,0 +1,299 @@
+"""
+Registro dos modelos de custo do lote econômico.
+
+Cada modelo define a função de custo total anual CT(Q) de forma simbólica
+(SymPy, com os parâmetros do produto como símbolos) e a avaliação numérica
+vetorizada (NumPy) do lote ótimo, do custo total e da segunda derivada
+para arrays de produtos, em forma fechada. Os modelos registrados têm
+CT(Q) = DS/Q + hQ/2 e derivam de ModeloManutencaoEquivalente, definindo
+apenas o custo de manutenção equivalente h. Novos modelos entram no
+registro com registrar_modelo, que recebe a classe e a instancia (uma
+classe sem algum método abstrato falha já no registro), e passam a ser
+aceitos no campo ``modelo`` das simulações.
+"""
+
+from abc import ABC, abstractmethod
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple, Type
+
+import numpy as np
+import sympy as sp
+
+MODELO_LEC = "lec"
+MODELO_LEP = "lep"
+MODELO_LEC_FALTAS = "lec_faltas"
+
+# Símbolos: lote (Q), demanda (D), pedido (S), manutenção (H)
+Q, D, S, H = sp.symbols("Q D S H", positive=True, real=True)
+# Taxa de produção anual (P) e custo de falta por unidade por ano (B)
+P, B = sp.symbols("P B", positive=True, real=True)
+
+
+class ModeloCusto(ABC):
+    """
+    Modelo de custo total anual CT(Q) do lote econômico.
+
+    Subclasses definem nome, descricao, parametros (campos da simulação
+    usados além de D, S e H, com o símbolo de cada um), expressao_custo e
+    os métodos numéricos em forma fechada (lote_otimo, custo_total e
+    segunda_derivada), que recebem arrays por produto e os parâmetros
+    adicionais como argumentos nomeados.
+    """
+
+    nome: str = ""
+    descricao: str = ""
+    parametros: Mapping[str, sp.Symbol] = MappingProxyType({})
+
+    @abstractmethod
+    def expressao_custo(self) -> sp.Expr:
+        """
+        Custo total anual em função de Q e dos símbolos do modelo.
+        """
+
+    @property
+    def simbolos(self) -> Tuple[sp.Symbol, ...]:
+        """
+        Símbolos dos parâmetros, na ordem (D, S, H, adicionais...).
+        """
+        return (D, S, H) + tuple(self.parametros.values())
+
+    def validar(self, demanda: Any, extras: Dict[str, Any]) -> None:
+        """
+        Verifica os parâmetros adicionais dos produtos do modelo.
+
+        Raises:
+            ValueError: Se faltar algum parâmetro ou ele não for positivo.
+        """
+        for nome in self.parametros:
+            valores = extras.get(nome)
+            if valores is None:
+                raise ValueError(f"O modelo {self.nome} exige {nome}")
+            valores = np.asarray(valores, dtype=np.float64)
+            faltantes = int(np.count_nonzero(np.isnan(valores)))
+            if faltantes:
+                raise ValueError(
+                    f"O modelo {self.nome} exige {nome} ({faltantes} item(ns) sem)"
+                )
+            if np.any(valores <= 0):
+                raise ValueError(f"{nome} deve ser maior que zero")
+
+    @abstractmethod
+    def lote_otimo(self, demanda, pedido, manutencao, **extras) -> np.ndarray:
+        """
+        Lote que anula a derivada do custo total.
+        """
+
+    @abstractmethod
+    def custo_total(self, lote, demanda, pedido, manutencao, **extras) -> np.ndarray:
+        """
+        Custo total anual CT(Q) para os lotes informados.
+        """
+
+    @abstractmethod
+    def segunda_derivada(
+        self, lote, demanda, pedido, manutencao, **extras
+    ) -> np.ndarray:
+        """
+        d²CT/dQ² nos lotes informados.
+        """
+
+    def demanda_maxima(self, **extras) -> Optional[Any]:
+        """
+        Limite superior (exclusivo) da demanda anual para os parâmetros
+        adicionais informados. None se o modelo não limita a demanda.
+        """
+        return None
+
+    def manutencao_equivalente(
+        self, demanda, pedido, manutencao, **extras
+    ) -> Optional[np.ndarray]:
+        """
+        Custo h com CT(Q) = DS/Q + hQ/2, quando o modelo tem essa forma
+        (usado pela otimização com restrições). None nos demais modelos.
+        """
+        return None
+
+    def manutencao_equivalente_sql(
+        self, demanda: str, pedido: str, manutencao: str, **extras: str
+    ) -> Optional[str]:
+        """
+        Expressão SQL (double precision) de manutencao_equivalente, com as
+        mesmas operações na mesma ordem, a partir das expressões SQL dos
+        parâmetros. None se o modelo não puder ser recalculado no banco.
+        """
+        return None
+
+    def indicadores(
+        self, lote, demanda, pedido, manutencao, **extras
+    ) -> Dict[str, np.ndarray]:
+        """
+        Grandezas adicionais do modelo no lote informado (estoque máximo,
+        falta máxima...).
+        """
+        return {}
+
+
+class ModeloManutencaoEquivalente(ModeloCusto):
+    """
+    Modelos com CT(Q) = DS/Q + hQ/2, em que só o custo de manutenção
+    equivalente h muda. Lote ótimo, custo e segunda derivada usam a forma
+    fechada, na mesma ordem de operações do LEC clássico.
+    """
+
+    @abstractmethod
+    def manutencao_equivalente(self, demanda, pedido, manutencao, **extras):
+        """
+        Custo h do modelo (obrigatório nesta família).
+        """
+
+    def lote_otimo(self, demanda, pedido, manutencao, **extras):
+        equivalente = self.manutencao_equivalente(demanda, pedido, manutencao, **extras)
+        return np.sqrt(2 * pedido * demanda / equivalente)
+
+    def custo_total(self, lote, demanda, pedido, manutencao, **extras):
+        equivalente = self.manutencao_equivalente(demanda, pedido, manutencao, **extras)
+        return (equivalente / 2) * lote + (pedido * demanda) * (1 / lote)
+
+    def segunda_derivada(self, lote, demanda, pedido, manutencao, **extras):
+        return (2 * (pedido * demanda)) * (1 / lote**3)
+
+
+class ModeloLEC(ModeloManutencaoEquivalente):
+    """
+    Lote econômico de compra clássico: reposição instantânea e sem faltas.
+    CT(Q) = HQ/2 + SD/Q.
+    """
+
+    nome = MODELO_LEC
+    descricao = "Lote econômico de compra (reposição instantânea)"
+
+    def expressao_custo(self) -> sp.Expr:
+        return (H * Q) / 2 + (S * D) / Q
+
+    def manutencao_equivalente(self, demanda, pedido, manutencao, **extras):
+        return manutencao
+
+    def manutencao_equivalente_sql(self, demanda, pedido, manutencao, **extras):
+        return manutencao
+
+
+class ModeloLEP(ModeloManutencaoEquivalente):
+    """
+    Lote econômico de produção: o lote é produzido à taxa P (> D) enquanto
+    a demanda é atendida, e o estoque máximo é Q(1 - D/P).
+    CT(Q) = H(1 - D/P)Q/2 + SD/Q.
+    """
+
+    nome = MODELO_LEP
+    descricao = "Lote econômico de produção (taxa de produção finita)"
+    parametros = MappingProxyType({"taxa_producao": P})
+
+    def expressao_custo(self) -> sp.Expr:
+        return (H * (1 - D / P) * Q) / 2 + (S * D) / Q
+
+    def validar(self, demanda, extras):
+        super().validar(demanda, extras)
+        if np.any(np.asarray(demanda) >= np.asarray(self.demanda_maxima(**extras))):
+            raise ValueError("A taxa de produção deve ser maior que a demanda anual")
+
+    def demanda_maxima(self, taxa_producao=None, **extras):
+        return taxa_producao
+
+    def manutencao_equivalente(
+        self, demanda, pedido, manutencao, taxa_producao=None, **extras
+    ):
+        return manutencao * (1 - demanda / taxa_producao)
+
+    def manutencao_equivalente_sql(
+        self, demanda, pedido, manutencao, taxa_producao=None, **extras
+    ):
+        return f"{manutencao} * (1 - {demanda} / {taxa_producao})"
+
+    def indicadores(
+        self, lote, demanda, pedido, manutencao, taxa_producao=None, **extras
+    ):
+        return {"estoque_maximo": lote * (1 - demanda / taxa_producao)}
+
+
+class ModeloLECFaltas(ModeloManutencaoEquivalente):
+    """
+    Lote econômico com faltas planejadas (pendências atendidas na chegada
+    do lote), com custo B por unidade em falta por ano. Com a falta
+    máxima ótima b = HQ/(H + B), o custo fica
+    CT(Q) = SD/Q + HBQ/(2(H + B)).
+    """
+
+    nome = MODELO_LEC_FALTAS
+    descricao = "Lote econômico com faltas planejadas"
+    parametros = MappingProxyType({"custo_falta_anual": B})
+
+    def expressao_custo(self) -> sp.Expr:
+        return (S * D) / Q + (H * B * Q) / (2 * (H + B))
+
+    def manutencao_equivalente(
+        self, demanda, pedido, manutencao, custo_falta_anual=None, **extras
+    ):
+        return manutencao * custo_falta_anual / (manutencao + custo_falta_anual)
+
+    def manutencao_equivalente_sql(
+        self, demanda, pedido, manutencao, custo_falta_anual=None, **extras
+    ):
+        return (
+            f"{manutencao} * {custo_falta_anual}"
+            f" / ({manutencao} + {custo_falta_anual})"
+        )
+
+    def indicadores(
+        self, lote, demanda, pedido, manutencao, custo_falta_anual=None, **extras
+    ):
+        falta_maxima = lote * manutencao / (manutencao + custo_falta_anual)
+        return {
+            "falta_maxima": falta_maxima,
+            "estoque_maximo": lote - falta_maxima,
+        }
+
+
+MODELOS_CUSTO: Dict[str, ModeloCusto] = {}
+
+
+def registrar_modelo(classe: Type[ModeloCusto]) -> ModeloCusto:
+    """
+    Instancia o modelo e o inclui no registro (substitui outro de mesmo
+    nome).
+
+    Raises:
+        TypeError: Se a classe não implementar algum método abstrato.
+    """
+    modelo = classe()
+    MODELOS_CUSTO[modelo.nome] = modelo
+    return modelo
+
+
+def obter_modelo(nome: Optional[str]) -> ModeloCusto:
+    """
+    Modelo de custo registrado com o nome informado (LEC se None).
+
+    Raises:
+        ValueError: Se o modelo não existir.
+    """
+    modelo = MODELOS_CUSTO.get(nome or MODELO_LEC)
+    if modelo is None:
+        raise ValueError(
+            f"Modelo de custo inválido: {nome}"
+            f" (use {', '.join(sorted(MODELOS_CUSTO))})"
+        )
+    return modelo
+
+
+def parametros_modelos() -> Tuple[str, ...]:
+    """
+    Nomes de todos os parâmetros adicionais dos modelos registrados.
+    """
+    nomes: Dict[str, None] = {}
+    for modelo in MODELOS_CUSTO.values():
+        nomes.update(dict.fromkeys(modelo.parametros))
+    return tuple(nomes)
+
+
+for _classe in (ModeloLEC, ModeloLEP, ModeloLECFaltas):
+    registrar_modelo(_classe)
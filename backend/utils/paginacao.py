@@ -0,0 +1,128 @@
+"""
+Paginação por cursor (keyset) das listagens.
+
+O cursor é opaco para o cliente: guarda a ordenação usada e a chave
+(valor da coluna de ordenação, id) do último item da página, de modo que a
+próxima página começa logo depois dele sem OFFSET.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+LIMITE_PADRAO_PAGINA = 100
+LIMITE_MAXIMO_PAGINA = 1000
+
+CABECALHO_PROXIMO_CURSOR = "X-Proximo-Cursor"
+
+
+class Pagina(NamedTuple):
+    itens: List[Any]
+    proximo_cursor: Optional[str]
+
+
+class ColunaOrdenacao(NamedTuple):
+    # Expressão SQL da coluna
+    expressao: str
+    # Se a coluna aceita NULL (os nulos ficam sempre no fim)
+    anulavel: bool = False
+
+
+def _valor_cursor(valor: Any) -> Optional[str]:
+    if valor is None:
+        return None
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return str(valor)
+
+
+def codificar_cursor(ordenar_por: str, ordem: str, valor: Any, id_item: int) -> str:
+    """
+    Gera o cursor que aponta para depois do item informado.
+    """
+    dados = {"o": ordenar_por, "d": ordem, "v": _valor_cursor(valor), "i": id_item}
+    texto = json.dumps(dados, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(texto).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(
+    cursor: str, ordenar_por: str, ordem: str
+) -> Tuple[Optional[str], int]:
+    """
+    Lê um cursor gerado por codificar_cursor.
+
+    Returns:
+        Tupla (valor da coluna de ordenação, id) do último item visto.
+
+    Raises:
+        ValueError: Se o cursor for inválido ou de outra ordenação.
+    """
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        valor, id_item = dados["v"], int(dados["i"])
+        mesma_ordenacao = dados["o"] == ordenar_por and dados["d"] == ordem
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Cursor de paginação inválido")
+
+    if not mesma_ordenacao:
+        raise ValueError("O cursor foi gerado com outra ordenação")
+
+    return valor, id_item
+
+
+def ordenacao_keyset(coluna: ColunaOrdenacao, coluna_id: str, ordem: str) -> str:
+    """
+    Cláusula ORDER BY (sem a palavra-chave) com o id como desempate.
+    """
+    direcao = "DESC" if ordem == "desc" else "ASC"
+    nulos = " NULLS LAST" if coluna.anulavel else ""
+    return f"{coluna.expressao} {direcao}{nulos}, {coluna_id} {direcao}"
+
+
+def condicao_keyset(
+    coluna: ColunaOrdenacao,
+    coluna_id: str,
+    ordem: str,
+    valor: Optional[str],
+    id_item: int,
+) -> Tuple[str, list]:
+    """
+    Condição WHERE que seleciona os itens depois de (valor, id) na
+    ordenação de ordenacao_keyset.
+
+    Returns:
+        Tupla (SQL com placeholders, parâmetros).
+    """
+    operador = "<" if ordem == "desc" else ">"
+    expressao = coluna.expressao
+
+    if not coluna.anulavel:
+        return (
+            f"({expressao}, {coluna_id}) {operador} (%s, %s)",
+            [valor, id_item],
+        )
+
+    # Nulos vêm depois de todos os valores, ordenados apenas pelo id
+    if valor is None:
+        return f"({expressao} IS NULL AND {coluna_id} {operador} %s)", [id_item]
+
+    return (
+        f"({expressao} {operador} %s"
+        f" OR ({expressao} = %s AND {coluna_id} {operador} %s)"
+        f" OR {expressao} IS NULL)",
+        [valor, valor, id_item],
+    )
+
+
+def escapar_prefixo_like(prefixo: str) -> str:
+    """
+    Monta o padrão LIKE que busca textos começando pelo prefixo.
+    """
+    escapado = prefixo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escapado + "%"
@@ -0,0 +1,176 @@
+"""
+Pool de processos para os cálculos pesados (curvas, sensibilidade, Monte
+Carlo).
+
+As rotas rodam os serviços no pool de threads do AnyIO; cálculos longos em
+Python puro ou em NumPy seguram o GIL e atrasam o loop de eventos, que
+deixa de responder aos demais clientes. Acima de um custo estimado, o
+cálculo é enviado a um processo do pool e a thread da requisição apenas
+espera o resultado, com tempo limite. Cálculos pequenos continuam na
+própria thread, onde a troca de mensagens entre processos custaria mais
+que o cálculo.
+
+O pool é criado no lifespan da aplicação, com os processos já aquecidos
+(NumPy, SymPy e os modelos simbólicos carregados). Sem ele (scripts,
+manutenção) todos os cálculos rodam na thread atual.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as TempoFuturoEsgotado
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+class TempoCalculoEsgotadoError(Exception):
+    """
+    O cálculo não terminou dentro do tempo limite.
+    """
+
+    def __init__(self, timeout_segundos: float):
+        self.timeout_segundos = timeout_segundos
+        super().__init__(
+            f"O cálculo excedeu o tempo limite de {timeout_segundos:g} segundos"
+        )
+
+
+def _aquecer_processo():
+    """
+    Inicializador dos processos: importa as bibliotecas e deriva os
+    modelos simbólicos antes da primeira tarefa.
+    """
+    import numpy  # noqa: F401
+
+    from utils.lote_economico import modelo_simbolico
+    from utils.modelos_custo import MODELOS_CUSTO
+
+    for nome in MODELOS_CUSTO:
+        modelo_simbolico(nome)
+
+
+def _pronto() -> int:
+    return os.getpid()
+
+
+class PoolCalculo:
+    """
+    Executa cálculos em um pool de processos, com tempo limite por tarefa
+    e execução direta para as tarefas pequenas.
+    """
+
+    def __init__(
+        self,
+        max_processos: Optional[int] = None,
+        timeout_segundos: float = 60.0,
+        limite_inline: int = 50_000,
+    ):
+        """
+        Inicializa o pool (os processos só são criados em iniciar()).
+
+        Args:
+            max_processos: Processos do pool (padrão: número de CPUs;
+                0 desativa o pool)
+            timeout_segundos: Tempo limite padrão de cada tarefa
+            limite_inline: Custo estimado a partir do qual a tarefa vai
+                para o pool
+        """
+        self.max_processos = (
+            (os.cpu_count() or 1) if max_processos is None else max_processos
+        )
+        self.timeout_segundos = timeout_segundos
+        self.limite_inline = limite_inline
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._trava = threading.Lock()
+
+    @property
+    def ativo(self) -> bool:
+        return self._executor is not None
+
+    def _criar_executor(self) -> ProcessPoolExecutor:
+        # "spawn" evita copiar por fork as threads e conexões do servidor
+        return ProcessPoolExecutor(
+            max_workers=self.max_processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_aquecer_processo,
+        )
+
+    def iniciar(self):
+        """
+        Cria os processos e espera todos estarem aquecidos.
+        """
+        if self.max_processos <= 0:
+            return
+        with self._trava:
+            if self._executor is not None:
+                return
+            executor = self._criar_executor()
+            futuros = [executor.submit(_pronto) for _ in range(self.max_processos)]
+            for futuro in futuros:
+                futuro.result()
+            self._executor = executor
+
+    def executar(
+        self,
+        funcao: Callable[..., Any],
+        *args: Any,
+        custo: int = 0,
+        timeout_segundos: Optional[float] = None,
+    ) -> Any:
+        """
+        Executa funcao(*args) no pool ou, para tarefas pequenas e sem pool
+        ativo, na thread atual. Função e argumentos precisam ser
+        serializáveis com pickle.
+
+        Args:
+            funcao: Função a executar
+            custo: Custo estimado da tarefa (por exemplo, pontos avaliados)
+            timeout_segundos: Tempo limite (padrão: o do pool)
+
+        Raises:
+            TempoCalculoEsgotadoError: Se a tarefa passar do tempo limite.
+                Uma tarefa já iniciada continua até o fim no seu processo.
+        """
+        executor = self._executor
+        if executor is None or custo < self.limite_inline:
+            return funcao(*args)
+
+        timeout_segundos = timeout_segundos or self.timeout_segundos
+        try:
+            futuro = executor.submit(funcao, *args)
+            return futuro.result(timeout=timeout_segundos)
+        except TempoFuturoEsgotado:
+            futuro.cancel()
+            raise TempoCalculoEsgotadoError(timeout_segundos)
+        except BrokenProcessPool:
+            # Um processo morreu (falta de memória, sinal): recria o pool
+            # para as próximas tarefas
+            self._reiniciar(executor)
+            raise
+
+    def _reiniciar(self, quebrado: ProcessPoolExecutor):
+        with self._trava:
+            if self._executor is not quebrado:
+                return
+            quebrado.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._criar_executor()
+
+    def encerrar(self):
+        """
+        Finaliza os processos (as tarefas na fila são canceladas).
+        """
+        with self._trava:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+# Instância global para reutilização
+pool_calculo = PoolCalculo(
+    max_processos=(
+        int(os.getenv("CALCULO_PROCESSOS")) if os.getenv("CALCULO_PROCESSOS") else None
+    ),
+    timeout_segundos=float(os.getenv("CALCULO_TIMEOUT_SEGUNDOS", "60")),
+    limite_inline=int(os.getenv("CALCULO_LIMITE_INLINE", "50000")),
+)
@@ -0,0 +1,137 @@
+"""
+Hash de senhas com scrypt executado em um pool de threads limitado.
+
+O scrypt é propositalmente lento; para que logins simultâneos não ocupem
+todos os núcleos (nem as threads usadas pelas chamadas ao banco), os
+cálculos rodam em um executor próprio com concorrência configurável.
+Hashes no formato antigo (SHA-256 em hexadecimal) continuam aceitos e são
+sinalizados para serem refeitos no próximo login.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+PREFIXO_SCRYPT = "scrypt"
+
+_PADRAO_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _b64(dados: bytes) -> str:
+    return base64.b64encode(dados).decode("ascii").rstrip("=")
+
+
+def _de_b64(texto: str) -> bytes:
+    return base64.b64decode(texto + "=" * (-len(texto) % 4))
+
+
+class HasherSenha:
+    """
+    Gera e verifica hashes de senha no formato
+    ``scrypt$n$r$p$sal$hash`` (sal e hash em base64).
+    """
+
+    def __init__(
+        self,
+        max_concorrencia: Optional[int] = None,
+        n: int = 2**14,
+        r: int = 8,
+        p: int = 1,
+    ):
+        """
+        Inicializa o hasher.
+
+        Args:
+            max_concorrencia: Hashes calculados ao mesmo tempo
+                (padrão: número de CPUs)
+            n, r, p: Parâmetros de custo do scrypt
+        """
+        self.max_concorrencia = max_concorrencia or os.cpu_count() or 1
+        self.n = n
+        self.r = r
+        self.p = p
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concorrencia, thread_name_prefix="hash-senha"
+        )
+        # Hash usado quando o email não existe, para que a resposta leve
+        # o mesmo tempo de uma senha errada
+        self._hash_ficticio: Optional[str] = None
+
+    def _scrypt(self, senha: str, sal: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            senha.encode("utf-8"),
+            salt=sal,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r,
+            dklen=32,
+        )
+
+    def _gerar(self, senha: str) -> str:
+        sal = os.urandom(16)
+        chave = self._scrypt(senha, sal, self.n, self.r, self.p)
+        return f"{PREFIXO_SCRYPT}${self.n}${self.r}${self.p}${_b64(sal)}${_b64(chave)}"
+
+    def _verificar(self, senha: str, hash_armazenado: str) -> Tuple[bool, bool]:
+        if _PADRAO_SHA256.match(hash_armazenado):
+            legado = hashlib.sha256(senha.encode()).hexdigest()
+            return hmac.compare_digest(legado, hash_armazenado), True
+
+        try:
+            prefixo, n, r, p, sal, chave = hash_armazenado.split("$")
+            n, r, p = int(n), int(r), int(p)
+            sal, chave = _de_b64(sal), _de_b64(chave)
+        except ValueError:
+            return False, False
+        if prefixo != PREFIXO_SCRYPT:
+            return False, False
+
+        valida = hmac.compare_digest(self._scrypt(senha, sal, n, r, p), chave)
+        desatualizado = (n, r, p) != (self.n, self.r, self.p)
+        return valida, desatualizado
+
+    def gerar_hash(self, senha: str) -> str:
+        """
+        Gera o hash de uma senha (no executor limitado).
+        """
+        return self._executor.submit(self._gerar, senha).result()
+
+    def verificar(
+        self, senha: str, hash_armazenado: Optional[str]
+    ) -> Tuple[bool, bool]:
+        """
+        Verifica uma senha contra o hash armazenado (no executor limitado).
+
+        Args:
+            senha: Senha em texto plano.
+            hash_armazenado: Hash do banco ou None se o usuário não existir.
+
+        Returns:
+            Tupla (senha correta, hash deve ser refeito com os parâmetros
+            atuais).
+        """
+        if hash_armazenado is None:
+            if self._hash_ficticio is None:
+                self._hash_ficticio = self.gerar_hash("")
+            self._executor.submit(self._verificar, senha, self._hash_ficticio).result()
+            return False, False
+
+        return self._executor.submit(self._verificar, senha, hash_armazenado).result()
+
+    def encerrar(self):
+        """
+        Finaliza as threads do executor.
+        """
+        self._executor.shutdown(wait=False)
+
+
+# Instância global para reutilização
+hasher_senha = HasherSenha(
+    max_concorrencia=int(os.getenv("SENHA_HASH_MAX_CONCORRENCIA", "0")) or None,
+    n=int(os.getenv("SENHA_SCRYPT_N", str(2**14))),
+)
@@ -0,0 +1,286 @@
+"""
+Análise de sensibilidade do Lote Econômico de Compra.
+
+Varia demanda anual (D), custo de pedido (S) e custo de manutenção (H) em
+grades de fatores multiplicativos, uma variável por vez (curvas e tornado)
+ou duas ao mesmo tempo (mapa de calor). As grades são montadas por
+broadcasting do NumPy e calculadas em uma única passada pela
+CalculadoraLoteEconomicoLote, com o mesmo modelo de custo, forma fechada e
+arredondamento das simulações salvas (os parâmetros adicionais do modelo
+ficam fixos).
+
+Modelos que limitam a demanda (no LEP ela deve ficar abaixo da taxa de
+produção fixa) não têm solução nos pontos da grade acima do limite: esses
+pontos resultam em NaN, o tornado usa apenas fatores viáveis e o limite é
+informado em ``limites`` na análise.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.lote_economico import CalculadoraLoteEconomico, CalculadoraLoteEconomicoLote
+from utils.modelos_custo import obter_modelo
+
+PARAMETROS_SENSIBILIDADE = ("demanda_anual", "custo_pedido", "custo_manutencao")
+METRICAS_MAPA = (
+    "lote_otimo",
+    "custo_total_otimo",
+    "custo_total_atual",
+    "economia_anual",
+)
+
+MAX_PONTOS_SENSIBILIDADE = 1000
+
+
+class AnaliseSensibilidade:
+    """
+    Análise de sensibilidade de um produto a partir da sua calculadora.
+    """
+
+    def __init__(self, calculadora: CalculadoraLoteEconomico):
+        """
+        Inicializa a análise com os parâmetros base do produto.
+
+        Args:
+            calculadora: Calculadora do produto (parâmetros e lote atual)
+        """
+        self.base = {
+            "demanda_anual": calculadora.demanda_anual,
+            "custo_pedido": calculadora.custo_pedido,
+            "custo_manutencao": calculadora.custo_manutencao,
+        }
+        self.lote_atual = calculadora.lote_atual
+        self.modelo = calculadora.modelo
+        self.parametros_modelo = calculadora.parametros_modelo
+        self.demanda_maxima = obter_modelo(self.modelo).demanda_maxima(
+            **self.parametros_modelo
+        )
+
+    def fatores(
+        self, variacao_min: float, variacao_max: float, pontos: int
+    ) -> np.ndarray:
+        """
+        Grade de fatores multiplicativos de (1 + variacao_min) a
+        (1 + variacao_max); sempre inclui o fator 1 (cenário base).
+
+        Raises:
+            ValueError: Se a faixa de variação for inválida.
+        """
+        if not -1 < variacao_min < variacao_max:
+            raise ValueError(
+                "A variação mínima deve ser maior que -100% e menor que a máxima"
+            )
+        if not 2 <= pontos <= MAX_PONTOS_SENSIBILIDADE:
+            raise ValueError(
+                f"O número de pontos deve estar entre 2 e {MAX_PONTOS_SENSIBILIDADE}"
+            )
+
+        fatores = np.linspace(1 + variacao_min, 1 + variacao_max, pontos)
+        if variacao_min < 0 < variacao_max:
+            # Substitui o ponto mais próximo do cenário base pelo fator 1 exato
+            fatores[np.argmin(np.abs(fatores - 1))] = 1.0
+        return fatores
+
+    def _calcular(
+        self, fatores_por_parametro: Dict[str, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calcula lote ótimo e custos para as grades informadas (os demais
+        parâmetros ficam no valor base). As grades são combinadas por
+        broadcasting e o resultado tem a forma do broadcast; pontos com
+        demanda fora do limite do modelo recebem NaN.
+        """
+        valores = [
+            self.base[nome] * fatores_por_parametro.get(nome, np.float64(1.0))
+            for nome in PARAMETROS_SENSIBILIDADE
+        ]
+        demanda, pedido, manutencao = (
+            array.ravel() for array in np.broadcast_arrays(*valores)
+        )
+        forma = np.broadcast_shapes(*(np.shape(valor) for valor in valores))
+        viaveis = self._demanda_viavel(demanda)
+        quantidade = int(np.count_nonzero(viaveis))
+
+        calculadora = CalculadoraLoteEconomicoLote(
+            demanda_anual=demanda[viaveis],
+            custo_pedido=pedido[viaveis],
+            custo_manutencao=manutencao[viaveis],
+            lote_atual=(
+                np.full(quantidade, self.lote_atual) if self.lote_atual else None
+            ),
+            modelo=self.modelo,
+            parametros_modelo={
+                nome: np.full(quantidade, valor)
+                for nome, valor in self.parametros_modelo.items()
+            },
+        )
+        analise = calculadora.gerar_analise_completa()
+
+        chaves = {
+            "lote_otimo": "lote_otimo_calculado",
+            "custo_total_otimo": "custo_total_otimo",
+        }
+        if self.lote_atual:
+            chaves["custo_total_atual"] = "custo_total_atual"
+            chaves["economia_anual"] = "economia_anual"
+
+        resultado = {}
+        for nome, chave in chaves.items():
+            completo = np.full(demanda.size, np.nan)
+            completo[viaveis] = analise[chave]
+            resultado[nome] = completo.reshape(forma)
+        return resultado
+
+    def _demanda_viavel(self, demanda: np.ndarray) -> np.ndarray:
+        """
+        Máscara das demandas abaixo do limite do modelo (todas sem limite).
+        """
+        if self.demanda_maxima is None:
+            return np.ones(np.shape(demanda), dtype=bool)
+        return np.asarray(demanda) < self.demanda_maxima
+
+    def _fatores_viaveis(self, nome: str, fatores: np.ndarray) -> np.ndarray:
+        """
+        Fatores da grade que mantêm o parâmetro dentro do limite do modelo.
+        """
+        if nome != "demanda_anual":
+            return fatores
+        return fatores[self._demanda_viavel(self.base[nome] * fatores)]
+
+    def curvas(self, fatores: np.ndarray) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Varia um parâmetro por vez sobre a grade de fatores.
+
+        Returns:
+            Para cada parâmetro: valores testados, lote ótimo e custos.
+        """
+        curvas = {}
+        for nome in PARAMETROS_SENSIBILIDADE:
+            curva = self._calcular({nome: fatores})
+            curva["valores"] = self.base[nome] * fatores
+            curvas[nome] = curva
+        return curvas
+
+    def tornado(self, fatores: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Impacto de cada parâmetro nos extremos da grade de fatores, ordenado
+        do maior para o menor efeito sobre o custo total ótimo. A demanda
+        usa os extremos viáveis da grade (sem barra se nenhum for viável).
+        """
+        barras = []
+        for nome in PARAMETROS_SENSIBILIDADE:
+            viaveis = self._fatores_viaveis(nome, fatores)
+            if viaveis.size == 0:
+                continue
+            extremos = np.array([viaveis.min(), viaveis.max()])
+            resultado = self._calcular({nome: extremos})
+            custo = resultado["custo_total_otimo"]
+            barras.append(
+                {
+                    "parametro": nome,
+                    "valor_min": float(self.base[nome] * extremos[0]),
+                    "valor_max": float(self.base[nome] * extremos[1]),
+                    "lote_otimo_min": float(resultado["lote_otimo"][0]),
+                    "lote_otimo_max": float(resultado["lote_otimo"][1]),
+                    "custo_total_otimo_min": float(custo[0]),
+                    "custo_total_otimo_max": float(custo[1]),
+                    "amplitude_custo": round(float(abs(custo[1] - custo[0])), 2),
+                }
+            )
+        barras.sort(key=lambda b: b["amplitude_custo"], reverse=True)
+        return barras
+
+    def mapa(
+        self,
+        eixo_x: str,
+        eixo_y: str,
+        fatores_x: np.ndarray,
+        fatores_y: np.ndarray,
+        metrica: str = "custo_total_otimo",
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Varia dois parâmetros ao mesmo tempo (mapa de calor).
+
+        Returns:
+            Tupla (valores do eixo x, valores do eixo y, superfície da
+            métrica com uma linha por valor de y e uma coluna por valor de x).
+
+        Raises:
+            ValueError: Se os eixos ou a métrica forem inválidos.
+        """
+        if eixo_x == eixo_y:
+            raise ValueError("Os eixos do mapa devem ser parâmetros diferentes")
+        if (
+            eixo_x not in PARAMETROS_SENSIBILIDADE
+            or eixo_y not in PARAMETROS_SENSIBILIDADE
+        ):
+            raise ValueError(f"Parâmetro inválido: {eixo_x}/{eixo_y}")
+        if metrica not in METRICAS_MAPA:
+            raise ValueError(f"Métrica inválida: {metrica}")
+        if metrica in ("custo_total_atual", "economia_anual") and not self.lote_atual:
+            raise ValueError(
+                f"A métrica {metrica} exige que a simulação tenha lote atual"
+            )
+
+        resultado = self._calcular(
+            {eixo_x: fatores_x[np.newaxis, :], eixo_y: fatores_y[:, np.newaxis]}
+        )
+        return (
+            self.base[eixo_x] * fatores_x,
+            self.base[eixo_y] * fatores_y,
+            resultado[metrica],
+        )
+
+    def gerar_analise(
+        self,
+        variacao_min: float = -0.3,
+        variacao_max: float = 0.3,
+        pontos: int = 21,
+        eixo_x: str = "demanda_anual",
+        eixo_y: str = "custo_manutencao",
+        pontos_mapa: Optional[int] = None,
+        metrica_mapa: str = "custo_total_otimo",
+    ) -> Dict[str, Any]:
+        """
+        Gera a análise completa: cenário base, tornado, curvas de um
+        parâmetro por vez e mapa de dois parâmetros (arrays NumPy).
+        """
+        fatores = self.fatores(variacao_min, variacao_max, pontos)
+        fatores_mapa = (
+            fatores
+            if not pontos_mapa or pontos_mapa == pontos
+            else self.fatores(variacao_min, variacao_max, pontos_mapa)
+        )
+        base = self._calcular({})
+        valores_x, valores_y, superficie = self.mapa(
+            eixo_x, eixo_y, fatores_mapa, fatores_mapa, metrica_mapa
+        )
+
+        limites = {}
+        if self.demanda_maxima is not None:
+            # Limite exclusivo: pontos com demanda igual ou acima são NaN
+            limites["demanda_anual"] = float(self.demanda_maxima)
+
+        return {
+            "limites": limites,
+            "base": {
+                **self.base,
+                "lote_atual_empresa": self.lote_atual,
+                **{chave: float(valor) for chave, valor in base.items()},
+            },
+            "fatores": fatores,
+            # Extremos exatos da variação, mais a grade para o corte da demanda
+            "tornado": self.tornado(
+                np.union1d(fatores, [1 + variacao_min, 1 + variacao_max])
+            ),
+            "curvas": self.curvas(fatores),
+            "mapa": {
+                "eixo_x": eixo_x,
+                "eixo_y": eixo_y,
+                "metrica": metrica_mapa,
+                "valores_x": valores_x,
+                "valores_y": valores_y,
+                "valores": superficie,
+            },
+        }
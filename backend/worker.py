@@ -0,0 +1,74 @@
+"""
+Worker dos jobs em segundo plano (recálculo de projetos).
+
+Processa a fila da tabela jobs (services/job.py). Vários workers podem
+rodar ao mesmo tempo, na mesma máquina ou não. Ao receber SIGTERM ou
+SIGINT o worker termina o pedaço em andamento e devolve o job à fila.
+A API também pode iniciar um worker próprio (JOBS_WORKER_NA_INICIALIZACAO).
+
+Uso (a partir de backend/):
+
+    python worker.py                 # processa jobs até ser interrompido
+    python worker.py --uma-vez       # processa os jobs da fila e sai
+"""
+
+import argparse
+import signal
+import sys
+import threading
+from typing import List, Optional
+
+from services.job import JobService
+
+# Espera entre as consultas à fila vazia
+INTERVALO_FILA_SEGUNDOS = 2.0
+
+
+def executar_worker(
+    parar: Optional[threading.Event] = None,
+    intervalo: float = INTERVALO_FILA_SEGUNDOS,
+    uma_vez: bool = False,
+) -> int:
+    """
+    Processa jobs até o sinal de parada (ou até a fila esvaziar, com
+    uma_vez).
+
+    Returns:
+        Quantidade de jobs reivindicados.
+    """
+    parar = parar or threading.Event()
+    servico = JobService()
+    processados = 0
+
+    while not parar.is_set():
+        try:
+            if servico.processar_proximo(parar):
+                processados += 1
+                continue
+        except Exception as e:
+            # Banco indisponível: tenta de novo no próximo intervalo
+            print(f"Erro ao processar a fila de jobs: {e}", file=sys.stderr)
+        if uma_vez:
+            break
+        parar.wait(intervalo)
+
+    return processados
+
+
+def main(argumentos: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Worker dos jobs em segundo plano")
+    parser.add_argument("--uma-vez", action="store_true")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_FILA_SEGUNDOS)
+    args = parser.parse_args(argumentos)
+
+    parar = threading.Event()
+    for sinal in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sinal, lambda *_: parar.set())
+
+    processados = executar_worker(parar, args.intervalo, args.uma_vez)
+    print(f"Jobs processados: {processados}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())